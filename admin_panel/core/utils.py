@@ -2,12 +2,18 @@ import streamlit as st
 from pymongo import MongoClient, uri_parser
 import os
 import certifi
+import redis as _sync_redis
 from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
 from bson import ObjectId
 import pytz
 
-from app.core.constants import is_prod_like_env
+from app.core.constants import (
+    AVAILABILITY_CACHE_KEY,
+    RUNTIME_CONFIG_CHANNEL,
+    is_prod_like_env,
+)
+from app.core.lead_history import SESSION_ENDING_STATUSES, session_end, session_stamp
 
 # Load environment variables
 load_dotenv()
@@ -47,6 +53,69 @@ leads_collection = db.leads
 messages_collection = db.messages
 slots_collection = db.slots
 settings_collection = db.settings
+chat_sessions_collection = db.chat_sessions
+
+# Sync Redis for cache invalidation. The panel writes `slots` directly through
+# PyMongo, bypassing the worker's write-through helpers, so every slot edit
+# here must drop the pro's availability cache. Fail-open like the login
+# lockout in admin_panel/core/auth.py: an unreachable Redis only means the
+# cache converges on its TTL instead of immediately.
+_redis_url = (
+    os.getenv("REDIS_URL")
+    or os.getenv("REDIS_TLS_URL")
+    or f"redis://{os.getenv('REDIS_HOST', 'redis')}:{os.getenv('REDIS_PORT', '6379')}/{os.getenv('REDIS_DB', '0')}"
+)
+try:
+    sync_redis = _sync_redis.from_url(
+        _redis_url, decode_responses=True, socket_connect_timeout=2
+    )
+except Exception:
+    sync_redis = None
+
+
+def invalidate_availability_cache(pro_id) -> None:
+    """Drop a pro's `avail:{pro_id}` set; the worker rebuilds it from Mongo."""
+    if sync_redis is None:
+        return
+    try:
+        sync_redis.delete(AVAILABILITY_CACHE_KEY.format(pro_id=str(pro_id)))
+    except Exception as e:
+        from app.core.logger import logger
+
+        logger.warning(f"Availability cache invalidation failed for pro {pro_id}: {e}")
+
+
+def notify_settings_changed(doc_id: str) -> None:
+    """Announce an edited `settings` document; the worker drops its cached
+    copy (app/services/runtime_config_service.py) instead of waiting out the TTL."""
+    if sync_redis is None:
+        return
+    try:
+        sync_redis.publish(RUNTIME_CONFIG_CHANNEL, doc_id)
+    except Exception as e:
+        from app.core.logger import logger
+
+        logger.warning(f"Settings change notification failed for {doc_id}: {e}")
+
+def stamp_chat_sessions(lead_ids) -> None:
+    """Move the conversation session boundary (`chat_sessions`) of every lead
+    the panel just put in a session-ending status, as set_lead_status does on
+    the worker side. Without it the next AI prompt replays the ended session.
+    Call after the status write: the stamp is read from the stored lead."""
+    oids = [ObjectId(lead_id) for lead_id in lead_ids]
+    if not oids:
+        return
+    leads = leads_collection.find(
+        {"_id": {"$in": oids}, "status": {"$in": list(SESSION_ENDING_STATUSES)}}
+    )
+    ops = [
+        session_stamp(lead["chat_id"], session_end(lead))
+        for lead in leads
+        if lead.get("chat_id")
+    ]
+    if ops:
+        chat_sessions_collection.bulk_write(ops, ordered=False)
+
 
 # עזרי לוגיקה
 PROFESSION_CONFIG = {
@@ -156,6 +225,7 @@ def create_initial_schedule(pro_id):
             )
     if slots:
         slots_collection.insert_many(slots)
+        invalidate_availability_cache(pro_id)
 
 
 def send_completion_check_sync(lead_id: str):
@@ -1,12 +1,14 @@
 import streamlit as st
 import pandas as pd
 from bson.objectid import ObjectId
-from datetime import datetime
+from pymongo import UpdateOne
+from datetime import datetime, timezone
 from admin_panel.core.utils import (
     users_collection,
     leads_collection,
     messages_collection,
     send_completion_check_sync,
+    stamp_chat_sessions,
 )
 from admin_panel.ui.components import (
     render_chat_bubble,
@@ -23,6 +25,7 @@ from app.core.logger import logger
 from app.core.constants import AdminDefaults, Defaults, LeadStatus, Actor
 from app.core.phone import to_chat_id, strip_suffix
 from app.core.lead_history import status_history_entry
+from app.core.sharding import with_shard_key
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
@@ -255,7 +258,8 @@ def view_leads_dashboard(T):
                     if not changes:
                         st.toast(T.get("no_changes", "No changes."))
                     else:
-                        updated_count = 0
+                        ops = []
+                        audits = []
                         for row_idx, changed_data in changes.items():
                             lead_id = st.session_state.original_leads_df.iloc[row_idx][
                                 "id"
@@ -283,22 +287,39 @@ def view_leads_dashboard(T):
                             if update_payload:
                                 update_op = {"$set": update_payload}
                                 if "status" in update_payload:
+                                    # Same `updated_at` stamp set_lead_status
+                                    # writes — the lead-events poller tails it.
+                                    update_op["$set"] = {
+                                        **update_payload,
+                                        "updated_at": datetime.now(timezone.utc),
+                                    }
                                     update_op["$push"] = {
                                         "status_history": status_history_entry(
                                             update_payload["status"], Actor.ADMIN
                                         )
                                     }
-                                leads_collection.update_one(
-                                    {"_id": ObjectId(lead_id)}, update_op
+                                ops.append(
+                                    UpdateOne({"_id": ObjectId(lead_id)}, update_op)
                                 )
-                                log_audit(
-                                    "edit_lead",
-                                    {"lead_id": lead_id, "changes": update_payload},
+                                audits.append(
+                                    {"lead_id": lead_id, "changes": update_payload}
                                 )
-                                updated_count += 1
+
+                        # One round trip for the whole table edit.
+                        if ops:
+                            leads_collection.bulk_write(ops, ordered=False)
+                            stamp_chat_sessions(
+                                [
+                                    a["lead_id"]
+                                    for a in audits
+                                    if "status" in a["changes"]
+                                ]
+                            )
+                        for audit in audits:
+                            log_audit("edit_lead", audit)
 
                         st.success(
-                            f"{updated_count} {T.get('msg_changes', 'changes saved')}!"
+                            f"{len(ops)} {T.get('msg_changes', 'changes saved')}!"
                         )
                         st.cache_data.clear()
                         st.rerun()
@@ -381,7 +402,7 @@ def view_leads_dashboard(T):
                             "source": AdminDefaults.MANUAL_SOURCE,
                         }
 
-                        leads_collection.insert_one(new_lead_doc)
+                        leads_collection.insert_one(with_shard_key(new_lead_doc))
                         log_audit(
                             "create_lead", {"chat_id": chat_id, "status": new_status}
                         )
@@ -530,13 +551,19 @@ def _render_selected_lead_actions(
                             )
 
                         update_op = {"$set": update_data}
-                        if new_status != selected_lead.get("status"):
+                        status_changed = new_status != selected_lead.get("status")
+                        if status_changed:
+                            # Same `updated_at` stamp as the table edit — the
+                            # lead-events poller tails it.
+                            update_data["updated_at"] = datetime.now(timezone.utc)
                             update_op["$push"] = {
                                 "status_history": status_history_entry(
                                     new_status, Actor.ADMIN
                                 )
                             }
                         leads_collection.update_one({"_id": ObjectId(lid)}, update_op)
+                        if status_changed:
+                            stamp_chat_sessions([lid])
                         log_audit("edit_lead", {"lead_id": lid})
                         st.success(T.get("lead_updated", "Lead updated successfully!"))
                         st.cache_data.clear()
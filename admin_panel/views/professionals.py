@@ -6,6 +6,7 @@ from admin_panel.core.utils import (
     leads_collection,
     slots_collection,
     create_initial_schedule,
+    invalidate_availability_cache,
     generate_system_prompt,
 )
 from admin_panel.core.auth import log_audit, get_current_role
@@ -158,6 +159,7 @@ def render_pro_list(T):
                         {"$set": {"pro_id": None}},
                     )
                     slots_collection.delete_many({"pro_id": p["_id"]})
+                    invalidate_availability_cache(p["_id"])
                     users_collection.delete_one({"_id": p["_id"]})
                     log_audit(
                         "delete_pro", {"pro_id": pro_id, "name": p.get("business_name")}
@@ -2,7 +2,11 @@ import streamlit as st
 import pandas as pd
 from bson.objectid import ObjectId
 from datetime import datetime, timedelta, time
-from admin_panel.core.utils import users_collection, slots_collection
+from admin_panel.core.utils import (
+    users_collection,
+    slots_collection,
+    invalidate_availability_cache,
+)
 from app.core.config import settings
 import pytz
 
@@ -99,6 +103,7 @@ def view_schedule_editor(T):
                 if new_slots:
                     slots_collection.insert_many(new_slots)
 
+                invalidate_availability_cache(pro["_id"])
                 st.success(T['sch_success'])
                 st.rerun()
 
@@ -153,6 +158,7 @@ def view_schedule_editor(T):
 
                     if new_slots:
                         slots_collection.insert_many(new_slots)
+                        invalidate_availability_cache(pro["_id"])
                         st.success(f"{T['sch_msg_generated']} ({len(new_slots)})")
                         st.rerun()
                     else:
@@ -173,6 +179,7 @@ def view_schedule_editor(T):
                                 "$lte": tz.localize(datetime.combine(end_date, time(23, 59))).astimezone(pytz.utc)
                             }
                         })
+                        invalidate_availability_cache(pro["_id"])
                         st.success(f"{T['sch_msg_cleared']} ({res.deleted_count})")
                         del st.session_state.confirm_clear_slots
                         st.rerun()
@@ -1,6 +1,6 @@
 import streamlit as st
 from datetime import datetime, time
-from admin_panel.core.utils import settings_collection
+from admin_panel.core.utils import settings_collection, notify_settings_changed
 from admin_panel.core.auth import (
     log_audit, get_current_role, get_current_username,
     create_admin, delete_admin, list_admins, update_admin_role,
@@ -44,6 +44,7 @@ def view_system_settings(T):
         if not config:
             config = {"_id": "scheduler_config", "run_time": "08:00", "is_active": True, "trigger_now": False}
             settings_collection.insert_one(config)
+            notify_settings_changed("scheduler_config")
 
         with st.container(border=True):
             c1, c2, c3 = st.columns(3)
@@ -72,6 +73,7 @@ def view_system_settings(T):
                         {"_id": "scheduler_config"},
                         {"$set": {"trigger_now": True}}
                     )
+                    notify_settings_changed("scheduler_config")
                     log_audit("trigger_scheduler")
                     st.toast(T.get("sch_triggered", "Triggered!"))
 
@@ -85,6 +87,7 @@ def view_system_settings(T):
                         }},
                         upsert=True
                     )
+                    notify_settings_changed("scheduler_config")
                     log_audit("edit_scheduler_config", {"is_active": is_active, "run_time": new_time.strftime("%H:%M")})
                     st.success(T["success_save"])
                     st.rerun()
@@ -130,6 +133,7 @@ def view_system_settings(T):
                         }},
                         upsert=True
                     )
+                    notify_settings_changed("scheduler_config")
                     log_audit("edit_safety_settings", {
                         "stale_monitor": mon_active,
                         "sos_healer": healer_active,
@@ -1,13 +1,23 @@
+import json
 from datetime import datetime, timedelta, timezone
 
 from fastapi import APIRouter, Response, status
 
+from app.core import job_metrics, sharding
 from app.core.config import settings
-from app.core.constants import LeadStatus, WorkerConstants
+from app.core.constants import (
+    HTTP_POOL_STATS_KEY,
+    WORKER_CONCURRENCY_KEY,
+    WORKER_HEARTBEAT_KEY,
+    LeadStatus,
+    WorkerConstants,
+)
 from app.core.database import check_db_connection, leads_collection
+from app.core.http_client import pool_stats
 from app.core.logger import logger
 from app.core.redis_client import get_redis_client
 from app.providers.whatsapp import get_whatsapp
+from app.services.admission_service import AdmissionService
 import time
 
 router = APIRouter(prefix="/health", tags=["Health"])
@@ -45,7 +55,7 @@ async def health_check(response: Response):
         redis_up = True
 
         # Check worker heartbeat
-        hb = await redis.get("worker:heartbeat")
+        hb = await redis.get(WORKER_HEARTBEAT_KEY)
         if hb:
             worker_heartbeat = hb.decode() if isinstance(hb, bytes) else str(hb)
             # Worker is "up" if heartbeat is within last 120 seconds
@@ -56,6 +66,10 @@ async def health_check(response: Response):
     except Exception as e:
         logger.error(f"Health Check: Redis failed: {e}")
 
+    # Customer-lane ARQ queue depth and lag — the webhook's load-shedding signal
+    # (AdmissionService). None when Redis is unreadable.
+    pressure = await AdmissionService.queue_pressure()
+
     # WhatsApp Check — must compare to "authorized", not just truthiness:
     # "yellowCard" and "blocked" are truthy strings but mean the account is
     # filtered/blocked, so a truthiness check reports green while outbound is dead.
@@ -99,6 +113,17 @@ async def health_check(response: Response):
             "status": worker_status,
             "last_heartbeat": worker_heartbeat,
         },
+        "queue": {
+            "depth": pressure.depth if pressure else None,
+            "lag_seconds": pressure.lag_seconds if pressure else None,
+            "level": pressure.level if pressure else None,
+            "lanes": (
+                {lane: p._asdict() for lane, p in pressure.by_lane.items()}
+                if pressure
+                else None
+            ),
+            "load_shedding": settings.WEBHOOK_LOAD_SHEDDING_ENABLED,
+        },
         "whatsapp": {
             "status": whatsapp_status,
             "state": whatsapp_state,
@@ -177,3 +202,125 @@ async def leads_health(response: Response):
         logger.error(f"Health Check: /health/leads failed: {e}")
         response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
         return {"status": "error", "error": str(e)}
+
+
+@router.get("/scheduler")
+async def scheduler_health(response: Response):
+    """
+    Per-job scheduler telemetry, recorded by the worker on every APScheduler
+    run (app/core/job_metrics.py).
+
+    For each job: run / ok / error / lock-skipped / gated counters, allowed /
+    blocked counters per PRO-73 toggle, the last run (duration, items
+    processed, lock outcome, toggle decisions, error) and
+    `last_success_at`, plus a histogram and p50/p95/max over the last
+    JOB_METRICS_SAMPLE_SIZE executed runs. Interval jobs also report
+    `p95_interval_ratio`; `near_overlap` turns true once p95 reaches
+    JOB_OVERLAP_WARN_RATIO of the interval — the point to act before a sweep's
+    next tick starts while the last is still running (the lock then skips it).
+
+    `sharding` shows whether SCHEDULER_SHARDING_ENABLED is on and the worker
+    ids currently live (the shard layout). Top-level `status` is "degraded"
+    when any job is near overlap. A Redis
+    failure returns 503, as on /health/leads.
+    """
+    try:
+        jobs = await job_metrics.job_stats()
+        workers = await sharding.live_workers(await get_redis_client())
+    except Exception as e:
+        logger.error(f"Health Check: /health/scheduler failed: {e}")
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "error", "error": str(e)}
+
+    near_overlap = sorted(job_id for job_id, job in jobs.items() if job["near_overlap"])
+    return {
+        "status": "degraded" if near_overlap else "ok",
+        "near_overlap": near_overlap,
+        "sharding": {
+            "enabled": settings.SCHEDULER_SHARDING_ENABLED,
+            "live_workers": workers,
+        },
+        "jobs": jobs,
+        "checked_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+@router.get("/http")
+async def http_pools_health(response: Response):
+    """
+    Outbound HTTP pool utilization (app/core/http_client.py), per upstream
+    pool: requests in flight and their peak, utilization (in flight over the
+    pool's max_connections), total requests and transport errors, and whether
+    the pool speaks HTTP/2.
+
+    `api` is this process; `workers` holds each live worker's pools as
+    published with its last heartbeat — the worker is where Graph sends, media
+    downloads and geocoding run. Counters are per process since its start. A
+    pool pinned near utilization 1.0 is queueing requests for a connection. A
+    Redis failure returns 503, as on /health/scheduler.
+    """
+    try:
+        redis = await get_redis_client()
+        workers = await sharding.live_workers(redis)
+        published = (
+            await redis.mget(
+                [HTTP_POOL_STATS_KEY.format(worker_id=w) for w in workers]
+            )
+            if workers
+            else []
+        )
+    except Exception as e:
+        logger.error(f"Health Check: /health/http failed: {e}")
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "error", "error": str(e)}
+
+    return {
+        "status": "ok",
+        "api": pool_stats(),
+        "workers": {
+            worker: json.loads(raw)
+            for worker, raw in zip(workers, published)
+            if raw
+        },
+        "checked_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+@router.get("/concurrency")
+async def concurrency_health(response: Response):
+    """
+    Adaptive worker concurrency (app/core/concurrency.py): for each live
+    worker, per lane, the current max_jobs (`limit`) between its `floor` and
+    `ceiling`, jobs in flight, the p95 latency of the last adjustment window
+    and its decision, and how many times the limit moved up and down — as
+    published with the worker's last heartbeat.
+
+    `workers` is empty while ADAPTIVE_CONCURRENCY_ENABLED is off (each lane
+    then runs at its fixed WORKER_LANES budget). A Redis failure returns 503,
+    as on /health/http.
+    """
+    try:
+        redis = await get_redis_client()
+        workers = await sharding.live_workers(redis)
+        published = (
+            await redis.mget(
+                [WORKER_CONCURRENCY_KEY.format(worker_id=w) for w in workers]
+            )
+            if workers
+            else []
+        )
+    except Exception as e:
+        logger.error(f"Health Check: /health/concurrency failed: {e}")
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "error", "error": str(e)}
+
+    return {
+        "status": "ok",
+        "adaptive": settings.ADAPTIVE_CONCURRENCY_ENABLED,
+        "workers": {
+            worker: json.loads(raw)
+            for worker, raw in zip(workers, published)
+            if raw
+        },
+        "checked_at": datetime.now(timezone.utc).isoformat(),
+    }
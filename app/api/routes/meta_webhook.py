@@ -14,7 +14,10 @@ boot for the cloud provider, and this guard covers the dryrun-provider case
 where the route is exposed but the secret was never configured.
 
 Like the legacy route, this endpoint does no processing: verify, dedupe,
-open the service window, enqueue. Meta retries on non-2xx with backoff and
+open the service window, enqueue — for a whole envelope at once: one status
+write, one Redis pipeline carrying an atomic ingestion-gate script per
+message, and the enqueues issued concurrently across chats. Meta retries on
+non-2xx with backoff and
 disables webhooks only after sustained failure, so the response policy is:
 200 for everything we *decided* about (processed, duplicate, ignored,
 malformed body — our problem to log, not Meta's to retry), 503 only when an
@@ -23,6 +26,7 @@ retry genuinely recovers, and the idempotency claim is released first so the
 redelivery can land.
 """
 
+import asyncio
 import hashlib
 import hmac
 import json
@@ -30,19 +34,22 @@ import json
 from fastapi import APIRouter, Query, Request
 from fastapi.responses import JSONResponse, PlainTextResponse
 
+from app.core import lanes
 from app.core.config import settings
 from app.core.constants import APIStatus
 from app.core.logger import logger
 from app.core.phone import to_chat_id
 from app.core.redis_client import get_arq_pool, get_redis_client
 from app.providers.whatsapp import delivery
+from app.providers.whatsapp.base import NormalizedMessage
 from app.providers.whatsapp.cloud_api import (
     iter_meta_messages,
     normalize_meta_message,
     parse_status_events,
 )
-from app.providers.whatsapp.window import open_service_window
-from app.services.security_service import SecurityService
+from app.providers.whatsapp.window import stage_open_service_window, window_key
+from app.services.admission_service import AdmissionService
+from app.services.security_service import IngestionVerdict, SecurityService
 
 router = APIRouter()
 
@@ -86,6 +93,71 @@ def _signature_valid(raw_body: bytes, header: str | None) -> bool:
     return hmac.compare_digest(header.encode("latin-1", "replace"), expected.encode())
 
 
+async def _enqueue_all(
+    redis, messages: list[tuple[NormalizedMessage, IngestionVerdict]]
+) -> None:
+    """Enqueue an envelope's accepted messages: chats concurrently, each
+    chat's messages in envelope order. Raises after releasing the idempotency
+    claims of the messages that were not enqueued — the caller answers 503
+    and Meta's redelivery re-claims exactly those."""
+    by_chat: dict[str, list[tuple[NormalizedMessage, IngestionVerdict]]] = {}
+    for normalized, verdict in messages:
+        by_chat.setdefault(normalized.chat_id, []).append((normalized, verdict))
+    unqueued: list[NormalizedMessage] = []
+
+    async def release_unqueued() -> None:
+        claims = [f"webhook:{m.message_id}" for m in unqueued if m.message_id]
+        if claims:
+            await redis.delete(*claims)
+
+    try:
+        arq_pool = await get_arq_pool()
+    except Exception:
+        unqueued.extend(normalized for normalized, _ in messages)
+        await release_unqueued()
+        raise
+
+    async def enqueue_chat(chat_messages) -> None:
+        for position, (normalized, verdict) in enumerate(chat_messages):
+            try:
+                # Under queue pressure a customer's AI turn is deferred (see
+                # AdmissionService); pros/admin/emergencies are not.
+                defer_by = await AdmissionService.admit(
+                    normalized.chat_id, normalized.text
+                )
+                options = {"_defer_by": defer_by} if defer_by else {}
+                lane = await lanes.route(
+                    normalized.chat_id, normalized.text, normalized.media_url
+                )
+                await arq_pool.enqueue_job(
+                    "process_message_task",
+                    normalized.chat_id,
+                    normalized.text,
+                    normalized.media_url,
+                    message_id=normalized.message_id,
+                    # The worker applies the sliding-window verdict only to
+                    # chats that are not exempt; the gate has counted it.
+                    gate=verdict._asdict(),
+                    _queue_name=lanes.queue_name(lane),
+                    **options,
+                )
+            except Exception:
+                # This and the chat's later messages stay unqueued, so a
+                # redelivery cannot run them ahead of this one.
+                unqueued.extend(m for m, _ in chat_messages[position:])
+                raise
+
+    outcomes = await asyncio.gather(
+        *(enqueue_chat(chat_messages) for chat_messages in by_chat.values()),
+        return_exceptions=True,
+    )
+    errors = [o for o in outcomes if isinstance(o, BaseException)]
+    if not errors:
+        return
+    await release_unqueued()
+    raise errors[0]
+
+
 @router.post("/webhook/meta")
 async def meta_webhook_endpoint(request: Request):
     raw_body = await request.body()
@@ -115,80 +187,93 @@ async def meta_webhook_endpoint(request: Request):
 
     try:
         # Delivery statuses first: they are cheap, carry no user content, and
-        # a batch can hold both statuses and messages.
-        for event in parse_status_events(payload):
-            await delivery.apply_status_event(event)
+        # a batch can hold both statuses and messages. One write for all.
+        await delivery.apply_status_events(list(parse_status_events(payload)))
 
-        enqueued = 0
-        arq_pool = None
+        senders: list[str] = []
+        inbound: list[NormalizedMessage] = []
         for value, message in iter_meta_messages(payload):
             # PRO-89: Meta opens the 24h window on ANY inbound message —
             # stickers and reactions included, which normalize to None below.
-            # Open it first, off the raw sender, or the tracker under-reports
-            # the window and the outbound side blocks deliverable replies.
-            # Running before the idempotency check means a redelivery of an
-            # old message re-extends the window slightly past Meta's anchor —
-            # over-reporting is the safe direction (131047 is the backstop).
-            # (No @g.us group filter here, unlike the legacy route: Cloud API
-            # does not deliver group traffic to business numbers.)
+            # Open it off the raw sender, or the tracker under-reports the
+            # window and the outbound side blocks deliverable replies. A
+            # redelivery of an old message re-extends the window slightly past
+            # Meta's anchor — over-reporting is the safe direction (131047 is
+            # the backstop). (No @g.us group filter here, unlike the legacy
+            # route: Cloud API does not deliver group traffic to business
+            # numbers.)
             sender = message.get("from")
             if sender:
-                await open_service_window(to_chat_id(sender))
-
+                senders.append(to_chat_id(sender))
             normalized = normalize_meta_message(message, value)
-            if normalized is None:
-                continue
-            chat_id = normalized.chat_id
+            if normalized is not None:
+                inbound.append(normalized)
 
-            # Idempotency — same Redis pattern (and key namespace) as the
-            # legacy route: Meta redelivers on slow/failed responses.
-            if normalized.message_id:
-                redis = await get_redis_client()
-                is_new = await redis.set(
-                    f"webhook:{normalized.message_id}", "processed", ex=86400, nx=True
+        if not senders and not inbound:
+            return {"status": APIStatus.IGNORED_TYPE}
+
+        # Meta batches many events per POST under load: the whole envelope
+        # goes out in one pipeline, and each message in it is one atomic
+        # ingestion-gate script — service window, idempotency claim (same key
+        # namespace as the legacy route: Meta redelivers on slow/failed
+        # responses), the coarse DDoS shield, and the per-customer sliding
+        # window and trip count the worker used to pay for in separate round
+        # trips. Senders with nothing to process only get their window opened.
+        redis = await get_redis_client()
+        pipe = redis.pipeline(transaction=False)
+        gated = {normalized.chat_id for normalized in inbound}
+        windows = [c for c in dict.fromkeys(senders) if c not in gated]
+        for chat_id in windows:
+            stage_open_service_window(pipe, chat_id)
+        for normalized in inbound:
+            await SecurityService.stage_ingestion_gate(
+                pipe,
+                normalized.chat_id,
+                normalized.message_id,
+                window_key(normalized.chat_id),
+            )
+        results = await pipe.execute(raise_on_error=False)
+        if any(isinstance(r, Exception) for r in results[: len(windows)]):
+            logger.warning("Could not record the service window for part of a Meta envelope")
+
+        accepted: list[tuple[NormalizedMessage, IngestionVerdict]] = []
+        claimed: list[str] = []
+        gate_error = None
+        for normalized, reply in zip(inbound, results[len(windows) :]):
+            if isinstance(reply, Exception):
+                gate_error = reply
+                continue
+            verdict = SecurityService.ingestion_verdict(reply)
+            if verdict.outcome == "duplicate":
+                logger.info(
+                    f"Idempotency: skipping duplicate Meta message "
+                    f"{normalized.message_id}"
                 )
-                if not is_new:
-                    logger.info(
-                        f"Idempotency: skipping duplicate Meta message "
-                        f"{normalized.message_id}"
-                    )
-                    continue
-
-            # Coarse DDoS shield only — the precise per-customer limit with
-            # pro/admin exemptions runs in the worker (see workflow_service).
-            if not await SecurityService.check_rate_limit(
-                chat_id, limit=50, window_seconds=60
-            ):
-                logger.warning(f"⛔ Webhook DDoS shield tripped for ...{chat_id[-8:]}")
                 continue
-
-            try:
-                if arq_pool is None:
-                    arq_pool = await get_arq_pool()
-                await arq_pool.enqueue_job(
-                    "process_message_task",
-                    chat_id,
-                    normalized.text,
-                    normalized.media_url,
-                    message_id=normalized.message_id,
+            if normalized.message_id:
+                claimed.append(f"webhook:{normalized.message_id}")
+            if verdict.outcome == "shielded":
+                logger.warning(
+                    f"⛔ Webhook DDoS shield tripped for ...{normalized.chat_id[-8:]}"
                 )
-            except Exception:
-                # Release the idempotency claim: the outer handler answers 200
-                # (Meta must not retry-storm us), so a claimed-but-unqueued
-                # wamid would otherwise be a permanently lost message.
-                if normalized.message_id:
-                    await redis.delete(f"webhook:{normalized.message_id}")
-                raise
-            enqueued += 1
+                continue
+            accepted.append((normalized, verdict))
+        if gate_error is not None:
+            # Nothing is enqueued from a half-gated envelope: release what
+            # was claimed and let Meta redeliver the whole of it.
+            if claimed:
+                await redis.delete(*claimed)
+            raise gate_error
 
-        if enqueued:
-            return {"status": APIStatus.PROCESSING}
-        return {"status": APIStatus.IGNORED_TYPE}
+        if not accepted:
+            return {"status": APIStatus.IGNORED_TYPE}
+        await _enqueue_all(redis, accepted)
+        return {"status": APIStatus.PROCESSING}
 
     except Exception as e:
         logger.error(f"Meta webhook error: {e}")
-        # Non-2xx so Meta retries: the idempotency claim was released in the
-        # enqueue guard above, so the redelivery can actually land. This is
+        # Non-2xx so Meta retries: the idempotency claims of anything not
+        # enqueued were released in _enqueue_all, so the redelivery can land. This is
         # for transient infra failures (Redis/ARQ down); a deterministic
         # parsing bug would 503 repeatedly and Meta only disables a
         # subscription after *sustained* failure — by which point the same
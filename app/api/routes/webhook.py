@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Query
 from fastapi.responses import JSONResponse
 from app.schemas.whatsapp import WebhookPayload
+from app.core import lanes
 from app.core.logger import logger
 from app.core.config import settings
 from app.core.constants import APIStatus
 from app.core.redis_client import get_redis_client, get_arq_pool
+from app.services.admission_service import AdmissionService
 from app.services.security_service import SecurityService
 
 router = APIRouter()
@@ -95,7 +97,13 @@ async def webhook_endpoint(payload: WebhookPayload, token: str = Query(default=N
                     media_url = msg_data.fileMessageData.downloadUrl
                     user_text = msg_data.fileMessageData.caption or ""
 
-            # Process Standard Message via ARQ Worker
+            # Admission control: under queue pressure a customer's AI turn is
+            # deferred (see AdmissionService); pros/admin/emergencies are not.
+            defer_by = await AdmissionService.admit(chat_id, user_text)
+            options = {"_defer_by": defer_by} if defer_by else {}
+            lane = await lanes.route(chat_id, user_text, media_url)
+
+            # Process Standard Message via ARQ Worker, on its priority lane
             arq_pool = await get_arq_pool()
             await arq_pool.enqueue_job(
                 "process_message_task",
@@ -103,6 +111,8 @@ async def webhook_endpoint(payload: WebhookPayload, token: str = Query(default=N
                 user_text,
                 media_url,
                 message_id=payload.idMessage,
+                _queue_name=lanes.queue_name(lane),
+                **options,
             )
             return {"status": APIStatus.PROCESSING}
 
@@ -1,5 +1,5 @@
 import asyncio
-import time
+import contextlib
 from arq.connections import RedisSettings
 from arq.worker import Retry
 from app.core.config import settings
@@ -7,12 +7,26 @@ from app.services.workflow_service import process_incoming_message, whatsapp
 from app.core.logger import logger, mask_pii, page_critical
 from app.core.sentry import sentry_active
 from app.core.database import client
-from app.core.http_client import close_http_client
-from app.core.redis_client import get_redis_client, ChatLockBusyError
+from app.core.http_client import close_http_client, publish_pool_stats
+from app.core import sharding
+from app.core.background import BackgroundTasks
+from app.core.concurrency import publish_concurrency_stats
+from app.core.constants import RUNTIME_CONFIG_CHANNEL, WorkerConstants
+from app.core.redis_client import (
+    ChatLockBusyError,
+    get_redis_client,
+    listen_for_invalidations,
+)
 from app.core.messages import Messages
-from app.providers.whatsapp.cloud_api import META_MEDIA_SCHEME, fetch_meta_media
-from app.services.cloudinary_client_service import upload_media_bytes
+from app.providers.whatsapp import BREAKER_CHANNEL, invalidate_breaker_cache
+from app.providers.whatsapp.cloud_api import META_MEDIA_SCHEME, spool_meta_media
+from app.providers.whatsapp.delivery import DeliveryWriter
+from app.providers.whatsapp.outbox import OutboxWorker
+from app.services.cloudinary_client_service import upload_media_file
 from app.scheduler import start_scheduler
+from app.services.lead_events_service import LeadEventConsumer
+from app.services.message_log_service import MessageLogWriter
+from app.services.runtime_config_service import RuntimeConfig
 
 # Redis configuration for ARQ
 if settings.REDIS_URL:
@@ -41,22 +55,59 @@ async def startup(ctx):
     logger.info("⏳ Starting Scheduler within Worker...")
     ctx["scheduler"] = start_scheduler()
 
-    # 3. Start heartbeat loop
+    # 3. Start heartbeat loop — also this worker's membership in the live set
+    # that sharded scheduler sweeps partition over (app/core/sharding.py), its
+    # HTTP pool utilization for /health/http and its adaptive concurrency
+    # limits for /health/concurrency.
     async def _heartbeat_loop():
         while True:
             try:
                 redis = await get_redis_client()
-                await redis.set("worker:heartbeat", str(time.time()), ex=120)
+                await sharding.heartbeat(redis)
+                await publish_pool_stats(redis, sharding.WORKER_ID)
+                await publish_concurrency_stats(redis, sharding.WORKER_ID)
             except Exception as e:
                 # WARNING, deliberately not ERROR: the bridge must not spend
                 # Sentry budget on this — a dead heartbeat already surfaces
                 # as worker_alive=false on /health, which is the real signal.
                 logger.warning(f"💓 Heartbeat write failed: {e}")
-            await asyncio.sleep(60)
+            await asyncio.sleep(WorkerConstants.WORKER_HEARTBEAT_SECONDS)
 
     ctx["heartbeat_task"] = asyncio.create_task(_heartbeat_loop())
     logger.info("💓 Worker heartbeat started.")
 
+    # 4. Cache invalidation — the scheduler's toggle cache drops a settings
+    # document as soon as the admin panel announces a change, and the outbound
+    # breaker snapshot as soon as a breaker key is written.
+    ctx["invalidation_task"] = asyncio.create_task(
+        listen_for_invalidations(
+            {
+                RUNTIME_CONFIG_CHANNEL: RuntimeConfig.invalidate,
+                BREAKER_CHANNEL: invalidate_breaker_cache,
+            }
+        )
+    )
+
+    # 5. Reactive lead monitor (optional) — change stream / polling fallback
+    if settings.LEAD_EVENTS_ENABLED:
+        consumer = LeadEventConsumer()
+        ctx["lead_events"] = consumer
+        ctx["lead_events_task"] = asyncio.create_task(consumer.run())
+
+    # 6. Outbound queue (optional) — drains the sends the scheduled fan-outs
+    # enqueue, paced to the account's messaging tier.
+    if settings.OUTBOUND_QUEUE_ENABLED:
+        outbox_worker = OutboxWorker()
+        ctx["outbox"] = outbox_worker
+        ctx["outbox_task"] = asyncio.create_task(outbox_worker.run())
+
+    # 7. Write-behind message log (optional) — inserts the messages a crashed
+    # process spilled to Redis but never flushed to Mongo.
+    if settings.MESSAGE_LOG_WRITE_BEHIND_ENABLED:
+        ctx["message_log_recovery_task"] = asyncio.create_task(
+            MessageLogWriter.recover_forever()
+        )
+
 
 async def shutdown(ctx):
     """
@@ -64,9 +115,38 @@ async def shutdown(ctx):
     """
     logger.info("ARQ Worker shutting down...")
 
-    # Cancel heartbeat
+    # Cancel heartbeat and leave the live set so sharded sweeps rebalance now
     if "heartbeat_task" in ctx:
         ctx["heartbeat_task"].cancel()
+        try:
+            await sharding.leave(await get_redis_client())
+        except Exception as e:
+            logger.warning(f"💓 Could not leave the live-worker set: {e}")
+
+    if "invalidation_task" in ctx:
+        ctx["invalidation_task"].cancel()
+
+    # Stop the lead-event consumer; the resume token is already persisted
+    if "lead_events_task" in ctx:
+        ctx["lead_events"].stop()
+        ctx["lead_events_task"].cancel()
+
+    # Stop draining the outbox; a send in flight keeps its message at the head
+    # of its recipient's queue, and the lease expiry frees it for the next worker.
+    if "outbox_task" in ctx:
+        ctx["outbox"].stop()
+        ctx["outbox_task"].cancel()
+
+    # Let fire-and-forget work (typing, token accounting, flushes) finish
+    await BackgroundTasks.drain()
+
+    if "message_log_recovery_task" in ctx:
+        ctx["message_log_recovery_task"].cancel()
+
+    # Write out buffered delivery bookkeeping and message-log inserts before
+    # the process goes
+    await DeliveryWriter.close()
+    await MessageLogWriter.close()
 
     # Shutdown Scheduler
     if "scheduler" in ctx:
@@ -82,19 +162,20 @@ async def _resolve_inbound_media(media_url: str | None) -> str | None:
 
     Meta webhooks carry a media *id*; the real CDN URL needs an authorized
     fetch and expires within minutes, so the route enqueues the marker and the
-    worker re-hosts the bytes on Cloudinary here — downstream code (lead
-    ``media_urls``, the pro's offer message, the AI engine) then sees an
-    ordinary public URL, exactly as it always has. Failure degrades to
+    worker streams the bytes to a spooled file and re-hosts them on Cloudinary
+    in chunks here — downstream code (lead ``media_urls``, the pro's offer
+    message, the AI engine) then sees an ordinary public URL, exactly as it
+    always has. Failure degrades to
     text-only processing (returns ``None``), never to a crashed task.
     """
     if not media_url or not media_url.startswith(META_MEDIA_SCHEME):
         return media_url
     media_id = media_url[len(META_MEDIA_SCHEME) :]
-    data, _mime = await fetch_meta_media(media_id)
-    if data is None:
+    spool, _mime = await spool_meta_media(media_id)
+    if spool is None:
         logger.warning(f"Could not fetch Meta media {media_id} — processing text only.")
         return None
-    hosted_url = await asyncio.to_thread(upload_media_bytes, data)
+    hosted_url = await asyncio.to_thread(upload_media_file, spool)
     if hosted_url is None:
         logger.warning(
             f"Could not re-host Meta media {media_id} — processing text only."
@@ -103,14 +184,20 @@ async def _resolve_inbound_media(media_url: str | None) -> str | None:
 
 
 async def process_message_task(
-    ctx, chat_id: str, user_text: str, media_url: str = None, message_id: str = None
+    ctx,
+    chat_id: str,
+    user_text: str,
+    media_url: str = None,
+    message_id: str = None,
+    gate: dict = None,
 ):
     """
     ARQ Task wrapper for process_incoming_message.
     Sends a user-friendly error message if processing fails.
 
-    ``message_id`` (the provider's wamid) is optional so jobs enqueued
-    before the kwarg existed still deserialize.
+    ``message_id`` (the provider's wamid) and ``gate`` (the Meta webhook's
+    ingestion-gate verdict) are optional so jobs enqueued before the kwargs
+    existed still deserialize.
     """
     logger.info(f"Task started: processing message for {chat_id}")
     if sentry_active():
@@ -124,14 +211,23 @@ async def process_message_task(
         scope.set_tag("provider", settings.WHATSAPP_PROVIDER)
         if message_id:
             scope.set_tag("wamid", message_id)
+    # ADAPTIVE_CONCURRENCY_ENABLED: the lane's controller times the job.
+    concurrency = ctx.get("concurrency")
     try:
-        media_url = await _resolve_inbound_media(media_url)
-        await process_incoming_message(chat_id, user_text, media_url)
-    except ChatLockBusyError:
-        # Another worker is mid-flight for this chat_id — defer so we preserve
-        # message order without duplicate-processing.
-        logger.info(f"Chat lock busy for {chat_id} — requeuing with 2s defer")
-        raise Retry(defer=2)
+        async with concurrency.track() if concurrency else contextlib.nullcontext():
+            try:
+                media_url = await _resolve_inbound_media(media_url)
+                await process_incoming_message(
+                    chat_id, user_text, media_url, gate=gate
+                )
+            except ChatLockBusyError:
+                # Another worker is mid-flight for this chat_id — defer so we
+                # preserve message order without duplicate-processing. Raised
+                # as Retry inside track(), which does not count it as a job.
+                logger.info(f"Chat lock busy for {chat_id} — requeuing with 2s defer")
+                raise Retry(defer=2)
+    except Retry:
+        raise
     except Exception as e:
         # sentry_skip: the re-raise below propagates to ArqIntegration, which
         # captures the full exception — the bridge reporting this log line
@@ -0,0 +1,132 @@
+"""Supervised fire-and-forget tasks.
+
+The hot path used to spawn bare ``asyncio.create_task`` calls — the typing
+indicator in ``process_incoming_message``, token accounting in
+``analyze_conversation``, the write-behind flushes and their timers — with no
+bound, no error accounting and nothing waiting for them at shutdown. Under a burst they
+competed with real work for the event loop and the connection pools, and a
+failure was at best a stray "Task exception was never retrieved".
+
+:meth:`BackgroundTasks.spawn` runs them instead:
+
+* at most BACKGROUND_MAX_CONCURRENT run at once; the rest wait their turn;
+* a task with a ``key`` is coalesced — spawned while one with the same key is
+  still pending or running, it is dropped (one typing indicator per chat);
+* ``low_priority`` work is dropped once BACKGROUND_LOW_PRIORITY_LIMIT tasks
+  are outstanding, and everything once BACKGROUND_MAX_PENDING are;
+* a failure is logged and counted per task name.
+
+:meth:`BackgroundTasks.drain` waits for what is outstanding on shutdown (the
+worker's ``shutdown`` hook and the API's lifespan), cancelling whatever is
+still running after BACKGROUND_DRAIN_TIMEOUT_SECONDS.
+"""
+
+import asyncio
+from collections import Counter
+from typing import Coroutine
+
+from app.core.constants import WorkerConstants
+from app.core.logger import logger
+
+
+class BackgroundTasks:
+    _tasks: set[asyncio.Task] = set()
+    _keyed: dict[str, asyncio.Task] = {}
+    _slots: asyncio.Semaphore | None = None
+    _dropped: Counter = Counter()
+    _coalesced: Counter = Counter()
+    _failed: Counter = Counter()
+
+    @classmethod
+    def spawn(
+        cls,
+        coro: Coroutine,
+        name: str,
+        *,
+        key: str | None = None,
+        low_priority: bool = False,
+    ) -> asyncio.Task | None:
+        """Run ``coro`` in the background; None when it was dropped or
+        coalesced (the coroutine is closed, never awaited)."""
+        if key is not None and key in cls._keyed:
+            cls._coalesced[name] += 1
+            coro.close()
+            return None
+        limit = (
+            WorkerConstants.BACKGROUND_LOW_PRIORITY_LIMIT
+            if low_priority
+            else WorkerConstants.BACKGROUND_MAX_PENDING
+        )
+        if len(cls._tasks) >= limit:
+            cls._dropped[name] += 1
+            coro.close()
+            if not low_priority:
+                logger.error(
+                    f"Background task {name} dropped: {len(cls._tasks)} outstanding"
+                )
+            return None
+
+        if cls._slots is None:
+            cls._slots = asyncio.Semaphore(WorkerConstants.BACKGROUND_MAX_CONCURRENT)
+        task = asyncio.create_task(cls._run(coro, cls._slots), name=name)
+        cls._tasks.add(task)
+        if key is not None:
+            cls._keyed[key] = task
+        task.add_done_callback(lambda t: cls._done(t, name, key))
+        return task
+
+    @staticmethod
+    async def _run(coro: Coroutine, slots: asyncio.Semaphore) -> None:
+        async with slots:
+            await coro
+
+    @classmethod
+    def _done(cls, task: asyncio.Task, name: str, key: str | None) -> None:
+        cls._tasks.discard(task)
+        if key is not None and cls._keyed.get(key) is task:
+            del cls._keyed[key]
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            cls._failed[name] += 1
+            logger.warning(f"Background task {name} failed: {type(error).__name__}: {error}")
+
+    @classmethod
+    async def drain(cls) -> None:
+        """Wait for the outstanding tasks, cancelling the stragglers, and log
+        what was dropped, coalesced and failed since start. Never raises."""
+        if cls._tasks:
+            _, stragglers = await asyncio.wait(
+                set(cls._tasks), timeout=WorkerConstants.BACKGROUND_DRAIN_TIMEOUT_SECONDS
+            )
+            for task in stragglers:
+                task.cancel()
+            if stragglers:
+                await asyncio.wait(stragglers)
+                logger.warning(f"Cancelled {len(stragglers)} background task(s) at shutdown")
+        stats = cls.stats()
+        if stats["dropped"] or stats["coalesced"] or stats["failed"]:
+            logger.info(f"Background tasks since start: {stats}")
+
+    @classmethod
+    def stats(cls) -> dict:
+        return {
+            "outstanding": len(cls._tasks),
+            "dropped": dict(cls._dropped),
+            "coalesced": dict(cls._coalesced),
+            "failed": dict(cls._failed),
+        }
+
+    @classmethod
+    def reset(cls) -> None:
+        """Forget every task and counter (tests)."""
+        for task in cls._tasks:
+            if not task.done() and not task.get_loop().is_closed():
+                task.cancel()
+        cls._tasks = set()
+        cls._keyed = {}
+        cls._slots = None
+        cls._dropped = Counter()
+        cls._coalesced = Counter()
+        cls._failed = Counter()
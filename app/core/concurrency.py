@@ -0,0 +1,177 @@
+"""Adaptive ARQ concurrency — AIMD on each lane worker's ``max_jobs``.
+
+A fixed ``max_jobs`` is wrong at both ends of the day: in the morning and
+evening peaks jobs mostly wait on Gemini, and ten of them at once can push it
+into throttling; off-peak a higher limit would drain a backlog faster. With
+``ADAPTIVE_CONCURRENCY_ENABLED`` each lane worker (app/worker.py) gets an
+:class:`AdaptiveConcurrency` that moves its ``max_jobs`` between
+ADAPTIVE_MIN_JOBS and ADAPTIVE_MAX_JOBS_FACTOR × the lane's ``WORKER_LANES``
+budget, starting at the budget.
+
+Every ADAPTIVE_WINDOW_JOBS finished jobs it looks back over the window:
+
+* an upstream throttled (Gemini 429/503, a Graph 429 or throttle code — noted
+  through :func:`note_throttled` from inside the job), the p95 job latency is
+  above ADAPTIVE_P95_TARGET_SECONDS, or more than ADAPTIVE_MAX_ERROR_RATE of
+  the jobs failed → multiplicative decrease (× ADAPTIVE_DECREASE_FACTOR);
+* otherwise, if the worker ran at its limit during the window → +1.
+
+ARQ reads ``max_jobs`` before picking each job, so a lower limit takes effect
+as running jobs finish; nothing is cancelled. The job being tracked travels in
+a ContextVar, so the AI engine and the Graph client need no extra arguments.
+
+:func:`concurrency_stats` reports every lane's bounds and current limit; the
+worker publishes them with its heartbeat for ``/health/concurrency``.
+"""
+
+import contextvars
+import json
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from arq.worker import Retry, Worker
+
+from app.core.constants import WORKER_CONCURRENCY_KEY, WorkerConstants
+from app.core.logger import logger
+
+_current_job: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar(
+    "adaptive_concurrency_job", default=None
+)
+
+# Every controller in this process, by lane.
+_controllers: dict[str, "AdaptiveConcurrency"] = {}
+
+
+def note_throttled(upstream: str) -> None:
+    """Mark the job in progress as throttled by ``upstream``. A no-op outside
+    a tracked job (the API process, the scheduler, the outbox drain)."""
+    job = _current_job.get()
+    if job is not None:
+        job["throttled"] = upstream
+
+
+class AdaptiveConcurrency:
+    def __init__(self, worker: Worker, lane: str, budget: int):
+        self.worker = worker
+        self.lane = lane
+        self.floor = WorkerConstants.ADAPTIVE_MIN_JOBS
+        self.ceiling = budget * WorkerConstants.ADAPTIVE_MAX_JOBS_FACTOR
+        self.limit = budget
+        self.increases = 0
+        self.decreases = 0
+        self.last_p95_seconds: Optional[float] = None
+        self.last_decision = "start"
+        self._reset_window()
+        worker.max_jobs = self.limit
+        _controllers[lane] = self
+
+    def _reset_window(self) -> None:
+        self._durations: list[float] = []
+        self._failed = 0
+        self._throttled: dict[str, int] = {}
+        self._saturated = False
+
+    @asynccontextmanager
+    async def track(self):
+        """Wrap one job: its latency, failure and upstream throttling feed
+        the next adjustment. An ARQ Retry (chat lock busy) is not counted."""
+        # job_counter already includes this job.
+        if self.worker.job_counter >= self.limit:
+            self._saturated = True
+        job: dict = {}
+        token = _current_job.set(job)
+        started = time.monotonic()
+        failed = False
+        try:
+            yield
+        except Retry:
+            job["retried"] = True
+            raise
+        except Exception:
+            failed = True
+            raise
+        finally:
+            _current_job.reset(token)
+            if not job.get("retried"):
+                self.record(time.monotonic() - started, failed, job.get("throttled"))
+
+    def record(self, duration: float, failed: bool, throttled: Optional[str]) -> None:
+        self._durations.append(duration)
+        self._failed += failed
+        if throttled:
+            self._throttled[throttled] = self._throttled.get(throttled, 0) + 1
+        if len(self._durations) >= WorkerConstants.ADAPTIVE_WINDOW_JOBS:
+            self._adjust()
+
+    def _adjust(self) -> None:
+        durations = sorted(self._durations)
+        p95 = durations[math.ceil(len(durations) * 0.95) - 1]
+        error_rate = self._failed / len(durations)
+        self.last_p95_seconds = round(p95, 2)
+
+        if self._throttled:
+            reason = "throttled by " + ", ".join(sorted(self._throttled))
+        elif p95 > WorkerConstants.ADAPTIVE_P95_TARGET_SECONDS:
+            reason = f"p95 {p95:.1f}s"
+        elif error_rate > WorkerConstants.ADAPTIVE_MAX_ERROR_RATE:
+            reason = f"{error_rate:.0%} of jobs failed"
+        else:
+            reason = None
+
+        limit = self.limit
+        if reason:
+            limit = max(self.floor, int(limit * WorkerConstants.ADAPTIVE_DECREASE_FACTOR))
+            self.last_decision = f"decrease: {reason}"
+        elif self._saturated:
+            limit = min(self.ceiling, limit + 1)
+            self.last_decision = "increase"
+        else:
+            self.last_decision = "hold"
+        if limit != self.limit:
+            if limit > self.limit:
+                self.increases += 1
+            else:
+                self.decreases += 1
+            logger.info(
+                f"⚖️ Lane {self.lane}: max_jobs {self.limit} → {limit} "
+                f"({self.last_decision}, p95 {p95:.1f}s)"
+            )
+            self.limit = limit
+            self.worker.max_jobs = limit
+        self._reset_window()
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "floor": self.floor,
+            "ceiling": self.ceiling,
+            "in_flight": self.worker.job_counter,
+            "last_p95_seconds": self.last_p95_seconds,
+            "last_decision": self.last_decision,
+            "increases": self.increases,
+            "decreases": self.decreases,
+        }
+
+
+def concurrency_stats() -> dict:
+    """Bounds and current limit of every lane this process adapts."""
+    return {lane: controller.stats() for lane, controller in _controllers.items()}
+
+
+async def publish_concurrency_stats(redis, worker_id: str) -> None:
+    """Store this process's limits for ``/health/concurrency``; expires with
+    the heartbeat, so a dead worker's numbers age out with it."""
+    if not _controllers:
+        return
+    await redis.set(
+        WORKER_CONCURRENCY_KEY.format(worker_id=worker_id),
+        json.dumps(concurrency_stats()),
+        ex=WorkerConstants.WORKER_LIVENESS_SECONDS,
+    )
+
+
+def reset_controllers() -> None:
+    """Forget every controller (tests)."""
+    _controllers.clear()
@@ -282,6 +282,76 @@ class Settings(BaseSettings):
     # after a single blip.
     GEOCODING_TRANSIENT_TTL_SECONDS: int = Field(default=60, ge=1, le=600)
 
+    # Reactive lead monitor (app/services/lead_events_service.py). When on, the
+    # worker tails `leads` through a MongoDB change stream and dispatches status
+    # changes to handlers within a second; without a replica set it falls back
+    # to polling `updated_at`. Off by default — the interval sweeps and the
+    # deadline wheel already cover every timed action without it.
+    LEAD_EVENTS_ENABLED: bool = False
+
+    # Sharded scheduler sweeps (app/core/sharding.py). Off: one replica runs
+    # each lead sweep under its scheduler lock while the others idle. On: every
+    # live worker (discovered through its heartbeat) takes the leads whose
+    # `_id` hashes to its shard, so adding replicas adds sweep throughput. Only
+    # worth it with many replicas and tens of thousands of open leads.
+    SCHEDULER_SHARDING_ENABLED: bool = False
+
+    # Outbound send queue (app/providers/whatsapp/outbox.py). When on, sends
+    # made inside `queued_sends()` — the scheduled fan-outs and the deadline
+    # dispatcher's nudges — are queued in Redis and drained by the worker under
+    # a global token bucket, in order per recipient, with retry on 429/5xx;
+    # conversational replies stay direct.
+    # WHATSAPP_MESSAGES_PER_SECOND sizes the bucket: Meta's Cloud API default
+    # throughput is 80 msg/s per number, and the bucket should sit well under
+    # the account's tier so live replies sent outside it keep headroom.
+    OUTBOUND_QUEUE_ENABLED: bool = False
+    WHATSAPP_MESSAGES_PER_SECOND: float = Field(default=20, gt=0, le=1000)
+
+    # Write-behind delivery bookkeeping (app/providers/whatsapp/delivery.py).
+    # When on, the wa_delivery records of accepted sends and their status
+    # callbacks are buffered in process and flushed as one unordered
+    # bulk_write every DELIVERY_FLUSH_INTERVAL_SECONDS, instead of an awaited
+    # upsert per send and per callback. A `failed` status still flushes at
+    # once, so the 131047 template retry is not delayed. The cost: records
+    # buffered at a crash are lost — bookkeeping, never message content.
+    DELIVERY_WRITE_BEHIND_ENABLED: bool = False
+
+    # Write-behind message log (app/services/message_log_service.py). When on,
+    # LeadManager.log_message updates the Redis context and appends the
+    # message to a Redis stream in one pipelined round trip, and the Mongo
+    # `messages` inserts are buffered and flushed with insert_many every
+    # MESSAGE_LOG_FLUSH_INTERVAL_SECONDS. The stream entry is deleted once the
+    # message is in Mongo; entries a crashed process left behind are inserted
+    # by the worker's recovery loop. Off: an awaited insert_one per message.
+    MESSAGE_LOG_WRITE_BEHIND_ENABLED: bool = False
+
+    # Webhook load shedding (app/services/admission_service.py). When on, the
+    # webhook routes read the ARQ queue's depth and lag before enqueueing;
+    # under pressure, customers get an immediate "we're busy" reply and their
+    # AI turn is deferred, while pros, the admin and emergencies go straight
+    # through. Off: every message is enqueued at once, however far behind the
+    # worker is. The depth and lag are on /health either way.
+    WEBHOOK_LOAD_SHEDDING_ENABLED: bool = False
+
+    # Priority job lanes (app/core/lanes.py). When on, the webhook routes
+    # enqueue pros/admin, emergencies and media messages to their own ARQ
+    # queues, so a media burst or a slow AI period on customer traffic cannot
+    # delay a pro's approval. Off: every job goes to the default queue, as
+    # before. Turn it on only once the workers run this version — a worker
+    # that does not consume a lane leaves its jobs waiting.
+    JOB_LANES_ENABLED: bool = False
+    # The lanes this worker process consumes, as <lane>=<max_jobs> pairs: one
+    # ARQ worker per lane, each with its own concurrency budget. A dedicated
+    # media process sets e.g. "media=4"; every lane needs a consumer somewhere.
+    WORKER_LANES: str = "pro=3,emergency=3,standard=10,media=2"
+    # Adaptive worker concurrency (app/core/concurrency.py). When on, each
+    # lane's WORKER_LANES budget is only its starting max_jobs: the worker
+    # raises it while jobs are fast and upstreams healthy, and cuts it when
+    # Gemini or the Graph API throttle or the p95 job latency climbs. Off:
+    # every lane keeps its fixed budget. Current limits are on
+    # /health/concurrency.
+    ADAPTIVE_CONCURRENCY_ENABLED: bool = False
+
     @model_validator(mode="after")
     def require_webhook_auth_in_prod_like(self):
         if self.is_prod_like and not self.WEBHOOK_TOKEN:
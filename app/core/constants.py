@@ -125,7 +125,6 @@ class WorkerConstants:
     # 60-min Healer. Emergency leads use half these thresholds (// 2 → 5 / 12).
     APPROVAL_NUDGE_MINUTES = 10  # T+10 → nudge the pro (once per lead)
     APPROVAL_REASSIGN_OFFER_MINUTES = 25  # T+25 → offer the customer a reassignment
-    APPROVAL_SLA_CHECK_INTERVAL_MINUTES = 5  # how often the SLA job runs
     UNASSIGNED_LEAD_TIMEOUT_HOURS = (
         24  # Auto-reject CONTACTED leads with no pro after this
     )
@@ -196,6 +195,8 @@ class WorkerConstants:
     # waiting to happen, and nothing downstream (Gemini, the pro's offer
     # message) benefits from an asset that large.
     MAX_INBOUND_MEDIA_BYTES = 25 * 1024 * 1024  # 25MB
+    MEDIA_SPOOL_MEMORY_BYTES = 1024 * 1024  # a download spills to disk past 1MB
+    MEDIA_UPLOAD_CHUNK_BYTES = 6 * 1024 * 1024  # Cloudinary chunks (5MB minimum)
     # PRO-111 — nightly backup failure escalation. A single failed run stays
     # ERROR (transient: Mongo hiccup, S3 blip); this many CONSECUTIVE failures
     # logs CRITICAL, which is the Sentry paging threshold. Counter lives in
@@ -211,13 +212,187 @@ class WorkerConstants:
     SCHEDULER_MONGO_AUTH_TRIP_THRESHOLD = 3
     SCHEDULER_MONGO_AUTH_WINDOW_SECONDS = 1800  # 30 min rolling count window
     SCHEDULER_MONGO_AUTH_REALERT_SECONDS = 3600  # re-page hourly while broken
+    # Write-through availability cache (`avail:{pro_id}` sorted set of free
+    # slots). The booking/release paths keep it in sync; the TTL only bounds
+    # drift from writers that bypass those paths (seed scripts, a manual Mongo
+    # edit). The admin panel's schedule editor invalidates explicitly.
+    AVAILABILITY_CACHE_TTL_SECONDS = 600  # 10 min — rebuilt from Mongo on expiry
+    AVAILABILITY_CACHE_MAX_SLOTS = 500  # future free slots kept per pro
+    AVAILABILITY_LOOKAHEAD_DAYS = 7  # "has availability" horizon used by matching
+    # Scheduled fan-outs (the 08:00 daily agenda). Meta's default Cloud API
+    # throughput is 80 msgs/s per number; pacing well under it leaves headroom
+    # for live conversation replies sent during the same burst.
+    FANOUT_SEND_CONCURRENCY = 8  # sends in flight at once
+    FANOUT_SENDS_PER_SECOND = 20  # paced send starts per second
+    DAILY_AGENDA_MAX_JOBS = 50  # jobs listed per pro in one agenda message
+    # Deadline scheduler (`deadlines:due`). Timed lead actions are written the
+    # moment a lead enters a timed state and popped by a short-interval
+    # dispatcher, so they fire within seconds of their deadline; the interval
+    # sweeps in monitor_service remain as a slow safety net.
+    DEADLINE_POLL_SECONDS = 5  # dispatcher tick; an idle tick is one ZRANGEBYSCORE
+    DEADLINE_BATCH_SIZE = 100  # due entries claimed per tick
+    DEADLINE_RETRY_SECONDS = 600  # re-arm delay for a gated or failed action
+    DEADLINE_LEASE_SECONDS = 300  # a claimed entry reappears if its dispatcher dies
+    DEADLINE_SAFETY_SWEEP_MINUTES = 30  # cadence of the SLA/approval/Healer sweeps
+    STALE_BOOKED_REMINDER_INTERVAL_HOURS = 4  # spacing between stale-job reminders
+    # Reactive lead monitor (settings.LEAD_EVENTS_ENABLED). The change stream
+    # pushes events as they happen; the polling fallback is for deployments
+    # whose MongoDB is not a replica set (change streams need an oplog).
+    LEAD_EVENTS_POLL_SECONDS = 5  # polling-fallback interval
+    LEAD_EVENTS_BATCH_SIZE = 200  # leads read per polling pass
+    LEAD_EVENTS_RETRY_SECONDS = 5  # back-off after a dropped change stream
+    LEAD_EVENTS_STATUS_TTL_SECONDS = 604800  # 7 d — per-lead last-seen status
+    # Monitor sweeps (app/core/sweep.py): keyset-paged over `_id`, checkpointed
+    # in Redis between pages. The time budget sits under the shortest sweep
+    # lock TTL (270 s) so a long pass yields before its lock can expire under it.
+    SWEEP_PAGE_SIZE = 100  # leads read per page
+    SWEEP_CONCURRENCY = 4  # leads handled in parallel within a page
+    SWEEP_TIME_BUDGET_SECONDS = 240  # stop between pages past this; resume next run
+    SWEEP_CHECKPOINT_TTL_SECONDS = 86400  # an abandoned checkpoint expires in a day
+    SWEEP_METRICS_TTL_SECONDS = 604800  # 7 d — last-run metrics per sweep
+    SWEEP_REPORT_MAX_LINES = 50  # stuck leads itemised in one Reporter page
+    # Scheduler job instrumentation (app/core/job_metrics.py, /health/scheduler).
+    JOB_METRICS_SAMPLE_SIZE = 200  # rolling window of run durations per job
+    JOB_METRICS_TTL_SECONDS = 1209600  # 14 d — outlives the weekly slot job
+    JOB_OVERLAP_WARN_RATIO = 0.8  # flag a job whose p95 runtime passes 80% of its interval
+    JOB_DURATION_BUCKETS = (0.1, 0.5, 1, 5, 15, 60, 300, 900)  # histogram edges, seconds
+    # Worker liveness (heartbeat) — also the membership of sharded sweeps.
+    WORKER_HEARTBEAT_SECONDS = 60  # heartbeat write interval
+    WORKER_LIVENESS_SECONDS = 120  # a worker silent this long is dead; shards rebalance
+    # In-process caches invalidated over Redis pub/sub
+    # (redis_client.listen_for_invalidations). The freshness windows only bound
+    # a writer that does not publish, or a process that is not subscribed.
+    INVALIDATION_RETRY_SECONDS = 5  # back-off after a dropped subscription
+    RUNTIME_CONFIG_TTL_SECONDS = 30  # longest a cached settings document is served
+    # Outbound breaker snapshot in WhatsAppFacade. Short, because the admin
+    # panel's sync bridge is not subscribed and relies on it alone; a cached
+    # "authorized" is further capped by the confirmation key's remaining TTL.
+    WA_BREAKER_CACHE_SECONDS = 5
+    # Outbound send queue (app/providers/whatsapp/outbox.py).
+    OUTBOX_WORKERS = 4  # concurrent drain loops per worker process
+    OUTBOX_LEASE_SECONDS = 60  # a recipient's drain lease; refreshed per message
+    OUTBOX_BATCH_PER_RECIPIENT = 20  # messages sent before yielding the recipient
+    OUTBOX_MAX_ATTEMPTS = 6  # sends of one message before it is dead-lettered
+    OUTBOX_BACKOFF_BASE_SECONDS = 2  # retry delay doubles from here…
+    OUTBOX_BACKOFF_MAX_SECONDS = 300  # …up to this
+    OUTBOX_IDLE_POLL_SECONDS = 0.5  # drain-loop sleep when nothing is due
+    OUTBOX_DEAD_LETTER_MAX = 1000  # dead-lettered messages kept for inspection
+    # Write-behind buffer for wa_delivery bookkeeping (delivery.DeliveryWriter).
+    DELIVERY_FLUSH_INTERVAL_SECONDS = 0.25  # longest a buffered record waits
+    DELIVERY_FLUSH_MAX_ITEMS = 200  # buffered records that trigger an early flush
+    DELIVERY_BUFFER_MAX_ITEMS = 5000  # cap while Mongo is failing; beyond, dropped
+    # Webhook admission control (app/services/admission_service.py).
+    QUEUE_SOFT_DEPTH = 200  # ARQ jobs due: past this, customers are deferred
+    QUEUE_SOFT_LAG_SECONDS = 30  # …or when the oldest due job waited this long
+    QUEUE_HARD_DEPTH = 1000
+    QUEUE_HARD_LAG_SECONDS = 120
+    QUEUE_SOFT_DEFER_SECONDS = 120  # a deferred customer message's delay (soft)…
+    QUEUE_HARD_DEFER_SECONDS = 600  # …and past the hard threshold
+    QUEUE_BUSY_REPLY_COOLDOWN_SECONDS = 600  # one busy reply per chat per 10 min
+    QUEUE_PRESSURE_CACHE_SECONDS = 1  # queue depth/lag read at most this often
+    # Priority job lanes (app/core/lanes.py).
+    LANE_PRO_CACHE_SECONDS = 60  # pro chat ids reloaded from Mongo at most this often
+    # Adaptive worker concurrency (app/core/concurrency.py).
+    ADAPTIVE_MIN_JOBS = 1  # a lane's max_jobs never drops below this…
+    ADAPTIVE_MAX_JOBS_FACTOR = 3  # …nor rises past this × its WORKER_LANES budget
+    ADAPTIVE_WINDOW_JOBS = 20  # finished jobs per adjustment
+    ADAPTIVE_P95_TARGET_SECONDS = 30  # a slower window p95 backs off
+    ADAPTIVE_MAX_ERROR_RATE = 0.1  # …as does a window with more failed jobs
+    ADAPTIVE_DECREASE_FACTOR = 0.7  # multiplicative decrease on back-off
+    # Supervised fire-and-forget tasks (app/core/background.py).
+    BACKGROUND_MAX_CONCURRENT = 20  # background tasks running at once
+    BACKGROUND_LOW_PRIORITY_LIMIT = 50  # outstanding tasks past which typing etc. are dropped
+    BACKGROUND_MAX_PENDING = 1000  # outstanding tasks past which everything is dropped
+    BACKGROUND_DRAIN_TIMEOUT_SECONDS = 5  # shutdown wait before cancelling the rest
+    # Write-behind message log (app/services/message_log_service.py).
+    MESSAGE_LOG_FLUSH_INTERVAL_SECONDS = 0.5  # longest a logged message waits for Mongo
+    MESSAGE_LOG_FLUSH_MAX_ITEMS = 200  # buffered messages that trigger an early flush
+    MESSAGE_LOG_BUFFER_MAX_ITEMS = 5000  # held in memory while Mongo fails; beyond, the spill keeps them
+    MESSAGE_LOG_SPILL_MAXLEN = 100_000  # approximate cap on the spill stream
+    MESSAGE_LOG_RECOVER_AGE_SECONDS = 60  # spilled entries older than this are recovered…
+    MESSAGE_LOG_RECOVER_INTERVAL_SECONDS = 30  # …by a worker loop this often
+    MESSAGE_LOG_RECOVER_BATCH = 500  # entries read per XRANGE while recovering
+    MESSAGE_LOG_ERASED_TTL_SECONDS = 86_400  # erase tombstone outlives any buffered copy
     # ADMIN_PHONE moved to config.py / env var
 
 
+# Redis key of a pro's free-slot sorted set (member = slot _id, score = start
+# time as epoch seconds). Declared here rather than in the service so the admin
+# panel — which edits slots through its own sync client — can invalidate it
+# without importing app.services.
+AVAILABILITY_CACHE_KEY = "avail:{pro_id}"
+
+# Sorted set of pending timed lead actions: member = "{action}:{lead_id}",
+# score = due time as epoch seconds. One member per (lead, action), so re-arming
+# a lead moves its deadline instead of stacking a duplicate.
+DEADLINES_KEY = "deadlines:due"
+
+# Reactive lead monitor state: the change stream's resume token, the polling
+# fallback's `updated_at` high-water mark, and the last status dispatched per
+# lead (so a replayed or re-polled event never re-runs entry handlers).
+LEAD_EVENTS_RESUME_KEY = "leads:events:resume_token"
+LEAD_EVENTS_CURSOR_KEY = "leads:events:poll_cursor"
+LEAD_EVENTS_STATUS_KEY = "leads:events:status:{lead_id}"
+
+# Monitor sweep progress (last `_id` of the last finished page) and last-run
+# metrics, per sweep name.
+SWEEP_CHECKPOINT_KEY = "sweep:{name}:checkpoint"
+SWEEP_METRICS_KEY = "sweep:{name}:last_run"
+
+# Scheduler job instrumentation: the set of instrumented job ids, each job's
+# counters + last-run hash, and its rolling list of run durations (newest first).
+SCHEDULER_JOBS_KEY = "scheduler:jobs"
+SCHEDULER_JOB_STATS_KEY = "scheduler:job:{job_id}:stats"
+SCHEDULER_JOB_DURATIONS_KEY = "scheduler:job:{job_id}:durations"
+
+# Single-key heartbeat of "some worker is alive" (read by /health), and the
+# sorted set of live worker ids scored by last heartbeat (sharded sweeps).
+WORKER_HEARTBEAT_KEY = "worker:heartbeat"
+WORKERS_LIVE_KEY = "workers:live"
+# Per-worker HTTP pool utilization (JSON), refreshed with the heartbeat.
+HTTP_POOL_STATS_KEY = "http:pools:{worker_id}"
+# Per-worker adaptive concurrency limits (JSON per lane), refreshed with the heartbeat.
+WORKER_CONCURRENCY_KEY = "worker:concurrency:{worker_id}"
+
+# Durable spill of the write-behind message log: one entry per logged message
+# (field "doc" = the messages document as JSON), deleted once it is in Mongo.
+MESSAGE_LOG_SPILL_KEY = "messages:spill"
+# Right-to-delete tombstone: epoch seconds of the erase. Every process drops a
+# buffered or spilled message of the chat logged at or before it.
+MESSAGE_LOG_ERASED_KEY = "messages:erased:{chat_id}"
+
+# Outbound send queue: per-recipient FIFO list of queued sends, the sorted set
+# of recipients with queued sends (score = when the head is next due), the
+# per-recipient drain lease, dropped sends, and the global send token bucket.
+WA_OUTBOX_KEY = "wa:outbox:{chat_id}"
+WA_OUTBOX_READY_KEY = "wa:outbox:ready"
+WA_OUTBOX_LEASE_KEY = "wa:outbox:lease:{chat_id}"
+WA_OUTBOX_DEAD_KEY = "wa:outbox:dead"
+WA_SEND_BUCKET_KEY = "wa:send:bucket"
+
+# Pub/sub channel announcing a changed `settings` document (payload = its _id).
+# Declared here so the admin panel can publish without importing app.services.
+RUNTIME_CONFIG_CHANNEL = "settings:changed"
+
+
+class DeadlineAction(str, Enum):
+    """Timed lead actions driven by the deadline scheduler."""
+
+    SLA_DEFLECTION = "sla_deflection"  # paused handoff silent for PAUSE_TTL
+    APPROVAL_NUDGE = "approval_nudge"  # PRO-56 T+10 pro nudge
+    APPROVAL_OFFER = "approval_offer"  # PRO-56 T+25 customer reassignment offer
+    SOS_REASSIGN = "sos_reassign"  # Healer — unaccepted for SOS_TIMEOUT
+    LEAD_JANITOR = "lead_janitor"  # unassigned CONTACTED lead timed out
+    STALE_BOOKED = "stale_booked"  # BOOKED job left open — remind the pro
+
+
 # PRO-89 — Graph API error code on a send Meta rejected because the 24h
 # customer-service window was closed. A `failed` delivery status carrying this
 # code is re-routed through the template registry rather than merely logged.
 META_ERROR_WINDOW_CLOSED = 131047
+# Graph error codes that mean "slow down", returned with a 400 rather than a 429:
+# 130429 throughput reached, 131056 pair rate limit, 80007 account rate limit.
+META_THROTTLE_CODES = {130429, 131056, 80007}
 
 
 class APIStatus:
@@ -41,6 +41,10 @@ admins_collection = db.admins
 # context from any `messages` doc matching a chat_id, so status records there
 # would be replayed into the Gemini prompt.
 wa_delivery_collection = db.wa_delivery
+# Per-chat conversation session boundary (_id = chat_id, started_at = when
+# the chat's last lead reached a terminal status). Stamped by set_lead_status,
+# read by get_chat_history so a cold-cache rehydration never searches leads.
+chat_sessions_collection = db.chat_sessions
 
 # --- Sync Client (PyMongo) ---
 # Kept strictly for synchronous scripts or legacy tools if needed.
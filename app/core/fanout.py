@@ -0,0 +1,83 @@
+"""Bounded-concurrency fan-out for scheduled bulk work.
+
+Scheduler jobs that message many recipients (the 08:00 daily agenda, nudgers)
+used to await each send in turn — hundreds of sequential round trips in one
+burst. ``bounded_fanout`` runs the per-item coroutine with at most
+``concurrency`` in flight and, optionally, no more than ``per_second`` starts
+per second, so a fan-out finishes quickly without exceeding the messaging
+provider's throughput.
+
+A failing item never aborts the run: the exception is logged and counted in
+the returned :class:`FanoutResult`, which callers report as per-run metrics.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Iterable, TypeVar
+
+from app.core.logger import logger
+
+T = TypeVar("T")
+
+
+@dataclass
+class FanoutResult:
+    attempted: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    duration_seconds: float = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "attempted": self.attempted,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "duration_seconds": round(self.duration_seconds, 3),
+        }
+
+
+async def bounded_fanout(
+    items: Iterable[T],
+    worker: Callable[[T], Awaitable[object]],
+    *,
+    concurrency: int,
+    per_second: float | None = None,
+    label: str = "fanout",
+) -> FanoutResult:
+    """Run ``worker(item)`` for every item, ``concurrency`` at a time.
+
+    ``per_second`` spaces task *starts* evenly (1/per_second apart) — a simple
+    pacing that keeps a burst under a provider's messages-per-second limit
+    without a token bucket's state.
+    """
+    result = FanoutResult()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    pace_lock = asyncio.Lock()
+    interval = 1.0 / per_second if per_second else 0.0
+    next_start = 0.0
+    started = time.monotonic()
+
+    async def run(item: T) -> None:
+        nonlocal next_start
+        async with semaphore:
+            if interval:
+                async with pace_lock:
+                    now = time.monotonic()
+                    wait = max(0.0, next_start - now)
+                    next_start = max(now, next_start) + interval
+                if wait:
+                    await asyncio.sleep(wait)
+            try:
+                await worker(item)
+                result.succeeded += 1
+            except Exception as e:
+                result.failed += 1
+                logger.error(f"❌ [{label}] item failed: {e}")
+
+    tasks = [run(item) for item in items]
+    result.attempted = len(tasks)
+    if tasks:
+        await asyncio.gather(*tasks)
+    result.duration_seconds = time.monotonic() - started
+    return result
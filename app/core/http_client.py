@@ -1,21 +1,209 @@
+"""Shared outbound HTTP clients — one tuned connection pool per upstream.
+
+A single client used to serve every upstream, so a slow 25 MB media download
+could hold the connections a latency-critical Graph send was waiting for.
+Each upstream now gets its own ``httpx.AsyncClient``, with its own connection
+limits, keep-alive and timeouts:
+
+* ``graph`` — Graph API sends and state probes (graph.facebook.com). Small,
+  latency-critical requests: short timeouts, HTTP/2 multiplexing.
+* ``meta-media`` — inbound media bytes from Meta's CDN. Few, long transfers.
+* ``geocoding`` — Google Geocoding. One short GET per unresolved city.
+* ``media`` — everything else: arbitrary media URLs (media_handler, the AI
+  engine's audio/video fetch). The default.
+
+HTTP/2 needs the optional ``h2`` package (``httpx[http2]``). Without it the
+HTTP/2 pools fall back to HTTP/1.1 with a warning, rather than failing to
+build the client.
+
+Every pool counts its requests in flight through a thin transport wrapper;
+:func:`pool_stats` reports them for monitoring (``/health/http``; the worker
+publishes its own alongside its heartbeat).
+"""
+
+import importlib.util
+import json
+from dataclasses import dataclass
+from typing import Dict, Optional
+
 import httpx
-from typing import Optional
 
+from app.core.constants import HTTP_POOL_STATS_KEY, WorkerConstants
 from app.core.logger import logger
 
-_http_client: Optional[httpx.AsyncClient] = None
+GRAPH = "graph"
+META_MEDIA = "meta-media"
+GEOCODING = "geocoding"
+MEDIA = "media"
+
+
+@dataclass(frozen=True)
+class PoolSpec:
+    max_connections: int
+    max_keepalive: int
+    keepalive_expiry: float
+    connect: float
+    read: float
+    write: float
+    pool: float  # wait for a free connection before PoolTimeout
+    http2: bool = False
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(
+            connect=self.connect, read=self.read, write=self.write, pool=self.pool
+        )
+
+
+POOLS: Dict[str, PoolSpec] = {
+    GRAPH: PoolSpec(
+        max_connections=20, max_keepalive=10, keepalive_expiry=60,
+        connect=5, read=15, write=10, pool=5, http2=True,
+    ),
+    META_MEDIA: PoolSpec(
+        max_connections=8, max_keepalive=4, keepalive_expiry=30,
+        connect=5, read=60, write=10, pool=30, http2=True,
+    ),
+    GEOCODING: PoolSpec(
+        max_connections=10, max_keepalive=5, keepalive_expiry=60,
+        connect=2, read=5, write=5, pool=2, http2=True,
+    ),
+    MEDIA: PoolSpec(
+        max_connections=10, max_keepalive=5, keepalive_expiry=30,
+        connect=5, read=30, write=30, pool=30,
+    ),
+}
+
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class _PoolCounters:
+    def __init__(self):
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.errors = 0
+
+
+class _CountedStream(httpx.AsyncByteStream):
+    """Response body wrapper: the request stays in flight until it is read
+    or closed, which is when its connection goes back to the pool."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, counters: _PoolCounters):
+        self._stream = stream
+        self._counters = counters
+        self._open = True
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        if self._open:
+            self._open = False
+            self._counters.in_flight -= 1
+        await self._stream.aclose()
+
+
+class _CountingTransport(httpx.AsyncBaseTransport):
+    def __init__(self, transport: httpx.AsyncBaseTransport, counters: _PoolCounters):
+        self._transport = transport
+        self._counters = counters
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        counters = self._counters
+        counters.requests += 1
+        counters.in_flight += 1
+        counters.peak_in_flight = max(counters.peak_in_flight, counters.in_flight)
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception:
+            counters.in_flight -= 1
+            counters.errors += 1
+            raise
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_CountedStream(response.stream, counters),
+            extensions=response.extensions,
+        )
 
+    async def aclose(self) -> None:
+        await self._transport.aclose()
 
-async def get_http_client() -> httpx.AsyncClient:
-    """Returns a shared httpx.AsyncClient for media downloads and general HTTP calls."""
-    global _http_client
-    if _http_client is None or _http_client.is_closed:
-        _http_client = httpx.AsyncClient(timeout=30.0)
-    return _http_client
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+_counters: Dict[str, _PoolCounters] = {}
+
+
+def _build(name: str) -> httpx.AsyncClient:
+    spec = POOLS[name]
+    http2 = spec.http2 and _HTTP2_AVAILABLE
+    if spec.http2 and not http2:
+        logger.warning(f"HTTP pool '{name}': h2 not installed — using HTTP/1.1.")
+    counters = _counters.setdefault(name, _PoolCounters())
+    transport = httpx.AsyncHTTPTransport(http2=http2, limits=spec.limits())
+    return httpx.AsyncClient(
+        transport=_CountingTransport(transport, counters), timeout=spec.timeout()
+    )
+
+
+async def get_http_client(pool: str = MEDIA) -> httpx.AsyncClient:
+    """Returns the shared httpx.AsyncClient for ``pool`` (see POOLS)."""
+    if pool not in POOLS:
+        raise ValueError(f"Unknown HTTP pool {pool!r}")
+    client = _clients.get(pool)
+    if client is None or client.is_closed:
+        client = _clients[pool] = _build(pool)
+    return client
+
+
+def pool_stats() -> Dict[str, dict]:
+    """Per-pool utilization of the clients this process has opened."""
+    stats = {}
+    for name, spec in POOLS.items():
+        counters = _counters.get(name) or _PoolCounters()
+        client = _clients.get(name)
+        stats[name] = {
+            "open": client is not None and not client.is_closed,
+            "max_connections": spec.max_connections,
+            "in_flight": counters.in_flight,
+            "peak_in_flight": counters.peak_in_flight,
+            "utilization": round(counters.in_flight / spec.max_connections, 3),
+            "requests": counters.requests,
+            "errors": counters.errors,
+            "http2": spec.http2 and _HTTP2_AVAILABLE,
+        }
+    return stats
+
+
+async def publish_pool_stats(redis, worker_id: str) -> None:
+    """Store this process's pool stats for ``/health/http``; expires with the
+    heartbeat, so a dead worker's numbers age out with it."""
+    await redis.set(
+        HTTP_POOL_STATS_KEY.format(worker_id=worker_id),
+        json.dumps(pool_stats()),
+        ex=WorkerConstants.WORKER_LIVENESS_SECONDS,
+    )
+
+
+async def _close(name: str, client: Optional[httpx.AsyncClient]) -> None:
+    if client is None or client.is_closed:
+        return
+    try:
+        await client.aclose()
+    except Exception as e:
+        logger.warning(f"HTTP client '{name}' close failed (ignored during shutdown): {e}")
 
 
 async def close_http_client():
-    """Closes the shared HTTP client. Never raises (PRO-115).
+    """Closes every shared HTTP client. Never raises (PRO-115).
 
     httpx's async close is ``aclose()`` — the old ``close()`` call raised
     AttributeError on every graceful shutdown of both services, failing the
@@ -23,11 +211,7 @@ async def close_http_client():
     A failure to close a client the process is about to drop anyway is
     log-worthy, never fatal.
     """
-    global _http_client
-    client, _http_client = _http_client, None
-    if client is None or client.is_closed:
-        return
-    try:
-        await client.aclose()
-    except Exception as e:
-        logger.warning(f"HTTP client close failed (ignored during shutdown): {e}")
+    clients = dict(_clients)
+    _clients.clear()
+    for name, client in clients.items():
+        await _close(name, client)
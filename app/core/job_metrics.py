@@ -0,0 +1,226 @@
+"""Per-run instrumentation for APScheduler jobs.
+
+``start_scheduler`` wraps every registered job with :func:`instrument_job`. A
+run records its duration, items processed (read off the job's return value),
+outcome, and — via :func:`note` / :func:`note_gate`, called from inside the
+run — whether the ``with_scheduler_lock`` lock was acquired or skipped and how
+each PRO-73 toggle (``_customer_cold_job_allowed``) it checked decided. A run
+is only counted ``gated`` when a gate kept the whole job dark; the deadline
+dispatcher checks several toggles per tick and only skips the gated entries,
+so its per-toggle decisions land in the ``gate:{toggle}:*`` counters instead.
+The in-flight record travels in a ContextVar, so the lock decorator and the
+gate need no extra arguments.
+
+Each job's counters and last run live in ``scheduler:job:{job_id}:stats``; the
+durations of its last JOB_METRICS_SAMPLE_SIZE executed runs (lock-skipped runs
+excluded) in ``scheduler:job:{job_id}:durations``. :func:`job_stats` turns the
+latter into a histogram and percentiles for ``/health/scheduler``, flagging a
+job whose p95 runtime is approaching its interval before runs start to overlap.
+
+Recording is best-effort: a Redis error is logged and never fails the job.
+"""
+
+import contextvars
+import functools
+import json
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.core.constants import (
+    SCHEDULER_JOB_DURATIONS_KEY,
+    SCHEDULER_JOB_STATS_KEY,
+    SCHEDULER_JOBS_KEY,
+    WorkerConstants,
+)
+from app.core.logger import logger
+
+_current_run: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar(
+    "scheduler_job_run", default=None
+)
+
+
+def note(**fields) -> None:
+    """Attach fields (``lock=``, ``gated=``) to the job run in progress.
+    A no-op outside an instrumented job, e.g. when a test calls a job directly."""
+    run = _current_run.get()
+    if run is not None:
+        run.update(fields)
+
+
+def note_gate(toggle: str, allowed: bool) -> None:
+    """Record one PRO-73 toggle decision for the job run in progress. Unlike
+    ``gated=``, this says nothing about whether the run as a whole was gated."""
+    run = _current_run.get()
+    if run is not None:
+        run.setdefault("gates", {})[toggle] = allowed
+
+
+def _items_from(result) -> Optional[int]:
+    if isinstance(result, bool):
+        return None
+    if isinstance(result, int):
+        return result
+    if isinstance(result, dict):
+        for field in ("processed", "pros_messaged", "attempted"):
+            if isinstance(result.get(field), int):
+                return result[field]
+    return None
+
+
+def _outcome(run: dict) -> str:
+    if run.get("error"):
+        return "error"
+    if run.get("lock") == "skipped":
+        return "lock_skipped"
+    if run.get("gated"):
+        return "gated"
+    return "ok"
+
+
+async def _record(job_id: str, interval_seconds: Optional[float], run: dict) -> None:
+    from app.core.redis_client import get_redis_client
+
+    outcome = _outcome(run)
+    now = datetime.now(timezone.utc).isoformat()
+    # "" clears a field the previous run set — HSET cannot store None.
+    last_run = {
+        "last_run_at": now,
+        "last_outcome": outcome,
+        "last_duration_seconds": round(run["duration"], 3),
+        "last_lock": run.get("lock", "none"),
+        "last_items": "" if run.get("items") is None else run["items"],
+        "last_gates": json.dumps(run["gates"]) if run.get("gates") else "",
+        "last_error": str(run["error"])[:300] if run.get("error") else "",
+        "interval_seconds": interval_seconds or "",
+    }
+    if outcome == "ok":
+        last_run["last_success_at"] = now
+
+    try:
+        redis = await get_redis_client()
+        stats_key = SCHEDULER_JOB_STATS_KEY.format(job_id=job_id)
+        durations_key = SCHEDULER_JOB_DURATIONS_KEY.format(job_id=job_id)
+        ttl = WorkerConstants.JOB_METRICS_TTL_SECONDS
+        pipe = redis.pipeline(transaction=False)
+        pipe.sadd(SCHEDULER_JOBS_KEY, job_id)
+        pipe.hset(stats_key, mapping=last_run)
+        pipe.hincrby(stats_key, "runs", 1)
+        pipe.hincrby(stats_key, outcome, 1)
+        if run.get("items"):
+            pipe.hincrby(stats_key, "items_total", run["items"])
+        for toggle, allowed in run.get("gates", {}).items():
+            decision = "allowed" if allowed else "blocked"
+            pipe.hincrby(stats_key, f"gate:{toggle}:{decision}", 1)
+        pipe.expire(stats_key, ttl)
+        if outcome != "lock_skipped":
+            pipe.lpush(durations_key, round(run["duration"], 3))
+            pipe.ltrim(durations_key, 0, WorkerConstants.JOB_METRICS_SAMPLE_SIZE - 1)
+            pipe.expire(durations_key, ttl)
+        await pipe.execute()
+    except Exception as e:
+        logger.warning(f"[Scheduler] Metrics for '{job_id}' not recorded: {e}")
+
+
+def instrument_job(job_id: str, interval_seconds: Optional[float] = None):
+    """Wrap an APScheduler job coroutine to record every run. Exceptions are
+    recorded and re-raised, so ``_on_job_error`` still sees them."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            run: dict = {}
+            token = _current_run.set(run)
+            started = time.monotonic()
+            try:
+                result = await func(*args, **kwargs)
+                run["items"] = _items_from(result)
+                return result
+            except Exception as e:
+                run["error"] = e
+                raise
+            finally:
+                run["duration"] = time.monotonic() - started
+                _current_run.reset(token)
+                await _record(job_id, interval_seconds, run)
+
+        return wrapper
+
+    return decorator
+
+
+def _percentile(ordered: list, pct: float) -> float:
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _histogram(durations: list) -> dict:
+    edges = WorkerConstants.JOB_DURATION_BUCKETS
+    buckets = {f"le_{edge}s": 0 for edge in edges}
+    buckets["gt_max"] = 0
+    for d in durations:
+        for edge in edges:
+            if d <= edge:
+                buckets[f"le_{edge}s"] += 1
+                break
+        else:
+            buckets["gt_max"] += 1
+    return buckets
+
+
+async def job_stats() -> dict:
+    """Every instrumented job's counters, last run and rolling duration
+    histogram, keyed by job id. Raises on a Redis error — the route owns it."""
+    from app.core.redis_client import get_redis_client
+
+    redis = await get_redis_client()
+    job_ids = sorted(await redis.smembers(SCHEDULER_JOBS_KEY))
+    pipe = redis.pipeline(transaction=False)
+    for job_id in job_ids:
+        pipe.hgetall(SCHEDULER_JOB_STATS_KEY.format(job_id=job_id))
+        pipe.lrange(SCHEDULER_JOB_DURATIONS_KEY.format(job_id=job_id), 0, -1)
+    replies = await pipe.execute()
+
+    jobs = {}
+    for job_id, raw, samples in zip(job_ids, replies[0::2], replies[1::2]):
+        if not raw:
+            continue  # expired; the id lingers in the set until the next run
+        durations = sorted(float(s) for s in samples)
+        interval = float(raw["interval_seconds"]) if raw.get("interval_seconds") else None
+        gates: dict = {}
+        for field, count in raw.items():
+            if field.startswith("gate:"):
+                _, toggle, decision = field.split(":")
+                gates.setdefault(toggle, {"allowed": 0, "blocked": 0})[decision] = int(count)
+        entry = {
+            "runs": int(raw.get("runs", 0)),
+            "ok": int(raw.get("ok", 0)),
+            "errors": int(raw.get("error", 0)),
+            "lock_skipped": int(raw.get("lock_skipped", 0)),
+            "gated": int(raw.get("gated", 0)),
+            "items_total": int(raw.get("items_total", 0)),
+            "last_run_at": raw.get("last_run_at"),
+            "last_success_at": raw.get("last_success_at"),
+            "last_outcome": raw.get("last_outcome"),
+            "last_duration_seconds": float(raw.get("last_duration_seconds", 0)),
+            "last_items": int(raw["last_items"]) if raw.get("last_items") else None,
+            "last_lock": raw.get("last_lock"),
+            "gates": gates,
+            "last_gates": json.loads(raw["last_gates"]) if raw.get("last_gates") else None,
+            "last_error": raw.get("last_error") or None,
+            "interval_seconds": interval,
+            "samples": len(durations),
+            "histogram": _histogram(durations),
+            "near_overlap": False,
+        }
+        if durations:
+            entry["p50_seconds"] = _percentile(durations, 50)
+            entry["p95_seconds"] = _percentile(durations, 95)
+            entry["max_seconds"] = durations[-1]
+            if interval:
+                entry["p95_interval_ratio"] = round(entry["p95_seconds"] / interval, 3)
+                entry["near_overlap"] = (
+                    entry["p95_interval_ratio"] >= WorkerConstants.JOB_OVERLAP_WARN_RATIO
+                )
+        jobs[job_id] = entry
+    return jobs
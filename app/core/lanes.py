@@ -0,0 +1,119 @@
+"""ARQ job lanes — one queue and one concurrency budget per kind of inbound work.
+
+Every inbound message used to share the single ``arq:queue`` and the worker's
+``max_jobs = 10``, so a burst of video messages or a slow AI period delayed a
+pro's "אשר" — the most latency-sensitive action in the funnel. The webhook
+routes now route each job at enqueue time (:func:`route`) to a lane:
+
+* ``pro`` — pros and the admin (approvals, dashboard, admin wizard);
+* ``emergency`` — a message with an emergency keyword
+  (``Messages.Keywords.EMERGENCY_KEYWORDS``);
+* ``media`` — a customer message carrying an image/audio/video;
+* ``standard`` — every other customer message. Its queue is ARQ's default
+  ``arq:queue``, so jobs enqueued before lanes existed still run.
+
+Routing is gated by ``JOB_LANES_ENABLED``. A worker process subscribes to a weighted set of lanes through
+``WORKER_LANES`` (``lane=max_jobs`` pairs, see :func:`parse_lanes`): one ARQ
+worker per lane, each with its own concurrency budget, in one process
+(``app/worker.py``). Every lane needs at least one subscribed process.
+
+Pro membership is a set of chat ids loaded from ``users`` at most once per
+LANE_PRO_CACHE_SECONDS per process; an unreadable Mongo keeps the last set.
+"""
+
+import time
+
+from arq.constants import default_queue_name
+
+from app.core.config import settings
+from app.core.constants import WorkerConstants
+from app.core.database import users_collection
+from app.core.logger import logger
+from app.core.messages import Messages
+from app.core.phone import to_chat_id
+
+PRO = "pro"
+EMERGENCY = "emergency"
+STANDARD = "standard"
+MEDIA = "media"
+LANES = (PRO, EMERGENCY, STANDARD, MEDIA)
+
+# Process-wide snapshot: (monotonic expiry, chat ids of every pro).
+_pro_snapshot: tuple[float, frozenset[str]] | None = None
+
+
+def queue_name(lane: str) -> str:
+    """The ARQ queue a lane's jobs are enqueued to."""
+    if lane not in LANES:
+        raise ValueError(f"Unknown job lane {lane!r}")
+    return default_queue_name if lane == STANDARD else f"{default_queue_name}:{lane}"
+
+
+def parse_lanes(spec: str) -> dict[str, int]:
+    """``"pro=3,standard=10"`` → ``{"pro": 3, "standard": 10}``, in order."""
+    lanes: dict[str, int] = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        lane, _, budget = part.partition("=")
+        lane = lane.strip()
+        if lane not in LANES or not budget.strip().isdigit() or int(budget) < 1:
+            raise ValueError(
+                f"Bad WORKER_LANES entry {part.strip()!r}: expected <lane>=<max_jobs> "
+                f"with a lane in {', '.join(LANES)}"
+            )
+        lanes[lane] = int(budget)
+    if not lanes:
+        raise ValueError("WORKER_LANES subscribes to no lane")
+    return lanes
+
+
+def is_emergency(text: str | None) -> bool:
+    normalized_text = (text or "").strip().lower()
+    return any(kw in normalized_text for kw in Messages.Keywords.EMERGENCY_KEYWORDS)
+
+
+async def _pro_chat_ids() -> frozenset[str]:
+    global _pro_snapshot
+    now = time.monotonic()
+    snapshot = _pro_snapshot
+    if snapshot is not None and now < snapshot[0]:
+        return snapshot[1]
+    try:
+        users = await users_collection.find(
+            {"role": "professional"}, {"phone_number": 1}
+        ).to_list(length=None)
+        pros = frozenset(
+            to_chat_id(user["phone_number"]) for user in users if user.get("phone_number")
+        )
+    except Exception as e:
+        logger.warning(f"Lane routing: could not load pros, keeping the last set: {e}")
+        return snapshot[1] if snapshot is not None else frozenset()
+    _pro_snapshot = (now + WorkerConstants.LANE_PRO_CACHE_SECONDS, pros)
+    return pros
+
+
+async def is_pro_or_admin(chat_id: str) -> bool:
+    if chat_id == to_chat_id(settings.ADMIN_PHONE):
+        return True
+    return to_chat_id(chat_id) in await _pro_chat_ids()
+
+
+async def route(chat_id: str, text: str | None, media_url: str | None) -> str:
+    """The lane an inbound message's job goes to (always ``standard`` while
+    JOB_LANES_ENABLED is off)."""
+    if not settings.JOB_LANES_ENABLED:
+        return STANDARD
+    if is_emergency(text):
+        return EMERGENCY
+    if await is_pro_or_admin(chat_id):
+        return PRO
+    if media_url:
+        return MEDIA
+    return STANDARD
+
+
+def reset_pro_cache() -> None:
+    """Drop the pro snapshot (tests)."""
+    global _pro_snapshot
+    _pro_snapshot = None
@@ -1,9 +1,10 @@
-"""Pure helper for building lead ``status_history`` entries.
+"""Pure helpers for building lead ``status_history`` entries and the
+``chat_sessions`` boundary stamp that goes with a session-ending status.
 
 Shared by the async service layer (``lead_manager_service.set_lead_status``) and
 the synchronous Streamlit admin panel so both write identical
-``{status, at, by}`` entries. No I/O and no async/motor imports, so it is safe
-to import from either process.
+``{status, at, by}`` entries and move the session boundary the same way. No I/O
+and no async/motor imports, so it is safe to import from either process.
 
 ``status`` and ``actor`` are stored as-is. ``LeadStatus`` and ``Actor`` are
 ``(str, Enum)`` subclasses, so their underlying string content ("completed",
@@ -13,6 +14,22 @@ would serialize the Enum repr ("LeadStatus.COMPLETED") instead.
 
 from datetime import datetime, timezone
 
+from pymongo import UpdateOne
+
+from app.core.constants import LeadStatus
+
+# A lead reaching one of these ends the chat's conversation session: messages
+# logged before it belong to an old session and must not be replayed into a
+# new AI prompt.
+SESSION_ENDING_STATUSES = frozenset(
+    {
+        LeadStatus.COMPLETED,
+        LeadStatus.REJECTED,
+        LeadStatus.CLOSED,
+        LeadStatus.CANCELLED,
+    }
+)
+
 
 def status_history_entry(status, actor) -> dict:
     """Build one timestamped status transition record."""
@@ -21,3 +38,24 @@ def status_history_entry(status, actor) -> dict:
         "at": datetime.now(timezone.utc),
         "by": actor,
     }
+
+
+def session_end(lead: dict):
+    """When a session-ending lead ended its chat's session."""
+    return (
+        lead.get("completed_at")
+        or lead.get("closed_at")
+        or lead.get("updated_at")
+        or lead.get("created_at")
+    )
+
+
+def session_stamp(chat_id: str, ended_at) -> UpdateOne:
+    """The ``chat_sessions`` upsert recording a session boundary."""
+    # $max: a replayed or out-of-order transition never moves it back. No
+    # end (None) only records that the chat has none yet: no `started_at`.
+    if ended_at is None:
+        update = {"$setOnInsert": {"checked_at": datetime.now(timezone.utc)}}
+    else:
+        update = {"$max": {"started_at": ended_at}}
+    return UpdateOne({"_id": chat_id}, update, upsert=True)
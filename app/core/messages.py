@@ -665,6 +665,11 @@ class Messages:
         DAILY_AI_CAP_REACHED = (
             "הגעת למכסת הפניות היומית. נסה שוב מחר, ואם זה דחוף אנא פנה אלינו 🙏"
         )
+        # Webhook load shedding — the AI turn is deferred, not dropped
+        BUSY_DEFERRED = (
+            "⏳ יש לנו עומס פניות כרגע. קיבלנו את ההודעה שלך ונחזור אליך בהקדם. "
+            "אם מדובר במקרה חירום, כתוב *דחוף*."
+        )
 
     class AISystemPrompts:
         ANALYZE_IMAGE = "[System: Analyze the image to identify the issue.]"
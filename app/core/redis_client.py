@@ -3,9 +3,11 @@ import functools
 from redis.asyncio import Redis, from_url
 from arq import create_pool
 from arq.connections import RedisSettings
+from app.core import job_metrics, sharding
 from app.core.config import settings
+from app.core.constants import WorkerConstants
 from app.core.logger import logger
-from typing import Optional
+from typing import Callable, Dict, Optional
 
 _redis_client: Optional[Redis] = None
 _arq_pool = None
@@ -46,13 +48,19 @@ async def release_chat_lock(chat_id: str) -> None:
         logger.debug(f"release_chat_lock swallow for {chat_id}: {e}")
 
 
-def with_scheduler_lock(key: str, ttl: int):
+def with_scheduler_lock(key: str, ttl: int, sharded: bool = False):
     """
     Decorator for APScheduler jobs: ensures the wrapped coroutine runs on only
     one worker instance at a time (distributed lock via Redis SETNX).
     TTL should be slightly shorter than the job interval. Lock is released in a
     finally block so normal completion frees it immediately; TTL protects
     against crashes. On Redis error the job runs locally (degraded mode).
+
+    ``sharded=True`` (with ``settings.SCHEDULER_SHARDING_ENABLED``): the lock is
+    taken per shard of the live-worker layout instead, and the job runs with
+    that shard set for ``app.core.sweep`` to filter on — see app/core/sharding.py.
+    A replica whose shard cannot be resolved skips the run rather than sweeping
+    everything unsharded.
     """
 
     def decorator(func):
@@ -60,31 +68,54 @@ def with_scheduler_lock(key: str, ttl: int):
         async def wrapper(*args, **kwargs):
             lock_key = f"lock:scheduler:{key}"
             redis = None
+            shard = None
             try:
                 redis = await get_redis_client()
             except Exception as e:
                 logger.warning(
                     f"with_scheduler_lock Redis unavailable for '{key}': {e} — running local only"
                 )
+                job_metrics.note(lock="unavailable")
                 return await func(*args, **kwargs)
 
+            if sharded and settings.SCHEDULER_SHARDING_ENABLED:
+                try:
+                    shard = await sharding.resolve_shard(redis)
+                except Exception as e:
+                    logger.warning(f"with_scheduler_lock shard lookup failed for '{key}': {e}")
+                if shard is None:
+                    # Falling back to the unsharded lock would sweep every
+                    # shard on top of the replicas that own them; the peers
+                    # (or our next tick, once the heartbeat lands) cover it.
+                    logger.info(
+                        f"⏭️ Scheduler job '{key}' skipped — shard unresolved"
+                    )
+                    job_metrics.note(lock="skipped", shard="unresolved")
+                    return
+                lock_key = f"{lock_key}:shard:{shard}"
+                job_metrics.note(shard=str(shard))
+
             try:
                 acquired = bool(await redis.set(lock_key, "1", ex=ttl, nx=True))
             except Exception as e:
                 logger.warning(
                     f"with_scheduler_lock SETNX failed for '{key}': {e} — running local only"
                 )
+                job_metrics.note(lock="unavailable")
                 return await func(*args, **kwargs)
 
+            job_metrics.note(lock="acquired" if acquired else "skipped")
             if not acquired:
                 logger.debug(
                     f"⏭️ Scheduler job '{key}' skipped — lock held by another worker"
                 )
                 return
 
+            token = sharding.use_shard(shard)
             try:
                 return await func(*args, **kwargs)
             finally:
+                sharding.reset_shard(token)
                 try:
                     await redis.delete(lock_key)
                 except Exception as e:
@@ -129,6 +160,42 @@ async def get_redis_client() -> Redis:
     return _redis_client
 
 
+async def listen_for_invalidations(
+    handlers: Dict[str, Callable[[Optional[str]], None]]
+) -> None:
+    """Worker task: call ``handlers[channel](payload)`` for every message
+    published on one of its channels. Runs until cancelled; a dropped
+    subscription backs off and resubscribes.
+
+    Pub/sub is fire-and-forget — anything published while we were not
+    subscribed is lost — so every (re)subscribe first calls each handler with
+    ``None``, meaning "anything may have changed".
+    """
+    while True:
+        pubsub = None
+        try:
+            redis = await get_redis_client()
+            pubsub = redis.pubsub(ignore_subscribe_messages=True)
+            await pubsub.subscribe(*handlers)
+            for handler in handlers.values():
+                handler(None)
+            while True:
+                message = await pubsub.get_message(timeout=1.0)
+                if message and message.get("type") == "message":
+                    handlers[message["channel"]](message.get("data") or None)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"[Invalidation] subscription lost, retrying: {e}")
+            await asyncio.sleep(WorkerConstants.INVALIDATION_RETRY_SECONDS)
+        finally:
+            if pubsub is not None:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+
 async def get_arq_pool():
     """
     Returns a singleton ARQ Redis pool instance.
@@ -0,0 +1,148 @@
+"""Sharded execution of scheduler sweeps across live worker replicas.
+
+``with_scheduler_lock`` lets exactly one replica run a sweep while the others
+idle, so adding workers added nothing to sweep throughput. With
+``settings.SCHEDULER_SHARDING_ENABLED`` a job registered with
+``with_scheduler_lock(..., sharded=True)`` instead runs on *every* replica, each
+taking the documents whose ``_id`` hashes to its shard.
+
+Membership comes from the heartbeat: every worker ZADDs its ``WORKER_ID`` to
+``workers:live`` (scored by time) every WORKER_HEARTBEAT_SECONDS. A replica's
+shard is its position among the ids seen within WORKER_LIVENESS_SECONDS, so
+when a replica dies its id ages out and the survivors' shards widen to cover
+its documents on their next run — rebalancing needs no coordinator. The lock
+key carries the layout (``…:shard:1of3``), so a shard is still run at most
+once per tick, and a layout change simply starts new locks.
+
+The shard predicate runs in Mongo: every lead stores ``shard_key`` (the CRC32
+of its ``_id``, stamped by :func:`with_shard_key` at creation), shard ``i`` of
+``n`` owns the ``i``-th of ``n`` equal ranges of that 32-bit space, and a
+sharded sweep adds the range to its query (:func:`shard_filter`) — so each
+replica reads only its own share. Leads from before the field existed are
+matched by every shard and owned by the same hash in Python (:func:`owns`).
+
+While replicas disagree on the layout (a worker just joined or died) a
+document can land in two shards or none for one tick. Handlers are idempotent
+claims and the next tick covers a gap, as with any missed sweep.
+"""
+
+import contextvars
+import os
+import socket
+import time
+import uuid
+import zlib
+from typing import List, NamedTuple, Optional
+
+from bson import ObjectId
+
+from app.core.constants import (
+    WORKER_HEARTBEAT_KEY,
+    WORKERS_LIVE_KEY,
+    WorkerConstants,
+)
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class Shard(NamedTuple):
+    index: int
+    count: int
+
+    def __str__(self) -> str:
+        return f"{self.index}of{self.count}"
+
+
+_current_shard: contextvars.ContextVar[Optional[Shard]] = contextvars.ContextVar(
+    "scheduler_shard", default=None
+)
+
+
+def current_shard() -> Optional[Shard]:
+    """The shard of the sharded job running in this context, if any."""
+    return _current_shard.get()
+
+
+def shard_key(doc_id) -> int:
+    """CRC32 of the id string, not ``hash()`` — it must agree across
+    processes, and with the ``shard_key`` stored on the document."""
+    return zlib.crc32(str(doc_id).encode())
+
+
+def with_shard_key(doc: dict) -> dict:
+    """Give a new document its ``_id`` up front and the matching ``shard_key``."""
+    doc.setdefault("_id", ObjectId())
+    doc["shard_key"] = shard_key(doc["_id"])
+    return doc
+
+
+def _key_range(shard: Shard) -> tuple[int, int]:
+    # [start, end) of the shard's slice of the 32-bit key space.
+    return (
+        (shard.index << 32) // shard.count,
+        ((shard.index + 1) << 32) // shard.count,
+    )
+
+
+def owns(doc_id, shard: Optional[Shard]) -> bool:
+    """Whether ``doc_id`` falls in ``shard``."""
+    if shard is None or shard.count <= 1:
+        return True
+    start, end = _key_range(shard)
+    return start <= shard_key(doc_id) < end
+
+
+def shard_filter(shard: Optional[Shard]) -> Optional[dict]:
+    """The query clause selecting ``shard``'s documents, or None when
+    unsharded. Documents without a ``shard_key`` match every shard; the
+    caller filters those with :func:`owns`."""
+    if shard is None or shard.count <= 1:
+        return None
+    start, end = _key_range(shard)
+    return {
+        "$or": [
+            {"shard_key": {"$gte": start, "$lt": end}},
+            {"shard_key": {"$exists": False}},
+        ]
+    }
+
+
+async def heartbeat(redis, worker_id: Optional[str] = None) -> None:
+    """Refresh this worker's liveness and prune workers past the window."""
+    worker_id = worker_id or WORKER_ID
+    now = time.time()
+    pipe = redis.pipeline(transaction=False)
+    pipe.set(WORKER_HEARTBEAT_KEY, str(now), ex=WorkerConstants.WORKER_LIVENESS_SECONDS)
+    pipe.zadd(WORKERS_LIVE_KEY, {worker_id: now})
+    pipe.zremrangebyscore(
+        WORKERS_LIVE_KEY, "-inf", now - WorkerConstants.WORKER_LIVENESS_SECONDS
+    )
+    await pipe.execute()
+
+
+async def leave(redis, worker_id: Optional[str] = None) -> None:
+    """Drop out of the live set on clean shutdown, so peers rebalance now."""
+    await redis.zrem(WORKERS_LIVE_KEY, worker_id or WORKER_ID)
+
+
+async def live_workers(redis) -> List[str]:
+    cutoff = time.time() - WorkerConstants.WORKER_LIVENESS_SECONDS
+    return sorted(await redis.zrangebyscore(WORKERS_LIVE_KEY, cutoff, "+inf"))
+
+
+async def resolve_shard(redis, worker_id: Optional[str] = None) -> Optional[Shard]:
+    """This worker's shard of the current layout. None when it is not in the
+    live set (heartbeat not yet written) — the caller then skips the run."""
+    worker_id = worker_id or WORKER_ID
+    workers = await live_workers(redis)
+    if worker_id not in workers:
+        return None
+    return Shard(workers.index(worker_id), len(workers))
+
+
+def use_shard(shard: Optional[Shard]) -> contextvars.Token:
+    return _current_shard.set(shard)
+
+
+def reset_shard(token: contextvars.Token) -> None:
+    _current_shard.reset(token)
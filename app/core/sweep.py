@@ -0,0 +1,201 @@
+"""Paginated, checkpointed sweeps over a Mongo collection.
+
+The monitor sweeps used to ``find(query).to_list(DB_QUERY_LIMIT)`` — at most
+100 full documents materialized at once, with anything beyond silently left
+for the next tick. ``run_sweep`` instead streams every matching document in
+``_id`` order, a page at a time and with a projection, and runs the per-item
+handler through :func:`app.core.fanout.bounded_fanout`.
+
+Keyset paging on ``_id`` (not ``skip``) is what makes it safe for handlers to
+move documents out of the query while the sweep is running. After each page the
+last ``_id`` is checkpointed in Redis (``sweep:{name}:checkpoint``); a sweep that
+runs out of its time budget — kept under the scheduler lock TTL — stops between
+pages and the next run resumes from the checkpoint instead of starting over. A
+completed pass deletes it.
+
+Each run's :class:`SweepResult` is logged and stored at ``sweep:{name}:last_run``.
+Redis is best-effort throughout: without it a sweep simply cannot resume.
+
+Inside a sharded scheduler job (``app/core/sharding.py``) the shard predicate
+is part of the query, so each replica pages through only its own share of the
+matches (documents predating ``shard_key`` are filtered in Python); checkpoint
+and metrics are kept per shard layout (``{name}@1of3``), so a rebalance starts
+the new shards from scratch.
+"""
+
+import json
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional
+
+from bson import ObjectId
+
+from app.core import sharding
+from app.core.constants import SWEEP_CHECKPOINT_KEY, SWEEP_METRICS_KEY, WorkerConstants
+from app.core.fanout import bounded_fanout
+from app.core.logger import logger
+from app.core.redis_client import get_redis_client
+
+
+@dataclass
+class SweepResult:
+    processed: int = 0
+    failed: int = 0
+    pages: int = 0
+    resumed: bool = False
+    completed: bool = True
+    duration_seconds: float = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "processed": self.processed,
+            "failed": self.failed,
+            "pages": self.pages,
+            "resumed": self.resumed,
+            "completed": self.completed,
+            "duration_seconds": round(self.duration_seconds, 3),
+        }
+
+
+async def _load_checkpoint(name: str) -> Optional[ObjectId]:
+    try:
+        redis = await get_redis_client()
+        raw = await redis.get(SWEEP_CHECKPOINT_KEY.format(name=name))
+        return ObjectId(raw) if raw else None
+    except Exception as e:
+        logger.warning(f"[Sweep:{name}] checkpoint read failed, starting over: {e}")
+        return None
+
+
+async def _save_checkpoint(name: str, last_id: Optional[ObjectId]) -> None:
+    try:
+        redis = await get_redis_client()
+        key = SWEEP_CHECKPOINT_KEY.format(name=name)
+        if last_id is None:
+            await redis.delete(key)
+        else:
+            await redis.set(
+                key, str(last_id), ex=WorkerConstants.SWEEP_CHECKPOINT_TTL_SECONDS
+            )
+    except Exception as e:
+        logger.warning(f"[Sweep:{name}] checkpoint write failed: {e}")
+
+
+async def _store_metrics(name: str, result: SweepResult) -> None:
+    try:
+        redis = await get_redis_client()
+        payload = {**result.as_dict(), "ran_at": datetime.now(timezone.utc).isoformat()}
+        await redis.set(
+            SWEEP_METRICS_KEY.format(name=name),
+            json.dumps(payload),
+            ex=WorkerConstants.SWEEP_METRICS_TTL_SECONDS,
+        )
+    except Exception as e:
+        logger.warning(f"[Sweep:{name}] metrics write failed: {e}")
+
+
+async def run_sweep(
+    name: str,
+    collection,
+    query: dict,
+    handler: Callable[[dict], Awaitable[object]],
+    *,
+    projection: Optional[dict] = None,
+    page_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    time_budget_seconds: Optional[float] = None,
+    per_page: bool = False,
+) -> SweepResult:
+    """Run ``handler`` over every document matching ``query``.
+
+    ``projection`` of None reads whole documents (for handlers that pass the
+    lead on to code needing arbitrary fields). A handler exception is logged and
+    counted in ``failed`` — it never aborts the sweep. Query errors propagate,
+    as ``find().to_list()`` did.
+
+    ``per_page=True`` calls ``handler`` once per page with the list of
+    documents instead — for handlers that batch their writes (e.g.
+    ``set_lead_statuses_bulk``). It may return how many of them failed; if it
+    raises, the whole page counts as failed.
+    """
+    page_size = page_size or WorkerConstants.SWEEP_PAGE_SIZE
+    concurrency = concurrency or WorkerConstants.SWEEP_CONCURRENCY
+    budget = time_budget_seconds or WorkerConstants.SWEEP_TIME_BUDGET_SECONDS
+    result = SweepResult()
+    started = time.monotonic()
+
+    shard = sharding.current_shard()
+    if shard is not None:
+        name = f"{name}@{shard}"
+    in_shard = sharding.shard_filter(shard)
+    if in_shard is not None:
+        query = {"$and": [query, in_shard]}
+        if projection is not None:
+            projection = {**projection, "shard_key": 1}
+
+    async def guarded(doc: dict) -> None:
+        # Caught here rather than in bounded_fanout so the log names the document.
+        try:
+            await handler(doc)
+        except Exception as e:
+            result.failed += 1
+            logger.error(f"❌ [Sweep:{name}] {doc.get('_id')} failed: {e}")
+
+    last_id = await _load_checkpoint(name)
+    result.resumed = last_id is not None
+    if last_id is not None:
+        logger.info(f"[Sweep:{name}] resuming after {last_id}")
+
+    while True:
+        page_query = dict(query)
+        if last_id is not None:
+            page_query = {"$and": [query, {"_id": {"$gt": last_id}}]}
+        cursor = collection.find(page_query, projection).sort("_id", 1).limit(page_size)
+        page = [doc async for doc in cursor]
+        if not page:
+            break
+
+        owned = [
+            doc
+            for doc in page
+            if "shard_key" in doc or sharding.owns(doc["_id"], shard)
+        ]
+        if per_page:
+            if owned:
+                try:
+                    result.failed += await handler(owned) or 0
+                except Exception as e:
+                    result.failed += len(owned)
+                    logger.error(f"❌ [Sweep:{name}] page after {last_id} failed: {e}")
+        else:
+            await bounded_fanout(
+                owned, guarded, concurrency=concurrency, label=f"Sweep:{name}"
+            )
+        result.pages += 1
+        result.processed += len(owned)
+        last_id = page[-1]["_id"]
+
+        if len(page) < page_size:
+            break
+        if time.monotonic() - started >= budget:
+            result.completed = False
+            break
+        await _save_checkpoint(name, last_id)
+
+    if result.completed:
+        await _save_checkpoint(name, None)
+    else:
+        await _save_checkpoint(name, last_id)
+        logger.warning(
+            f"[Sweep:{name}] time budget ({budget:.0f}s) spent after "
+            f"{result.processed} item(s) — resuming from {last_id} next run."
+        )
+
+    result.duration_seconds = time.monotonic() - started
+    logger.info(
+        f"[Sweep:{name}] processed={result.processed} failed={result.failed} "
+        f"pages={result.pages} in {result.duration_seconds:.2f}s"
+    )
+    await _store_metrics(name, result)
+    return result
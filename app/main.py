@@ -8,10 +8,13 @@ from app.core.config import settings
 from app.core.constants import APIStatus
 from contextlib import asynccontextmanager
 from app.api.routes import webhook, meta_webhook, health, privacy
+from app.core.background import BackgroundTasks
 from app.core.redis_client import close_redis_client, get_redis_client
 from app.core.http_client import close_http_client as _close_shared_http_client
 from app.core.database import client as mongo_client
 from app.core.logger import logger, page_critical
+from app.providers.whatsapp.delivery import DeliveryWriter
+from app.services.message_log_service import MessageLogWriter
 from app.core.sentry import init_sentry, sentry_active
 from scripts.create_indexes import create_all_indexes
 
@@ -72,6 +75,9 @@ async def lifespan(app: FastAPI):
     yield
 
     # ---- Shutdown ----
+    await BackgroundTasks.drain()
+    await DeliveryWriter.close()
+    await MessageLogWriter.close()
     await close_redis_client()
     await _close_shared_http_client()
     logger.info("API shut down cleanly.")
@@ -14,7 +14,14 @@ from app.providers.whatsapp.cloud_api import (
     TemplateNotRegisteredError,
 )
 from app.providers.whatsapp.dry_run import DryRunProvider
-from app.providers.whatsapp.facade import WhatsAppFacade, record_account_state
+from app.providers.whatsapp.facade import (
+    BREAKER_CHANNEL,
+    WhatsAppFacade,
+    announce_breaker_change,
+    invalidate_breaker_cache,
+    record_account_state,
+    set_kill_switch,
+)
 
 _PROVIDERS: dict[str, type[WhatsAppProvider]] = {
     DryRunProvider.name: DryRunProvider,
@@ -74,6 +81,7 @@ def reset_whatsapp() -> None:
 
 
 __all__ = [
+    "BREAKER_CHANNEL",
     "CloudAPIProvider",
     "DryRunProvider",
     "NormalizedMessage",
@@ -81,8 +89,11 @@ __all__ = [
     "TemplateNotRegisteredError",
     "WhatsAppFacade",
     "WhatsAppProvider",
+    "announce_breaker_change",
     "build_provider",
     "get_whatsapp",
+    "invalidate_breaker_cache",
     "record_account_state",
     "reset_whatsapp",
+    "set_kill_switch",
 ]
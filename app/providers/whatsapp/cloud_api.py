@@ -24,12 +24,14 @@ intact for the API process even when it runs with ``WHATSAPP_PROVIDER=dryrun``
 """
 
 import mimetypes
-from typing import Any
+import tempfile
+from typing import IO, Any
 from urllib.parse import urlparse
 
 from app.core.config import settings
-from app.core.constants import WorkerConstants
-from app.core.http_client import get_http_client
+from app.core.concurrency import note_throttled
+from app.core.constants import META_THROTTLE_CODES, WorkerConstants
+from app.core.http_client import GRAPH, META_MEDIA, get_http_client
 from app.core.logger import logger, page_critical
 from app.core.phone import mask_chat_id as _mask
 from app.core.phone import strip_suffix, to_chat_id
@@ -141,7 +143,7 @@ class CloudAPIProvider(WhatsAppProvider):
             "to": strip_suffix(chat_id),
             **payload,
         }
-        client = await get_http_client()
+        client = await get_http_client(GRAPH)
         response = await client.post(
             self._messages_url(), json=body, headers=self._auth_headers()
         )
@@ -156,6 +158,8 @@ class CloudAPIProvider(WhatsAppProvider):
                 f"HTTP {response.status_code}, "
                 f"code={error.get('code')}, title={error.get('message')!r}"
             )
+            if response.status_code == 429 or error.get("code") in META_THROTTLE_CODES:
+                note_throttled("graph")
             response.raise_for_status()
 
         data = response.json()
@@ -412,7 +416,7 @@ class CloudAPIProvider(WhatsAppProvider):
         if settings.META_ACCESS_TOKEN is None or not settings.META_PHONE_NUMBER_ID:
             return None
         try:
-            client = await get_http_client()
+            client = await get_http_client(GRAPH)
             response = await client.get(
                 f"{_GRAPH_ROOT}/{settings.META_GRAPH_API_VERSION}"
                 f"/{settings.META_PHONE_NUMBER_ID}",
@@ -575,21 +579,28 @@ def parse_status_events(payload: Any) -> list[dict[str, Any]]:
     return events
 
 
-async def fetch_meta_media(media_id: str) -> tuple[bytes | None, str | None]:
-    """Resolve a Meta media id to ``(bytes, mime_type)``.
+async def spool_meta_media(media_id: str) -> tuple[IO[bytes] | None, str | None]:
+    """Resolve a Meta media id to ``(file, mime_type)``, the file rewound and
+    owned by the caller (who must close it).
 
     Two authorized hops: ``GET /{media_id}`` returns a short-lived CDN URL,
     which must itself be fetched with the Bearer token. Called by the worker
     (``arq_worker``) to re-host inbound media on Cloudinary — the CDN URL
     expires in minutes, so it must never be stored or forwarded.
+
+    The body is streamed into a spooled temporary file: the first
+    MEDIA_SPOOL_MEMORY_BYTES stay in memory, the rest goes to disk, and the
+    download is aborted as soon as it passes MAX_INBOUND_MEDIA_BYTES — a
+    burst of videos never holds whole bodies in worker memory.
     """
     token = settings.META_ACCESS_TOKEN
     if token is None:
         logger.warning("Cannot fetch Meta media: META_ACCESS_TOKEN not configured.")
         return None, None
     headers = {"Authorization": "Bearer " + token.get_secret_value()}
+    spool = None
     try:
-        client = await get_http_client()
+        client = await get_http_client(GRAPH)
         lookup = await client.get(
             f"{_GRAPH_ROOT}/{settings.META_GRAPH_API_VERSION}/{media_id}",
             headers=headers,
@@ -612,8 +623,8 @@ async def fetch_meta_media(media_id: str) -> tuple[bytes | None, str | None]:
             # TypeError into the catch-all and silently drop ALL media.
             size = int(info.get("file_size") or 0)
         except (TypeError, ValueError):
-            size = 0  # unparseable → let the download proceed; the post-
-            # download check below is what makes the cap real anyway
+            size = 0  # unparseable → let the download proceed; the streamed
+            # byte count below is what makes the cap real anyway
         if size > WorkerConstants.MAX_INBOUND_MEDIA_BYTES:
             # Meta allows up to 100MB; buffering that through the worker and
             # Cloudinary serves nobody. Checked before the second hop so the
@@ -623,20 +634,33 @@ async def fetch_meta_media(media_id: str) -> tuple[bytes | None, str | None]:
                 f"{WorkerConstants.MAX_INBOUND_MEDIA_BYTES} cap; not fetched."
             )
             return None, None
-        download = await client.get(url, headers=headers)
-        download.raise_for_status()
-        if len(download.content) > WorkerConstants.MAX_INBOUND_MEDIA_BYTES:
-            # file_size can be absent or lie; the cap is enforced on what
-            # actually arrived, not on what the lookup claimed.
-            logger.warning(
-                f"Meta media {media_id} downloaded {len(download.content)} "
-                f"bytes — over the {WorkerConstants.MAX_INBOUND_MEDIA_BYTES} "
-                "cap; discarded."
-            )
-            return None, None
-        return download.content, mime or download.headers.get(
-            "Content-Type", mimetypes.guess_type(url)[0]
+        # The bytes come from Meta's CDN on their own pool, so a slow
+        # download never holds a connection a Graph send is waiting for.
+        media_client = await get_http_client(META_MEDIA)
+        spool = tempfile.SpooledTemporaryFile(
+            max_size=WorkerConstants.MEDIA_SPOOL_MEMORY_BYTES
         )
+        received = 0
+        async with media_client.stream("GET", url, headers=headers) as download:
+            download.raise_for_status()
+            async for chunk in download.aiter_bytes():
+                received += len(chunk)
+                if received > WorkerConstants.MAX_INBOUND_MEDIA_BYTES:
+                    # file_size can be absent or lie; the cap is enforced on
+                    # what actually arrives, and the rest is never read.
+                    logger.warning(
+                        f"Meta media {media_id} passed the "
+                        f"{WorkerConstants.MAX_INBOUND_MEDIA_BYTES}-byte cap "
+                        "mid-download; aborted."
+                    )
+                    spool.close()
+                    return None, None
+                spool.write(chunk)
+            content_type = download.headers.get("Content-Type")
+        spool.seek(0)
+        return spool, mime or content_type or mimetypes.guess_type(url)[0]
     except Exception as e:
         logger.error(f"Failed to fetch Meta media {media_id}: {e}")
+        if spool is not None:
+            spool.close()
         return None, None
@@ -13,17 +13,131 @@ error 131047 (send rejected because the 24h service window was closed) —
 drives the template-retry path: an approved fallback template is re-sent
 through the facade, and when none is registered the operator is paged. Either
 way the failure is never silent, which is the acceptance criterion.
+
+With ``DELIVERY_WRITE_BEHIND_ENABLED`` these writes leave the send and webhook
+paths: :class:`DeliveryWriter` buffers them and flushes in batches.
 """
 
+import asyncio
 from datetime import datetime, timezone
 from typing import Any
 
-from app.core.constants import META_ERROR_WINDOW_CLOSED
+from pymongo import UpdateOne
+
+from app.core.background import BackgroundTasks
+from app.core.config import settings
+from app.core.constants import META_ERROR_WINDOW_CLOSED, WorkerConstants
 from app.core.database import wa_delivery_collection
 from app.core.logger import logger, page_critical
 from app.core.phone import mask_chat_id as _mask
 from app.providers.whatsapp import template_registry
 
+# A pending write: the fields to $set and to $setOnInsert for one wamid.
+_Write = tuple[dict[str, Any], dict[str, Any]]
+
+
+def _upsert(write: _Write) -> dict[str, Any]:
+    to_set, on_insert = write
+    # A status written in the same op wins over the "accepted" default.
+    on_insert = {k: v for k, v in on_insert.items() if k not in to_set}
+    return {"$set": to_set, "$setOnInsert": on_insert}
+
+
+class DeliveryWriter:
+    """Write-behind buffer for ``wa_delivery`` (DELIVERY_WRITE_BEHIND_ENABLED).
+
+    Writes for the same wamid coalesce in arrival order — the outbound record
+    and its ``sent``/``delivered`` callbacks become one upsert — and the buffer
+    is flushed as one unordered ``bulk_write`` DELIVERY_FLUSH_INTERVAL_SECONDS
+    after its first write, or as soon as it holds DELIVERY_FLUSH_MAX_ITEMS.
+    A failed flush puts its writes back under any newer ones, up to
+    DELIVERY_BUFFER_MAX_ITEMS.
+    """
+
+    _pending: dict[str, _Write] = {}
+    _timer: asyncio.Task | None = None
+
+    @classmethod
+    def add(cls, wa_message_id: str, write: _Write) -> None:
+        cls._merge({wa_message_id: write}, newer=True)
+        if len(cls._pending) >= WorkerConstants.DELIVERY_FLUSH_MAX_ITEMS:
+            BackgroundTasks.spawn(cls._flush_logged(), "wa_delivery_flush", key="wa_delivery_flush")
+        elif cls._timer is None or cls._timer.done():
+            cls._timer = BackgroundTasks.spawn(cls._flush_later(), "wa_delivery_flush_timer")
+
+    @classmethod
+    def _merge(cls, writes: dict[str, _Write], newer: bool) -> None:
+        for wa_message_id, (to_set, on_insert) in writes.items():
+            held = cls._pending.get(wa_message_id)
+            if held is None:
+                if len(cls._pending) >= WorkerConstants.DELIVERY_BUFFER_MAX_ITEMS:
+                    logger.error(
+                        f"wa_delivery buffer full — dropping the write for wamid {wa_message_id}"
+                    )
+                    continue
+                cls._pending[wa_message_id] = (dict(to_set), dict(on_insert))
+            elif newer:
+                held[0].update(to_set)
+                cls._pending[wa_message_id] = (held[0], {**on_insert, **held[1]})
+            else:
+                cls._pending[wa_message_id] = ({**to_set, **held[0]}, {**held[1], **on_insert})
+
+    @classmethod
+    async def flush(cls) -> int:
+        """Write everything buffered now. Raises on a Mongo error, after
+        putting the writes back for the next flush."""
+        pending, cls._pending = cls._pending, {}
+        if not pending:
+            return 0
+        ops = [
+            UpdateOne({"wa_message_id": wamid}, _upsert(write), upsert=True)
+            for wamid, write in pending.items()
+        ]
+        try:
+            await wa_delivery_collection.bulk_write(ops, ordered=False)
+        except Exception:
+            cls._merge(pending, newer=False)
+            raise
+        return len(ops)
+
+    @classmethod
+    async def _flush_logged(cls) -> None:
+        try:
+            await cls.flush()
+        except Exception as e:
+            logger.warning(f"wa_delivery flush failed, retrying with the next batch: {e}")
+
+    @classmethod
+    async def _flush_later(cls) -> None:
+        await asyncio.sleep(WorkerConstants.DELIVERY_FLUSH_INTERVAL_SECONDS)
+        await cls._flush_logged()
+
+    @classmethod
+    async def close(cls) -> None:
+        """Flush what is left on shutdown. Never raises."""
+        if cls._timer is not None and not cls._timer.done():
+            cls._timer.cancel()
+        cls._timer = None
+        await cls._flush_logged()
+
+    @classmethod
+    def reset(cls) -> None:
+        """Drop the buffer unwritten (tests)."""
+        timer = cls._timer
+        if timer is not None and not timer.done() and not timer.get_loop().is_closed():
+            timer.cancel()
+        cls._timer = None
+        cls._pending = {}
+
+
+async def _write(wa_message_id: str, write: _Write) -> None:
+    if settings.DELIVERY_WRITE_BEHIND_ENABLED:
+        DeliveryWriter.add(wa_message_id, write)
+        return
+    await wa_delivery_collection.update_one(
+        {"wa_message_id": wa_message_id}, _upsert(write), upsert=True
+    )
+
 
 async def record_outbound(wa_message_id: str, chat_id: str, kind: str) -> None:
     """Remember an accepted send so its status callbacks can be attributed.
@@ -32,31 +146,20 @@ async def record_outbound(wa_message_id: str, chat_id: str, kind: str) -> None:
     send was wamid X, to whom", which is all the retry path needs.
     """
     now = datetime.now(timezone.utc)
-    await wa_delivery_collection.update_one(
-        {"wa_message_id": wa_message_id},
-        {
-            "$set": {"chat_id": chat_id, "kind": kind, "updated_at": now},
-            "$setOnInsert": {"status": "accepted", "created_at": now},
-        },
-        upsert=True,
+    await _write(
+        wa_message_id,
+        (
+            {"chat_id": chat_id, "kind": kind, "updated_at": now},
+            {"status": "accepted", "created_at": now},
+        ),
     )
 
 
-async def apply_status_event(event: dict[str, Any]) -> None:
-    """Persist one ``statuses`` webhook event; drive the 131047 retry path.
-
-    Upserts rather than updates: a status can arrive for a wamid this process
-    never recorded (worker restart, record_outbound failure), and a delivery
-    fact should not be dropped because the bookkeeping row is missing.
-    """
-    wa_message_id = event.get("wa_message_id")
-    status = event.get("status")
-    if not wa_message_id or not status:
-        return
-
-    now = datetime.now(timezone.utc)
+def _status_write(event: dict[str, Any], now: datetime) -> _Write | None:
+    if not event.get("wa_message_id") or not event.get("status"):
+        return None
     update: dict[str, Any] = {
-        "status": status,
+        "status": event["status"],
         "status_timestamp": event.get("timestamp"),
         "updated_at": now,
     }
@@ -65,16 +168,61 @@ async def apply_status_event(event: dict[str, Any]) -> None:
         update["error_title"] = event.get("error_title")
     if event.get("chat_id"):
         update["chat_id"] = event.get("chat_id")
+    return update, {"created_at": now}
 
-    await wa_delivery_collection.update_one(
-        {"wa_message_id": wa_message_id},
-        {"$set": update, "$setOnInsert": {"created_at": now}},
-        upsert=True,
-    )
 
-    if status != "failed":
+async def apply_status_events(events: list[dict[str, Any]]) -> None:
+    """Persist a webhook envelope's ``statuses`` events in one write; drive
+    the 131047 retry path for each ``failed`` one.
+
+    Upserts rather than updates: a status can arrive for a wamid this process
+    never recorded (worker restart, record_outbound failure), and a delivery
+    fact should not be dropped because the bookkeeping row is missing.
+    Events for one wamid (``sent`` and ``delivered`` in the same envelope)
+    coalesce into one upsert, applied in arrival order.
+    """
+    now = datetime.now(timezone.utc)
+    writes: dict[str, _Write] = {}
+    failed = []
+    for event in events:
+        write = _status_write(event, now)
+        if write is None:
+            continue
+        held = writes.setdefault(event["wa_message_id"], ({}, {}))
+        held[0].update(write[0])
+        held[1].update(write[1])
+        if event["status"] == "failed":
+            failed.append(event)
+    if not writes:
         return
 
+    if settings.DELIVERY_WRITE_BEHIND_ENABLED:
+        for wa_message_id, write in writes.items():
+            DeliveryWriter.add(wa_message_id, write)
+        if failed:
+            # The retry path reads the record back (kind, chat_id): write it
+            # now rather than after the flush interval.
+            await DeliveryWriter.flush()
+    else:
+        await wa_delivery_collection.bulk_write(
+            [
+                UpdateOne({"wa_message_id": wamid}, _upsert(write), upsert=True)
+                for wamid, write in writes.items()
+            ],
+            ordered=False,
+        )
+
+    for event in failed:
+        await _handle_failed(event)
+
+
+async def apply_status_event(event: dict[str, Any]) -> None:
+    """Persist one ``statuses`` webhook event (see apply_status_events)."""
+    await apply_status_events([event])
+
+
+async def _handle_failed(event: dict[str, Any]) -> None:
+    wa_message_id = event["wa_message_id"]
     record = await wa_delivery_collection.find_one({"wa_message_id": wa_message_id})
     chat_id = (record or {}).get("chat_id") or event.get("chat_id") or ""
     error_code = event.get("error_code")
@@ -16,12 +16,14 @@ Method names match the client this replaces so the ~177 existing call sites and
 their test doubles keep working unchanged.
 """
 
+import time
 import urllib.parse
 from typing import Any
 
 from app.core.constants import WorkerConstants
 from app.core.logger import logger
 from app.core.redis_client import get_redis_client
+from app.providers.whatsapp import outbox
 from app.providers.whatsapp.base import NormalizedMessage, WhatsAppProvider
 
 # PRO-71: presence of EITHER key halts all outbound.
@@ -38,11 +40,64 @@ _PAUSE_MANUAL_KEY = "wa:instance:paused:manual"
 # which are states in which we must NOT send.
 _STATE_KEY = "wa:instance:state"
 
+# Announces a write to any of the three keys above; subscribed processes drop
+# their breaker snapshot (see ``_outbound_blocked_reason``).
+BREAKER_CHANNEL = "wa:breaker:changed"
+
+# Process-wide snapshot of the breaker: (monotonic expiry, blocked reason or
+# None). Shared by every facade — they all guard the same number.
+_breaker_snapshot: tuple[float, str | None] | None = None
+# Bumped by every invalidation, so a Redis read that raced one is not cached.
+_breaker_generation = 0
+
+
+def invalidate_breaker_cache(_payload: str | None = None) -> None:
+    """Drop the breaker snapshot; the next guarded send re-reads Redis."""
+    global _breaker_snapshot, _breaker_generation
+    _breaker_generation += 1
+    _breaker_snapshot = None
+
+
+async def announce_breaker_change() -> None:
+    """Tell every subscribed process that a breaker key changed. Best-effort:
+    an unannounced change still lands within WA_BREAKER_CACHE_SECONDS."""
+    invalidate_breaker_cache()
+    try:
+        redis = await get_redis_client()
+        await redis.publish(BREAKER_CHANNEL, "1")
+    except Exception as e:
+        logger.warning(f"Could not announce breaker change: {e}")
+
+
+async def set_kill_switch(engaged: bool, reason: str = "1") -> None:
+    """Set or clear the operator kill switch (``wa:instance:paused:manual``)
+    and announce it, so every worker halts or resumes on its next send."""
+    redis = await get_redis_client()
+    if engaged:
+        await redis.set(_PAUSE_MANUAL_KEY, reason)
+    else:
+        await redis.delete(_PAUSE_MANUAL_KEY)
+    await announce_breaker_change()
+
 
 def _as_text(value: Any) -> str:
     return value.decode() if isinstance(value, bytes) else str(value)
 
 
+def _blocked_reason(paused: int, state: Any) -> str | None:
+    if paused:
+        return "circuit breaker engaged (instance paused)"
+    if state is None:
+        return (
+            "account state unconfirmed — no successful probe on record "
+            "(worker boot window or monitor not running)"
+        )
+    state_text = _as_text(state)
+    if state_text != "authorized":
+        return f"account state={state_text}"
+    return None
+
+
 class WhatsAppFacade:
     """The chokepoint. Holds a provider; nothing else may hold one."""
 
@@ -71,26 +126,38 @@ class WhatsAppFacade:
             # Cannot reach a handset — there is no number to protect.
             return None
 
+        # The verdict is cached for WA_BREAKER_CACHE_SECONDS so a fan-out does
+        # not pay a Redis round trip per message; writers announce on
+        # BREAKER_CHANNEL and the worker's listener drops it immediately.
+        global _breaker_snapshot
+        now = time.monotonic()
+        snapshot = _breaker_snapshot
+        if snapshot is not None and now < snapshot[0]:
+            return snapshot[1]
+
+        generation = _breaker_generation
         try:
             redis = await get_redis_client()
-            if await redis.exists(_PAUSE_KEY, _PAUSE_MANUAL_KEY):
-                return "circuit breaker engaged (instance paused)"
-            state = await redis.get(_STATE_KEY)
+            pipe = redis.pipeline(transaction=False)
+            pipe.exists(_PAUSE_KEY, _PAUSE_MANUAL_KEY)
+            pipe.get(_STATE_KEY)
+            pipe.pttl(_STATE_KEY)
+            paused, state, state_ttl_ms = await pipe.execute()
         except Exception as e:
+            # Not cached: the next send retries Redis.
             logger.warning(
                 f"Outbound pause check failed — sending anyway (fail-open): {e}"
             )
             return None
 
-        if state is None:
-            return (
-                "account state unconfirmed — no successful probe on record "
-                "(worker boot window or monitor not running)"
-            )
-        state_text = _as_text(state)
-        if state_text != "authorized":
-            return f"account state={state_text}"
-        return None
+        reason = _blocked_reason(paused, state)
+        fresh_for = WorkerConstants.WA_BREAKER_CACHE_SECONDS
+        if reason is None and state_ttl_ms and state_ttl_ms > 0:
+            # PRO-82: never serve a confirmation past its own expiry.
+            fresh_for = min(fresh_for, state_ttl_ms / 1000)
+        if generation == _breaker_generation:
+            _breaker_snapshot = (now + fresh_for, reason)
+        return reason
 
     async def _guard(self, what: str, chat_id: str) -> bool:
         """True when the send may proceed; logs and returns False otherwise."""
@@ -103,6 +170,13 @@ class WhatsAppFacade:
         )
         return False
 
+    async def _enqueue(self, method: str, chat_id: str, *args: Any) -> dict | None:
+        """Queue the send when inside ``outbox.queued_sends()``; None means
+        send it now. See app/providers/whatsapp/outbox.py."""
+        if not outbox.should_queue(self._provider):
+            return None
+        return await outbox.enqueue(method, chat_id, *args)
+
     # ------------------------------------------------------------------
     # Outbound — legacy names, unchanged signatures
     # ------------------------------------------------------------------
@@ -110,6 +184,8 @@ class WhatsAppFacade:
     async def send_message(self, chat_id: str, text: str):
         if not await self._guard("message", chat_id):
             return None
+        if queued := await self._enqueue("send_message", chat_id, text):
+            return queued
         try:
             result = await self._provider.send_text(chat_id, text)
             logger.info(f"Message sent to ...{chat_id[-4:]}")
@@ -127,6 +203,8 @@ class WhatsAppFacade:
     ):
         if not await self._guard("file", chat_id):
             return None
+        if queued := await self._enqueue("send_file_by_url", chat_id, url, caption, file_name):
+            return queued
         try:
             result = await self._provider.send_file(chat_id, url, caption, file_name)
             logger.info(f"File sent to ...{chat_id[-4:]}")
@@ -171,11 +249,15 @@ class WhatsAppFacade:
     ):
         if not await self._guard(f"template {template_name}", chat_id):
             return None
+        if queued := await self._enqueue("send_template", chat_id, template_name, params):
+            return queued
         return await self._provider.send_template(chat_id, template_name, params)
 
     async def send_interactive(self, chat_id: str, body: str, options: list[str]):
         if not await self._guard("interactive message", chat_id):
             return None
+        if queued := await self._enqueue("send_interactive", chat_id, body, options):
+            return queued
         return await self._provider.send_interactive(chat_id, body, options)
 
     # ------------------------------------------------------------------
@@ -239,9 +321,11 @@ async def record_account_state(state: str | None, *, transmits: bool = True) ->
         redis = await get_redis_client()
         if state != "authorized":
             await redis.delete(_STATE_KEY)
-            return
-        await redis.set(
-            _STATE_KEY, state, ex=WorkerConstants.WA_STATE_CONFIRM_TTL_SECONDS
-        )
+        else:
+            await redis.set(
+                _STATE_KEY, state, ex=WorkerConstants.WA_STATE_CONFIRM_TTL_SECONDS
+            )
     except Exception as e:
         logger.warning(f"Could not record account state: {e}")
+        return
+    await announce_breaker_change()
@@ -0,0 +1,274 @@
+"""Outbound send queue — rate-shaped, per-recipient-ordered dispatch.
+
+Sends made inside :func:`queued_sends` (the scheduled fan-outs: daily agenda,
+nudgers) are not transmitted by the caller. With
+``settings.OUTBOUND_QUEUE_ENABLED`` and a transmitting provider, the facade
+hands them to :func:`enqueue` and returns at once; :class:`OutboxWorker`, run
+by the ARQ worker, sends them. Everything else — conversational replies, the
+admin panel — stays a direct send: a reply the user is waiting for must not
+sit behind a 500-message agenda.
+
+Layout
+------
+* ``wa:outbox:{chat_id}`` — a list of queued sends for one recipient, oldest
+  first. A text longer than one Cloud API body is split into its chunks at
+  enqueue time, so a retried chunk never re-sends the ones before it. Whether
+  it goes out as text at all is decided once, before splitting: with the
+  recipient's service window closed it is queued whole, and the provider
+  re-routes it to one fallback template rather than one per chunk.
+* ``wa:outbox:ready`` — recipients with queued sends, scored by when their
+  head message is next due (now, or a retry's backoff).
+* ``wa:outbox:lease:{chat_id}`` — held by the drain loop serving a recipient.
+  One holder per recipient across every worker process is what keeps a
+  recipient's messages in order; different recipients drain concurrently.
+* ``wa:send:bucket`` — a global token bucket refilled at
+  ``WHATSAPP_MESSAGES_PER_SECOND``. Every queued send takes a token first.
+
+A failed send is retried with exponential backoff when Meta throttled or
+failed transiently (429, 5xx, transport errors, throttling error codes); the
+recipient's later messages wait behind it. Anything else — or a message out of
+attempts — is logged, kept on ``wa:outbox:dead`` and dropped, so one bad
+message cannot wedge its recipient. The breaker still applies: the queued send
+goes through the facade, which checks it at send time.
+
+Failure policy: a Redis error on enqueue falls back to a direct send.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import json
+import random
+import time
+import uuid
+from typing import Any, Iterator, Optional
+
+import httpx
+from redis.exceptions import WatchError
+
+from app.core.config import settings
+from app.core.constants import (
+    META_THROTTLE_CODES,
+    WA_OUTBOX_DEAD_KEY,
+    WA_OUTBOX_KEY,
+    WA_OUTBOX_LEASE_KEY,
+    WA_OUTBOX_READY_KEY,
+    WA_SEND_BUCKET_KEY,
+    WorkerConstants,
+)
+from app.core.logger import logger
+from app.core.phone import mask_chat_id as _mask
+from app.core.redis_client import get_redis_client
+from app.providers.whatsapp.cloud_api import _split_text
+from app.providers.whatsapp.window import is_service_window_open
+
+
+# Facade methods a queued send may name.
+_QUEUEABLE = {"send_message", "send_file_by_url", "send_template", "send_interactive"}
+
+_queueing: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "outbox_queueing", default=False
+)
+
+
+@contextlib.contextmanager
+def queued_sends() -> Iterator[None]:
+    """Queue the facade sends made in this block (and the tasks it starts)."""
+    token = _queueing.set(True)
+    try:
+        yield
+    finally:
+        _queueing.reset(token)
+
+
+def enabled() -> bool:
+    return settings.OUTBOUND_QUEUE_ENABLED
+
+
+def should_queue(provider) -> bool:
+    """Whether a facade send over ``provider`` goes to the queue. A provider
+    that cannot reach a handset has no rate limit to respect."""
+    return _queueing.get() and enabled() and provider.transmits
+
+
+async def _jobs_for(method: str, chat_id: str, args: list) -> list[dict]:
+    parts = [args]
+    if method == "send_message":
+        text, *rest = args
+        chunks = _split_text(text)
+        # Each queued chunk is its own send: split only a text that will go
+        # out as text, or a closed window turns every chunk into a template.
+        if len(chunks) > 1 and await is_service_window_open(chat_id):
+            parts = [[chunk, *rest] for chunk in chunks]
+    return [
+        {"id": uuid.uuid4().hex, "method": method, "chat_id": chat_id, "args": part, "attempts": 0}
+        for part in parts
+    ]
+
+
+async def enqueue(method: str, chat_id: str, *args: Any) -> Optional[dict]:
+    """Queue one facade send. Returns ``{"queued": n}`` (chunks queued), or
+    None when Redis is unavailable — the caller then sends directly."""
+    if method not in _QUEUEABLE:
+        raise ValueError(f"{method!r} cannot be queued")
+    jobs = await _jobs_for(method, chat_id, list(args))
+    try:
+        redis = await get_redis_client()
+        pipe = redis.pipeline(transaction=False)
+        pipe.rpush(WA_OUTBOX_KEY.format(chat_id=chat_id), *(json.dumps(j) for j in jobs))
+        # NX: never pull a recipient that is backing off forward.
+        pipe.zadd(WA_OUTBOX_READY_KEY, {chat_id: time.time()}, nx=True)
+        await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Outbox enqueue for {_mask(chat_id)} failed — sending directly: {e}")
+        return None
+    return {"queued": len(jobs)}
+
+
+async def take_send_token(redis, rate: Optional[float] = None) -> float:
+    """Take one token from the global send bucket. Returns 0 when taken, else
+    how many seconds until one is available. Burst = one second's worth."""
+    rate = rate or settings.WHATSAPP_MESSAGES_PER_SECOND
+    burst = max(1.0, rate)
+    async with redis.pipeline(transaction=True) as pipe:
+        while True:
+            try:
+                await pipe.watch(WA_SEND_BUCKET_KEY)
+                state = await pipe.hgetall(WA_SEND_BUCKET_KEY)
+                now = time.time()
+                tokens = float(state.get("tokens", burst))
+                elapsed = max(0.0, now - float(state.get("ts", now)))
+                tokens = min(burst, tokens + elapsed * rate)
+                if tokens < 1:
+                    await pipe.unwatch()
+                    return (1 - tokens) / rate
+                pipe.multi()
+                pipe.hset(WA_SEND_BUCKET_KEY, mapping={"tokens": tokens - 1, "ts": now})
+                pipe.expire(WA_SEND_BUCKET_KEY, 60)
+                await pipe.execute()
+                return 0.0
+            except WatchError:
+                continue
+
+
+def _is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, httpx.TransportError):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        code = exc.response.status_code
+        if code == 429 or code >= 500:
+            return True
+        try:
+            meta_code = exc.response.json().get("error", {}).get("code")
+        except Exception:
+            return False
+        return meta_code in META_THROTTLE_CODES
+    return False
+
+
+def _backoff(attempts: int) -> float:
+    base = WorkerConstants.OUTBOX_BACKOFF_BASE_SECONDS
+    delay = min(WorkerConstants.OUTBOX_BACKOFF_MAX_SECONDS, base * 2 ** (attempts - 1))
+    return delay + random.uniform(0, base)
+
+
+class OutboxWorker:
+    """Drains the outbox with OUTBOX_WORKERS concurrent loops. Started by the
+    ARQ worker when ``OUTBOUND_QUEUE_ENABLED``; ``stop()`` ends it between
+    messages."""
+
+    def __init__(self, facade=None):
+        self._facade = facade
+        self._stopping = False
+
+    def stop(self) -> None:
+        self._stopping = True
+
+    async def run(self) -> None:
+        logger.info(
+            f"📤 [Outbox] Draining with {WorkerConstants.OUTBOX_WORKERS} loops at "
+            f"{settings.WHATSAPP_MESSAGES_PER_SECOND} msg/s."
+        )
+        await asyncio.gather(
+            *(self._loop() for _ in range(WorkerConstants.OUTBOX_WORKERS))
+        )
+
+    async def _loop(self) -> None:
+        while not self._stopping:
+            try:
+                served = await self.drain_once()
+            except Exception as e:
+                logger.warning(f"[Outbox] drain failed: {e}")
+                served = False
+            if not served:
+                await asyncio.sleep(WorkerConstants.OUTBOX_IDLE_POLL_SECONDS)
+
+    async def drain_once(self) -> bool:
+        """Serve one due recipient whose lease is free. False when none is."""
+        redis = await get_redis_client()
+        due = await redis.zrangebyscore(
+            WA_OUTBOX_READY_KEY, "-inf", time.time(), start=0, num=WorkerConstants.OUTBOX_WORKERS * 2
+        )
+        for chat_id in due:
+            lease = WA_OUTBOX_LEASE_KEY.format(chat_id=chat_id)
+            if not await redis.set(lease, "1", nx=True, ex=WorkerConstants.OUTBOX_LEASE_SECONDS):
+                continue
+            try:
+                await self._serve(redis, chat_id, lease)
+            finally:
+                await redis.delete(lease)
+            return True
+        return False
+
+    async def _serve(self, redis, chat_id: str, lease: str) -> None:
+        queue = WA_OUTBOX_KEY.format(chat_id=chat_id)
+        for _ in range(WorkerConstants.OUTBOX_BATCH_PER_RECIPIENT):
+            if self._stopping:
+                return
+            raw = await redis.lindex(queue, 0)
+            if raw is None:
+                # Remove, then re-check: an enqueue racing this sees either the
+                # member still present (and our re-check finds its message) or
+                # it absent (and its own ZADD puts it back).
+                await redis.zrem(WA_OUTBOX_READY_KEY, chat_id)
+                if await redis.llen(queue):
+                    await redis.zadd(WA_OUTBOX_READY_KEY, {chat_id: time.time()})
+                return
+            job = json.loads(raw)
+            while (wait := await take_send_token(redis)) > 0:
+                await asyncio.sleep(wait)
+            await redis.expire(lease, WorkerConstants.OUTBOX_LEASE_SECONDS)
+            try:
+                await self._send(job)
+            except Exception as e:
+                job["attempts"] += 1
+                if _is_retryable(e) and job["attempts"] < WorkerConstants.OUTBOX_MAX_ATTEMPTS:
+                    delay = _backoff(job["attempts"])
+                    await redis.lset(queue, 0, json.dumps(job))
+                    await redis.zadd(WA_OUTBOX_READY_KEY, {chat_id: time.time() + delay})
+                    logger.warning(
+                        f"[Outbox] {job['method']} to {_mask(chat_id)} failed "
+                        f"(attempt {job['attempts']}), retrying in {delay:.0f}s: {e}"
+                    )
+                    return
+                logger.error(
+                    f"❌ [Outbox] {job['method']} to {_mask(chat_id)} dropped after "
+                    f"{job['attempts']} attempt(s): {e}"
+                )
+                pipe = redis.pipeline(transaction=False)
+                pipe.lpush(WA_OUTBOX_DEAD_KEY, json.dumps({**job, "error": str(e)[:300]}))
+                pipe.ltrim(WA_OUTBOX_DEAD_KEY, 0, WorkerConstants.OUTBOX_DEAD_LETTER_MAX - 1)
+                await pipe.execute()
+            await redis.lpop(queue)
+        # Batch spent with messages left: yield the recipient to the others.
+        await redis.zadd(WA_OUTBOX_READY_KEY, {chat_id: time.time()}, xx=True)
+
+    async def _send(self, job: dict) -> None:
+        facade = self._facade
+        if facade is None:
+            from app.providers.whatsapp import get_whatsapp
+
+            facade = get_whatsapp()
+        # The drain loops run outside queued_sends(), so this is a direct send
+        # through the facade — breaker included.
+        await getattr(facade, job["method"])(job["chat_id"], *job["args"])
@@ -6,9 +6,11 @@ pre-approved template goes through. The window is **per recipient, not per
 conversation** (see docs/WHATSAPP_TEMPLATE_CATALOG.md — it is the finding that
 shaped PRO-88), so the key is the chat_id and nothing else.
 
-``open_service_window`` is called by the Meta webhook route on every inbound
-message; key-present therefore means window-open by construction, and the TTL
-is Meta's 24h, not a tunable.
+The Meta webhook route opens the window on every inbound message — inside
+the ingestion gate (``SecurityService.stage_ingestion_gate``) for messages it
+processes, with ``stage_open_service_window`` for the rest; key-present
+therefore means window-open by construction, and the TTL is Meta's 24h, not a
+tunable.
 
 Both functions fail **open** on a Redis error, deliberately mirroring the
 facade's Redis-error posture (PRO-82): a monitoring/bookkeeping dependency
@@ -28,7 +30,7 @@ from app.core.redis_client import get_redis_client
 _WINDOW_KEY_PREFIX = "wa:window:"
 
 
-def _window_key(chat_id: str) -> str:
+def window_key(chat_id: str) -> str:
     return f"{_WINDOW_KEY_PREFIX}{chat_id}"
 
 
@@ -44,7 +46,7 @@ async def open_service_window(chat_id: str) -> None:
     try:
         redis = await get_redis_client()
         await redis.set(
-            _window_key(chat_id),
+            window_key(chat_id),
             datetime.now(timezone.utc).isoformat(),
             ex=WorkerConstants.SERVICE_WINDOW_TTL_SECONDS,
         )
@@ -52,6 +54,17 @@ async def open_service_window(chat_id: str) -> None:
         logger.warning(f"Could not record service window for ...{chat_id[-4:]}: {e}")
 
 
+def stage_open_service_window(pipe, chat_id: str) -> None:
+    """Queue :func:`open_service_window`'s write on a Redis pipeline, for a
+    caller opening many windows in one round trip. Errors surface on the
+    pipeline's ``execute``."""
+    pipe.set(
+        window_key(chat_id),
+        datetime.now(timezone.utc).isoformat(),
+        ex=WorkerConstants.SERVICE_WINDOW_TTL_SECONDS,
+    )
+
+
 async def is_service_window_open(chat_id: str) -> bool:
     """True when a free-form send to ``chat_id`` is deliverable.
 
@@ -60,7 +73,7 @@ async def is_service_window_open(chat_id: str) -> bool:
     """
     try:
         redis = await get_redis_client()
-        return bool(await redis.exists(_window_key(chat_id)))
+        return bool(await redis.exists(window_key(chat_id)))
     except Exception as e:
         logger.warning(
             f"Service-window check failed for ...{chat_id[-4:]} — "
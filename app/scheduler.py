@@ -1,7 +1,7 @@
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.cron import CronTrigger
-from app.core.database import users_collection, leads_collection, settings_collection
+from app.core.database import leads_collection, settings_collection
 from app.services.workflow_service import (
     send_pro_reminder,
     send_customer_completion_check,
@@ -16,13 +16,21 @@ from app.services.monitor_service import (
     check_pro_approval_sla,
     remind_stale_booked_leads,
     check_whatsapp_instance_state,
+    deflect_silent_handoff,
+    process_approval_sla_lead,
+    reassign_stale_lead,
+    close_unassigned_lead,
+    remind_stale_booked_lead,
 )
-from datetime import datetime, timedelta
+from app.services.deadline_service import Deadlines
+from app.services.runtime_config_service import RuntimeConfig
+from datetime import datetime, timedelta, timezone
 import functools
+import json
 import re
 from pymongo.errors import OperationFailure, ServerSelectionTimeoutError
 from app.core.config import settings
-from app.core.constants import LeadStatus, WorkerConstants
+from app.core.constants import LeadStatus, WorkerConstants, DeadlineAction
 from app.core.phone import to_chat_id, strip_suffix
 from app.core.datetime_utils import within_business_hours
 import os
@@ -30,17 +38,88 @@ import pytz
 from app.services.scheduling_service import regenerate_all_templates
 from app.core.logger import logger, page_critical
 from app.core.redis_client import with_scheduler_lock
+from app.core.fanout import bounded_fanout
+from app.core import job_metrics
+from app.providers.whatsapp import outbox
 
 IL_TZ = pytz.timezone("Asia/Jerusalem")
 
 
-async def send_daily_reminders():
+# Last run's fan-out metrics, for operators and the health view.
+DAILY_REMINDERS_METRICS_KEY = "scheduler:daily_reminders:last_run"
+
+
+def _daily_agenda_pipeline(start_utc: datetime, end_utc: datetime) -> list:
+    """Today's BOOKED leads grouped per active pro — the whole agenda in one
+    aggregation instead of a `leads.find` per pro."""
+    return [
+        {
+            "$match": {
+                "status": LeadStatus.BOOKED,
+                "pro_id": {"$ne": None},
+                "appointment_datetime": {"$gte": start_utc, "$lt": end_utc},
+            }
+        },
+        {"$sort": {"appointment_datetime": 1}},
+        {
+            "$group": {
+                "_id": "$pro_id",
+                "jobs": {
+                    "$push": {
+                        "appointment_datetime": "$appointment_datetime",
+                        "chat_id": "$chat_id",
+                        "details": "$details",
+                    }
+                },
+            }
+        },
+        {
+            "$lookup": {
+                "from": "users",
+                "localField": "_id",
+                "foreignField": "_id",
+                "as": "pro",
+            }
+        },
+        {"$unwind": "$pro"},
+        {"$match": {"pro.is_active": True}},
+        {
+            "$project": {
+                "business_name": "$pro.business_name",
+                "phone_number": "$pro.phone_number",
+                "jobs": {"$slice": ["$jobs", WorkerConstants.DAILY_AGENDA_MAX_JOBS]},
+            }
+        },
+    ]
+
+
+def _format_daily_agenda(agenda: dict, today_start: datetime) -> str:
+    msg = f"☀️ *בוקר טוב {agenda.get('business_name')}!* \nהנה העבודות שלך להיום ({today_start.strftime('%d/%m')}):"
+    for job in agenda["jobs"]:
+        job_time = (
+            job["appointment_datetime"].replace(tzinfo=pytz.utc).astimezone(IL_TZ)
+        )
+        time_str = job_time.strftime("%H:%M")
+        client_phone = strip_suffix(job["chat_id"])
+        details = job.get("details", "פרטים חסרים")
+        msg += f"\n🛠️ *{time_str}* - {details}\n   📞 {client_phone}\n"
+
+    msg += "\nשיהיה יום מוצלח! 💪"
+    return msg
+
+
+async def send_daily_reminders() -> dict:
+    """Send each active pro today's agenda.
+
+    One aggregation builds every pro's agenda; the sends go out through a
+    bounded, paced fan-out rather than one awaited send after another. Returns
+    (and logs, and stores under ``DAILY_REMINDERS_METRICS_KEY``) the run's
+    metrics: pros messaged, failures, duration.
+    """
     logger.info(
         f"⏰ [Scheduler] Starting daily reminders check at {datetime.now(IL_TZ)}"
     )
 
-    active_pros = await users_collection.find({"is_active": True}).to_list(length=500)
-
     now_il = datetime.now(IL_TZ)
     today_start = now_il.replace(hour=0, minute=0, second=0, microsecond=0)
     today_end = today_start + timedelta(days=1)
@@ -48,39 +127,53 @@ async def send_daily_reminders():
     start_utc = today_start.astimezone(pytz.utc)
     end_utc = today_end.astimezone(pytz.utc)
 
-    for pro in active_pros:
-        booked_jobs_cursor = leads_collection.find(
-            {
-                "pro_id": pro["_id"],
-                "status": LeadStatus.BOOKED,
-                "appointment_datetime": {"$gte": start_utc, "$lt": end_utc},
-            }
-        ).sort("appointment_datetime", 1)
-
-        booked_jobs = await booked_jobs_cursor.to_list(length=50)
-
-        if booked_jobs:
-            msg = f"☀️ *בוקר טוב {pro['business_name']}!* \nהנה העבודות שלך להיום ({today_start.strftime('%d/%m')}):"
-            for job in booked_jobs:
-                job_time = (
-                    job["appointment_datetime"]
-                    .replace(tzinfo=pytz.utc)
-                    .astimezone(IL_TZ)
-                )
-                time_str = job_time.strftime("%H:%M")
-                client_phone = strip_suffix(job["chat_id"])
-                details = job.get("details", "פרטים חסרים")
-                msg += f"\n🛠️ *{time_str}* - {details}\n   📞 {client_phone}\n"
-
-            msg += "\nשיהיה יום מוצלח! 💪"
-
-            chat_id = pro.get("phone_number")
-            if chat_id:
-                chat_id = to_chat_id(chat_id)
-                try:
-                    await whatsapp.send_message(chat_id, msg)
-                except Exception as e:
-                    logger.error(f"❌ Failed to send to {pro['business_name']}: {e}")
+    agendas = [
+        doc
+        async for doc in leads_collection.aggregate(
+            _daily_agenda_pipeline(start_utc, end_utc)
+        )
+        if doc.get("phone_number") and doc.get("jobs")
+    ]
+
+    async def send_agenda(agenda: dict) -> None:
+        try:
+            await whatsapp.send_message(
+                to_chat_id(agenda["phone_number"]),
+                _format_daily_agenda(agenda, today_start),
+            )
+        except Exception as e:
+            raise RuntimeError(
+                f"Failed to send to {agenda.get('business_name')}: {e}"
+            ) from e
+
+    # With the outbound queue on, the sends below only enqueue; the outbox's
+    # token bucket does the pacing, so the fan-out needs none of its own.
+    with outbox.queued_sends():
+        result = await bounded_fanout(
+            agendas,
+            send_agenda,
+            concurrency=WorkerConstants.FANOUT_SEND_CONCURRENCY,
+            per_second=None if outbox.enabled() else WorkerConstants.FANOUT_SENDS_PER_SECOND,
+            label="daily_reminders",
+        )
+    metrics = {
+        "pros_messaged": result.succeeded,
+        "failures": result.failed,
+        "duration_seconds": round(result.duration_seconds, 3),
+        "ran_at": datetime.now(pytz.utc).isoformat(),
+    }
+    logger.info(
+        f"⏰ [Scheduler] Daily reminders: {metrics['pros_messaged']} pros messaged, "
+        f"{metrics['failures']} failed, {metrics['duration_seconds']}s"
+    )
+    try:
+        from app.core.redis_client import get_redis_client
+
+        redis = await get_redis_client()
+        await redis.set(DAILY_REMINDERS_METRICS_KEY, json.dumps(metrics), ex=7 * 86400)
+    except Exception as e:
+        logger.warning(f"[Scheduler] Daily reminders metrics not stored: {e}")
+    return metrics
 
 
 # PRO-112 — Mongo auth-failure escalation. `bad auth` (Atlas 8000) on a
@@ -206,7 +299,7 @@ async def monitor_unfinished_jobs():
     Monitors 'booked' leads and takes action based on their age.
     """
     # 1. Check Config
-    config = await settings_collection.find_one({"_id": "scheduler_config"})
+    config = await RuntimeConfig.get("scheduler_config")
     if config and not config.get("stale_monitor_active", True):
         return
 
@@ -267,25 +360,34 @@ async def monitor_unfinished_jobs():
 # --- Wrappers for Imported Services ---
 
 
-async def _customer_cold_job_allowed(toggle_key: str) -> bool:
+async def _customer_cold_job_allowed(toggle_key: str, whole_run: bool = True) -> bool:
     """PRO-73 gate for *cold customer-facing* scheduler jobs (SOS healer, lead
     janitor, SLA deflection): run only **inside business hours** AND when the
     per-job toggle is enabled. Toggles **default OFF** — these re-engagement jobs
     that message a customer because the chat went silent stay dark until an
-    operator turns them on after the WhatsApp number is warmed up (pilot safety)."""
+    operator turns them on after the WhatsApp number is warmed up (pilot safety).
+
+    Every decision is recorded per toggle; ``whole_run=False`` (the deadline
+    dispatcher, which only skips the gated entries) keeps a closed gate from
+    marking the whole run as gated."""
     if not within_business_hours():
-        return False
-    config = await settings_collection.find_one({"_id": "scheduler_config"})
-    return bool(config and config.get(toggle_key, False))
+        allowed = False
+    else:
+        config = await RuntimeConfig.get("scheduler_config")
+        allowed = bool(config and config.get(toggle_key, False))
+    job_metrics.note_gate(toggle_key, allowed)
+    if whole_run and not allowed:
+        job_metrics.note(gated=True)
+    return allowed
 
 
-@with_scheduler_lock("run_sos_healer", ttl=500)
+@with_scheduler_lock("run_sos_healer", ttl=500, sharded=True)
 @track_mongo_auth_failures
 async def run_sos_healer():
     """Wrapper for SOS Auto-Healer — gated (business hours + toggle, PRO-73)."""
     if not await _customer_cold_job_allowed("sos_healer_active"):
         return
-    await check_and_reassign_stale_leads()
+    return await check_and_reassign_stale_leads()
 
 
 @with_scheduler_lock("run_slot_regeneration", ttl=82000)
@@ -295,6 +397,7 @@ async def run_slot_regeneration():
         count = await regenerate_all_templates()
         if count > 0:
             logger.info(f"✅ [Scheduler] Slot regeneration: {count} new slots")
+        return count
     except Exception as e:
         logger.error(f"❌ [Scheduler] Slot regeneration error: {e}")
 
@@ -399,28 +502,28 @@ async def run_daily_backup():
 @track_mongo_auth_failures
 async def run_sos_reporter():
     """Wrapper for SOS Admin Reporter with Toggle Check"""
-    config = await settings_collection.find_one({"_id": "scheduler_config"})
+    config = await RuntimeConfig.get("scheduler_config")
     if config and not config.get("sos_reporter_active", True):
         return
-    await send_periodic_admin_report()
+    return await send_periodic_admin_report()
 
 
-@with_scheduler_lock("run_lead_janitor", ttl=20000)
+@with_scheduler_lock("run_lead_janitor", ttl=20000, sharded=True)
 @track_mongo_auth_failures
 async def run_lead_janitor():
     """Auto-reject CONTACTED leads with no pro — gated (business hours + toggle, PRO-73)."""
     if not await _customer_cold_job_allowed("lead_janitor_active"):
         return
-    await auto_reject_unassigned_leads()
+    return await auto_reject_unassigned_leads()
 
 
-@with_scheduler_lock("run_sla_monitor", ttl=270)
+@with_scheduler_lock("run_sla_monitor", ttl=270, sharded=True)
 @track_mongo_auth_failures
 async def run_sla_monitor():
     """Silent-handoff deflection — gated (business hours + toggle, PRO-73)."""
     if not await _customer_cold_job_allowed("sla_monitor_active"):
         return
-    await check_sla_deflection()
+    return await check_sla_deflection()
 
 
 # No @track_mongo_auth_failures here or on the stale-lead nudger: their
@@ -428,17 +531,83 @@ async def run_sla_monitor():
 # never propagates to the wrapper — the decorator would be dead code implying
 # coverage it doesn't provide. The six decorated jobs (incl. the 2-min
 # WhatsApp state monitor) trip the threshold on their own.
-@with_scheduler_lock("run_pro_approval_sla", ttl=270)
+@with_scheduler_lock("run_pro_approval_sla", ttl=270, sharded=True)
 async def run_pro_approval_sla():
     """PRO-56 — nudge silent pros (T+10) + offer the customer a reassignment (T+25)."""
-    await check_pro_approval_sla()
+    return await check_pro_approval_sla()
 
 
 # No @track_mongo_auth_failures — see the note above run_pro_approval_sla.
-@with_scheduler_lock("run_stale_lead_nudger", ttl=3000)
+@with_scheduler_lock("run_stale_lead_nudger", ttl=3000, sharded=True)
 async def run_stale_lead_nudger():
     """Wrapper for Stale Lead Nudger"""
-    await remind_stale_booked_leads()
+    return await remind_stale_booked_leads()
+
+
+# Deadline wheel: action → (per-lead handler, PRO-73 toggle or None). The three
+# cold customer-facing actions keep the same business-hours + toggle gate as
+# their sweeps; a gated entry is re-armed DEADLINE_RETRY_SECONDS out rather
+# than dropped, so it fires once the gate opens.
+_DEADLINE_HANDLERS = {
+    DeadlineAction.SLA_DEFLECTION: (deflect_silent_handoff, "sla_monitor_active"),
+    DeadlineAction.APPROVAL_NUDGE: (process_approval_sla_lead, None),
+    DeadlineAction.APPROVAL_OFFER: (process_approval_sla_lead, None),
+    DeadlineAction.SOS_REASSIGN: (reassign_stale_lead, "sos_healer_active"),
+    DeadlineAction.LEAD_JANITOR: (close_unassigned_lead, "lead_janitor_active"),
+    DeadlineAction.STALE_BOOKED: (remind_stale_booked_lead, None),
+}
+
+
+@with_scheduler_lock("run_deadline_dispatcher", ttl=60)
+async def run_deadline_dispatcher() -> int:
+    """Pop due entries off the deadline wheel and run their monitor handlers.
+
+    Runs every DEADLINE_POLL_SECONDS; an idle tick is a single ZRANGEBYSCORE and
+    never touches Mongo. Returns the number of entries claimed this tick.
+    """
+    now = datetime.now(timezone.utc)
+    try:
+        due = await Deadlines.pop_due(now)
+    except Exception as e:
+        logger.warning(f"[Deadlines] Redis unavailable, skipping tick: {e}")
+        return 0
+    if not due:
+        return 0
+
+    retry_at = now + timedelta(seconds=WorkerConstants.DEADLINE_RETRY_SECONDS)
+    gates: dict = {}
+    done = []
+    # The nudges are a fan-out like the daily agenda: with the outbound queue
+    # on they are paced by the outbox rather than sent inline.
+    with outbox.queued_sends():
+        for lead_id, action in due:
+            handler, toggle = _DEADLINE_HANDLERS[action]
+            try:
+                if toggle:
+                    if toggle not in gates:
+                        gates[toggle] = await _customer_cold_job_allowed(
+                            toggle, whole_run=False
+                        )
+                    if not gates[toggle]:
+                        await Deadlines.schedule(lead_id, action, retry_at)
+                        continue
+                lead = await leads_collection.find_one({"_id": lead_id})
+                rearm_at = await handler(lead) if lead else None
+                if rearm_at:
+                    await Deadlines.schedule(lead_id, action, rearm_at)
+                else:
+                    done.append((lead_id, action))
+            except Exception as e:
+                # Re-arm instead of dropping: a transient Mongo/provider error must
+                # not lose the action (the safety-net sweep would, but far later).
+                logger.error(f"❌ [Deadlines] {action.value} failed for lead {lead_id}: {e}")
+                await Deadlines.schedule(lead_id, action, retry_at)
+    # Claimed entries are leased until completed; a crash before this line
+    # only means they come due again when the lease runs out.
+    await Deadlines.complete(done, now)
+
+    logger.info(f"⏱️ [Deadlines] Processed {len(due)} due action(s).")
+    return len(due)
 
 
 @with_scheduler_lock("run_whatsapp_state_monitor", ttl=90)
@@ -447,7 +616,7 @@ async def run_whatsapp_state_monitor():
     """PRO-20 — WhatsApp account deauth watchdog. Toggle via `whatsapp_monitor_active`.
     Lock TTL is kept under the polling interval so a missed/crashed tick doesn't
     block the next one from running."""
-    config = await settings_collection.find_one({"_id": "scheduler_config"})
+    config = await RuntimeConfig.get("scheduler_config")
     if config and not config.get("whatsapp_monitor_active", True):
         return
     await check_whatsapp_instance_state()
@@ -462,7 +631,7 @@ async def daily_reminders_job():
     """
     try:
         # 1. Ensure Config Exists (Upsert)
-        await settings_collection.update_one(
+        seeded = await settings_collection.update_one(
             {"_id": "scheduler_config"},
             {
                 "$setOnInsert": {
@@ -481,6 +650,8 @@ async def daily_reminders_job():
             },
             upsert=True,
         )
+        if seeded.upserted_id is not None:
+            await RuntimeConfig.publish_change("scheduler_config")
 
         # 2. Scheduled Run (Atomic Check-and-Lock)
         today_str = datetime.now(IL_TZ).strftime("%Y-%m-%d")
@@ -497,7 +668,7 @@ async def daily_reminders_job():
 
         if result:
             logger.info(f"⏰ [Scheduler] Executing daily reminders for {today_str}.")
-            await send_daily_reminders()
+            return await send_daily_reminders()
 
     except Exception as e:
         logger.error(f"❌ [Scheduler Error] {e}")
@@ -538,52 +709,60 @@ def start_scheduler():
 
     scheduler.add_listener(_on_job_error, EVENT_JOB_ERROR)
 
+    def add_job(func, trigger, job_id: str) -> None:
+        # Every job records duration, items processed, lock and PRO-73 gate
+        # outcomes per run (app/core/job_metrics.py → /health/scheduler).
+        interval = getattr(trigger, "interval", None)
+        scheduler.add_job(
+            job_metrics.instrument_job(
+                job_id, interval.total_seconds() if interval else None
+            )(func),
+            trigger,
+            id=job_id,
+            replace_existing=True,
+        )
+
     # Job 1: Daily "Good Morning" Reminders (Cron)
-    scheduler.add_job(
+    add_job(
         daily_reminders_job,
         CronTrigger(hour=8, minute=0, timezone=IL_TZ),
-        id="daily_reminders_job",
-        replace_existing=True,
+        "daily_reminders_job",
     )
 
     # Job 2: Stale Job Monitor (Wrapped)
-    scheduler.add_job(
+    add_job(
         monitor_unfinished_jobs,
         IntervalTrigger(minutes=30),
-        id="stale_job_monitor",
-        replace_existing=True,
+        "stale_job_monitor",
     )
 
-    # Job 3: SOS Auto-Healer (Wrapped)
-    scheduler.add_job(
+    # Job 3: SOS Auto-Healer (Wrapped) — safety net; the deadline wheel
+    # (Job 11) reassigns each lead at its own T+SOS_TIMEOUT.
+    add_job(
         run_sos_healer,
-        IntervalTrigger(minutes=10),
-        id="sos_auto_healer",
-        replace_existing=True,
+        IntervalTrigger(minutes=WorkerConstants.DEADLINE_SAFETY_SWEEP_MINUTES),
+        "sos_auto_healer",
     )
 
     # Job 4: SOS Admin Reporter (Wrapped)
-    scheduler.add_job(
+    add_job(
         run_sos_reporter,
         IntervalTrigger(hours=4),
-        id="sos_admin_reporter",
-        replace_existing=True,
+        "sos_admin_reporter",
     )
 
     # Job 5: Lead Janitor — auto-reject unassigned CONTACTED leads (every 6 hours)
-    scheduler.add_job(
+    add_job(
         run_lead_janitor,
         IntervalTrigger(hours=6),
-        id="lead_janitor",
-        replace_existing=True,
+        "lead_janitor",
     )
 
     # Job 6: Weekly Slot Regeneration (Sunday 01:00 Israel time)
-    scheduler.add_job(
+    add_job(
         run_slot_regeneration,
         CronTrigger(day_of_week="sun", hour=1, minute=0, timezone=IL_TZ),
-        id="slot_regeneration",
-        replace_existing=True,
+        "slot_regeneration",
     )
 
     # Job 7: Daily Backup (02:00 Israel time) — production only (PRO-127).
@@ -592,11 +771,10 @@ def start_scheduler():
     # that is not meant to back up. Registration-time gate: the job never
     # enters the scheduler outside production.
     if settings.is_production:
-        scheduler.add_job(
+        add_job(
             run_daily_backup,
             CronTrigger(hour=2, minute=0, timezone=IL_TZ),
-            id="daily_backup",
-            replace_existing=True,
+            "daily_backup",
         )
     else:
         logger.info(
@@ -604,37 +782,43 @@ def start_scheduler():
             f"{settings.ENVIRONMENT}; backups are production-only, PRO-127)."
         )
 
-    # Job 8: SLA Deflection Monitor (every 5 minutes)
-    scheduler.add_job(
+    # Job 8: SLA Deflection Monitor — safety net behind the deadline wheel
+    add_job(
         run_sla_monitor,
-        IntervalTrigger(minutes=5),
-        id="sla_deflection_monitor",
-        replace_existing=True,
+        IntervalTrigger(minutes=WorkerConstants.DEADLINE_SAFETY_SWEEP_MINUTES),
+        "sla_deflection_monitor",
     )
 
-    # Job 8b: Pro-Approval SLA — nudge silent pros + reassignment offer (PRO-56)
-    scheduler.add_job(
+    # Job 8b: Pro-Approval SLA — nudge silent pros + reassignment offer (PRO-56).
+    # Safety net behind the deadline wheel, which fires both at their due time.
+    add_job(
         run_pro_approval_sla,
-        IntervalTrigger(minutes=WorkerConstants.APPROVAL_SLA_CHECK_INTERVAL_MINUTES),
-        id="pro_approval_sla",
-        replace_existing=True,
+        IntervalTrigger(minutes=WorkerConstants.DEADLINE_SAFETY_SWEEP_MINUTES),
+        "pro_approval_sla",
     )
 
     # Job 9: Stale Lead Nudger — remind pros to close old active jobs (every 4 hours)
-    scheduler.add_job(
+    add_job(
         run_stale_lead_nudger,
         IntervalTrigger(hours=4),
-        id="stale_lead_nudger",
-        replace_existing=True,
+        "stale_lead_nudger",
     )
 
     # Job 10: WhatsApp account deauth watchdog — page on-call if the account
     # loses authorization (SPOF). Polls every WA_STATE_CHECK_INTERVAL_MINUTES.
-    scheduler.add_job(
+    add_job(
         run_whatsapp_state_monitor,
         IntervalTrigger(minutes=WorkerConstants.WA_STATE_CHECK_INTERVAL_MINUTES),
-        id="whatsapp_state_monitor",
-        replace_existing=True,
+        "whatsapp_state_monitor",
+    )
+
+    # Job 11: Deadline dispatcher — fires timed lead actions (SLA deflection,
+    # approval SLA, Healer, janitor, stale nudger) within seconds of their
+    # deadline. The interval sweeps above remain as the safety net.
+    add_job(
+        run_deadline_dispatcher,
+        IntervalTrigger(seconds=WorkerConstants.DEADLINE_POLL_SECONDS),
+        "deadline_dispatcher",
     )
 
     scheduler.start()
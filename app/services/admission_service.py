@@ -0,0 +1,168 @@
+"""Webhook admission control — backpressure from the ARQ queue.
+
+The webhook routes used to enqueue every message unconditionally: when Gemini
+slowed down and the worker fell behind, the queue grew without bound and
+customers got their replies minutes late with no signal. The routes now ask
+:meth:`AdmissionService.admit` first, which reads the pressure of the customer lanes' queues (``standard``
+and ``media``, see app/core/lanes.py — the traffic it can defer):
+
+* ``depth`` — jobs due now, running ones included (ARQ removes a job from its
+  queue when it finishes), summed over the lanes; deferred jobs are not
+  counted until due;
+* ``lag_seconds`` — how long the oldest of them, in either lane, has been due.
+
+Past the soft threshold (QUEUE_SOFT_DEPTH / QUEUE_SOFT_LAG_SECONDS), pros,
+the admin and emergency messages (``Messages.Keywords.EMERGENCY_KEYWORDS``)
+are still enqueued as before; a customer gets a cheap deterministic "we're
+busy, we'll get back to you" reply straight from the webhook (once per
+QUEUE_BUSY_REPLY_COOLDOWN_SECONDS) and their AI turn is deferred by
+QUEUE_SOFT_DEFER_SECONDS, so the critical traffic reaches the worker first.
+Past the hard threshold the deferral is QUEUE_HARD_DEFER_SECONDS. Nothing is
+dropped: a deferred message is processed once it comes due.
+
+The pressure is read at most once per QUEUE_PRESSURE_CACHE_SECONDS per
+process, and fails open — an unreadable queue admits everything, as the
+routes did before.
+"""
+
+import time
+from typing import NamedTuple
+
+from app.core import lanes
+from app.core.config import settings
+from app.core.constants import WorkerConstants
+from app.core.logger import logger
+from app.core.messages import Messages
+from app.core.redis_client import get_redis_client
+from app.providers.whatsapp import get_whatsapp
+
+OK = "ok"
+SOFT = "soft"
+HARD = "hard"
+
+_BUSY_NOTIFIED_KEY = "busy:notified:{chat_id}"
+
+# The lanes whose jobs admission can defer; pros, the admin and emergencies
+# have their own lanes and are never deferred.
+_CUSTOMER_LANES = (lanes.STANDARD, lanes.MEDIA)
+
+
+class LanePressure(NamedTuple):
+    depth: int
+    lag_seconds: float
+
+
+class QueuePressure(NamedTuple):
+    depth: int
+    lag_seconds: float
+    level: str
+    by_lane: dict[str, LanePressure]
+
+
+# Process-wide snapshot: (monotonic expiry, pressure).
+_pressure_snapshot: tuple[float, QueuePressure] | None = None
+
+
+def _level(depth: int, lag_seconds: float) -> str:
+    if (
+        depth >= WorkerConstants.QUEUE_HARD_DEPTH
+        or lag_seconds >= WorkerConstants.QUEUE_HARD_LAG_SECONDS
+    ):
+        return HARD
+    if (
+        depth >= WorkerConstants.QUEUE_SOFT_DEPTH
+        or lag_seconds >= WorkerConstants.QUEUE_SOFT_LAG_SECONDS
+    ):
+        return SOFT
+    return OK
+
+
+class AdmissionService:
+    @staticmethod
+    async def queue_pressure() -> QueuePressure | None:
+        """Depth and lag of the customer lanes' ARQ queues, in total and
+        per lane, or None when Redis is unreadable.
+
+        ARQ keeps each queue as a sorted set scored by when each job is due
+        (epoch ms), so a lane's jobs due now and the oldest of them are one
+        ZCOUNT and one ZRANGEBYSCORE — all lanes in one pipeline.
+        """
+        global _pressure_snapshot
+        now = time.monotonic()
+        snapshot = _pressure_snapshot
+        if snapshot is not None and now < snapshot[0]:
+            return snapshot[1]
+        try:
+            redis = await get_redis_client()
+            now_ms = int(time.time() * 1000)
+            pipe = redis.pipeline(transaction=False)
+            for lane in _CUSTOMER_LANES:
+                queue = lanes.queue_name(lane)
+                pipe.zcount(queue, "-inf", now_ms)
+                pipe.zrangebyscore(queue, "-inf", now_ms, start=0, num=1, withscores=True)
+            raw = await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Queue pressure check failed — admitting (fail-open): {e}")
+            return None
+        by_lane = {}
+        for i, lane in enumerate(_CUSTOMER_LANES):
+            depth, oldest = raw[2 * i], raw[2 * i + 1]
+            lag = round(max(0, now_ms - oldest[0][1]) / 1000, 1) if oldest else 0.0
+            by_lane[lane] = LanePressure(depth, lag)
+        depth = sum(p.depth for p in by_lane.values())
+        lag_seconds = max(p.lag_seconds for p in by_lane.values())
+        pressure = QueuePressure(depth, lag_seconds, _level(depth, lag_seconds), by_lane)
+        _pressure_snapshot = (now + WorkerConstants.QUEUE_PRESSURE_CACHE_SECONDS, pressure)
+        return pressure
+
+    @staticmethod
+    async def is_critical(chat_id: str, text: str | None) -> bool:
+        """Emergencies, the admin and pros skip load shedding — the same
+        traffic the lane router (app/core/lanes.py) keeps off the standard lane."""
+        return lanes.is_emergency(text) or await lanes.is_pro_or_admin(chat_id)
+
+    @staticmethod
+    async def admit(chat_id: str, text: str | None) -> int | None:
+        """How long to defer this message's job (ARQ ``_defer_by``, seconds),
+        or None to enqueue it now. Sends the busy reply when it defers."""
+        if not settings.WEBHOOK_LOAD_SHEDDING_ENABLED:
+            return None
+        pressure = await AdmissionService.queue_pressure()
+        if pressure is None or pressure.level == OK:
+            return None
+        try:
+            if await AdmissionService.is_critical(chat_id, text):
+                return None
+        except Exception as e:
+            logger.warning(f"Admission: pro lookup failed, admitting ...{chat_id[-8:]}: {e}")
+            return None
+
+        logger.warning(
+            f"🚦 Queue {pressure.level} (depth {pressure.depth}, lag "
+            f"{pressure.lag_seconds}s) — deferring ...{chat_id[-8:]}"
+        )
+        await AdmissionService._send_busy_reply(chat_id)
+        if pressure.level == HARD:
+            return WorkerConstants.QUEUE_HARD_DEFER_SECONDS
+        return WorkerConstants.QUEUE_SOFT_DEFER_SECONDS
+
+    @staticmethod
+    async def _send_busy_reply(chat_id: str) -> None:
+        try:
+            redis = await get_redis_client()
+            first = await redis.set(
+                _BUSY_NOTIFIED_KEY.format(chat_id=chat_id),
+                "1",
+                ex=WorkerConstants.QUEUE_BUSY_REPLY_COOLDOWN_SECONDS,
+                nx=True,
+            )
+            if first:
+                await get_whatsapp().send_message(chat_id, Messages.Errors.BUSY_DEFERRED)
+        except Exception as e:
+            logger.warning(f"Busy reply to ...{chat_id[-8:]} failed: {e}")
+
+
+def reset_pressure_cache() -> None:
+    """Drop the pressure snapshot (tests)."""
+    global _pressure_snapshot
+    _pressure_snapshot = None
@@ -1,5 +1,7 @@
 from google import genai
 from google.genai import types
+from app.core.background import BackgroundTasks
+from app.core.concurrency import note_throttled
 from app.core.config import settings
 from app.core.logger import logger
 from app.core.messages import Messages
@@ -9,7 +11,7 @@ import json
 import os
 import tempfile
 import asyncio
-from app.core.http_client import get_http_client
+from app.core.http_client import MEDIA, get_http_client
 from tenacity import (
     retry,
     stop_after_attempt,
@@ -131,7 +133,7 @@ class AIEngine:
             # For Audio/Video, we must use the File API to avoid size limits and timeouts
             tmp_path = None
             try:
-                http_client = await get_http_client()
+                http_client = await get_http_client(MEDIA)
                 async with http_client.stream("GET", media_url) as resp:
                     if resp.status_code == 200:
                         with tempfile.NamedTemporaryFile(
@@ -239,7 +241,9 @@ class AIEngine:
                         response.usage_metadata, "total_token_count", 0
                     )
                     if token_count:
-                        asyncio.create_task(_track_token_usage(pro_id, token_count))
+                        BackgroundTasks.spawn(
+                            _track_token_usage(pro_id, token_count), "track_token_usage"
+                        )
 
                 if require_json:
                     try:
@@ -264,6 +268,10 @@ class AIEngine:
                     f"Model {model_name} failed: {type(e).__name__}: {e}. "
                     "Trying next fallback..."
                 )
+                if getattr(e, "code", None) in (429, 503):
+                    # genai APIError for quota or overload: the worker's
+                    # concurrency backs off (app/core/concurrency.py).
+                    note_throttled("gemini")
                 last_error = e
                 continue
 
@@ -0,0 +1,272 @@
+"""
+Availability cache — a write-through Redis index of each pro's free slots.
+
+`avail:{pro_id}` is a sorted set: member = slot ``_id`` (str), score = slot
+``start_time`` as epoch seconds. It answers the three availability questions
+the hot paths ask — "any free slot in this window", "next N free slots" and
+"earliest free slot across these K pros" — in a single Redis round trip,
+instead of one `slots` query per pro.
+
+Consistency model
+-----------------
+* The set is *built lazily* from Mongo on first read (``_warm``) and carries a
+  short TTL (``AVAILABILITY_CACHE_TTL_SECONDS``) so any writer that bypasses
+  the sync helpers below is bounded to that much drift.
+* Booking/release paths call ``remove_slot`` / ``add_free_slot`` *after* the
+  Mongo write commits. Mongo stays the source of truth: every claim is still a
+  guarded ``find_one_and_update`` on ``is_taken: False``, so a stale cache entry
+  can at worst offer a slot that the claim then refuses.
+* An empty-but-known availability must be distinguishable from "never built",
+  so a warmed set always holds the ``_WARM_MARKER`` member. Its score is 0 when
+  the set holds all of the pro's future free slots, or ``-horizon`` when the
+  warm stopped at ``AVAILABILITY_CACHE_MAX_SLOTS``: the set is then only
+  complete up to ``horizon`` (the last cached start), and a window reaching
+  past it that the set cannot fill is a miss (Mongo answers it). Every query
+  window starts after 1970, so the marker never appears in results.
+* ``add_free_slot`` checks the marker and writes in one script (``_ADD_LUA``),
+  so a set that expires or is invalidated mid-call is never re-created as a
+  one-member "complete" set.
+
+Failure policy: every method returns ``None`` (reads) or swallows (writes) on
+a Redis error, and callers fall back to Mongo — the cache can make availability
+cheaper, never unavailable.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from bson import ObjectId
+
+from app.core.constants import AVAILABILITY_CACHE_KEY, WorkerConstants
+from app.core.logger import logger
+from app.core.redis_client import get_redis_client
+
+_WARM_MARKER = "__warm__"
+
+# Add slot ARGV[2] at score ARGV[3] only while the set is warm (holds the marker
+# ARGV[1]) and the slot is within its horizon. A set that somehow lost its TTL
+# gets ARGV[4] back; a live TTL is left alone so drift stays bounded.
+_ADD_LUA = """
+local mark = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if not mark then
+  return 0
+end
+mark = tonumber(mark)
+if mark < 0 and tonumber(ARGV[3]) > -mark then
+  return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[3], ARGV[2])
+if redis.call('TTL', KEYS[1]) < 0 then
+  redis.call('EXPIRE', KEYS[1], ARGV[4])
+end
+return 1
+"""
+
+FreeSlot = Tuple[ObjectId, datetime]
+
+
+def _key(pro_id) -> str:
+    return AVAILABILITY_CACHE_KEY.format(pro_id=str(pro_id))
+
+
+def _as_oid(pro_id) -> ObjectId:
+    return ObjectId(pro_id) if isinstance(pro_id, str) else pro_id
+
+
+def _as_utc(dt: datetime) -> datetime:
+    # Motor returns naive UTC datetimes unless the client is tz_aware.
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt
+
+
+def _decode(entries) -> List[FreeSlot]:
+    return [
+        (ObjectId(member), datetime.fromtimestamp(score, tz=timezone.utc))
+        for member, score in entries
+        if member != _WARM_MARKER
+    ]
+
+
+class AvailabilityCache:
+    TTL = WorkerConstants.AVAILABILITY_CACHE_TTL_SECONDS
+
+    @classmethod
+    async def _warm(cls, pro_ids: Iterable) -> None:
+        """Rebuild the sets for ``pro_ids`` from Mongo (future free slots only)."""
+        # Imported lazily: scheduling_service imports this module. Reading the
+        # collection off the module (not a copied reference) also keeps the
+        # cache on whatever `slots_collection` that module is bound to.
+        from app.services import scheduling_service
+
+        oids = [_as_oid(p) for p in pro_ids]
+        if not oids:
+            return
+        now = datetime.now(timezone.utc)
+        cursor = scheduling_service.slots_collection.find(
+            {"pro_id": {"$in": oids}, "is_taken": False, "start_time": {"$gte": now}},
+            {"pro_id": 1, "start_time": 1},
+        ).sort("start_time", 1)
+
+        by_pro: Dict[ObjectId, Dict[str, float]] = {oid: {} for oid in oids}
+        truncated = set()
+        async for slot in cursor:
+            members = by_pro.get(slot["pro_id"])
+            if members is None:
+                continue
+            if len(members) >= WorkerConstants.AVAILABILITY_CACHE_MAX_SLOTS:
+                truncated.add(slot["pro_id"])
+                continue
+            members[str(slot["_id"])] = _as_utc(slot["start_time"]).timestamp()
+
+        redis = await get_redis_client()
+        pipe = redis.pipeline()
+        for oid, members in by_pro.items():
+            key = _key(oid)
+            # Slots come in start order, so the largest score is the horizon.
+            mark = -max(members.values()) if oid in truncated else 0
+            pipe.delete(key)
+            pipe.zadd(key, {_WARM_MARKER: mark, **members})
+            pipe.expire(key, cls.TTL)
+        await pipe.execute()
+        logger.debug(f"📅 Availability cache warmed for {len(oids)} pro(s)")
+
+    @classmethod
+    async def _query(
+        cls, pro_ids: List, start: datetime, end: Optional[datetime], limit: int
+    ) -> Dict[str, Optional[List[FreeSlot]]]:
+        """One pipelined round trip: marker ZSCORE + ZRANGEBYSCORE per pro.
+
+        Cold sets are warmed from Mongo (a single `$in` query for all of them)
+        and re-read — the only case that costs more than one round trip. A pro
+        maps to None when its set was truncated before ``end`` and cannot fill
+        ``limit`` from what it holds: the answer lies past the horizon.
+        """
+        lo = _as_utc(start).timestamp()
+        hi = _as_utc(end).timestamp() if end else float("inf")
+
+        async def read(ids):
+            redis = await get_redis_client()
+            pipe = redis.pipeline(transaction=False)
+            for pid in ids:
+                pipe.zscore(_key(pid), _WARM_MARKER)
+                pipe.zrangebyscore(
+                    _key(pid), lo, hi if end else "+inf",
+                    start=0, num=limit, withscores=True,
+                )
+            raw = await pipe.execute()
+            return {
+                str(pid): (raw[2 * i], raw[2 * i + 1])
+                for i, pid in enumerate(ids)
+            }
+
+        results = await read(pro_ids)
+        cold = [pid for pid in pro_ids if results[str(pid)][0] is None]
+        if cold:
+            await cls._warm(cold)
+            results.update(await read(cold))
+
+        found: Dict[str, Optional[List[FreeSlot]]] = {}
+        for pid, (mark, entries) in results.items():
+            slots = _decode(entries)
+            horizon = -mark if mark is not None and mark < 0 else None
+            if horizon is not None and hi > horizon and len(slots) < limit:
+                found[pid] = None
+            else:
+                found[pid] = slots
+        return found
+
+    @classmethod
+    async def next_free_slots(
+        cls,
+        pro_id,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = 20,
+    ) -> Optional[List[FreeSlot]]:
+        """Up to ``limit`` free ``(slot_id, start_time)`` pairs in
+        ``[start, end]``, earliest first. ``start`` defaults to now.
+        Returns None when the cache is unavailable or the window reaches past
+        a truncated set's horizon (caller falls back to Mongo).
+        """
+        try:
+            start = start or datetime.now(timezone.utc)
+            found = await cls._query([pro_id], start, end, limit)
+            return found[str(pro_id)]
+        except Exception as e:
+            logger.warning(f"Availability cache read failed for pro {pro_id}: {e}")
+            return None
+
+    @classmethod
+    async def has_free_slot(
+        cls, pro_id, start: datetime, end: datetime
+    ) -> Optional[bool]:
+        """True/False if any free slot starts in ``[start, end]``; None on cache error."""
+        slots = await cls.next_free_slots(pro_id, start, end, limit=1)
+        return None if slots is None else bool(slots)
+
+    @classmethod
+    async def earliest_free_slots(
+        cls, pro_ids: List, start: datetime, end: Optional[datetime] = None
+    ) -> Optional[Dict[str, Optional[datetime]]]:
+        """Earliest free slot start per pro, keyed by ``str(pro_id)`` (None =
+        nothing free in the window). Returns None when the cache is unavailable
+        or any pro's answer lies past its set's horizon.
+        """
+        if not pro_ids:
+            return {}
+        try:
+            found = await cls._query(list(pro_ids), start, end, limit=1)
+            if any(slots is None for slots in found.values()):
+                return None
+            return {
+                pid: (slots[0][1] if slots else None) for pid, slots in found.items()
+            }
+        except Exception as e:
+            logger.warning(f"Availability cache batch read failed: {e}")
+            return None
+
+    @classmethod
+    async def add_free_slot(cls, pro_id, slot_id, start_time: datetime) -> None:
+        """Write-through for a slot that just became free.
+
+        Only touches a set that is already warm (see ``_ADD_LUA``): adding to
+        a cold key would make a one-member set look like the pro's complete
+        availability. When the write fails the set may now be missing a free
+        slot, so it is dropped and the next read rebuilds it.
+        """
+        try:
+            start_time = _as_utc(start_time)
+            if start_time < datetime.now(timezone.utc):
+                return
+            redis = await get_redis_client()
+            add = redis.register_script(_ADD_LUA)
+            await add(
+                keys=[_key(pro_id)],
+                args=[_WARM_MARKER, str(slot_id), start_time.timestamp(), cls.TTL],
+            )
+        except Exception as e:
+            logger.warning(f"Availability cache add failed for slot {slot_id}: {e}")
+            await cls.invalidate(pro_id)
+
+    @classmethod
+    async def remove_slot(cls, pro_id, slot_id) -> None:
+        """Write-through for a slot that was just claimed."""
+        try:
+            redis = await get_redis_client()
+            await redis.zrem(_key(pro_id), str(slot_id))
+        except Exception as e:
+            logger.warning(f"Availability cache remove failed for slot {slot_id}: {e}")
+
+    @classmethod
+    async def invalidate(cls, pro_id) -> None:
+        """Drop a pro's set; the next read rebuilds it from Mongo."""
+        try:
+            redis = await get_redis_client()
+            await redis.delete(_key(pro_id))
+        except Exception as e:
+            logger.warning(f"Availability cache invalidate failed for pro {pro_id}: {e}")
+
+    @staticmethod
+    def lookahead_window() -> Tuple[datetime, datetime]:
+        """The default "does this pro have availability" window: now → +N days."""
+        now = datetime.now(timezone.utc)
+        return now, now + timedelta(days=WorkerConstants.AVAILABILITY_LOOKAHEAD_DAYS)
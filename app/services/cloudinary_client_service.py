@@ -1,8 +1,9 @@
-import io
+from typing import IO
 
 import cloudinary
 import cloudinary.uploader
 from app.core.config import settings
+from app.core.constants import WorkerConstants
 from app.core.logger import logger
 
 cloudinary.config(
@@ -23,18 +24,27 @@ def upload_image(file_object) -> str | None:
         return None
 
 
-def upload_media_bytes(data: bytes) -> str | None:
-    """Synchronous upload of raw media bytes; ``resource_type="auto"`` so
-    audio/video land as playable assets, not broken images.
+def upload_media_file(file: IO[bytes]) -> str | None:
+    """Synchronous chunked upload of a media file; ``resource_type="auto"`` so
+    audio/video land as playable assets, not broken images. Always closes
+    ``file``.
 
     PRO-89: inbound Meta media arrives as a short-lived, auth-gated CDN URL —
     useless to store on a lead or forward to a pro. The worker re-hosts the
-    bytes here to get a permanent public URL. Blocking cloudinary SDK call —
-    async callers must run it via ``asyncio.to_thread``.
+    spooled download here to get a permanent public URL. ``upload_large``
+    sends it in MEDIA_UPLOAD_CHUNK_BYTES parts read one at a time, so the
+    media is never held whole in memory a second time. Blocking cloudinary
+    SDK call — async callers must run it via ``asyncio.to_thread``.
     """
     try:
-        response = cloudinary.uploader.upload(io.BytesIO(data), resource_type="auto")
-        return response.get("secure_url")
+        response = cloudinary.uploader.upload_large(
+            file,
+            resource_type="auto",
+            chunk_size=WorkerConstants.MEDIA_UPLOAD_CHUNK_BYTES,
+        )
+        return (response or {}).get("secure_url")
     except Exception as e:
-        logger.error(f"Error uploading media bytes to Cloudinary: {e}")
+        logger.error(f"Error uploading media to Cloudinary: {e}")
         return None
+    finally:
+        file.close()
@@ -1,26 +1,43 @@
 import json
 from typing import List, Optional, Dict, Any
+from app.core.config import settings
 from app.core.redis_client import get_redis_client
 from app.core.logger import logger
 
 class ContextManager:
+    """
+    Conversation context per chat: a Redis list `context:{chat_id}` kept as
+    a ring buffer of the last MAX_CHAT_HISTORY messages. Every append trims
+    the list in the same MULTI/EXEC, so a chatty customer or pro never grows
+    it past the window the AI prompt reads, and reads fetch only that tail.
+    """
+
     TTL = 14400  # 4 hours expiration (allows longer conversations)
 
+    @staticmethod
+    def capacity() -> int:
+        """Messages kept per chat — the most any prompt reads."""
+        return settings.MAX_CHAT_HISTORY
+
     @classmethod
-    async def get_history(cls, chat_id: str) -> Optional[List[Dict[str, Any]]]:
+    async def get_history(
+        cls, chat_id: str, limit: Optional[int] = None
+    ) -> Optional[List[Dict[str, Any]]]:
         """
-        Returns list of messages from Redis key `context:{chat_id}`.
+        Returns the last `limit` (at most `capacity()`) messages from Redis key
+        `context:{chat_id}`, oldest first.
         Returns None if key doesn't exist or on error.
         """
         try:
             redis = await get_redis_client()
             key = f"context:{chat_id}"
-            # Fetch all items from the list
-            items = await redis.lrange(key, 0, -1)
-            
+            count = min(limit or cls.capacity(), cls.capacity())
+            # Fetch only the tail that will be used
+            items = await redis.lrange(key, -count, -1)
+
             if not items:
                 return None
-            
+
             # Redis returns list of strings (bytes decoded if decode_responses=True)
             # We need to parse each JSON string back to dict
             history = [json.loads(item) for item in items]
@@ -29,44 +46,58 @@ class ContextManager:
             logger.error(f"Redis get_history error for {chat_id}: {e}")
             return None
 
+    @classmethod
+    def stage_history(cls, pipe, chat_id: str, role: str, content: str):
+        """
+        Queues the append + trim + TTL reset of `update_history` on a Redis
+        pipeline, for callers that batch it with their own commands (message
+        log). The pipeline should be transactional so the trim is atomic.
+        """
+        key = f"context:{chat_id}"
+
+        # Construct the message object consistent with get_chat_history format
+        msg = {"role": role, "parts": [content]}
+
+        # Append to list (RPUSH), drop what fell out of the window (LTRIM),
+        # then reset expiration
+        pipe.rpush(key, json.dumps(msg))
+        pipe.ltrim(key, -cls.capacity(), -1)
+        pipe.expire(key, cls.TTL)
+
     @classmethod
     async def update_history(cls, chat_id: str, role: str, content: str):
         """
-        Appends a new message dict to the Redis list and resets TTL.
+        Appends a new message dict to the Redis ring buffer and resets TTL.
         """
         try:
             redis = await get_redis_client()
-            key = f"context:{chat_id}"
-            
-            # Construct the message object consistent with get_chat_history format
-            msg = {"role": role, "parts": [content]}
-            
-            # Append to list (RPUSH)
-            await redis.rpush(key, json.dumps(msg))
-            
-            # Reset Expiration
-            await redis.expire(key, cls.TTL)
+            async with redis.pipeline(transaction=True) as pipe:
+                cls.stage_history(pipe, chat_id, role, content)
+                await pipe.execute()
         except Exception as e:
             logger.error(f"Redis update_history error for {chat_id}: {e}")
 
     @classmethod
     async def set_history(cls, chat_id: str, messages: List[Dict[str, Any]]):
         """
-        Sets the entire history for a chat_id. Used for cache warming.
+        Sets the entire history for a chat_id (its last `capacity()` messages).
+        Used for cache warming.
         """
         try:
             redis = await get_redis_client()
             key = f"context:{chat_id}"
-            
-            # clear existing to be safe (though set_history implies overwrite)
-            await redis.delete(key)
-            
-            if messages:
-                # Convert all dicts to JSON strings
-                dumped_msgs = [json.dumps(m) for m in messages]
-                # RPUSH allows multiple values
-                await redis.rpush(key, *dumped_msgs)
-                await redis.expire(key, cls.TTL)
+
+            async with redis.pipeline(transaction=True) as pipe:
+                # clear existing to be safe (though set_history implies overwrite)
+                pipe.delete(key)
+
+                if messages:
+                    # Convert the window's dicts to JSON strings
+                    dumped_msgs = [json.dumps(m) for m in messages[-cls.capacity():]]
+                    # RPUSH allows multiple values
+                    pipe.rpush(key, *dumped_msgs)
+                    pipe.expire(key, cls.TTL)
+                await pipe.execute()
         except Exception as e:
             logger.error(f"Redis set_history error for {chat_id}: {e}")
 
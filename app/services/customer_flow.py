@@ -2,7 +2,6 @@ from app.core.database import (
     users_collection,
     leads_collection,
     reviews_collection,
-    slots_collection,
 )
 from app.core.logger import logger
 from app.core.messages import Messages
@@ -11,6 +10,7 @@ from app.core.phone import to_chat_id
 from app.services.lead_manager_service import set_lead_status
 from app.services.context_manager_service import ContextManager
 from app.services.state_manager_service import StateManager
+from app.services.scheduling_service import claim_slot, release_slot
 from bson import ObjectId
 from datetime import datetime, timedelta, timezone
 import pytz
@@ -335,10 +335,7 @@ async def handle_reschedule_selection(chat_id: str, user_text: str, whatsapp) ->
         return
 
     # Atomically claim the chosen slot (guards against race conditions)
-    chosen_slot = await slots_collection.find_one_and_update(
-        {"_id": slot_id, "is_taken": False},
-        {"$set": {"is_taken": True}},
-    )
+    chosen_slot = await claim_slot(slot_id)
     if not chosen_slot:
         await whatsapp.send_message(
             chat_id, Messages.Customer.RESCHEDULE_INVALID_CHOICE
@@ -348,10 +345,7 @@ async def handle_reschedule_selection(chat_id: str, user_text: str, whatsapp) ->
     # Free previously booked slot if we have a reference to it
     old_slot_id = lead.get("booked_slot_id")
     if old_slot_id:
-        await slots_collection.update_one(
-            {"_id": old_slot_id, "is_taken": True},
-            {"$set": {"is_taken": False}},
-        )
+        await release_slot(old_slot_id)
 
     old_time = lead.get("appointment_time", "לא ידוע")
     new_time = chosen_slot["start_time"].astimezone(_IL_TZ).strftime("%d/%m/%Y %H:%M")
@@ -13,6 +13,7 @@ user-facing message handlers without auth.
 
 from datetime import datetime, timezone
 from app.core.database import (
+    chat_sessions_collection,
     consent_collection,
     users_collection,
     leads_collection,
@@ -22,6 +23,7 @@ from app.core.database import (
 )
 from app.services.state_manager_service import StateManager
 from app.services.context_manager_service import ContextManager
+from app.services.message_log_service import MessageLogWriter
 from app.core.phone import strip_suffix
 from app.core.logger import logger
 
@@ -88,6 +90,11 @@ async def delete_user_data(chat_id: str) -> dict:
     phone = strip_suffix(chat_id)
 
     results = {}
+    # Buffered write-behind inserts must not land after the erase — ours are
+    # flushed now, other processes' are dropped by the tombstone — and spill
+    # recovery must not re-insert what it erases
+    await MessageLogWriter.flush()
+    results["spilled_messages"] = await MessageLogWriter.erase(chat_id)
     results["messages"] = (
         await messages_collection.delete_many({"chat_id": chat_id})
     ).deleted_count
@@ -100,6 +107,9 @@ async def delete_user_data(chat_id: str) -> dict:
     results["consent"] = (
         await consent_collection.delete_many({"chat_id": chat_id})
     ).deleted_count
+    results["chat_sessions"] = (
+        await chat_sessions_collection.delete_many({"_id": chat_id})
+    ).deleted_count
 
     # Clear Redis state and context
     await StateManager.clear_state(chat_id)
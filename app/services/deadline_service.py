@@ -0,0 +1,268 @@
+"""
+Deadline scheduler — a persistent timer wheel for timed lead actions.
+
+The SLA deflection monitor, the PRO-56 approval SLA, the SOS Healer, the stale
+nudger and the janitor used to find their work by re-scanning ``leads`` on an
+interval and comparing ``pro_notified_at`` / ``paused_at`` / ``created_at`` in
+Python: an action fired up to a full interval late, and every tick cost a query
+even when nothing was due.
+
+``deadlines:due`` (``DEADLINES_KEY``) is a sorted set of
+``"{action}:{lead_id}"`` members scored by due time. ``arm_for_lead`` computes a
+lead's deadlines from its document and is called wherever a lead enters a timed
+state — ``set_lead_status`` (every status transition), lead creation and the
+pause handoff. The scheduler's deadline dispatcher pops what is due every few
+seconds and hands each entry to the matching ``monitor_service`` handler.
+
+Consistency model
+-----------------
+* An entry is a *hint*, never an instruction: every handler re-reads the lead
+  and re-checks its own condition, so a stale deadline (the pro accepted, the
+  customer wrote again) is a no-op. Handlers that find the clock was reset
+  (e.g. ``paused_at`` bumped by new activity) return the new due time and the
+  dispatcher re-arms it.
+* ``pop_due`` claims due entries atomically (one script) by re-scoring them to
+  a lease, DEADLINE_LEASE_SECONDS out, so two dispatchers can never
+  double-fire. The dispatcher then re-arms each entry or marks it done with
+  ``complete``; if it dies first, the lease expires and the entry is due
+  again — within minutes, not at the next safety sweep.
+* Fail-open: a Redis error while arming is logged and swallowed. The interval
+  sweeps in ``monitor_service`` keep running at a slower cadence as the safety
+  net for anything the wheel missed (and for leads written before it existed).
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from bson import ObjectId
+
+from app.core.constants import (
+    DEADLINES_KEY,
+    DeadlineAction,
+    LeadStatus,
+    WorkerConstants,
+)
+from app.core.logger import logger
+from app.core.redis_client import get_redis_client
+
+# Claim up to ARGV[3] members due by ARGV[1] by moving them to the lease score
+# ARGV[2]. Atomic, so a member is claimed by exactly one dispatcher.
+_CLAIM_LUA = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1],
+  'LIMIT', 0, tonumber(ARGV[3]))
+for _, member in ipairs(due) do
+  redis.call('ZADD', KEYS[1], ARGV[2], member)
+end
+return due
+"""
+
+# Remove the members ARGV[2..] that still hold the lease score ARGV[1]; one
+# re-armed meanwhile (a status transition, the handler's own re-arm) stays.
+_COMPLETE_LUA = """
+local lease = tonumber(ARGV[1])
+local removed = 0
+for i = 2, #ARGV do
+  local score = redis.call('ZSCORE', KEYS[1], ARGV[i])
+  if score and tonumber(score) == lease then
+    removed = removed + redis.call('ZREM', KEYS[1], ARGV[i])
+  end
+end
+return removed
+"""
+
+
+def _as_utc(dt: Optional[datetime]) -> Optional[datetime]:
+    # Motor returns naive UTC datetimes unless the client is tz_aware.
+    if dt is None:
+        return None
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt
+
+
+def _member(lead_id, action: DeadlineAction) -> str:
+    return f"{DeadlineAction(action).value}:{lead_id}"
+
+
+def approval_sla_minutes(lead: dict) -> Tuple[int, int]:
+    """PRO-56 (nudge, offer) thresholds in minutes — halved for emergencies."""
+    nudge_after = WorkerConstants.APPROVAL_NUDGE_MINUTES
+    offer_after = WorkerConstants.APPROVAL_REASSIGN_OFFER_MINUTES
+    if lead.get("is_emergency"):
+        nudge_after //= 2  # 5 min
+        offer_after //= 2  # 12 min
+    return nudge_after, offer_after
+
+
+def deadlines_for_lead(lead: dict) -> Dict[DeadlineAction, datetime]:
+    """Every deadline that currently applies to ``lead``, from its document alone.
+
+    Mirrors the queries of the interval sweeps in ``monitor_service`` so the
+    wheel and the safety net agree on what "due" means.
+    """
+    status = lead.get("status")
+    due: Dict[DeadlineAction, datetime] = {}
+
+    paused_at = _as_utc(lead.get("paused_at"))
+    if (
+        lead.get("is_paused")
+        and paused_at
+        and status in (LeadStatus.NEW, LeadStatus.BOOKED)
+    ):
+        due[DeadlineAction.SLA_DEFLECTION] = paused_at + timedelta(
+            seconds=WorkerConstants.PAUSE_TTL_SECONDS
+        )
+
+    notified_at = _as_utc(lead.get("pro_notified_at"))
+    if status == LeadStatus.NEW and lead.get("pro_id") and notified_at:
+        nudge_after, offer_after = approval_sla_minutes(lead)
+        if not lead.get("approval_nudged"):
+            due[DeadlineAction.APPROVAL_NUDGE] = notified_at + timedelta(
+                minutes=nudge_after
+            )
+        if not lead.get("reassign_offered"):
+            due[DeadlineAction.APPROVAL_OFFER] = notified_at + timedelta(
+                minutes=offer_after
+            )
+
+    created_at = _as_utc(lead.get("created_at"))
+    if created_at and status in (LeadStatus.NEW, LeadStatus.CONTACTED):
+        due[DeadlineAction.SOS_REASSIGN] = created_at + timedelta(
+            minutes=WorkerConstants.SOS_TIMEOUT_MINUTES
+        )
+    # Same `$exists: False` semantics as the janitor sweep's query.
+    if created_at and status == LeadStatus.CONTACTED and "pro_id" not in lead:
+        due[DeadlineAction.LEAD_JANITOR] = created_at + timedelta(
+            hours=WorkerConstants.UNASSIGNED_LEAD_TIMEOUT_HOURS
+        )
+
+    if (
+        status == LeadStatus.BOOKED
+        and lead.get("reminders_sent", 0) < WorkerConstants.MAX_PRO_REMINDERS
+    ):
+        anchors = [
+            _as_utc(lead.get(field))
+            for field in ("appointment_datetime", "updated_at")
+            if isinstance(lead.get(field), datetime)
+        ]
+        if anchors:
+            stale_at = min(anchors) + timedelta(
+                hours=WorkerConstants.STALE_BOOKED_LEAD_HOURS
+            )
+            last_reminder = _as_utc(lead.get("last_reminder_at"))
+            if last_reminder:
+                stale_at = max(
+                    stale_at,
+                    last_reminder
+                    + timedelta(
+                        hours=WorkerConstants.STALE_BOOKED_REMINDER_INTERVAL_HOURS
+                    ),
+                )
+            due[DeadlineAction.STALE_BOOKED] = stale_at
+
+    return due
+
+
+class Deadlines:
+    @classmethod
+    async def schedule(cls, lead_id, action: DeadlineAction, due_at: datetime) -> None:
+        """Arm (or move) one deadline for ``lead_id``."""
+        try:
+            redis = await get_redis_client()
+            await redis.zadd(
+                DEADLINES_KEY, {_member(lead_id, action): _as_utc(due_at).timestamp()}
+            )
+        except Exception as e:
+            logger.warning(f"Deadline schedule failed for {action}:{lead_id}: {e}")
+
+    @classmethod
+    async def arm_for_lead(cls, lead: Optional[dict]) -> None:
+        """Sync the wheel with ``lead``'s current document in one round trip.
+
+        Deadlines that apply are (re)scored; those that no longer apply — the
+        lead left the timed state — are removed, so terminal leads leave no
+        residue in the set.
+        """
+        await cls.arm_for_leads([lead])
+
+    @classmethod
+    async def arm_for_leads(cls, leads: List[Optional[dict]]) -> None:
+        """``arm_for_lead`` for many leads in one pipeline (bulk transitions)."""
+        leads = [lead for lead in leads if lead and lead.get("_id")]
+        if not leads:
+            return
+        try:
+            redis = await get_redis_client()
+            pipe = redis.pipeline(transaction=False)
+            for lead in leads:
+                lead_id = lead["_id"]
+                due = deadlines_for_lead(lead)
+                stale = [_member(lead_id, a) for a in DeadlineAction if a not in due]
+                if stale:
+                    pipe.zrem(DEADLINES_KEY, *stale)
+                if due:
+                    pipe.zadd(
+                        DEADLINES_KEY,
+                        {_member(lead_id, a): at.timestamp() for a, at in due.items()},
+                    )
+            await pipe.execute()
+        except Exception as e:
+            ids = ", ".join(str(lead["_id"]) for lead in leads[:5])
+            logger.warning(f"Deadline arm failed for lead(s) {ids}: {e}")
+
+    @staticmethod
+    def lease_until(now: datetime) -> float:
+        """The lease score of entries claimed by ``pop_due(now)``."""
+        return now.timestamp() + WorkerConstants.DEADLINE_LEASE_SECONDS
+
+    @classmethod
+    async def pop_due(
+        cls, now: Optional[datetime] = None, limit: Optional[int] = None
+    ) -> List[Tuple[ObjectId, DeadlineAction]]:
+        """Claim up to ``limit`` due entries, earliest first.
+
+        A claimed entry is leased, not removed: it is re-scored to
+        ``lease_until(now)`` and comes due again if the caller neither re-arms
+        it nor passes it to ``complete`` by then. Raises on a Redis error — the
+        dispatcher owns that failure (it simply retries next tick). An idle
+        tick is a single script call.
+        """
+        now = now or datetime.now(timezone.utc)
+        limit = limit or WorkerConstants.DEADLINE_BATCH_SIZE
+        redis = await get_redis_client()
+        claim = redis.register_script(_CLAIM_LUA)
+        members = await claim(
+            keys=[DEADLINES_KEY],
+            args=[now.timestamp(), cls.lease_until(now), limit],
+        )
+
+        claimed = []
+        for member in members:
+            action, _, lead_id = member.partition(":")
+            try:
+                claimed.append((ObjectId(lead_id), DeadlineAction(action)))
+            except Exception:
+                logger.warning(f"Dropping malformed deadline entry {member!r}")
+                await redis.zrem(DEADLINES_KEY, member)
+        return claimed
+
+    @classmethod
+    async def complete(
+        cls, done: List[Tuple[ObjectId, DeadlineAction]], now: datetime
+    ) -> None:
+        """Remove entries claimed by ``pop_due(now)`` whose action is finished.
+
+        Only entries still holding that claim's lease go: one re-armed while
+        its handler ran keeps its new due time. Fail-open — a left-over lease
+        only runs the (idempotent) handler once more.
+        """
+        if not done:
+            return
+        try:
+            redis = await get_redis_client()
+            complete = redis.register_script(_COMPLETE_LUA)
+            await complete(
+                keys=[DEADLINES_KEY],
+                args=[cls.lease_until(now)]
+                + [_member(lead_id, action) for lead_id, action in done],
+            )
+        except Exception as e:
+            logger.warning(f"Deadline completion failed for {len(done)} entries: {e}")
@@ -61,10 +61,9 @@ from __future__ import annotations
 import json
 from typing import Optional, Tuple
 
-import httpx
-
 from app.core.config import settings
 from app.core.constants import ISRAEL_CITIES_COORDS
+from app.core.http_client import GEOCODING, get_http_client
 from app.core.logger import logger, page_critical
 from app.core.redis_client import get_redis_client
 
@@ -227,10 +226,10 @@ async def _call_google(name: str) -> Optional[Tuple[float, float]]:
         "key": settings.GOOGLE_MAPS_API_KEY.get_secret_value(),
     }
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            resp = await client.get(_GOOGLE_GEOCODE_URL, params=params)
-            resp.raise_for_status()
-            data = resp.json()
+        client = await get_http_client(GEOCODING)
+        resp = await client.get(_GOOGLE_GEOCODE_URL, params=params)
+        resp.raise_for_status()
+        data = resp.json()
     except Exception as e:
         # Timeout, DNS, connection reset, HTTP 5xx via raise_for_status —
         # all transient. Retry sooner rather than blacklisting the name.
@@ -0,0 +1,271 @@
+"""
+Reactive lead monitor — dispatches lead status changes to handlers as they
+happen, instead of a sweep noticing them minutes later.
+
+``LeadEventConsumer`` runs inside the worker when ``settings.LEAD_EVENTS_ENABLED``
+is on. It tails ``leads`` through a MongoDB change stream filtered to inserts
+and ``status`` writes (``fullDocument: updateLookup``), persisting the resume
+token in Redis after every event so a restarted worker picks up where it left
+off. A deployment without a replica set cannot open a change stream; the
+consumer then falls back to polling ``updated_at`` past a Redis high-water mark.
+
+Dispatch
+--------
+``dispatch`` runs every ``_ANY_STATUS`` handler for each event, plus the
+handlers registered for the lead's status *only when the lead newly entered
+it*. "Newly" is decided by an atomic ``SET … GET`` on a per-lead key, which
+makes entry handlers fire once even when an event is replayed after a resume,
+re-read by the poller (every ``updated_at`` bump looks like a change there), or
+seen by two worker replicas at once. Handlers must still be idempotent — the
+per-lead key expires after ``LEAD_EVENTS_STATUS_TTL_SECONDS``.
+
+Failure policy: a handler error is logged and never stops the stream; a lost
+stream backs off and reconnects from the stored token. Nothing here is the only
+path to an action — the deadline wheel and interval sweeps still run.
+"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from bson import ObjectId, json_util
+from pymongo.errors import OperationFailure
+
+from app.core import database
+from app.core.constants import (
+    LEAD_EVENTS_CURSOR_KEY,
+    LEAD_EVENTS_RESUME_KEY,
+    LEAD_EVENTS_STATUS_KEY,
+    LeadStatus,
+    WorkerConstants,
+)
+from app.core.logger import logger
+from app.core.redis_client import get_redis_client
+from app.services.monitor_service import rearm_lead_deadlines
+from app.services.notification_service import page_lead_needs_review
+
+Handler = Callable[[dict], Awaitable[object]]
+
+_ANY_STATUS = "*"
+
+# status → handlers. `_ANY_STATUS` handlers run on every event.
+_HANDLERS: Dict[str, List[Handler]] = {
+    _ANY_STATUS: [rearm_lead_deadlines],
+    LeadStatus.PENDING_ADMIN_REVIEW: [page_lead_needs_review],
+}
+
+# Mongo error codes: 40573 = change streams need a replica set / sharded
+# cluster; 286 = resume point fell off the oplog; 280 = non-resumable error.
+_UNSUPPORTED_CODES = {40573}
+_HISTORY_LOST_CODES = {286, 280}
+
+_STREAM_PIPELINE = [
+    {
+        "$match": {
+            "$or": [
+                {"operationType": {"$in": ["insert", "replace"]}},
+                {
+                    "operationType": "update",
+                    "updateDescription.updatedFields.status": {"$exists": True},
+                },
+            ]
+        }
+    }
+]
+
+
+def _leads():
+    # Read off the module so tests (and the e2e world) can rebind it.
+    return database.leads_collection
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _as_utc(dt: datetime) -> datetime:
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt
+
+
+class _StreamUnsupported(Exception):
+    """This deployment cannot open change streams — use the poller."""
+
+
+async def dispatch(lead: Optional[dict]) -> int:
+    """Run the handlers for one lead event. Returns how many handlers ran."""
+    if not lead or not lead.get("_id") or not lead.get("status"):
+        return 0
+    status = str(getattr(lead["status"], "value", lead["status"]))
+
+    handlers = list(_HANDLERS.get(_ANY_STATUS, []))
+    try:
+        redis = await get_redis_client()
+        previous = await redis.set(
+            LEAD_EVENTS_STATUS_KEY.format(lead_id=lead["_id"]),
+            status,
+            ex=WorkerConstants.LEAD_EVENTS_STATUS_TTL_SECONDS,
+            get=True,
+        )
+        entered = previous != status
+    except Exception as e:
+        # Without the dedupe key we cannot tell entry from replay; skip the
+        # entry handlers rather than risk re-running them.
+        logger.warning(f"[Lead Events] status dedupe failed for {lead['_id']}: {e}")
+        entered = False
+    if entered:
+        handlers += _HANDLERS.get(status, [])
+
+    for handler in handlers:
+        try:
+            await handler(lead)
+        except Exception as e:
+            logger.error(
+                f"❌ [Lead Events] {handler.__name__} failed for lead {lead['_id']}: {e}"
+            )
+    return len(handlers)
+
+
+class LeadEventConsumer:
+    """Change stream consumer with a polling fallback. ``run`` until ``stop``."""
+
+    def __init__(self):
+        self._stopped = asyncio.Event()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    async def run(self) -> None:
+        logger.info("👂 [Lead Events] Consumer starting (change stream).")
+        while not self._stopped.is_set():
+            try:
+                await self._consume_stream()
+            except _StreamUnsupported as e:
+                logger.info(
+                    f"[Lead Events] Change streams unavailable ({e}) — polling "
+                    f"`updated_at` every {WorkerConstants.LEAD_EVENTS_POLL_SECONDS}s."
+                )
+                await self._poll_forever()
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(
+                    f"[Lead Events] Change stream dropped: {e} — reconnecting in "
+                    f"{WorkerConstants.LEAD_EVENTS_RETRY_SECONDS}s."
+                )
+                await self._sleep(WorkerConstants.LEAD_EVENTS_RETRY_SECONDS)
+
+    async def _sleep(self, seconds: float) -> None:
+        try:
+            await asyncio.wait_for(self._stopped.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    # --- change stream ---------------------------------------------------
+
+    async def _load_resume_token(self):
+        try:
+            redis = await get_redis_client()
+            raw = await redis.get(LEAD_EVENTS_RESUME_KEY)
+            return json_util.loads(raw) if raw else None
+        except Exception as e:
+            logger.warning(f"[Lead Events] Could not load resume token: {e}")
+            return None
+
+    async def _save_resume_token(self, token) -> None:
+        try:
+            redis = await get_redis_client()
+            await redis.set(LEAD_EVENTS_RESUME_KEY, json_util.dumps(token))
+        except Exception as e:
+            logger.warning(f"[Lead Events] Could not persist resume token: {e}")
+
+    async def _consume_stream(self) -> None:
+        token = await self._load_resume_token()
+        try:
+            stream = _leads().watch(
+                _STREAM_PIPELINE, full_document="updateLookup", resume_after=token
+            )
+        except NotImplementedError as e:  # drivers/doubles without change streams
+            raise _StreamUnsupported(str(e) or "watch() not implemented")
+
+        try:
+            async with stream:
+                async for change in stream:
+                    await dispatch(change.get("fullDocument"))
+                    await self._save_resume_token(change["_id"])
+                    if self._stopped.is_set():
+                        return
+        except OperationFailure as e:
+            if e.code in _UNSUPPORTED_CODES:
+                raise _StreamUnsupported(e.details.get("errmsg") if e.details else str(e))
+            if e.code in _HISTORY_LOST_CODES and token is not None:
+                # The stored token fell off the oplog; restart from "now". Any
+                # gap is covered by the deadline wheel and the safety-net sweeps.
+                logger.warning(
+                    "[Lead Events] Resume token expired — restarting the stream "
+                    "from the current position."
+                )
+                redis = await get_redis_client()
+                await redis.delete(LEAD_EVENTS_RESUME_KEY)
+                return
+            raise
+
+    # --- polling fallback --------------------------------------------------
+
+    async def _poll_forever(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                while await self.poll_once() >= WorkerConstants.LEAD_EVENTS_BATCH_SIZE:
+                    pass  # a full page means more may be waiting — drain now
+            except Exception as e:
+                logger.warning(f"[Lead Events] Poll failed: {e}")
+            await self._sleep(WorkerConstants.LEAD_EVENTS_POLL_SECONDS)
+
+    async def poll_once(self) -> int:
+        """Dispatch leads updated past the stored high-water mark. Returns the
+        number of leads read (a full batch means there may be more).
+
+        The mark is ``(updated_at, _id)`` of the last lead read, and leads are
+        read in that order: a bulk transition stamps a whole batch with one
+        ``updated_at``, so a page can end part-way through equal timestamps
+        and a scalar mark would skip the rest.
+        """
+        redis = await get_redis_client()
+        raw = await redis.get(LEAD_EVENTS_CURSOR_KEY)
+        if raw is None:
+            # First run: start from now rather than replaying history. Floored
+            # to the millisecond — Mongo truncates `updated_at` to ms, so a
+            # write in this same millisecond would otherwise sort below it.
+            now_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+            await redis.set(LEAD_EVENTS_CURSOR_KEY, json.dumps({"ms": now_ms - 1}))
+            return 0
+        mark = json.loads(raw)
+        since = _EPOCH + timedelta(milliseconds=mark["ms"])
+        query = {"updated_at": {"$gt": since}}
+        if mark.get("id"):
+            query = {
+                "$or": [
+                    query,
+                    {"updated_at": since, "_id": {"$gt": ObjectId(mark["id"])}},
+                ]
+            }
+
+        leads = (
+            await _leads()
+            .find(query)
+            .sort([("updated_at", 1), ("_id", 1)])
+            .limit(WorkerConstants.LEAD_EVENTS_BATCH_SIZE)
+            .to_list(length=WorkerConstants.LEAD_EVENTS_BATCH_SIZE)
+        )
+        for lead in leads:
+            await dispatch(lead)
+        if leads:
+            last = leads[-1]
+            last_ms = (_as_utc(last["updated_at"]) - _EPOCH) // timedelta(
+                milliseconds=1
+            )
+            await redis.set(
+                LEAD_EVENTS_CURSOR_KEY,
+                json.dumps({"ms": last_ms, "id": str(last["_id"])}),
+            )
+        return len(leads)
@@ -1,13 +1,38 @@
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Optional
+from typing import List, Optional
 from bson import ObjectId
-from pymongo import ReturnDocument
-from app.core.database import leads_collection, messages_collection
+from pymongo import ReturnDocument, UpdateOne
+from app.core.database import (
+    chat_sessions_collection,
+    leads_collection,
+    messages_collection,
+)
 from app.core.logger import logger
 from app.core.constants import LeadStatus, Actor
 from app.core.config import settings
-from app.core.lead_history import status_history_entry
+from app.core.sharding import with_shard_key
+from app.core.lead_history import (
+    SESSION_ENDING_STATUSES,
+    session_end,
+    session_stamp,
+    status_history_entry,
+)
 from app.services.context_manager_service import ContextManager
+from app.services.deadline_service import Deadlines
+from app.services.message_log_service import MessageLogWriter
+
+
+async def _stamp_sessions(leads: List[dict]) -> None:
+    """Record the new session boundary of every chat whose lead just reached
+    a session-ending status (``chat_sessions``, read by get_chat_history)."""
+    ops = [
+        session_stamp(lead["chat_id"], session_end(lead))
+        for lead in leads
+        if lead.get("status") in SESSION_ENDING_STATUSES and lead.get("chat_id")
+    ]
+    if ops:
+        await chat_sessions_collection.bulk_write(ops, ordered=False)
 
 
 async def set_lead_status(
@@ -38,6 +63,11 @@ async def set_lead_status(
 
     ``expected_status`` adds a guard to the filter so a transition can be made
     conditional (and race-safe) on the lead's current status.
+
+    A successful transition re-arms the lead's timed actions on the deadline
+    wheel (``Deadlines.arm_for_lead``), which also clears any that no longer
+    apply to the new status, and — for a session-ending status — stamps the
+    chat's new conversation session boundary.
     """
     oid = lead_id if isinstance(lead_id, ObjectId) else ObjectId(lead_id)
     set_fields = {"status": status, "updated_at": datetime.now(timezone.utc)}
@@ -52,9 +82,86 @@ async def set_lead_status(
     query = {"_id": oid}
     if expected_status is not None:
         query["status"] = expected_status
-    return await leads_collection.find_one_and_update(
+    lead = await leads_collection.find_one_and_update(
         query, update, return_document=ReturnDocument.AFTER
     )
+    if lead:
+        await Deadlines.arm_for_lead(lead)
+        await _stamp_sessions([lead])
+    return lead
+
+
+@dataclass
+class StatusTransition:
+    """One guarded transition for :func:`set_lead_statuses_bulk` — the same
+    arguments :func:`set_lead_status` takes for a single lead."""
+
+    lead_id: object
+    status: str
+    extra_set: Optional[dict] = None
+    extra_unset: Optional[dict] = None
+    expected_status: object = None
+
+
+async def set_lead_statuses_bulk(
+    transitions: List[StatusTransition], actor: str
+) -> List[dict]:
+    """Apply many guarded status transitions in one ``bulk_write``.
+
+    Each transition is the update :func:`set_lead_status` would issue — same
+    ``$set`` / ``$push`` / ``$unset`` and the same ``expected_status`` filter.
+    Returns the updated documents of the transitions that won (a lost guard is
+    simply absent), in input order.
+
+    A bulk write reports only counts, so each update also sets a per-call
+    ``last_transition_batch`` id and winners are read back by it: a timestamp
+    and actor are not unique to this call, since two concurrent bulk calls by
+    the same actor can share a millisecond. Write errors propagate, as
+    in the single-lead path; the winners' deadlines are re-armed in one pipeline.
+    """
+    if not transitions:
+        return []
+    now = datetime.now(timezone.utc)
+    batch = ObjectId()
+    ops = []
+    for t in transitions:
+        oid = t.lead_id if isinstance(t.lead_id, ObjectId) else ObjectId(t.lead_id)
+        set_fields = {"status": t.status, "updated_at": now}
+        if t.extra_set:
+            set_fields.update(t.extra_set)
+        set_fields["last_transition_batch"] = batch
+        update = {
+            "$set": set_fields,
+            "$push": {
+                "status_history": {
+                    **status_history_entry(t.status, actor),
+                    "at": now,
+                }
+            },
+        }
+        if t.extra_unset:
+            update["$unset"] = t.extra_unset
+        query = {"_id": oid}
+        if t.expected_status is not None:
+            query["status"] = t.expected_status
+        ops.append((oid, UpdateOne(query, update)))
+
+    result = await leads_collection.bulk_write([op for _, op in ops], ordered=False)
+    if not result.modified_count:
+        return []
+    won = {
+        lead["_id"]: lead
+        async for lead in leads_collection.find(
+            {
+                "_id": {"$in": [oid for oid, _ in ops]},
+                "last_transition_batch": batch,
+            }
+        )
+    }
+    leads = [won[oid] for oid, _ in ops if oid in won]
+    await Deadlines.arm_for_leads(leads)
+    await _stamp_sessions(leads)
+    return leads
 
 
 def is_address_complete(extracted_data) -> tuple[bool, str]:
@@ -161,6 +268,7 @@ class LeadManager:
         # persist the "Unknown Address" magic string going forward.
         if full_address in (None, "", "Unknown Address", "Unknown"):
             full_address = None
+        now = datetime.now(timezone.utc)
         try:
             lead_doc = {
                 "chat_id": chat_id,
@@ -170,7 +278,10 @@ class LeadManager:
                 "full_address": full_address,
                 "issue_type": issue_type,
                 "is_emergency": is_emergency,
-                "created_at": datetime.now(timezone.utc),
+                "created_at": now,
+                # Set at creation too, so `updated_at` alone orders every lead
+                # write (the lead-events poller tails it).
+                "updated_at": now,
                 "history": [],
                 "status_history": [status_history_entry(status, Actor.SYSTEM)],
                 "pro_id": pro_id,
@@ -184,6 +295,7 @@ class LeadManager:
             }
             if media_url:
                 lead_doc["media_urls"] = [media_url]
+            with_shard_key(lead_doc)
 
             if status == LeadStatus.CONTACTED and not pro_id:
                 # Atomic find-or-create: prevents duplicate active leads per customer
@@ -200,10 +312,12 @@ class LeadManager:
                 logger.info(
                     f"Lead found-or-created: {result['_id']} (Status: {status})"
                 )
+                await Deadlines.arm_for_lead(result)
                 return result
 
             result = await leads_collection.insert_one(lead_doc)
             lead_doc["_id"] = result.inserted_id
+            await Deadlines.arm_for_lead(lead_doc)
             logger.info(
                 f"Lead created/inserted: {result.inserted_id} (Status: {status})"
             )
@@ -213,6 +327,11 @@ class LeadManager:
             return None
 
     async def log_message(self, chat_id: str, role: str, text: str):
+        # Write-behind: Redis context + durable spill now, Mongo in batches
+        if settings.MESSAGE_LOG_WRITE_BEHIND_ENABLED:
+            await MessageLogWriter.log(chat_id, role, text)
+            return
+
         # 1. MongoDB Insert (Safety)
         msg_doc = {
             "chat_id": chat_id,
@@ -229,11 +348,9 @@ class LeadManager:
         self, chat_id: str, limit: int = settings.MAX_CHAT_HISTORY
     ) -> list:
         # 1. Try fetching from ContextManager (Redis)
-        cached_history = await ContextManager.get_history(chat_id)
+        cached_history = await ContextManager.get_history(chat_id, limit=limit)
 
         if cached_history is not None:
-            if len(cached_history) > limit:
-                return cached_history[-limit:]
             return cached_history
 
         # 2. Mongo fallback — scope to messages that belong to the *current*
@@ -242,31 +359,10 @@ class LeadManager:
         # lead closed belong to an old session and MUST NOT leak into the new
         # AI prompt. Without this cutoff, every post-completion rehydration
         # would re-inject stale context and confuse Gemini.
-        terminal_statuses = [
-            LeadStatus.COMPLETED,
-            LeadStatus.REJECTED,
-            LeadStatus.CLOSED,
-            LeadStatus.CANCELLED,
-        ]
-        last_terminal = await leads_collection.find_one(
-            {"chat_id": chat_id, "status": {"$in": terminal_statuses}},
-            sort=[("completed_at", -1), ("created_at", -1)],
-        )
-        cutoff = None
-        if last_terminal:
-            cutoff = (
-                last_terminal.get("completed_at")
-                or last_terminal.get("closed_at")
-                or last_terminal.get("updated_at")
-                or last_terminal.get("created_at")
-            )
-
-        query = {"chat_id": chat_id}
-        if cutoff:
-            query["timestamp"] = {"$gt": cutoff}
-
-        cursor = messages_collection.find(query).sort("timestamp", 1).limit(limit)
-        msgs = await cursor.to_list(length=limit)
+        cutoff = await self.get_session_cutoff(chat_id)
+        # The newest `limit` messages of the session, oldest first.
+        cursor = self.session_history_cursor(chat_id, cutoff, limit)
+        msgs = list(reversed(await cursor.to_list(length=limit)))
 
         formatted = []
         for m in msgs:
@@ -282,6 +378,33 @@ class LeadManager:
 
         return formatted
 
+    @staticmethod
+    def session_history_cursor(chat_id: str, cutoff, limit: int):
+        """The rehydration query: one range read on the (chat_id, timestamp)
+        index, newest first (tests/test_session_cutoff.py checks its plan)."""
+        query = {"chat_id": chat_id}
+        if cutoff:
+            query["timestamp"] = {"$gt": cutoff}
+        return messages_collection.find(query).sort("timestamp", -1).limit(limit)
+
+    async def get_session_cutoff(self, chat_id: str):
+        """When the chat's current conversation session started — its last
+        session-ending lead — or None. A point read on ``chat_sessions``."""
+        session = await chat_sessions_collection.find_one({"_id": chat_id})
+        if session is not None:
+            return session.get("started_at")
+
+        # Chats whose last session ended before boundaries were stamped:
+        # derive it from their leads once and stamp it (None = no session
+        # has ended yet, so the leads are not searched again).
+        last_terminal = await leads_collection.find_one(
+            {"chat_id": chat_id, "status": {"$in": list(SESSION_ENDING_STATUSES)}},
+            sort=[("completed_at", -1), ("created_at", -1)],
+        )
+        cutoff = session_end(last_terminal) if last_terminal else None
+        await chat_sessions_collection.bulk_write([session_stamp(chat_id, cutoff)])
+        return cutoff
+
     async def get_lead_by_id(self, lead_id: str):
         try:
             return await leads_collection.find_one({"_id": ObjectId(lead_id)})
@@ -2,7 +2,8 @@ from app.core.database import users_collection, leads_collection, slots_collecti
 from app.core.logger import logger
 from app.core.constants import LeadStatus, WorkerConstants, ISRAEL_CITIES_COORDS
 from app.services.geocoding_service import resolve_city_to_coords
-from app.services.scheduling_service import check_pro_availability
+from app.services.availability_cache_service import AvailabilityCache
+from app.services.scheduling_service import get_earliest_free_slots
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from bson import ObjectId
@@ -151,6 +152,29 @@ async def determine_best_pro(
         async for doc in leads_collection.aggregate(load_pipeline):
             load_counts[doc["_id"]] = doc["count"]
 
+        eligible = [
+            pro
+            for pro in matching_pros
+            if load_counts.get(pro["_id"], 0) < WorkerConstants.MAX_PRO_LOAD
+        ]
+        # One availability lookup for every eligible pro (a single Redis round
+        # trip on a warm cache) instead of a slots query per candidate.
+        earliest_slots = None
+        if eligible:
+            try:
+                earliest_slots = await get_earliest_free_slots(
+                    [pro["_id"] for pro in eligible]
+                )
+            except Exception as e:
+                # Fail-open (pros stay eligible) but no longer silent: a
+                # broken availability check hands leads to booked-out
+                # pros with zero trace. ERROR so the Sentry bridge sees
+                # a systematic failure (throttled per site).
+                logger.error(
+                    f"Availability check failed for {len(eligible)} pros — "
+                    f"treating as available: {e}"
+                )
+
         candidates = []
 
         for pro in matching_pros:
@@ -159,18 +183,11 @@ async def determine_best_pro(
             no_shows = pro.get("no_show_count", 0)
 
             if current_load < WorkerConstants.MAX_PRO_LOAD:
-                has_slots = True
-                try:
-                    has_slots = await check_pro_availability(pro["_id"])
-                except Exception as e:
-                    # Fail-open (pro stays eligible) but no longer silent: a
-                    # broken availability check hands leads to booked-out
-                    # pros with zero trace. ERROR so the Sentry bridge sees
-                    # a systematic failure (throttled per site).
-                    logger.error(
-                        f"Availability check failed for pro {pro['_id']} — "
-                        f"treating as available: {e}"
-                    )
+                if earliest_slots is None:
+                    has_slots, earliest = True, None
+                else:
+                    earliest = earliest_slots.get(str(pro["_id"]))
+                    has_slots = earliest is not None
 
                 candidates.append(
                     {
@@ -178,6 +195,7 @@ async def determine_best_pro(
                         "load": current_load,
                         "rating": rating,
                         "has_slots": has_slots,
+                        "earliest_slot": earliest,
                         "no_shows": no_shows,
                     }
                 )
@@ -192,11 +210,14 @@ async def determine_best_pro(
             )
             return None
 
-        # 4. Final Selection — sort by composite score (rating + slots - no-shows)
+        # 4. Final Selection — sort by composite score (rating + slots - no-shows);
+        # ties go to the pro who can come soonest.
         def candidate_score(c):
             slot_bonus = 10 if c.get("has_slots", True) else 0
             no_show_penalty = c.get("no_shows", 0) * 0.5
-            return slot_bonus + c["rating"] - no_show_penalty
+            earliest = c.get("earliest_slot")
+            soonest = -earliest.timestamp() if earliest else float("-inf")
+            return (slot_bonus + c["rating"] - no_show_penalty, soonest)
 
         candidates.sort(key=candidate_score, reverse=True)
         selected = candidates[0]
@@ -253,6 +274,7 @@ async def book_slot_for_lead(
         )
 
         if slot:
+            await AvailabilityCache.remove_slot(slot["pro_id"], slot["_id"])
             logger.info(
                 f"📅 Booked slot {slot['_id']} for Pro {pro_id} at {slot['start_time']}"
             )
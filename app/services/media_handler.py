@@ -1,6 +1,6 @@
 from app.core.logger import logger
 from app.core.constants import Defaults
-from app.core.http_client import get_http_client
+from app.core.http_client import MEDIA, get_http_client
 
 
 async def detect_and_fetch_media(media_url: str) -> tuple[bytes | None, str | None]:
@@ -16,7 +16,7 @@ async def detect_and_fetch_media(media_url: str) -> tuple[bytes | None, str | No
     media_mime = None
 
     try:
-        client = await get_http_client()
+        client = await get_http_client(MEDIA)
         head_resp = await client.head(media_url)
         content_type = head_resp.headers.get("Content-Type", "")
 
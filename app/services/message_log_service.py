@@ -0,0 +1,280 @@
+"""Write-behind message log (MESSAGE_LOG_WRITE_BEHIND_ENABLED).
+
+``LeadManager.log_message`` used to await a ``messages`` insert_one and then
+a separate RPUSH and EXPIRE for every user and model turn, so each reply paid
+for at least two Mongo inserts and four Redis commands before the next step
+of the workflow could run. With the flag on, :meth:`MessageLogWriter.log`
+does one pipelined Redis round trip instead:
+
+* the Redis context (``context:{chat_id}``) is appended to, trimmed and its
+  TTL reset, exactly as ``ContextManager.update_history`` does — the AI prompt
+  reads it, so it stays synchronous;
+* the ``messages`` document, with its ``_id`` already assigned, is appended
+  to the ``messages:spill`` stream.
+
+The document is then buffered in process and flushed with an unordered
+``insert_many`` MESSAGE_LOG_FLUSH_INTERVAL_SECONDS after the first buffered
+message, or as soon as MESSAGE_LOG_FLUSH_MAX_ITEMS are buffered; the flushed
+messages' stream entries are deleted. A failed flush keeps its messages for
+the next one. If the process dies first, the stream still holds them:
+:meth:`MessageLogWriter.recover` (a worker loop) inserts every entry older
+than MESSAGE_LOG_RECOVER_AGE_SECONDS. Because ``_id`` travels with the
+document, a message inserted twice — recovered while its own process was
+still retrying — is rejected as a duplicate key rather than stored twice.
+Right-to-delete (:meth:`MessageLogWriter.erase`) leaves a tombstone
+(``messages:erased:{chat_id}``) that every process's flush and recovery check
+before inserting, so a message another replica still buffers cannot land after
+the erase, and purges the chat's spill entries.
+
+If the pipeline fails (Redis down) the message is written straight to Mongo,
+as with the flag off.
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from app.core.background import BackgroundTasks
+from app.core.constants import (
+    MESSAGE_LOG_ERASED_KEY,
+    MESSAGE_LOG_SPILL_KEY,
+    WorkerConstants,
+)
+from app.core.database import messages_collection
+from app.core.logger import logger
+from app.core.phone import mask_chat_id as _mask
+from app.core.redis_client import get_redis_client
+from app.services.context_manager_service import ContextManager
+
+_DUPLICATE_KEY = 11000
+
+
+def _dump(doc: dict) -> str:
+    return json.dumps(
+        {**doc, "_id": str(doc["_id"]), "timestamp": doc["timestamp"].isoformat()}
+    )
+
+
+def _load(raw: str) -> dict:
+    doc = json.loads(raw)
+    doc["_id"] = ObjectId(doc["_id"])
+    doc["timestamp"] = datetime.fromisoformat(doc["timestamp"])
+    return doc
+
+
+async def _drop_erased(docs: list[dict]) -> list[dict]:
+    """``docs`` without the messages of erased chats logged before the erase.
+    Raises on a Redis error, so the caller keeps them for the next attempt."""
+    chat_ids = sorted({doc["chat_id"] for doc in docs})
+    redis = await get_redis_client()
+    stamps = await redis.mget([MESSAGE_LOG_ERASED_KEY.format(chat_id=c) for c in chat_ids])
+    erased_at = {c: float(stamp) for c, stamp in zip(chat_ids, stamps) if stamp is not None}
+    if not erased_at:
+        return docs
+    kept = [
+        doc
+        for doc in docs
+        if doc["timestamp"].timestamp() > erased_at.get(doc["chat_id"], float("-inf"))
+    ]
+    if len(kept) < len(docs):
+        logger.info(f"Message log dropped {len(docs) - len(kept)} message(s) of erased chats")
+    return kept
+
+
+async def _insert(docs: list[dict]) -> None:
+    """insert_many that treats already-stored messages as written and skips
+    the messages of erased chats."""
+    docs = await _drop_erased(docs)
+    if not docs:
+        return
+    try:
+        await messages_collection.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        details = e.details or {}
+        errors = details.get("writeErrors", [])
+        if details.get("writeConcernErrors") or any(
+            err.get("code") != _DUPLICATE_KEY for err in errors
+        ):
+            raise
+
+
+async def _delete_spilled(entry_ids: list[str]) -> None:
+    if not entry_ids:
+        return
+    try:
+        redis = await get_redis_client()
+        await redis.xdel(MESSAGE_LOG_SPILL_KEY, *entry_ids)
+    except Exception as e:
+        # Left behind, they are recovered later as duplicates and skipped.
+        logger.warning(f"Message log spill cleanup failed ({len(entry_ids)} entries): {e}")
+
+
+class MessageLogWriter:
+    # Buffered messages in log order: (spill stream entry id, document).
+    _pending: list[tuple[str, dict]] = []
+    _timer: asyncio.Task | None = None
+
+    @classmethod
+    async def log(cls, chat_id: str, role: str, text: str) -> None:
+        doc = {
+            "_id": ObjectId(),
+            "chat_id": chat_id,
+            "role": role,
+            "text": text,
+            "timestamp": datetime.now(timezone.utc),
+        }
+        try:
+            redis = await get_redis_client()
+            async with redis.pipeline(transaction=True) as pipe:
+                ContextManager.stage_history(pipe, chat_id, role, text)
+                pipe.xadd(
+                    MESSAGE_LOG_SPILL_KEY,
+                    {"doc": _dump(doc)},
+                    maxlen=WorkerConstants.MESSAGE_LOG_SPILL_MAXLEN,
+                    approximate=True,
+                )
+                results = await pipe.execute()
+        except Exception as e:
+            logger.warning(
+                f"Message log spill failed for {_mask(chat_id)}, writing through: {e}"
+            )
+            await messages_collection.insert_one(doc)
+            return
+        cls.add(results[-1], doc)
+
+    @classmethod
+    def add(cls, entry_id: str, doc: dict) -> None:
+        cls._pending.append((entry_id, doc))
+        if len(cls._pending) >= WorkerConstants.MESSAGE_LOG_FLUSH_MAX_ITEMS:
+            BackgroundTasks.spawn(cls._flush_logged(), "message_log_flush", key="message_log_flush")
+        elif cls._timer is None or cls._timer.done():
+            cls._timer = BackgroundTasks.spawn(cls._flush_later(), "message_log_flush_timer")
+
+    @classmethod
+    async def flush(cls) -> int:
+        """Insert everything buffered now. Raises on a Mongo error, after
+        putting the messages back ahead of any logged since."""
+        pending, cls._pending = cls._pending, []
+        if not pending:
+            return 0
+        try:
+            await _insert([doc for _, doc in pending])
+        except Exception:
+            cls._pending = pending + cls._pending
+            overflow = len(cls._pending) - WorkerConstants.MESSAGE_LOG_BUFFER_MAX_ITEMS
+            if overflow > 0:
+                # Still in the spill stream; recovery inserts them.
+                del cls._pending[:overflow]
+                logger.error(
+                    f"Message log buffer full — left {overflow} message(s) to spill recovery"
+                )
+            raise
+        await _delete_spilled([entry_id for entry_id, _ in pending])
+        return len(pending)
+
+    @classmethod
+    async def _flush_logged(cls) -> None:
+        try:
+            await cls.flush()
+        except Exception as e:
+            logger.warning(f"Message log flush failed, retrying with the next batch: {e}")
+
+    @classmethod
+    async def _flush_later(cls) -> None:
+        await asyncio.sleep(WorkerConstants.MESSAGE_LOG_FLUSH_INTERVAL_SECONDS)
+        await cls._flush_logged()
+
+    @classmethod
+    async def close(cls) -> None:
+        """Flush what is left on shutdown. Never raises; what cannot be
+        written stays in the spill stream."""
+        if cls._timer is not None and not cls._timer.done():
+            cls._timer.cancel()
+        cls._timer = None
+        await cls._flush_logged()
+
+    @classmethod
+    async def recover(cls) -> int:
+        """Insert the spilled messages older than MESSAGE_LOG_RECOVER_AGE_SECONDS
+        — ones whose process died before flushing them — and delete their
+        entries. Returns how many were recovered."""
+        redis = await get_redis_client()
+        newest = int((time.time() - WorkerConstants.MESSAGE_LOG_RECOVER_AGE_SECONDS) * 1000)
+        recovered = 0
+        while True:
+            entries = await redis.xrange(
+                MESSAGE_LOG_SPILL_KEY,
+                min="-",
+                max=str(newest),
+                count=WorkerConstants.MESSAGE_LOG_RECOVER_BATCH,
+            )
+            if not entries:
+                break
+            await _insert([_load(fields["doc"]) for _, fields in entries])
+            await redis.xdel(MESSAGE_LOG_SPILL_KEY, *[entry_id for entry_id, _ in entries])
+            recovered += len(entries)
+        if recovered:
+            logger.warning(f"Recovered {recovered} spilled message(s) into Mongo")
+        return recovered
+
+    @classmethod
+    async def erase(cls, chat_id: str) -> int:
+        """Right-to-delete: tombstone ``chat_id`` so no process inserts a
+        message of it logged until now, then :meth:`purge` its spill entries.
+        Returns how many entries were purged; raises on a Redis error."""
+        redis = await get_redis_client()
+        await redis.set(
+            MESSAGE_LOG_ERASED_KEY.format(chat_id=chat_id),
+            time.time(),
+            ex=WorkerConstants.MESSAGE_LOG_ERASED_TTL_SECONDS,
+        )
+        return await cls.purge(chat_id)
+
+    @classmethod
+    async def purge(cls, chat_id: str) -> int:
+        """Delete ``chat_id``'s entries from the spill stream, whatever their
+        age, so :meth:`recover` cannot re-insert an erased chat's messages.
+        Walks the whole stream in MESSAGE_LOG_RECOVER_BATCH pages. Returns how
+        many were deleted; raises on a Redis error."""
+        redis = await get_redis_client()
+        batch = WorkerConstants.MESSAGE_LOG_RECOVER_BATCH
+        after = "-"
+        purged = 0
+        while True:
+            entries = await redis.xrange(MESSAGE_LOG_SPILL_KEY, min=after, max="+", count=batch)
+            if not entries:
+                break
+            mine = [
+                entry_id
+                for entry_id, fields in entries
+                if json.loads(fields["doc"]).get("chat_id") == chat_id
+            ]
+            if mine:
+                purged += await redis.xdel(MESSAGE_LOG_SPILL_KEY, *mine)
+            if len(entries) < batch:
+                break
+            after = f"({entries[-1][0]}"
+        return purged
+
+    @classmethod
+    async def recover_forever(cls) -> None:
+        """Worker loop around :meth:`recover`."""
+        while True:
+            try:
+                await cls.recover()
+            except Exception as e:
+                logger.warning(f"Message log spill recovery failed: {e}")
+            await asyncio.sleep(WorkerConstants.MESSAGE_LOG_RECOVER_INTERVAL_SECONDS)
+
+    @classmethod
+    def reset(cls) -> None:
+        """Drop the buffer unwritten (tests)."""
+        timer = cls._timer
+        if timer is not None and not timer.done() and not timer.get_loop().is_closed():
+            timer.cancel()
+        cls._timer = None
+        cls._pending = []
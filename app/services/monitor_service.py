@@ -1,14 +1,32 @@
 import time
 from datetime import datetime, timedelta, timezone
 from app.core.database import leads_collection, users_collection
-from app.core.constants import LeadStatus, UserStates, WorkerConstants, Defaults, Actor
+from app.core.constants import (
+    Actor,
+    DeadlineAction,
+    Defaults,
+    LeadStatus,
+    UserStates,
+    WorkerConstants,
+)
 from app.core.phone import to_chat_id, to_local_phone
-from app.services.lead_manager_service import set_lead_status
+from app.services.lead_manager_service import (
+    StatusTransition,
+    set_lead_status,
+    set_lead_statuses_bulk,
+)
 from app.core.logger import logger, page_critical
 from app.core.redis_client import get_redis_client
+from app.core.fanout import bounded_fanout
+from app.core.sweep import run_sweep
 from app.core.datetime_utils import within_business_hours
-from app.providers.whatsapp import get_whatsapp, record_account_state
+from app.providers.whatsapp import (
+    announce_breaker_change,
+    get_whatsapp,
+    record_account_state,
+)
 from app.providers.whatsapp.facade import _PAUSE_KEY
+from app.providers.whatsapp.outbox import queued_sends
 from app.services import matching_service
 from app.services.notification_service import (
     send_oncall_alert,
@@ -18,11 +36,67 @@ from app.services.notification_service import (
 from app.core.messages import Messages
 from app.services.context_manager_service import ContextManager
 from app.services.state_manager_service import StateManager
+from app.services.deadline_service import (
+    Deadlines,
+    approval_sla_minutes,
+    deadlines_for_lead,
+)
 from bson import ObjectId
+from typing import Optional
 
 whatsapp = get_whatsapp()
 
 
+def _as_utc(dt: datetime) -> datetime:
+    # Mongo hands datetimes back tz-naive; make them UTC-aware before any
+    # arithmetic against an aware `now`.
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt
+
+
+async def rearm_lead_deadlines(lead) -> None:
+    """Lead-event handler: re-sync the deadline wheel after any status change.
+
+    ``set_lead_status`` already arms in-process; this covers writers that
+    bypass it — chiefly the admin panel's table editor, which writes ``status``
+    through its own sync client.
+    """
+    await Deadlines.arm_for_lead(lead)
+
+
+# Sweep projections — only what each per-lead handler reads. The Healer passes
+# the lead on to matching/notification code and so reads whole documents.
+_JANITOR_FIELDS = {"chat_id": 1, "status": 1, "created_at": 1, "pro_id": 1}
+_REPORTER_FIELDS = {"chat_id": 1, "issue_type": 1, "full_address": 1, "created_at": 1}
+_APPROVAL_FIELDS = {
+    "chat_id": 1,
+    "status": 1,
+    "pro_id": 1,
+    "pro_notified_at": 1,
+    "approval_nudged": 1,
+    "reassign_offered": 1,
+    "is_emergency": 1,
+}
+_DEFLECTION_FIELDS = {"chat_id": 1, "status": 1, "is_paused": 1, "paused_at": 1}
+_STALE_BOOKED_FIELDS = {
+    "status": 1,
+    "reminders_sent": 1,
+    "last_reminder_at": 1,
+    "appointment_datetime": 1,
+    "updated_at": 1,
+    "pro_id": 1,
+    "customer_name": 1,
+}
+
+
+# --- Per-lead handlers ---------------------------------------------------------
+# Each timed action is one function over a single lead, shared by the deadline
+# dispatcher (app/scheduler.py → deadline_service) and the interval sweep below
+# it, which is now only the safety net. A handler re-checks its own condition
+# against the lead it is given — a deadline is a hint, and the lead may have
+# moved on since it was armed — and returns the datetime to re-arm at when the
+# clock turned out to have been reset (None otherwise).
+
+
 async def _alert_admin_lead_escalated(lead, attempts: int) -> None:
     """Page the admin the moment a lead exhausts its reassignments (PRO-63).
 
@@ -62,6 +136,37 @@ async def _alert_admin_lead_escalated(lead, attempts: int) -> None:
         )
 
 
+async def _after_exhausted_escalation(lead) -> None:
+    """Side effects of a won PRO-63 escalation (reassignments exhausted)."""
+    chat_id = lead["chat_id"]
+    reassignment_count = lead.get("reassignment_count", 0)
+    try:
+        await whatsapp.send_message(chat_id, Messages.SOS.MAX_REASSIGNMENTS_REACHED)
+    except Exception as e:
+        logger.error(
+            f"Failed to notify customer ...{chat_id[-8:]} of escalation: {e}"
+        )
+    # The customer message promises a callback within the hour; the batched
+    # Reporter only runs every 4h, so page the admin now. Best-effort — a
+    # failed alert must not abort the escalation (the lead is already in
+    # PENDING_ADMIN_REVIEW, and the Reporter remains the safety net).
+    await _alert_admin_lead_escalated(lead, reassignment_count)
+    # Release the customer's FSM state (not just context) — this branch is
+    # reachable from the PRO-56 "1" reply, so a customer whose lead just
+    # escalated must not stay parked in AWAITING_PRO_APPROVAL.
+    await StateManager.clear_state(chat_id)
+    await ContextManager.clear_context(chat_id)
+    logger.warning(
+        f"🚨 [Reassign] Lead {lead['_id']} escalated to PENDING_ADMIN_REVIEW after "
+        f"{reassignment_count} reassignments."
+    )
+
+
+def _has_usable_location(lead) -> bool:
+    raw_location = lead.get("full_address")
+    return bool(raw_location) and raw_location != Defaults.UNKNOWN_ADDRESS
+
+
 async def reassign_lead(lead) -> bool:
     """Reassign one lead to the next-best pro, excluding its current pro.
 
@@ -122,33 +227,14 @@ async def reassign_lead(lead) -> bool:
             )
             return False
 
-        try:
-            await whatsapp.send_message(chat_id, Messages.SOS.MAX_REASSIGNMENTS_REACHED)
-        except Exception as e:
-            logger.error(
-                f"Failed to notify customer ...{chat_id[-8:]} of escalation: {e}"
-            )
-        # The customer message promises a callback within the hour; the batched
-        # Reporter only runs every 4h, so page the admin now. Best-effort — a
-        # failed alert must not abort the escalation (the lead is already in
-        # PENDING_ADMIN_REVIEW, and the Reporter remains the safety net).
-        await _alert_admin_lead_escalated(lead, reassignment_count)
-        # Release the customer's FSM state (not just context) — this branch is
-        # reachable from the PRO-56 "1" reply, so a customer whose lead just
-        # escalated must not stay parked in AWAITING_PRO_APPROVAL.
-        await StateManager.clear_state(chat_id)
-        await ContextManager.clear_context(chat_id)
-        logger.warning(
-            f"🚨 [Reassign] Lead {lead_id} escalated to PENDING_ADMIN_REVIEW after "
-            f"{reassignment_count} reassignments."
-        )
+        await _after_exhausted_escalation(lead)
         return False
 
     # Skip leads without a real, usable location — geo matching would always fail
     # and escalate to PENDING_ADMIN_REVIEW, burning a CUSTOMER_REASSIGNING notice
     # each cycle. Hand to the admin directly.
     raw_location = lead.get("full_address")
-    if not raw_location or raw_location == Defaults.UNKNOWN_ADDRESS:
+    if not _has_usable_location(lead):
         logger.info(
             f"⏭️ [Reassign] Skipping lead {lead_id} for ...{chat_id[-8:]} — no usable "
             f"location (full_address={raw_location!r}). Escalating to PENDING_ADMIN_REVIEW."
@@ -179,8 +265,11 @@ async def reassign_lead(lead) -> bool:
     if new_pro:
         new_pro_id = new_pro["_id"]
 
-        # 3. Update lead — increment counter, reset timers + PRO-56 SLA clock
-        await set_lead_status(
+        # 3. Update lead — increment counter, reset timers + PRO-56 SLA clock.
+        # Guarded on the status we read, like the escalation above: a pro who
+        # accepted (or a concurrent reassign) in the meantime wins, and we must
+        # not notify a second pro about a lead that is no longer theirs.
+        reassigned = await set_lead_status(
             lead_id,
             LeadStatus.NEW,
             Actor.SYSTEM,
@@ -193,7 +282,14 @@ async def reassign_lead(lead) -> bool:
                 "reassigned_from": current_pro_id,
                 "reassignment_count": reassignment_count + 1,
             },
+            expected_status=lead.get("status"),
         )
+        if not reassigned:
+            logger.info(
+                f"⏭️ [Reassign] Lead {lead_id} changed status concurrently — "
+                "not reassigning."
+            )
+            return False
 
         # 4. Notify new pro
         await notify_pro_new_lead(lead, new_pro, whatsapp)
@@ -248,7 +344,8 @@ async def reassign_lead(lead) -> bool:
 async def check_and_reassign_stale_leads():
     """
     AUTO-RECOVERY ("The Healer"):
-    Runs frequently (e.g., every 10 mins).
+    Safety-net sweep (every DEADLINE_SAFETY_SWEEP_MINUTES); the deadline
+    dispatcher normally reaches each lead at its own T+SOS_TIMEOUT first.
     Finds stale leads and automatically re-assigns them to a new pro.
     """
     logger.info("🕵️ [SOS Healer] Checking for stale leads to reassign...")
@@ -268,24 +365,97 @@ async def check_and_reassign_stale_leads():
     }
 
     try:
-        cursor = leads_collection.find(query)
-        stale_leads = await cursor.to_list(length=WorkerConstants.DB_QUERY_LIMIT)
-
-        if not stale_leads:
+        # Full documents (no projection): reassign_lead hands the lead on to
+        # notify_pro_new_lead, which renders most of its fields.
+        result = await run_sweep(
+            "sos_healer", leads_collection, query, reassign_stale_leads, per_page=True
+        )
+        if not result.processed:
             logger.info("✅ [SOS Healer] No stale leads found.")
             return
-
         logger.warning(
-            f"🕵️ [SOS Healer] Found {len(stale_leads)} stale leads. Attempting reassignment..."
+            f"🕵️ [SOS Healer] Attempted reassignment of {result.processed} stale "
+            f"lead(s) ({result.failed} failed)."
         )
-
-        for lead in stale_leads:
-            await reassign_lead(lead)
+        return result.as_dict()
 
     except Exception as e:
         logger.error(f"❌ [SOS Healer] Error: {e}")
 
 
+def _healer_due_at(lead) -> Optional[datetime]:
+    if lead.get("status") not in (LeadStatus.NEW, LeadStatus.CONTACTED):
+        return None
+    created_at = lead.get("created_at")
+    if not created_at:
+        return None
+    return _as_utc(created_at) + timedelta(minutes=WorkerConstants.SOS_TIMEOUT_MINUTES)
+
+
+async def reassign_stale_lead(lead) -> Optional[datetime]:
+    """Healer, one lead: reassign it once it has gone SOS_TIMEOUT_MINUTES unaccepted."""
+    due = _healer_due_at(lead)
+    if due is None:
+        return None
+    if due > datetime.now(timezone.utc):
+        return due
+    await reassign_lead(lead)
+    return None
+
+
+async def reassign_stale_leads(leads) -> int:
+    """Healer, one sweep page. The leads that go straight to a human —
+    reassignments exhausted (PRO-63) or no usable location — are escalated in
+    one ``set_lead_statuses_bulk``; the rest run ``reassign_lead`` as before.
+    Returns how many leads failed."""
+    now = datetime.now(timezone.utc)
+    stale = [lead for lead in leads if (_healer_due_at(lead) or now) < now]
+
+    escalations, reassignable = [], []
+    for lead in stale:
+        if lead.get("reassignment_count", 0) >= WorkerConstants.MAX_REASSIGNMENTS:
+            # Same idempotency guard as reassign_lead: never re-escalate.
+            if lead.get("escalation_reason") == "max_reassignments_exhausted":
+                continue
+            reason = "max_reassignments_exhausted"
+        elif not _has_usable_location(lead):
+            reason = "no_usable_location"
+        else:
+            reassignable.append(lead)
+            continue
+        escalations.append(
+            StatusTransition(
+                lead["_id"],
+                LeadStatus.PENDING_ADMIN_REVIEW,
+                extra_set={"escalation_reason": reason},
+                expected_status=lead.get("status"),
+            )
+        )
+
+    by_id = {lead["_id"]: lead for lead in stale}
+    escalated = await set_lead_statuses_bulk(escalations, Actor.SYSTEM)
+
+    async def follow_up(updated) -> None:
+        lead = by_id[updated["_id"]]
+        if updated.get("escalation_reason") == "max_reassignments_exhausted":
+            await _after_exhausted_escalation(lead)
+        else:
+            logger.info(
+                f"⏭️ [Reassign] Lead {lead['_id']} has no usable location — "
+                "escalated to PENDING_ADMIN_REVIEW."
+            )
+            await StateManager.clear_state(lead["chat_id"])
+
+    concurrency = WorkerConstants.SWEEP_CONCURRENCY
+    notified = await bounded_fanout(
+        escalated, follow_up, concurrency=concurrency, label="SOS Healer"
+    )
+    reassigned = await bounded_fanout(
+        reassignable, reassign_lead, concurrency=concurrency, label="SOS Healer"
+    )
+    return notified.failed + reassigned.failed
+
+
 async def auto_reject_unassigned_leads():
     """
     AUTO-REJECTION ("The Janitor"):
@@ -305,41 +475,85 @@ async def auto_reject_unassigned_leads():
     }
 
     try:
-        cursor = leads_collection.find(query)
-        stale_unassigned = await cursor.to_list(length=WorkerConstants.DB_QUERY_LIMIT)
-
-        if not stale_unassigned:
+        result = await run_sweep(
+            "lead_janitor",
+            leads_collection,
+            query,
+            close_unassigned_leads,
+            projection=_JANITOR_FIELDS,
+            per_page=True,
+        )
+        if not result.processed:
             logger.info("✅ [Janitor] No unassigned stale leads found.")
             return
+        logger.warning(f"🧹 [Janitor] Processed {result.processed} unassigned lead(s).")
+        return result.as_dict()
 
-        logger.warning(
-            f"🧹 [Janitor] Closing {len(stale_unassigned)} unassigned leads."
-        )
+    except Exception as e:
+        logger.error(f"❌ [Janitor] Error: {e}")
+
+
+def _janitor_due_at(lead) -> Optional[datetime]:
+    # `"pro_id" not in lead` matches the sweep's `$exists: False`.
+    if lead.get("status") != LeadStatus.CONTACTED or "pro_id" in lead:
+        return None
+    created_at = lead.get("created_at")
+    if not created_at:
+        return None
+    return _as_utc(created_at) + timedelta(
+        hours=WorkerConstants.UNASSIGNED_LEAD_TIMEOUT_HOURS
+    )
+
+
+async def close_unassigned_lead(lead) -> Optional[datetime]:
+    """Janitor, one lead: close a CONTACTED lead no pro was ever assigned to."""
+    due = _janitor_due_at(lead)
+    if due is None:
+        return None
+    if due > datetime.now(timezone.utc):
+        return due
+    await close_unassigned_leads([lead])
+    return None
 
-        for lead in stale_unassigned:
-            lead_id = lead["_id"]
-            chat_id = lead.get("chat_id")
 
-            await set_lead_status(
-                lead_id,
+async def close_unassigned_leads(leads) -> int:
+    """Janitor, one sweep page: close every due lead in one guarded
+    ``set_lead_statuses_bulk`` and notify the customers whose close won.
+    Returns how many notifications failed."""
+    now = datetime.now(timezone.utc)
+    closed = await set_lead_statuses_bulk(
+        [
+            StatusTransition(
+                lead["_id"],
                 LeadStatus.CLOSED,
-                Actor.SYSTEM,
                 extra_set={"closed_reason": "no_pro_available"},
+                expected_status=LeadStatus.CONTACTED,
             )
+            for lead in leads
+            if (_janitor_due_at(lead) or now) < now
+        ],
+        Actor.SYSTEM,
+    )
 
-            if chat_id:
-                try:
-                    await whatsapp.send_message(chat_id, Messages.SOS.NO_PRO_AVAILABLE)
-                except Exception as e:
-                    logger.error(f"Failed to notify customer {chat_id} of closure: {e}")
-                await ContextManager.clear_context(chat_id)
-
-            logger.info(
-                f"🧹 [Janitor] Closed unassigned lead {lead_id} (chat: {chat_id})"
-            )
+    async def notify(lead) -> None:
+        chat_id = lead.get("chat_id")
+        if chat_id:
+            try:
+                await whatsapp.send_message(chat_id, Messages.SOS.NO_PRO_AVAILABLE)
+            except Exception as e:
+                logger.error(f"Failed to notify customer {chat_id} of closure: {e}")
+            await ContextManager.clear_context(chat_id)
+        logger.info(
+            f"🧹 [Janitor] Closed unassigned lead {lead['_id']} (chat: {chat_id})"
+        )
 
-    except Exception as e:
-        logger.error(f"❌ [Janitor] Error: {e}")
+    notified = await bounded_fanout(
+        closed,
+        notify,
+        concurrency=WorkerConstants.SWEEP_CONCURRENCY,
+        label="Janitor",
+    )
+    return notified.failed
 
 
 async def send_periodic_admin_report():
@@ -365,36 +579,52 @@ async def send_periodic_admin_report():
         "created_at": {"$lt": threshold_time},
     }
 
+    # PRO-88: paged via Sentry, not WhatsApp. The admin's Cloud API service
+    # window is permanently closed, so this batched digest would have needed
+    # its own approved template. Phones are masked to their last 4 digits —
+    # this is a "go look at the panel" signal, not a data export. Every stuck
+    # lead is counted; only the first SWEEP_REPORT_MAX_LINES are itemised.
+    lead_lines = []
+
+    async def add_line(lead) -> None:
+        if len(lead_lines) >= WorkerConstants.SWEEP_REPORT_MAX_LINES:
+            return
+        local = (lead.get("chat_id") or "").split("@")[0]
+        created_at = lead.get("created_at")
+        lead_lines.append(
+            f"- ***{local[-4:]}: {lead.get('issue_type') or 'unknown issue'}"
+            f" in {lead.get('full_address') or 'unknown city'}"
+            f" (waiting since {created_at.strftime('%H:%M') if created_at else '??'})"
+        )
+
     try:
-        cursor = leads_collection.find(query)
-        stuck_leads = await cursor.to_list(length=WorkerConstants.DB_QUERY_LIMIT)
+        # One pass, never resumed: a digest split across runs would under-report.
+        result = await run_sweep(
+            "sos_reporter",
+            leads_collection,
+            query,
+            add_line,
+            projection=_REPORTER_FIELDS,
+            time_budget_seconds=float("inf"),
+        )
+        count = result.processed
 
-        if not stuck_leads:
+        if not count:
             logger.info("✅ [SOS Reporter] No stuck leads to report.")
             return
 
-        count = len(stuck_leads)
         logger.warning(f"🕵️ [SOS Reporter] Found {count} stuck leads.")
-
-        # PRO-88: paged via Sentry, not WhatsApp. The admin's Cloud API service
-        # window is permanently closed, so this batched digest would have needed
-        # its own approved template. Phones are masked to their last 4 digits —
-        # this is a "go look at the panel" signal, not a data export.
         report_lines = [
-            f"{count} lead(s) stuck for more than {timeout_minutes} minutes:"
+            f"{count} lead(s) stuck for more than {timeout_minutes} minutes:",
+            *lead_lines,
         ]
-        for lead in stuck_leads:
-            local = (lead.get("chat_id") or "").split("@")[0]
-            created_at = lead.get("created_at")
-            report_lines.append(
-                f"- ***{local[-4:]}: {lead.get('issue_type') or 'unknown issue'}"
-                f" in {lead.get('full_address') or 'unknown city'}"
-                f" (waiting since {created_at.strftime('%H:%M') if created_at else '??'})"
-            )
+        if count > len(lead_lines):
+            report_lines.append(f"... and {count - len(lead_lines)} more.")
         report_lines.append("Open the admin panel to reassign or call.")
 
         page_operator("\n".join(report_lines))
         logger.info(f"✅ [SOS Reporter] Paged operator about {count} stuck leads.")
+        return result.as_dict()
 
     except Exception as e:
         logger.error(f"❌ [SOS Reporter] Error: {e}")
@@ -463,7 +693,8 @@ async def check_whatsapp_instance_state():
             # Release the auto breaker on recovery. The manual kill switch lives in
             # a separate key (wa:instance:paused:manual) the monitor never touches,
             # so an operator-set halt survives instance recovery.
-            await redis.delete(DOWN_SINCE_KEY, ALERTED_KEY, LAST_ALERT_KEY, PAUSED_KEY)
+            if await redis.delete(DOWN_SINCE_KEY, ALERTED_KEY, LAST_ALERT_KEY, PAUSED_KEY):
+                await announce_breaker_change()
             if down_since and alerted:
                 logger.info("✅ [WA Monitor] WhatsApp account recovered (authorized).")
                 await send_oncall_alert(
@@ -483,6 +714,7 @@ async def check_whatsapp_instance_state():
             state or "unreachable",
             ex=WorkerConstants.WA_STATE_PAUSE_TTL_SECONDS,
         )
+        await announce_breaker_change()
         down_since_raw = await redis.get(DOWN_SINCE_KEY)
         if not down_since_raw:
             # First detection — start the clock, don't page yet.
@@ -557,96 +789,96 @@ async def check_pro_approval_sla():
                 {"reassign_offered": {"$ne": True}},
             ],
         }
-        leads = await leads_collection.find(query).to_list(
-            length=WorkerConstants.DB_QUERY_LIMIT
-        )
+        with queued_sends():
+            result = await run_sweep(
+                "approval_sla",
+                leads_collection,
+                query,
+                lambda lead: process_approval_sla_lead(lead, now),
+                projection=_APPROVAL_FIELDS,
+            )
     except Exception as e:
         logger.error(f"❌ [Approval SLA] Query failed: {e}")
         return
+    return result.as_dict()
 
-    for lead in leads:
-        try:
-            chat_id = lead["chat_id"]
-            # Only act while the customer is genuinely waiting for approval.
-            if (
-                await StateManager.get_state(chat_id)
-                != UserStates.AWAITING_PRO_APPROVAL
-            ):
-                continue
 
-            notified_at = lead.get("pro_notified_at")
-            if not notified_at:
-                continue
-            # Mongo hands datetimes back tz-naive; make it UTC-aware before the
-            # subtraction (matches the guard used across the codebase). Without
-            # this the arithmetic raises and the per-lead except swallows it —
-            # the whole feature would silently never fire.
-            if notified_at.tzinfo is None:
-                notified_at = notified_at.replace(tzinfo=timezone.utc)
-            waited_min = (now - notified_at).total_seconds() / 60
-
-            nudge_after = WorkerConstants.APPROVAL_NUDGE_MINUTES
-            offer_after = WorkerConstants.APPROVAL_REASSIGN_OFFER_MINUTES
-            if lead.get("is_emergency"):
-                nudge_after //= 2  # 5 min
-                offer_after //= 2  # 12 min
-
-            # T+offer: reassignment offer to the customer (once). Claim the flag
-            # atomically (gated on status=NEW + not-yet-offered) BEFORE sending, so
-            # overlapping ticks — or a Redis-down scheduler lock that fails open —
-            # can't double-send. NOTE: quiet-hours / Shabbat gating of this
-            # customer-facing message is deferred to PRO-73.
-            # PRO-73: the customer-facing offer is gated to business hours — never
-            # message a customer at 3am. Outside hours we skip (reassign_offered
-            # stays False) so it fires on the next in-hours tick. The pro nudge
-            # below is pro-facing and stays ungated.
-            if (
-                waited_min >= offer_after
-                and not lead.get("reassign_offered")
-                and within_business_hours()
-            ):
-                claimed = await leads_collection.update_one(
-                    {
-                        "_id": lead["_id"],
-                        "status": LeadStatus.NEW,
-                        "reassign_offered": {"$ne": True},
-                    },
-                    {"$set": {"reassign_offered": True}},
+async def process_approval_sla_lead(lead, now=None) -> Optional[datetime]:
+    """PRO-56, one lead: nudge the pro / offer the customer a reassignment if due.
+
+    Returns a retry time when the offer is due but held back by the PRO-73
+    business-hours gate, so the deadline wheel re-arms it instead of dropping it.
+    """
+    now = now or datetime.now(timezone.utc)
+    if lead.get("status") != LeadStatus.NEW or not lead.get("pro_id"):
+        return None
+    chat_id = lead["chat_id"]
+    # Only act while the customer is genuinely waiting for approval.
+    if await StateManager.get_state(chat_id) != UserStates.AWAITING_PRO_APPROVAL:
+        return None
+
+    notified_at = lead.get("pro_notified_at")
+    if not notified_at:
+        return None
+    # Mongo hands datetimes back tz-naive; make it UTC-aware before the
+    # subtraction (matches the guard used across the codebase). Without
+    # this the arithmetic raises and the per-lead except swallows it —
+    # the whole feature would silently never fire.
+    waited_min = (now - _as_utc(notified_at)).total_seconds() / 60
+
+    nudge_after, offer_after = approval_sla_minutes(lead)
+    retry_at = None
+
+    # T+offer: reassignment offer to the customer (once). Claim the flag
+    # atomically (gated on status=NEW + not-yet-offered) BEFORE sending, so
+    # overlapping ticks — or a Redis-down scheduler lock that fails open —
+    # can't double-send.
+    # PRO-73: the customer-facing offer is gated to business hours — never
+    # message a customer at 3am. Outside hours we skip (reassign_offered
+    # stays False) so it fires on a later in-hours attempt. The pro nudge
+    # below is pro-facing and stays ungated.
+    if waited_min >= offer_after and not lead.get("reassign_offered"):
+        if within_business_hours():
+            claimed = await leads_collection.update_one(
+                {
+                    "_id": lead["_id"],
+                    "status": LeadStatus.NEW,
+                    "reassign_offered": {"$ne": True},
+                },
+                {"$set": {"reassign_offered": True}},
+            )
+            if claimed.modified_count == 1:
+                await whatsapp.send_message(chat_id, Messages.Customer.REASSIGN_OFFER)
+                logger.info(
+                    f"⏰ [Approval SLA] Offered reassignment to ...{chat_id[-8:]} "
+                    f"after ~{waited_min:.0f}m."
                 )
-                if claimed.modified_count == 1:
-                    await whatsapp.send_message(
-                        chat_id, Messages.Customer.REASSIGN_OFFER
-                    )
-                    logger.info(
-                        f"⏰ [Approval SLA] Offered reassignment to ...{chat_id[-8:]} "
-                        f"after ~{waited_min:.0f}m."
-                    )
-                continue  # don't also nudge on the same tick
-
-            # T+nudge: nudge the silent pro (once) — same atomic-claim pattern.
-            if waited_min >= nudge_after and not lead.get("approval_nudged"):
-                claimed = await leads_collection.update_one(
-                    {
-                        "_id": lead["_id"],
-                        "status": LeadStatus.NEW,
-                        "approval_nudged": {"$ne": True},
-                    },
-                    {"$set": {"approval_nudged": True}},
+            return None  # don't also nudge on the same pass
+        retry_at = now + timedelta(seconds=WorkerConstants.DEADLINE_RETRY_SECONDS)
+
+    # T+nudge: nudge the silent pro (once) — same atomic-claim pattern.
+    if waited_min >= nudge_after and not lead.get("approval_nudged"):
+        claimed = await leads_collection.update_one(
+            {
+                "_id": lead["_id"],
+                "status": LeadStatus.NEW,
+                "approval_nudged": {"$ne": True},
+            },
+            {"$set": {"approval_nudged": True}},
+        )
+        if claimed.modified_count == 1:
+            pro = await users_collection.find_one({"_id": lead.get("pro_id")})
+            if pro and pro.get("phone_number"):
+                pro_phone = to_chat_id(pro["phone_number"])
+                await whatsapp.send_message(
+                    pro_phone,
+                    Messages.Pro.APPROVAL_NUDGE.format(minutes=nudge_after),
                 )
-                if claimed.modified_count == 1:
-                    pro = await users_collection.find_one({"_id": lead.get("pro_id")})
-                    if pro and pro.get("phone_number"):
-                        pro_phone = to_chat_id(pro["phone_number"])
-                        await whatsapp.send_message(
-                            pro_phone,
-                            Messages.Pro.APPROVAL_NUDGE.format(minutes=nudge_after),
-                        )
-                    logger.info(
-                        f"⏰ [Approval SLA] Nudged pro for lead {lead['_id']} "
-                        f"after ~{waited_min:.0f}m."
-                    )
-        except Exception as e:
-            logger.error(f"❌ [Approval SLA] Error on lead {lead.get('_id')}: {e}")
+            logger.info(
+                f"⏰ [Approval SLA] Nudged pro for lead {lead['_id']} "
+                f"after ~{waited_min:.0f}m."
+            )
+    return retry_at
 
 
 async def check_sla_deflection():
@@ -669,50 +901,68 @@ async def check_sla_deflection():
     }
 
     try:
-        cursor = leads_collection.find(query)
-        paused_leads = await cursor.to_list(length=WorkerConstants.DB_QUERY_LIMIT)
-
-        if not paused_leads:
-            logger.info("✅ [SLA Monitor] No silent handoffs found.")
-            return
+        result = await run_sweep(
+            "sla_deflection",
+            leads_collection,
+            query,
+            deflect_silent_handoff,
+            projection=_DEFLECTION_FIELDS,
+        )
+    except Exception as e:
+        logger.error(f"❌ [SLA Monitor] Error: {e}")
+        return
 
-        for lead in paused_leads:
-            chat_id = lead["chat_id"]
+    if not result.processed:
+        logger.info("✅ [SLA Monitor] No silent handoffs found.")
+    return result.as_dict()
+
+
+async def deflect_silent_handoff(lead) -> Optional[datetime]:
+    """SLA deflection, one lead: a paused handoff silent for PAUSE_TTL_SECONDS."""
+    if not lead.get("is_paused") or lead.get("status") not in (
+        LeadStatus.NEW,
+        LeadStatus.BOOKED,
+    ):
+        return None
+    paused_at = lead.get("paused_at")
+    if not paused_at:
+        return None
+    # Pro/customer activity bumps paused_at without touching the wheel, so a
+    # deadline can arrive early — re-arm from the latest activity instead.
+    due = _as_utc(paused_at) + timedelta(seconds=WorkerConstants.PAUSE_TTL_SECONDS)
+    if due > datetime.now(timezone.utc):
+        return due
 
-            # Double check with Redis state
-            state = await StateManager.get_state(chat_id)
-            if state != UserStates.PAUSED_FOR_HUMAN:
-                # State already cleared or changed, just cleanup the DB flag
-                await leads_collection.update_one(
-                    {"_id": lead["_id"]}, {"$set": {"is_paused": False}}
-                )
-                continue
+    chat_id = lead["chat_id"]
 
-            # It's been 15 mins of silence. Trigger deflection.
-            logger.warning(
-                f"⏰ [SLA Monitor] SLA exceeded for {chat_id}. Deflecting to phone check."
-            )
+    # Double check with Redis state
+    state = await StateManager.get_state(chat_id)
+    if state != UserStates.PAUSED_FOR_HUMAN:
+        # State already cleared or changed, just cleanup the DB flag
+        await leads_collection.update_one(
+            {"_id": lead["_id"]}, {"$set": {"is_paused": False}}
+        )
+        return None
 
-            # 1. Clear state
-            await StateManager.clear_state(chat_id)
+    # It's been 15 mins of silence. Trigger deflection.
+    logger.warning(
+        f"⏰ [SLA Monitor] SLA exceeded for {chat_id}. Deflecting to phone check."
+    )
 
-            # 2. Update lead doc
-            await leads_collection.update_one(
-                {"_id": lead["_id"]},
-                {"$set": {"is_paused": False, "sla_deflected": True}},
-            )
+    # 1. Clear state
+    await StateManager.clear_state(chat_id)
 
-            # 3. Send Deflection Message
-            await whatsapp.send_message(
-                chat_id, Messages.Customer.SLA_DEFLECTION_MESSAGE
-            )
+    # 2. Update lead doc
+    await leads_collection.update_one(
+        {"_id": lead["_id"]},
+        {"$set": {"is_paused": False, "sla_deflected": True}},
+    )
 
-            logger.info(
-                f"✅ [SLA Monitor] Deflected customer {chat_id} after inactivity."
-            )
+    # 3. Send Deflection Message
+    await whatsapp.send_message(chat_id, Messages.Customer.SLA_DEFLECTION_MESSAGE)
 
-    except Exception as e:
-        logger.error(f"❌ [SLA Monitor] Error: {e}")
+    logger.info(f"✅ [SLA Monitor] Deflected customer {chat_id} after inactivity.")
+    return None
 
 
 async def remind_stale_booked_leads():
@@ -748,56 +998,100 @@ async def remind_stale_booked_leads():
     }
 
     try:
-        cursor = leads_collection.find(query)
-        stale_leads = await cursor.to_list(length=WorkerConstants.DB_QUERY_LIMIT)
-
-        if not stale_leads:
-            logger.info("✅ [Stale Lead Nudger] No stale booked leads found.")
-            return
+        with queued_sends():
+            result = await run_sweep(
+                "stale_booked",
+                leads_collection,
+                query,
+                remind_stale_booked_lead,
+                projection=_STALE_BOOKED_FIELDS,
+            )
+    except Exception as e:
+        logger.error(f"❌ [Stale Lead Nudger] Error: {e}")
+        return
 
+    if not result.processed:
+        logger.info("✅ [Stale Lead Nudger] No stale booked leads found.")
+    else:
         logger.warning(
-            f"⏰ [Stale Lead Nudger] Found {len(stale_leads)} stale leads. Sending reminders..."
+            f"⏰ [Stale Lead Nudger] Checked {result.processed} stale lead(s) "
+            f"({result.failed} failed)."
         )
+    return result.as_dict()
 
-        for lead in stale_leads:
-            lead_id = lead["_id"]
-            pro_id = lead.get("pro_id")
-            customer_name = lead.get("customer_name") or "לקוח"
-
-            if not pro_id:
-                continue
 
-            pro = await users_collection.find_one({"_id": pro_id})
-            if not pro or not pro.get("phone_number"):
-                continue
+async def remind_stale_booked_lead(lead) -> Optional[datetime]:
+    """Stale nudger, one lead: remind the pro to close a BOOKED job left open.
 
-            pro_name = pro.get("business_name") or pro.get("name") or "איש מקצוע"
-            pro_phone = pro["phone_number"]
-            pro_phone = to_chat_id(pro_phone)
+    Returns when the next reminder is due while MAX_PRO_REMINDERS is not yet
+    reached, so the deadline wheel keeps the reminder cadence.
+    """
+    # The same due time the wheel armed — stale since the anchor, and at
+    # least STALE_BOOKED_REMINDER_INTERVAL_HOURS after the last reminder.
+    due_at = deadlines_for_lead(lead).get(DeadlineAction.STALE_BOOKED)
+    if due_at is None:
+        return None
+    now = datetime.now(timezone.utc)
+    if due_at > now:
+        return due_at
+    reminders_sent = lead.get("reminders_sent", 0)
 
-            # Send Message
-            message = Messages.Pro.STALE_LEAD_REMINDER.format(
-                pro_name=pro_name, customer_name=customer_name
-            )
+    lead_id = lead["_id"]
+    pro_id = lead.get("pro_id")
+    customer_name = lead.get("customer_name") or "לקוח"
+
+    if not pro_id:
+        return None
+
+    pro = await users_collection.find_one({"_id": pro_id})
+    if not pro or not pro.get("phone_number"):
+        return None
+
+    pro_name = pro.get("business_name") or pro.get("name") or "איש מקצוע"
+    pro_phone = pro["phone_number"]
+    pro_phone = to_chat_id(pro_phone)
+
+    # Claim the reminder BEFORE sending, guarded on the reminder state this
+    # snapshot was read with: the wheel and the interval sweep each hold their
+    # own snapshot and can both find it due, and only one may send.
+    claimed = await leads_collection.update_one(
+        {
+            "_id": lead_id,
+            "status": LeadStatus.BOOKED,
+            "reminders_sent": lead.get("reminders_sent"),
+            "last_reminder_at": lead.get("last_reminder_at"),
+        },
+        {
+            "$inc": {"reminders_sent": 1},
+            "$set": {"last_reminder_at": now},
+        },
+    )
+    if claimed.modified_count != 1:
+        # The other path reminded (or the lead moved on): keep the wheel on
+        # the lead's own next due time.
+        current = await leads_collection.find_one(
+            {"_id": lead_id}, _STALE_BOOKED_FIELDS
+        )
+        if not current:
+            return None
+        return deadlines_for_lead(current).get(DeadlineAction.STALE_BOOKED)
 
-            try:
-                await whatsapp.send_message(pro_phone, message)
-
-                # Update lead
-                await leads_collection.update_one(
-                    {"_id": lead_id},
-                    {
-                        "$inc": {"reminders_sent": 1},
-                        "$set": {"last_reminder_at": datetime.now(timezone.utc)},
-                    },
-                )
-                logger.info(
-                    f"✅ [Stale Lead Nudger] Sent reminder to pro {pro_id} for lead {lead_id}"
-                )
-            except Exception as e:
-                logger.error(
-                    f"❌ [Stale Lead Nudger] Failed to send reminder to {pro_phone}: {e}"
-                )
+    message = Messages.Pro.STALE_LEAD_REMINDER.format(
+        pro_name=pro_name, customer_name=customer_name
+    )
 
+    try:
+        await whatsapp.send_message(pro_phone, message)
+        logger.info(
+            f"✅ [Stale Lead Nudger] Sent reminder to pro {pro_id} for lead {lead_id}"
+        )
     except Exception as e:
-        logger.error(f"❌ [Stale Lead Nudger] Error: {e}")
+        logger.error(
+            f"❌ [Stale Lead Nudger] Failed to send reminder to {pro_phone}: {e}"
+        )
+
+    if reminders_sent + 1 < WorkerConstants.MAX_PRO_REMINDERS:
+        return now + timedelta(
+            hours=WorkerConstants.STALE_BOOKED_REMINDER_INTERVAL_HOURS
+        )
+    return None
@@ -2,7 +2,7 @@ from app.providers.whatsapp import get_whatsapp
 from app.core.database import leads_collection, users_collection
 from app.core.logger import logger, page_critical
 from app.core.messages import Messages
-from app.core.constants import LeadStatus, WorkerConstants
+from app.core.constants import Actor, LeadStatus, WorkerConstants
 from app.core.phone import to_chat_id, to_local_phone
 from app.core.config import settings
 from bson import ObjectId
@@ -282,3 +282,27 @@ async def send_sos_alert(chat_id: str, last_message: str, pro_id: str = None):
 
     except Exception as e:
         logger.error(f"Error in send_sos_alert for user {chat_id}: {e}")
+
+
+async def page_lead_needs_review(lead: dict) -> None:
+    """Lead-event handler: page the operator when the system parks a lead in
+    ``PENDING_ADMIN_REVIEW``.
+
+    Only the exhausted-reassignments escalation paged immediately (PRO-63);
+    the no-usable-location and no-replacement escalations waited for the
+    4-hourly Reporter. Transitions made by an admin are theirs already, and
+    ``max_reassignments_exhausted`` was paged at the source — both skipped.
+    """
+    history = lead.get("status_history") or []
+    if history and history[-1].get("by") != Actor.SYSTEM:
+        return
+    if lead.get("escalation_reason") == "max_reassignments_exhausted":
+        return
+    local_phone = to_local_phone(lead.get("chat_id")) or ""
+    page_operator(
+        f"Lead {lead.get('_id')} needs admin review "
+        f"(reason={lead.get('escalation_reason') or 'no replacement found'}) — "
+        f"customer ***{local_phone[-4:]}, "
+        f"issue={lead.get('issue_type') or 'unknown'}. "
+        "Open the lead in the admin panel."
+    )
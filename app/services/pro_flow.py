@@ -5,12 +5,21 @@ from bson import ObjectId
 from app.core.database import users_collection, leads_collection, reviews_collection
 from app.core.logger import logger
 from app.core.messages import Messages
-from app.core.constants import LeadStatus, Defaults, UserStates, WorkerConstants, Actor
+from app.core.constants import (
+    LeadStatus,
+    Defaults,
+    UserStates,
+    WorkerConstants,
+    Actor,
+    DeadlineAction,
+)
 from app.core.phone import strip_suffix, to_local_phone
 from app.services.lead_manager_service import set_lead_status
 from app.core.redis_client import get_redis_client
 from app.services.matching_service import book_slot_for_lead
+from app.services.scheduling_service import release_slot
 from app.services.context_manager_service import ContextManager
+from app.services.deadline_service import Deadlines
 from app.services.state_manager_service import StateManager
 from datetime import datetime, timedelta, timezone
 
@@ -373,10 +382,17 @@ async def _handle_pause_bot(pro, whatsapp):
         ttl=WorkerConstants.PAUSE_TTL_SECONDS,
     )
 
-    # Set is_paused flag and paused_at for SLA monitor
+    # Set is_paused flag and paused_at for SLA monitor, and arm its deadline.
+    # Later activity only bumps paused_at; the deflection handler re-arms from it.
+    paused_at = datetime.now(timezone.utc)
     await leads_collection.update_one(
         {"_id": lead["_id"]},
-        {"$set": {"is_paused": True, "paused_at": datetime.now(timezone.utc)}},
+        {"$set": {"is_paused": True, "paused_at": paused_at}},
+    )
+    await Deadlines.schedule(
+        lead["_id"],
+        DeadlineAction.SLA_DEFLECTION,
+        paused_at + timedelta(seconds=WorkerConstants.PAUSE_TTL_SECONDS),
     )
 
     await whatsapp.send_message(customer_chat_id, Messages.Customer.BOT_PAUSED_BY_PRO)
@@ -616,8 +632,6 @@ async def _handle_cancel(pro, whatsapp, chat_id):
 
 
 async def _execute_cancel(lead, pro, whatsapp):
-    from app.core.database import slots_collection
-
     await set_lead_status(
         lead["_id"],
         LeadStatus.CANCELLED,
@@ -630,10 +644,7 @@ async def _execute_cancel(lead, pro, whatsapp):
     )
 
     if lead.get("booked_slot_id"):
-        await slots_collection.update_one(
-            {"_id": lead["booked_slot_id"]},
-            {"$set": {"is_taken": False}},
-        )
+        await release_slot(lead["booked_slot_id"])
 
     if lead.get("chat_id"):
         await ContextManager.clear_context(lead["chat_id"])
@@ -0,0 +1,74 @@
+"""
+Runtime config — an in-process cache of ``settings`` documents.
+
+The operator toggles in ``scheduler_config`` gate scheduler jobs that tick
+every few seconds to minutes; reading the document from Mongo on every tick of
+every gated job costs a round trip per tick for a value that changes a few
+times a month. ``RuntimeConfig.get`` serves it from memory instead.
+
+Freshness
+---------
+* Whoever writes a settings document publishes its ``_id`` on
+  ``RUNTIME_CONFIG_CHANNEL`` — the admin panel's settings view does, through
+  ``admin_panel.core.utils.notify_settings_changed``. The worker's
+  ``listen_for_invalidations`` task calls ``RuntimeConfig.invalidate`` on each
+  message, so the next read refetches: a flipped toggle takes effect on the
+  next tick.
+* Pub/sub is fire-and-forget; a message sent while the listener is
+  reconnecting is lost. Every (re)subscribe therefore clears the whole cache,
+  and an entry is never served past ``RUNTIME_CONFIG_TTL_SECONDS`` — a writer
+  that does not publish (a manual Mongo edit) is bounded to that much lag.
+
+Failure policy: a Mongo error on a miss propagates, exactly as the direct
+``find_one`` did. A Redis error only stops invalidation; the TTL still holds.
+"""
+
+import time
+from typing import Dict, Optional, Tuple
+
+from app.core import database
+from app.core.constants import RUNTIME_CONFIG_CHANNEL, WorkerConstants
+from app.core.logger import logger
+from app.core.redis_client import get_redis_client
+
+
+class RuntimeConfig:
+    TTL = WorkerConstants.RUNTIME_CONFIG_TTL_SECONDS
+
+    # doc _id → (monotonic fetch time, document or None)
+    _cache: Dict[str, Tuple[float, Optional[dict]]] = {}
+    # Bumped by every invalidation, so a fetch that raced one is not cached.
+    _generation = 0
+
+    @classmethod
+    async def get(cls, doc_id: str) -> Optional[dict]:
+        """The ``settings`` document ``doc_id`` (None when it does not exist)."""
+        hit = cls._cache.get(doc_id)
+        if hit and time.monotonic() - hit[0] < cls.TTL:
+            return hit[1]
+        generation = cls._generation
+        # Read off the module so tests (and the e2e world) can rebind it.
+        doc = await database.settings_collection.find_one({"_id": doc_id})
+        if generation == cls._generation:
+            cls._cache[doc_id] = (time.monotonic(), doc)
+        return doc
+
+    @classmethod
+    def invalidate(cls, doc_id: Optional[str] = None) -> None:
+        """Drop one cached document, or all of them."""
+        cls._generation += 1
+        if doc_id:
+            cls._cache.pop(doc_id, None)
+        else:
+            cls._cache.clear()
+
+    @classmethod
+    async def publish_change(cls, doc_id: str) -> None:
+        """Tell every process to drop ``doc_id``. Best-effort: on a Redis error
+        the other processes converge on the TTL."""
+        cls.invalidate(doc_id)
+        try:
+            redis = await get_redis_client()
+            await redis.publish(RUNTIME_CONFIG_CHANNEL, doc_id)
+        except Exception as e:
+            logger.warning(f"[RuntimeConfig] change notification for '{doc_id}' not sent: {e}")
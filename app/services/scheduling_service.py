@@ -2,7 +2,9 @@
 Scheduling Service - Recurring availability templates and slot management.
 
 Supports weekly recurring schedules, availability checks for matching,
-and no-show tracking.
+and no-show tracking. Availability reads are served from the write-through
+AvailabilityCache; every slot claim/release goes through claim_slot /
+release_slot so the cache stays in sync with Mongo.
 """
 
 from datetime import datetime, timedelta, timezone, time
@@ -10,6 +12,7 @@ from bson.objectid import ObjectId
 from app.core.database import users_collection, slots_collection, leads_collection
 from app.core.constants import LeadStatus
 from app.core.logger import logger
+from app.services.availability_cache_service import AvailabilityCache
 import pytz
 
 IL_TZ = pytz.timezone("Asia/Jerusalem")
@@ -103,6 +106,7 @@ async def generate_slots_from_template(pro_id: str, days_ahead: int = 14) -> int
 
     if new_slots:
         await slots_collection.insert_many(new_slots)
+        await AvailabilityCache.invalidate(oid)
         logger.info(f"Generated {len(new_slots)} slots for pro {pro_id} ({days_ahead} days)")
 
     return len(new_slots)
@@ -144,6 +148,10 @@ async def check_pro_availability(pro_id, requested_time: datetime | None = None)
         window_start = now_utc
         window_end = now_utc + timedelta(days=7)
 
+    cached = await AvailabilityCache.has_free_slot(oid, window_start, window_end)
+    if cached is not None:
+        return cached
+
     slot = await slots_collection.find_one({
         "pro_id": oid,
         "is_taken": False,
@@ -153,8 +161,44 @@ async def check_pro_availability(pro_id, requested_time: datetime | None = None)
     return slot is not None
 
 
+async def get_earliest_free_slots(pro_ids: list) -> dict:
+    """
+    Earliest free slot start within the availability lookahead, per pro.
+    Returns {str(pro_id): datetime | None}. One Redis round trip when the
+    cache is warm; on cache failure, one grouped Mongo aggregation — never a
+    query per pro.
+    """
+    if not pro_ids:
+        return {}
+    window_start, window_end = AvailabilityCache.lookahead_window()
+
+    cached = await AvailabilityCache.earliest_free_slots(pro_ids, window_start, window_end)
+    if cached is not None:
+        return cached
+
+    oids = [ObjectId(p) if isinstance(p, str) else p for p in pro_ids]
+    earliest = {str(oid): None for oid in oids}
+    pipeline = [
+        {"$match": {
+            "pro_id": {"$in": oids},
+            "is_taken": False,
+            "start_time": {"$gte": window_start, "$lte": window_end},
+        }},
+        {"$group": {"_id": "$pro_id", "first": {"$min": "$start_time"}}},
+    ]
+    async for doc in slots_collection.aggregate(pipeline):
+        first = doc["first"]
+        earliest[str(doc["_id"])] = first.replace(tzinfo=timezone.utc) if first.tzinfo is None else first
+    return earliest
+
+
 async def get_available_slots(pro_id: str, date: datetime | None = None, limit: int = 20) -> list:
-    """Get available (not taken) slots for a pro, optionally filtered by date."""
+    """Get available (not taken) slots for a pro, optionally filtered by date.
+
+    Returns slot dicts carrying ``_id``, ``pro_id`` and ``start_time``. Served
+    from the availability cache (future slots only); falls back to Mongo when
+    the cache is unavailable.
+    """
     oid = ObjectId(pro_id)
     query = {"pro_id": oid, "is_taken": False}
 
@@ -163,13 +207,50 @@ async def get_available_slots(pro_id: str, date: datetime | None = None, limit:
         day_start = tz.localize(datetime.combine(date, time.min)).astimezone(pytz.utc)
         day_end = tz.localize(datetime.combine(date, time.max)).astimezone(pytz.utc)
         query["start_time"] = {"$gte": day_start, "$lte": day_end}
+        window_start = max(day_start, datetime.now(timezone.utc))
+        window_end = day_end
     else:
         query["start_time"] = {"$gte": datetime.now(timezone.utc)}
+        window_start, window_end = None, None
+
+    cached = await AvailabilityCache.next_free_slots(oid, window_start, window_end, limit)
+    if cached is not None:
+        return [
+            {"_id": slot_id, "pro_id": oid, "start_time": start}
+            for slot_id, start in cached
+        ]
 
     cursor = slots_collection.find(query).sort("start_time", 1).limit(limit)
     return await cursor.to_list(length=limit)
 
 
+async def claim_slot(slot_id) -> dict | None:
+    """
+    Atomically mark a free slot as taken. Returns the slot document, or None
+    when it was already taken (or does not exist).
+    """
+    slot = await slots_collection.find_one_and_update(
+        {"_id": slot_id, "is_taken": False},
+        {"$set": {"is_taken": True}},
+    )
+    if slot and slot.get("pro_id"):
+        await AvailabilityCache.remove_slot(slot["pro_id"], slot["_id"])
+    return slot
+
+
+async def release_slot(slot_id) -> None:
+    """Free a reserved slot so the pro regains that hour. Only a release that
+    actually freed the slot writes it through to the availability cache."""
+    slot = await slots_collection.find_one_and_update(
+        {"_id": slot_id, "is_taken": True},
+        {"$set": {"is_taken": False}},
+    )
+    if slot and slot.get("pro_id") and slot.get("start_time"):
+        await AvailabilityCache.add_free_slot(
+            slot["pro_id"], slot["_id"], slot["start_time"]
+        )
+
+
 # --- No-Show Tracking ---
 
 async def record_no_show(pro_id) -> int:
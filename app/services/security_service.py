@@ -1,20 +1,106 @@
 import time
-import uuid
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import NamedTuple
 from zoneinfo import ZoneInfo
 
 from app.core.redis_client import get_redis_client
 from app.core.logger import logger
 from app.core.config import settings
+from app.core.constants import WorkerConstants
+
+# GCRA (generic cell rate algorithm) — the one rate limiter behind both the
+# webhook DDoS shield and the per-customer inbound limit. Each key holds a
+# single number, the theoretical arrival time (TAT) of the next request.
+#
+# A burst of ``ceil(limit / 2)`` requests is allowed, then one every
+# ``period / (limit - burst + 1)`` seconds. The split is what keeps the
+# sliding window's guarantee — at most ``limit`` requests in any ``period``
+# seconds: a chat that spends its burst and then keeps up the steady rate
+# gets ``burst + (limit - burst)`` through in any window. (A burst of the full
+# ``limit`` plus a steady ``limit`` per period let nearly twice that through.)
+# A rejected request does not move the TAT, and the key expires as soon as
+# the chat is back to a full burst. Returns allowed (1/0) and the cells in
+# use counting this request (burst + 1 when rejected).
+_GCRA_LUA = """
+local function gcra(key, limit, period, now)
+  local burst = math.ceil(limit / 2)
+  local interval = period / (limit - burst + 1)
+  local tat = tonumber(redis.call('GET', key))
+  if not tat or tat < now then
+    tat = now
+  end
+  local new_tat = tat + interval
+  -- 1 ms of slack absorbs float rounding in the stored TAT
+  local used = math.ceil((new_tat - now) / interval - 0.001)
+  if new_tat - now > burst * interval + 0.001 then
+    return 0, used
+  end
+  redis.call('SET', key, string.format('%.6f', new_tat),
+    'PX', string.format('%d', math.ceil((new_tat - now) * 1000)))
+  return 1, used
+end
+"""
+
+_RATE_LIMIT_LUA = _GCRA_LUA + """
+local allowed = gcra(KEYS[1], tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]))
+return allowed
+"""
+
+# The ingestion gate: every per-message Redis check of the inbound path in one
+# atomic call. KEYS: idempotency claim, service window, shield GCRA key,
+# per-customer GCRA key, trip counter. ARGV: now, window value, window TTL,
+# claim flag ('1' when the message has an id), shield limit, shield window,
+# customer limit, customer window.
+_INGESTION_GATE_LUA = _GCRA_LUA + """
+local now = tonumber(ARGV[1])
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+if ARGV[4] == '1' and not redis.call('SET', KEYS[1], 'processed', 'EX', 86400, 'NX') then
+  return {'duplicate', 0, 0}
+end
+local allowed, used = gcra(KEYS[3], tonumber(ARGV[5]), tonumber(ARGV[6]), now)
+if allowed == 0 then
+  return {'shielded', used, 0}
+end
+allowed, used = gcra(KEYS[4], tonumber(ARGV[7]), tonumber(ARGV[8]), now)
+if allowed == 1 then
+  return {'accepted', used, 0}
+end
+local trips = redis.call('INCR', KEYS[5])
+if trips == 1 then
+  redis.call('EXPIRE', KEYS[5], ARGV[8])
+end
+return {'throttled', used, trips}
+"""
+
+
+class IngestionVerdict(NamedTuple):
+    """One message's ingestion-gate result. ``outcome`` is ``accepted``,
+    ``throttled`` (over the per-customer sliding window — the worker decides,
+    since pros and the admin are exempt), ``duplicate`` or ``shielded`` (over
+    the coarse DDoS shield); ``trips`` is the running trip count when
+    throttled."""
+
+    outcome: str
+    count: int
+    trips: int
 
 
 class SecurityService:
+    @staticmethod
+    async def _gcra_allow(key: str, limit: int, window_seconds: float) -> bool:
+        """One GCRA check (see _GCRA_LUA): True if allowed. Raises on a Redis
+        error — the callers choose their own fail-open logging."""
+        redis = await get_redis_client()
+        rate_limit = redis.register_script(_RATE_LIMIT_LUA)
+        allowed = await rate_limit(keys=[key], args=[limit, window_seconds, time.time()])
+        return allowed == 1
+
     @staticmethod
     async def check_rate_limit(
         chat_id: str, limit: int = 10, window_seconds: int = 60
     ) -> bool:
         """
-        Implements a Fixed Window rate limiter using Redis.
+        Implements the webhook's coarse rate limiter (GCRA, see _GCRA_LUA).
         Returns True if request is allowed, False if blocked.
 
         NOTE: This is the coarse webhook-layer backstop (DDoS shield). The precise
@@ -22,53 +108,77 @@ class SecurityService:
         check_sliding_window — keep this generous so it never blocks a legit pro/admin.
         """
         try:
-            redis = await get_redis_client()
-            key = f"rate_limit:{chat_id}"
-
-            # Increment the counter
-            current_count = await redis.incr(key)
-
-            # If this is the first request in the window, set expiration
-            if current_count == 1:
-                await redis.expire(key, window_seconds)
-
-            if current_count > limit:
-                return False
-
-            return True
+            return await SecurityService._gcra_allow(
+                f"rate_limit:{chat_id}", limit, window_seconds
+            )
 
         except Exception as e:
             # Fail Open Policy: If Redis fails, allow the request to prevent downtime
             logger.error(f"Rate Limit Check Failed for {chat_id}: {e}")
             return True
 
+    @staticmethod
+    async def stage_ingestion_gate(
+        pipe,
+        chat_id: str,
+        message_id: str | None,
+        window_key: str,
+        shield_limit: int = 50,
+        shield_window_seconds: int = 60,
+    ) -> None:
+        """
+        Queue the ingestion gate for one inbound message on a Redis pipeline.
+
+        One server-side script does, atomically: open the service window
+        (window_key, 24h), claim the idempotency key (skipped without a
+        message_id), check the coarse shield (rate_limit:), then the
+        per-customer limit (rl:gcra:) and, when over, count the trip
+        (rl:trips:). The pipeline's ``execute`` returns the
+        reply for :meth:`ingestion_verdict`.
+        """
+        gate = pipe.register_script(_INGESTION_GATE_LUA)
+        await gate(
+            keys=[
+                f"webhook:{message_id}",
+                window_key,
+                f"rate_limit:{chat_id}",
+                f"rl:gcra:{chat_id}",
+                f"rl:trips:{chat_id}",
+            ],
+            args=[
+                time.time(),
+                datetime.now(timezone.utc).isoformat(),
+                WorkerConstants.SERVICE_WINDOW_TTL_SECONDS,
+                "1" if message_id else "0",
+                shield_limit,
+                shield_window_seconds,
+                WorkerConstants.INBOUND_RATE_LIMIT_MAX,
+                WorkerConstants.INBOUND_RATE_LIMIT_WINDOW_SECONDS,
+            ],
+            client=pipe,
+        )
+
+    @staticmethod
+    def ingestion_verdict(reply) -> IngestionVerdict:
+        outcome, count, trips = reply
+        return IngestionVerdict(outcome, int(count), int(trips))
+
     @staticmethod
     async def check_sliding_window(
         chat_id: str, limit: int, window_seconds: int
     ) -> bool:
         """
-        True sliding-window rate limiter backed by a Redis sorted set (PRO-21).
-
-        Drops timestamps older than the window, records this hit, then counts what
-        remains. Returns True if the request is allowed, False if it should be throttled.
+        Per-customer inbound rate limiter (PRO-21): at most ``limit`` messages in
+        any ``window_seconds``, from a GCRA that keeps one timestamp per chat (see
+        _GCRA_LUA) — the sorted set it replaced held a member per message. Up to
+        half the limit may arrive at once; the rest is spread over the window.
+        Returns True if the request is allowed, False if it should be throttled.
         Fail-open: any Redis error returns True.
         """
         try:
-            redis = await get_redis_client()
-            key = f"rl:inbound:{chat_id}"
-            now = time.time()
-            cutoff = now - window_seconds
-            member = f"{now}:{uuid.uuid4().hex[:8]}"  # unique so identical timestamps don't collide
-
-            pipe = redis.pipeline()
-            pipe.zremrangebyscore(key, 0, cutoff)
-            pipe.zadd(key, {member: now})
-            pipe.zcard(key)
-            pipe.expire(key, window_seconds)
-            results = await pipe.execute()
-
-            count = results[2]  # ZCARD result
-            return count <= limit
+            return await SecurityService._gcra_allow(
+                f"rl:gcra:{chat_id}", limit, window_seconds
+            )
 
         except Exception as e:
             logger.error(f"Sliding-window check failed for ...{chat_id[-8:]}: {e}")
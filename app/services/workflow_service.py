@@ -1,4 +1,3 @@
-import asyncio
 from app.providers.whatsapp import get_whatsapp
 from app.services.ai_engine_service import AIEngine, AIResponse
 from app.services.lead_manager_service import (
@@ -8,13 +7,22 @@ from app.services.lead_manager_service import (
 )
 from app.services.state_manager_service import StateManager
 from app.services.context_manager_service import ContextManager
+from app.core.background import BackgroundTasks
 from app.core.logger import logger
-from app.core.database import users_collection, leads_collection, slots_collection
+from app.core.database import users_collection, leads_collection
 from app.core.messages import Messages
 from app.core.prompts import Prompts
-from app.core.constants import LeadStatus, Defaults, UserStates, WorkerConstants, Actor
+from app.core.constants import (
+    LeadStatus,
+    Defaults,
+    UserStates,
+    WorkerConstants,
+    Actor,
+    DeadlineAction,
+)
 from app.core.phone import to_chat_id, strip_suffix
 from app.services.lead_manager_service import set_lead_status
+from app.services.deadline_service import Deadlines
 from app.core.datetime_utils import parse_iso_to_utc
 from app.core.redis_client import (
     acquire_chat_lock,
@@ -33,7 +41,7 @@ from app.services.customer_flow import (
     handle_reschedule_selection as _handle_reschedule_selection,
     handle_status_query as _handle_status_query,
 )
-from app.services.scheduling_service import get_available_slots
+from app.services.scheduling_service import get_available_slots, release_slot
 import pytz
 from app.services.pro_flow import handle_pro_text_command as _handle_pro_cmd
 from app.services.pro_onboarding_service import (
@@ -208,10 +216,16 @@ async def send_pro_reminder(lead_id: str, triggered_by: str = "auto"):
 # --- Main Orchestrator ---
 
 
-async def process_incoming_message(chat_id: str, user_text: str, media_url: str = None):
+async def process_incoming_message(
+    chat_id: str, user_text: str, media_url: str = None, gate: dict = None
+):
     """
     Entry point for all incoming customer/pro messages.
 
+    ``gate`` is the webhook ingestion gate's verdict (SecurityService.
+    stage_ingestion_gate), when the message came through one: its sliding
+    window and trip count were already taken, so they are not taken again.
+
     Wraps the actual handler in a Redis-backed per-chat lock so concurrent ARQ
     tasks for the same chat_id (e.g. rapid-fire messages) don't race on state /
     lead creation. On lock contention we raise ChatLockBusyError so the ARQ
@@ -226,14 +240,19 @@ async def process_incoming_message(chat_id: str, user_text: str, media_url: str
         raise ChatLockBusyError(chat_id)
 
     try:
-        asyncio.create_task(whatsapp.send_chat_state_typing(chat_id))
-        await _process_incoming_message_inner(chat_id, user_text, media_url)
+        BackgroundTasks.spawn(
+            whatsapp.send_chat_state_typing(chat_id),
+            "typing_indicator",
+            key=f"typing:{chat_id}",
+            low_priority=True,
+        )
+        await _process_incoming_message_inner(chat_id, user_text, media_url, gate)
     finally:
         await release_chat_lock(chat_id)
 
 
 async def _process_incoming_message_inner(
-    chat_id: str, user_text: str, media_url: str = None
+    chat_id: str, user_text: str, media_url: str = None, gate: dict = None
 ):
     normalized_text = (user_text or "").strip().lower()
     is_emergency_detected = any(
@@ -295,15 +314,21 @@ async def _process_incoming_message_inner(
         )
 
     if not is_exempt:
-        allowed = await SecurityService.check_sliding_window(
-            chat_id,
-            WorkerConstants.INBOUND_RATE_LIMIT_MAX,
-            WorkerConstants.INBOUND_RATE_LIMIT_WINDOW_SECONDS,
-        )
-        if not allowed:
-            trips = await SecurityService.record_trip(
-                chat_id, WorkerConstants.INBOUND_RATE_LIMIT_WINDOW_SECONDS
+        if gate is not None:
+            allowed = gate["outcome"] != "throttled"
+        else:
+            allowed = await SecurityService.check_sliding_window(
+                chat_id,
+                WorkerConstants.INBOUND_RATE_LIMIT_MAX,
+                WorkerConstants.INBOUND_RATE_LIMIT_WINDOW_SECONDS,
             )
+        if not allowed:
+            if gate is not None:
+                trips = gate["trips"]
+            else:
+                trips = await SecurityService.record_trip(
+                    chat_id, WorkerConstants.INBOUND_RATE_LIMIT_WINDOW_SECONDS
+                )
             logger.warning(
                 f"⛔ Inbound rate limit hit for ...{chat_id[-8:]} (trip {trips})"
             )
@@ -443,9 +468,15 @@ async def _process_incoming_message_inner(
         )
 
         if active_lead:
+            paused_at = datetime.now(timezone.utc)
             await leads_collection.update_one(
                 {"_id": active_lead["_id"]},
-                {"$set": {"is_paused": True, "paused_at": datetime.now(timezone.utc)}},
+                {"$set": {"is_paused": True, "paused_at": paused_at}},
+            )
+            await Deadlines.schedule(
+                active_lead["_id"],
+                DeadlineAction.SLA_DEFLECTION,
+                paused_at + timedelta(seconds=WorkerConstants.PAUSE_TTL_SECONDS),
             )
 
         pro_id = (
@@ -488,16 +519,15 @@ async def _process_incoming_message_inner(
                     await monitor_service.reassign_lead(offered_lead)
                 else:  # "2" — keep waiting; fully restart the SLA window so both
                     # the pro nudge (T+10) and the offer (T+25) re-arm.
+                    restart = {
+                        "reassign_offered": False,
+                        "approval_nudged": False,
+                        "pro_notified_at": datetime.now(timezone.utc),
+                    }
                     await leads_collection.update_one(
-                        {"_id": offered_lead["_id"]},
-                        {
-                            "$set": {
-                                "reassign_offered": False,
-                                "approval_nudged": False,
-                                "pro_notified_at": datetime.now(timezone.utc),
-                            }
-                        },
+                        {"_id": offered_lead["_id"]}, {"$set": restart}
                     )
+                    await Deadlines.arm_for_lead({**offered_lead, **restart})
                     await whatsapp.send_message(
                         chat_id, Messages.Customer.REASSIGN_WAIT_ACK
                     )
@@ -663,10 +693,7 @@ async def _process_incoming_message_inner(
                 # Mirrors the release in pro_flow._execute_cancel; guarded so
                 # legacy/emergency leads with no booked_slot_id are a no-op.
                 if booked_lead.get("booked_slot_id"):
-                    await slots_collection.update_one(
-                        {"_id": booked_lead["booked_slot_id"]},
-                        {"$set": {"is_taken": False}},
-                    )
+                    await release_slot(booked_lead["booked_slot_id"])
                 await StateManager.clear_state(chat_id)
                 await ContextManager.clear_context(chat_id)
                 await whatsapp.send_message(
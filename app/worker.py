@@ -1,12 +1,79 @@
+import asyncio
+import signal
 import sys
 
-from arq import run_worker
+from arq.worker import Worker
 
+from app.core import lanes
 from app.core.arq_worker import WorkerSettings
+from app.core.concurrency import AdaptiveConcurrency
+from app.core.config import settings
+from app.core.constants import WorkerConstants
 from app.core.logger import logger
 from app.core.sentry import init_sentry, sentry_active
 
 
+def build_lane_workers(spec: str) -> list[Worker]:
+    """One ARQ worker per lane in ``spec`` (WORKER_LANES), each consuming its
+    lane's queue with the lane's max_jobs.
+
+    The first lane's worker is the primary: it alone runs the startup and
+    shutdown hooks, so the process still has one scheduler, one heartbeat and
+    one outbox drain however many lanes it consumes. Signals are handled by
+    :func:`run_lanes` for all of them at once.
+
+    With ADAPTIVE_CONCURRENCY_ENABLED the lane's max_jobs is only where its
+    :class:`AdaptiveConcurrency` starts; the worker is sized for the ceiling.
+    """
+    adaptive = settings.ADAPTIVE_CONCURRENCY_ENABLED
+    workers = []
+    for position, (lane, max_jobs) in enumerate(lanes.parse_lanes(spec).items()):
+        primary = position == 0
+        worker = Worker(
+            functions=WorkerSettings.functions,
+            queue_name=lanes.queue_name(lane),
+            redis_settings=WorkerSettings.redis_settings,
+            on_startup=WorkerSettings.on_startup if primary else None,
+            on_shutdown=WorkerSettings.on_shutdown if primary else None,
+            handle_signals=False,
+            max_jobs=(
+                max_jobs * WorkerConstants.ADAPTIVE_MAX_JOBS_FACTOR if adaptive else max_jobs
+            ),
+            job_timeout=WorkerSettings.job_timeout,
+            max_tries=WorkerSettings.max_tries,
+            retry_jobs=WorkerSettings.retry_jobs,
+            keep_result=WorkerSettings.keep_result,
+            keep_result_forever=WorkerSettings.keep_result_forever,
+        )
+        if adaptive:
+            # Jobs find it in their ctx (process_message_task).
+            worker.ctx["concurrency"] = AdaptiveConcurrency(worker, lane, max_jobs)
+        workers.append(worker)
+    return workers
+
+
+async def run_lanes(spec: str) -> None:
+    """Run the lane workers side by side until SIGINT/SIGTERM, then close
+    them — running jobs are cancelled and retried, as with a single worker."""
+    workers = build_lane_workers(spec)
+    logger.info(
+        "ARQ lanes: "
+        + ", ".join(f"{w.queue_name} (max_jobs {w.max_jobs})" for w in workers)
+    )
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(
+            sig, lambda sig=sig: [w.handle_sig(sig) for w in workers]
+        )
+    try:
+        await asyncio.gather(*(w.async_run() for w in workers))
+    except asyncio.CancelledError:
+        pass
+    finally:
+        for w in workers:
+            await w.close()
+
+
 def main():
     """
     Entry point for the ARQ worker process.
@@ -16,7 +83,7 @@ def main():
     init_sentry("proli-worker")
     logger.info("Initializing ARQ Worker...")
     try:
-        run_worker(WorkerSettings)
+        asyncio.run(run_lanes(settings.WORKER_LANES))
     except Exception as e:
         logger.error(f"ARQ Worker crashed: {e}")
         # A worker-process death is exactly what Sentry exists for; flush
@@ -0,0 +1,153 @@
+"""Rate-limiter benchmark — GCRA vs the sorted-set sliding window it replaced.
+
+Fills a Redis with the per-customer limiter state of N active chats (each
+having sent --hits messages inside the window) under both algorithms, and
+reports the memory each one costs and the latency of a single check:
+
+    python scripts/bench_rate_limiter.py                          # REDIS_URL / .env
+    python scripts/bench_rate_limiter.py --chats 100000 --hits 10
+    python scripts/bench_rate_limiter.py --redis-url redis://localhost:6379/15
+
+Needs a real Redis (``INFO memory`` is the measurement) — point it at a
+scratch instance or database, never production. Every key it writes is under
+``bench:rl:`` and is deleted again at the end.
+
+The sorted-set implementation is reproduced here as it was in
+``SecurityService.check_sliding_window`` before the GCRA: ZREMRANGEBYSCORE,
+ZADD, ZCARD and EXPIRE in one MULTI per check, one member per message.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+
+import redis.asyncio as aioredis
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings  # noqa: E402
+from app.core.constants import WorkerConstants  # noqa: E402
+from app.services.security_service import _RATE_LIMIT_LUA  # noqa: E402
+
+PREFIX = "bench:rl:"
+BATCH = 1000
+
+
+def _stage_sorted_set(pipe, key, window, now) -> None:
+    pipe.zremrangebyscore(key, 0, now - window)
+    pipe.zadd(key, {f"{now}:{uuid.uuid4().hex[:8]}": now})
+    pipe.zcard(key)
+    pipe.expire(key, window)
+
+
+async def _fill(redis, algorithm, chats, hits, limit, window):
+    gcra = redis.register_script(_RATE_LIMIT_LUA)
+    for _ in range(hits):
+        for start in range(0, chats, BATCH):
+            pipe = redis.pipeline(transaction=False)
+            now = time.time()
+            for chat in range(start, min(start + BATCH, chats)):
+                key = f"{PREFIX}{algorithm}:{chat}"
+                if algorithm == "gcra":
+                    await gcra(keys=[key], args=[limit, window, now], client=pipe)
+                else:
+                    _stage_sorted_set(pipe, key, window, now)
+            await pipe.execute()
+
+
+async def _latency(redis, algorithm, chats, samples, limit, window):
+    gcra = redis.register_script(_RATE_LIMIT_LUA)
+    timings = []
+    for _ in range(samples):
+        key = f"{PREFIX}{algorithm}:{random.randrange(chats)}"
+        started = time.perf_counter()
+        if algorithm == "gcra":
+            await gcra(keys=[key], args=[limit, window, time.time()])
+        else:
+            pipe = redis.pipeline()
+            _stage_sorted_set(pipe, key, window, time.time())
+            await pipe.execute()
+        timings.append((time.perf_counter() - started) * 1_000_000)
+    timings.sort()
+    return {
+        "mean": statistics.fmean(timings),
+        "p50": timings[len(timings) // 2],
+        "p99": timings[int(len(timings) * 0.99) - 1],
+    }
+
+
+async def _used_memory(redis) -> int:
+    return (await redis.info("memory"))["used_memory"]
+
+
+async def _cleanup(redis) -> None:
+    async for keys in _scan_batches(redis):
+        await redis.unlink(*keys)
+
+
+async def _scan_batches(redis):
+    batch = []
+    async for key in redis.scan_iter(match=f"{PREFIX}*", count=BATCH):
+        batch.append(key)
+        if len(batch) >= BATCH:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def bench(url, chats, hits, samples, limit, window):
+    redis = aioredis.from_url(url, decode_responses=True)
+    await _cleanup(redis)
+    print(
+        f"📏 {chats:,} chats × {hits} messages in the window "
+        f"(limit {limit}/{window}s), {samples:,} latency samples\n"
+    )
+    print(f"{'algorithm':<12} | {'memory':>10} | {'per chat':>9} | "
+          f"{'mean µs':>8} | {'p50 µs':>7} | {'p99 µs':>7}")
+    print("-" * 68)
+    try:
+        for algorithm in ("sorted-set", "gcra"):
+            before = await _used_memory(redis)
+            await _fill(redis, algorithm, chats, hits, limit, window)
+            used = await _used_memory(redis) - before
+            latency = await _latency(redis, algorithm, chats, samples, limit, window)
+            print(
+                f"{algorithm:<12} | {used / 1_048_576:>8.1f}MB | {used / chats:>8.0f}B | "
+                f"{latency['mean']:>8.0f} | {latency['p50']:>7.0f} | {latency['p99']:>7.0f}"
+            )
+            await _cleanup(redis)
+    finally:
+        await _cleanup(redis)
+        await redis.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="GCRA vs sorted-set rate limiter benchmark.")
+    parser.add_argument("--chats", type=int, default=100_000)
+    parser.add_argument(
+        "--hits", type=int, default=10, help="messages per chat inside the window"
+    )
+    parser.add_argument("--samples", type=int, default=20_000)
+    parser.add_argument(
+        "--redis-url",
+        default=settings.REDIS_URL.get_secret_value() if settings.REDIS_URL else None,
+    )
+    args = parser.parse_args()
+    if not args.redis_url:
+        sys.exit("REDIS_URL is not set — pass --redis-url.")
+    asyncio.run(
+        bench(
+            args.redis_url,
+            args.chats,
+            args.hits,
+            args.samples,
+            WorkerConstants.INBOUND_RATE_LIMIT_MAX,
+            WorkerConstants.INBOUND_RATE_LIMIT_WINDOW_SECONDS,
+        )
+    )
@@ -6,25 +6,26 @@ from pymongo import ASCENDING, DESCENDING, TEXT
 # Add the project root to the python path to allow imports from 'app'
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.core.database import (
-    users_collection,
-    leads_collection,
-    messages_collection,
-    slots_collection,
-    audit_log_collection,
-    consent_collection,
-    admins_collection,
-    wa_delivery_collection,
-    db,
-)
-
-
-async def create_all_indexes(silent: bool = False):
+from app.core.database import db
+
+
+async def create_all_indexes(silent: bool = False, database=None):
     """
     Creates indexes for all collections to optimize query performance.
     Safe to call on every startup -- MongoDB skips existing indexes.
     Set silent=True to suppress print output (e.g. when called from app startup).
+    `database` defaults to the app's; the index coverage check
+    (scripts/index_coverage.py) and integration tests pass a scratch one.
     """
+    database = db if database is None else database
+    users_collection = database.users
+    leads_collection = database.leads
+    messages_collection = database.messages
+    slots_collection = database.slots
+    audit_log_collection = database.audit_log
+    consent_collection = database.consent
+    admins_collection = database.admins
+    wa_delivery_collection = database.wa_delivery
 
     def log(msg):
         if not silent:
@@ -39,6 +40,10 @@ async def create_all_indexes(silent: bool = False):
         await users_collection.create_index([("business_name", TEXT)])
         await users_collection.create_index([("service_areas", ASCENDING)])
         await users_collection.create_index([("location", "2dsphere")])
+        # Active-pro listings: role + is_active, no other selective field.
+        await users_collection.create_index(
+            [("role", ASCENDING), ("is_active", ASCENDING)]
+        )
         log("  Users: done")
     except Exception as e:
         log(f"  Error indexing Users: {e}")
@@ -49,8 +54,10 @@ async def create_all_indexes(silent: bool = False):
         await leads_collection.create_index([("chat_id", ASCENDING)])
         await leads_collection.create_index([("status", ASCENDING)])
         await leads_collection.create_index([("created_at", ASCENDING)])
+        # A pro's leads in a status, newest first (pro commands, dashboard
+        # counts). Supersedes the old (pro_id, status) index, its prefix.
         await leads_collection.create_index(
-            [("pro_id", ASCENDING), ("status", ASCENDING)]
+            [("pro_id", ASCENDING), ("status", ASCENDING), ("created_at", ASCENDING)]
         )
         await leads_collection.create_index(
             [("status", ASCENDING), ("created_at", ASCENDING)]
@@ -58,6 +65,25 @@ async def create_all_indexes(silent: bool = False):
         await leads_collection.create_index(
             [("chat_id", ASCENDING), ("status", ASCENDING)]
         )
+        # "The customer's latest lead": chat_id equality, newest first, with
+        # the status conditions (often an $or) filtered on the way.
+        await leads_collection.create_index(
+            [("chat_id", ASCENDING), ("created_at", ASCENDING)]
+        )
+        # Monitor sweeps (app/core/sweep.py) page a status by _id.
+        await leads_collection.create_index(
+            [("status", ASCENDING), ("_id", ASCENDING)]
+        )
+        # Lead-events polling fallback (lead_events_service.poll_once): leads
+        # past an (updated_at, _id) high-water mark, in that order.
+        await leads_collection.create_index(
+            [("updated_at", ASCENDING), ("_id", ASCENDING)]
+        )
+        # The scheduler's daily agenda: BOOKED leads in today's window,
+        # sorted by appointment time.
+        await leads_collection.create_index(
+            [("status", ASCENDING), ("appointment_datetime", ASCENDING)]
+        )
         log("  Leads: done")
     except Exception as e:
         log(f"  Error indexing Leads: {e}")
@@ -65,7 +91,20 @@ async def create_all_indexes(silent: bool = False):
     # --- Messages Collection ---
     try:
         log("Indexing Messages Collection...")
-        await messages_collection.create_index([("chat_id", ASCENDING)])
+        # History rehydration (LeadManager.session_history_cursor): one range
+        # read per chat, newest first — chat_id equality + timestamp range and
+        # sort, walked backwards. Also serves chat_id-only lookups (export,
+        # erase); the old single-field chat_id_1 index is a redundant prefix.
+        await messages_collection.create_index(
+            [("chat_id", ASCENDING), ("timestamp", ASCENDING)]
+        )
+        # Analytics response time (analytics_service): a chat's first model
+        # message after the lead was created — chat_id + role equality, then
+        # the timestamp range and sort. Not reached by the E2E harness, so
+        # CI's query-shape check does not see it.
+        await messages_collection.create_index(
+            [("chat_id", ASCENDING), ("role", ASCENDING), ("timestamp", ASCENDING)]
+        )
         await messages_collection.create_index(
             [("timestamp", ASCENDING)],
             expireAfterSeconds=7776000,  # 90 days TTL
@@ -82,6 +121,11 @@ async def create_all_indexes(silent: bool = False):
         await slots_collection.create_index(
             [("pro_id", ASCENDING), ("start_time", ASCENDING)]
         )
+        # Free-slot reads and booking: pro_id (or $in) + is_taken + a
+        # start_time range, sorted by start_time.
+        await slots_collection.create_index(
+            [("pro_id", ASCENDING), ("is_taken", ASCENDING), ("start_time", ASCENDING)]
+        )
         log("  Slots: done")
     except Exception as e:
         log(f"  Error indexing Slots: {e}")
@@ -134,7 +178,7 @@ async def create_all_indexes(silent: bool = False):
     # --- Admin Sessions Collection ---
     try:
         log("Indexing Admin Sessions Collection...")
-        admin_sessions_col = db.admin_sessions
+        admin_sessions_col = database.admin_sessions
         await admin_sessions_col.create_index([("_token", ASCENDING)], unique=True)
         await admin_sessions_col.create_index(
             [("expiry", ASCENDING)], expireAfterSeconds=0
@@ -0,0 +1,348 @@
+"""Query-shape index coverage — are the queries the services issue indexed?
+
+``scripts/create_indexes.py`` is maintained by hand, and nothing ties it to
+the queries the code actually runs. This closes the loop in two steps:
+
+1. **Record.** With ``PROLI_QUERY_SHAPES`` set, the offline E2E harness
+   (``tests/e2e``) wraps every collection the app holds in a
+   :class:`RecordingCollection`, which notes the shape of each filter and
+   sort (field names and operators, values reduced to their type) plus one
+   example, and writes them to that file when the harness finishes::
+
+       PROLI_QUERY_SHAPES=query_shapes.json pytest -q tests/e2e
+
+2. **Verify.** Against a scratch mongod, create the declared indexes on an
+   empty database and ``explain()`` every recorded shape with its example
+   values. A plan with a ``COLLSCAN``, a blocking ``SORT``, or an index scan
+   unbounded on its leading field fails::
+
+       python scripts/index_coverage.py verify query_shapes.json \\
+           --mongo-uri mongodb://localhost:27017/proli_index_coverage
+
+   The database named in the URI is dropped first — never point it at real
+   data. Exit code is 0 iff every checked shape is indexed.
+
+Not every query is on a hot path. A shape is skipped when its collection is
+one of the few small, admin-only ones (:data:`SMALL_COLLECTIONS`), when it
+has no filter at all (a deliberate full read), or when it is a ``$geoNear``
+aggregation (served by the 2dsphere index by construction). Anything else
+that cannot be indexed goes in :data:`ACCEPTED_SCANS` with its reason.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from typing import Any, Optional
+
+from bson import json_util
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Collections small enough, or far enough from the message path, that a scan
+# is the right plan: runtime settings documents and the admin panel's logins.
+SMALL_COLLECTIONS = frozenset({"settings", "admins", "admin_sessions"})
+
+# Shapes whose plan is known not to be index-only, each with the reason it is
+# accepted, keyed like :func:`signature`.
+ACCEPTED_SCANS: dict[str, str] = {
+    json.dumps(
+        {
+            "collection": "leads",
+            "filter": {"chat_id": "str", "status": {"$in": ["str"]}},
+            "sort": [["completed_at", -1], ["created_at", -1]],
+        },
+        sort_keys=True,
+    ): (
+        "get_session_cutoff's one-time backfill for chats from before "
+        "chat_sessions; sorts one chat's finished leads"
+    ),
+}
+
+# Filter operators whose operand is a list of sub-filters, not of values.
+_LOGICAL = frozenset({"$and", "$or", "$nor"})
+
+
+def _type_name(value: Any) -> str:
+    # A LeadStatus member and its string value are the same query.
+    return "str" if isinstance(value, str) else type(value).__name__
+
+
+def shape_of(value: Any) -> Any:
+    """A filter with its values reduced to type names: what decides the plan,
+    independent of which chat or lead it was issued for."""
+    if isinstance(value, dict):
+        return {
+            key: (
+                [shape_of(sub) for sub in operand]
+                if key in _LOGICAL and isinstance(operand, list)
+                else shape_of(operand)
+            )
+            for key, operand in sorted(value.items())
+        }
+    if isinstance(value, (list, tuple)):
+        return sorted({_type_name(v) for v in value}) or ["empty"]
+    return _type_name(value)
+
+
+def normalize_sort(key_or_list: Any, direction: Optional[int] = None) -> Optional[list]:
+    """pymongo's sort spellings — ``("f", -1)``, ``"f"``, ``[("f", -1)]``,
+    ``{"f": -1}`` — as a list of ``[field, direction]``."""
+    if key_or_list is None:
+        return None
+    if isinstance(key_or_list, str):
+        return [[key_or_list, direction if direction is not None else 1]]
+    if isinstance(key_or_list, dict):
+        return [[k, v] for k, v in key_or_list.items()]
+    return [[k, v] for k, v in key_or_list]
+
+
+def signature(shape: dict) -> str:
+    return json.dumps(
+        {k: shape.get(k) for k in ("collection", "filter", "sort")}, sort_keys=True
+    )
+
+
+class ShapeRecorder:
+    """The distinct query shapes seen, each with its first example."""
+
+    def __init__(self):
+        self.shapes: dict[str, dict] = {}
+
+    def record(
+        self, collection: str, op: str, filter_: Optional[dict], sort=None
+    ) -> None:
+        entry = {
+            "collection": collection,
+            "filter": shape_of(filter_ or {}),
+            "sort": sort,
+        }
+        held = self.shapes.setdefault(
+            signature(entry),
+            {**entry, "ops": [], "example": json_util.dumps(filter_ or {})},
+        )
+        if op not in held["ops"]:
+            held["ops"].append(op)
+
+    def dump(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(sorted(self.shapes.values(), key=signature), f, indent=2)
+
+
+class RecordingCursor:
+    """A find() cursor; its shape is recorded once it is read, by which time
+    any ``.sort()`` chained onto it is known."""
+
+    def __init__(self, cursor, record, filter_, sort):
+        self._cursor = cursor
+        self._record = record
+        self._filter = filter_
+        self._sort = sort
+
+    def sort(self, *args):
+        self._sort = normalize_sort(*args)
+        self._cursor = self._cursor.sort(*args)
+        return self
+
+    def limit(self, n):
+        self._cursor = self._cursor.limit(n)
+        return self
+
+    def skip(self, n):
+        self._cursor = self._cursor.skip(n)
+        return self
+
+    async def to_list(self, *args, **kwargs):
+        self._record("find", self._filter, self._sort)
+        return await self._cursor.to_list(*args, **kwargs)
+
+    def __aiter__(self):
+        self._record("find", self._filter, self._sort)
+        return self._cursor.__aiter__()
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+# Collection methods whose first argument is a filter (find and the rest of
+# the read path are wrapped explicitly below).
+_FILTERED_WRITES = frozenset(
+    {
+        "update_one",
+        "update_many",
+        "replace_one",
+        "delete_one",
+        "delete_many",
+        "find_one_and_update",
+        "find_one_and_replace",
+        "find_one_and_delete",
+    }
+)
+
+
+class RecordingCollection:
+    """Motor collection proxy that records each query's shape, then delegates."""
+
+    def __init__(self, collection, recorder: ShapeRecorder, name: Optional[str] = None):
+        self._collection = collection
+        self._recorder = recorder
+        self._name = name or collection.name
+
+    def _note(self, op: str, filter_, sort=None) -> None:
+        self._recorder.record(self._name, op, filter_, sort)
+
+    def find(self, filter=None, *args, **kwargs):
+        cursor = self._collection.find(filter, *args, **kwargs)
+        return RecordingCursor(
+            cursor, self._note, filter, normalize_sort(kwargs.get("sort"))
+        )
+
+    async def find_one(self, filter=None, *args, **kwargs):
+        self._note("find_one", filter, normalize_sort(kwargs.get("sort")))
+        return await self._collection.find_one(filter, *args, **kwargs)
+
+    async def count_documents(self, filter, *args, **kwargs):
+        self._note("count_documents", filter)
+        return await self._collection.count_documents(filter, *args, **kwargs)
+
+    async def distinct(self, key, filter=None, *args, **kwargs):
+        self._note("distinct", filter)
+        return await self._collection.distinct(key, filter, *args, **kwargs)
+
+    def aggregate(self, pipeline, *args, **kwargs):
+        first = pipeline[0] if pipeline else {}
+        if "$geoNear" not in first:
+            sort = pipeline[1].get("$sort") if len(pipeline) > 1 else None
+            self._note("aggregate", first.get("$match"), normalize_sort(sort))
+        return self._collection.aggregate(pipeline, *args, **kwargs)
+
+    async def bulk_write(self, requests, *args, **kwargs):
+        for request in requests:
+            filter_ = getattr(request, "_filter", None)
+            if filter_ is not None:
+                self._note(f"bulk_write.{type(request).__name__}", filter_)
+        return await self._collection.bulk_write(requests, *args, **kwargs)
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if name not in _FILTERED_WRITES:
+            return attr
+
+        async def _recorded(filter, *args, **kwargs):
+            self._note(name, filter, normalize_sort(kwargs.get("sort")))
+            return await attr(filter, *args, **kwargs)
+
+        return _recorded
+
+
+def plan_stages(explain: dict) -> list[dict]:
+    """Every stage of the winning plan, root first."""
+    plan = explain["queryPlanner"]["winningPlan"]
+    plan = plan.get("queryPlan", plan)  # slot-based engine (MongoDB 7+)
+    stages, pending = [], [plan]
+    while pending:
+        node = pending.pop()
+        stages.append(node)
+        if "inputStage" in node:
+            pending.append(node["inputStage"])
+        pending.extend(node.get("inputStages", []))
+    return stages
+
+
+def _unbounded(stage: dict) -> bool:
+    # An index walked end to end — typically picked only for its sort order —
+    # reads as much as a collection scan. Empty collections make the planner
+    # happy to choose one, so it counts as a miss too.
+    bounds = stage.get("indexBounds") or {}
+    first = next(iter(bounds.values()), None)
+    return first == ["[MinKey, MaxKey]"]
+
+
+def problems(stages: list[dict]) -> list[str]:
+    names = [stage["stage"] for stage in stages]
+    found = []
+    if "COLLSCAN" in names:
+        found.append("collection scan")
+    if any(stage["stage"] == "IXSCAN" and _unbounded(stage) for stage in stages):
+        found.append("unbounded index scan")
+    if "SORT" in names:
+        found.append("in-memory sort")
+    return found
+
+
+def skip_reason(shape: dict) -> Optional[str]:
+    if shape["collection"] in SMALL_COLLECTIONS:
+        return "small collection"
+    if not shape["filter"] and not shape["sort"]:
+        return "no filter"
+    return ACCEPTED_SCANS.get(signature(shape))
+
+
+async def verify(shapes_path: str, mongo_uri: str) -> int:
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from pymongo import uri_parser
+
+    from scripts.create_indexes import create_all_indexes
+
+    with open(shapes_path) as f:
+        shapes = json.load(f)
+    db_name = uri_parser.parse_uri(mongo_uri).get("database") or "proli_index_coverage"
+    client = AsyncIOMotorClient(mongo_uri)
+    await client.drop_database(db_name)
+    database = client[db_name]
+    await create_all_indexes(silent=True, database=database)
+
+    failed = checked = 0
+    for shape in shapes:
+        line = f"{shape['collection']} {json.dumps(shape['filter'])}"
+        if shape["sort"]:
+            line += f" sort {json.dumps(shape['sort'])}"
+        reason = skip_reason(shape)
+        if reason:
+            print(f"  skip  {line} ({reason})")
+            continue
+        command = {
+            "find": shape["collection"],
+            "filter": json_util.loads(shape["example"]),
+        }
+        if shape["sort"]:
+            command["sort"] = {field: direction for field, direction in shape["sort"]}
+        explain = await database.command(
+            {"explain": command, "verbosity": "queryPlanner"}
+        )
+        stages = plan_stages(explain)
+        checked += 1
+        found = problems(stages)
+        if found:
+            failed += 1
+            print(f"  FAIL  {line} via {', '.join(shape['ops'])}: {' + '.join(found)}")
+        else:
+            print(f"  ok    {line}")
+
+    await client.drop_database(db_name)
+    client.close()
+    print(f"\n{checked} shape(s) checked, {failed} not served by an index.")
+    return 1 if failed else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    check = sub.add_parser(
+        "verify", help="explain() recorded shapes against the declared indexes"
+    )
+    check.add_argument(
+        "shapes", help="JSON written by the E2E harness (PROLI_QUERY_SHAPES)"
+    )
+    check.add_argument(
+        "--mongo-uri",
+        default="mongodb://localhost:27017/proli_index_coverage",
+        help="scratch mongod; the database named here is dropped",
+    )
+    args = parser.parse_args()
+    return asyncio.run(verify(args.shapes, args.mongo_uri))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
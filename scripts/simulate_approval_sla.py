@@ -4,16 +4,17 @@ checklist is testable in seconds instead of waiting 10–25 minutes.
 The approval SLA (``check_pro_approval_sla``) fires off ``pro_notified_at``:
   * T+10 (5 for emergency) → nudge the silent pro.
   * T+25 (12 for emergency) → offer the customer a reassignment.
-The ``run_pro_approval_sla`` APScheduler job runs every 5 minutes.
+The aged lead is re-armed on the deadline wheel, so the worker's deadline
+dispatcher fires it within seconds.
 
 Usage:
     python scripts/simulate_approval_sla.py <customer_phone_or_chat_id> [nudge|offer]
 
 Modes (default: offer):
-  * ``nudge`` — ages the clock just past the 10-min mark → the next worker tick
+  * ``nudge`` — ages the clock just past the 10-min mark → the dispatcher
     nudges the assigned pro. Requires a lead that already has a real pro assigned
     (run the normal customer→pro flow first, then this).
-  * ``offer`` — ages the clock past the 25-min mark → the next tick sends the
+  * ``offer`` — ages the clock past the 25-min mark → the dispatcher sends the
     customer the reassignment offer (1/2). Only fires during Israel business
     hours (08:00–21:00) — the PRO-73 gate.
 
@@ -34,6 +35,7 @@ from app.core.database import leads_collection  # noqa: E402
 from app.core.datetime_utils import within_business_hours  # noqa: E402
 from app.services.state_manager_service import StateManager  # noqa: E402
 from app.core.constants import UserStates, LeadStatus, WorkerConstants  # noqa: E402
+from app.services.deadline_service import Deadlines  # noqa: E402
 
 
 async def simulate_approval_sla(chat_id: str, mode: str = "offer"):
@@ -67,6 +69,7 @@ async def simulate_approval_sla(chat_id: str, mode: str = "offer"):
                 "Run the customer→pro flow first so a pro is assigned."
             )
         await leads_collection.update_one({"_id": lead["_id"]}, {"$set": sla_fields})
+        await Deadlines.arm_for_lead({**lead, **sla_fields})
         print(f"✅ Aged existing lead {lead['_id']} (pro_id={lead.get('pro_id')}).")
     else:
         dummy = {
@@ -78,6 +81,7 @@ async def simulate_approval_sla(chat_id: str, mode: str = "offer"):
             **sla_fields,
         }
         result = await leads_collection.insert_one(dummy)
+        await Deadlines.arm_for_lead({**dummy, "_id": result.inserted_id})
         print(
             f"✅ Created throwaway lead {result.inserted_id} (no pro assigned — "
             "the customer offer will fire, but there is no pro to nudge)."
@@ -100,8 +104,8 @@ async def simulate_approval_sla(chat_id: str, mode: str = "offer"):
 
     print("\n🚀 Simulation ready — make sure the worker is running.")
     print(
-        f"   run_pro_approval_sla runs every "
-        f"{WorkerConstants.APPROVAL_SLA_CHECK_INTERVAL_MINUTES} min and will pick this up."
+        f"   The deadline dispatcher polls every "
+        f"{WorkerConstants.DEADLINE_POLL_SECONDS}s and will pick this up."
     )
 
 
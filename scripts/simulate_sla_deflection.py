@@ -9,6 +9,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.core.database import leads_collection
 from app.services.state_manager_service import StateManager
 from app.core.constants import UserStates, LeadStatus, WorkerConstants
+from app.services.deadline_service import Deadlines
 
 async def simulate_sla_deflection(chat_id: str):
     """
@@ -35,6 +36,7 @@ async def simulate_sla_deflection(chat_id: str):
             {"_id": lead["_id"]},
             {"$set": {"is_paused": True, "paused_at": stale_time}}
         )
+        await Deadlines.arm_for_lead({**lead, "is_paused": True, "paused_at": stale_time})
         print(f"✅ Updated existing lead {lead['_id']} to be stale (paused_at: {stale_time})")
     else:
         # Create a dummy lead if none exists
@@ -48,6 +50,7 @@ async def simulate_sla_deflection(chat_id: str):
             "paused_at": stale_time
         }
         result = await leads_collection.insert_one(new_lead)
+        await Deadlines.arm_for_lead({**new_lead, "_id": result.inserted_id})
         print(f"✅ Created dummy lead {result.inserted_id} to be stale (paused_at: {stale_time})")
 
     # 2. Set Redis State
@@ -55,7 +58,7 @@ async def simulate_sla_deflection(chat_id: str):
     print(f"✅ Set Redis state to PAUSED_FOR_HUMAN for {chat_id}")
 
     print(f"\n🚀 Simulation ready! Make sure the worker is running.")
-    print(f"The SLA Monitor (APScheduler job) runs every 5 minutes and will pick this up.")
+    print(f"The deadline dispatcher polls every {WorkerConstants.DEADLINE_POLL_SECONDS}s and will pick this up.")
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
@@ -83,6 +83,38 @@ def fake_redis(request, monkeypatch):
     return fake
 
 
+@pytest.fixture(autouse=True)
+def _fresh_process_caches():
+    """The runtime config cache, the outbound breaker snapshot, the
+    delivery and message-log write buffers, the queue-pressure snapshot, the
+    lane router's pro set and the background-task supervisor are
+    process-wide; what one test cached must not answer for the next (each
+    test gets a fresh fakeredis and rebinds `settings_collection`)."""
+    from app.core.background import BackgroundTasks
+    from app.core.lanes import reset_pro_cache
+    from app.providers.whatsapp import invalidate_breaker_cache
+    from app.providers.whatsapp.delivery import DeliveryWriter
+    from app.services.admission_service import reset_pressure_cache
+    from app.services.message_log_service import MessageLogWriter
+    from app.services.runtime_config_service import RuntimeConfig
+
+    RuntimeConfig.invalidate()
+    invalidate_breaker_cache()
+    DeliveryWriter.reset()
+    reset_pressure_cache()
+    reset_pro_cache()
+    BackgroundTasks.reset()
+    MessageLogWriter.reset()
+    yield
+    RuntimeConfig.invalidate()
+    invalidate_breaker_cache()
+    DeliveryWriter.reset()
+    reset_pressure_cache()
+    reset_pro_cache()
+    BackgroundTasks.reset()
+    MessageLogWriter.reset()
+
+
 @pytest.fixture(autouse=True)
 def patch_dependencies(request, monkeypatch, mock_db):
     """
@@ -144,7 +176,6 @@ def patch_dependencies(request, monkeypatch, mock_db):
     # Patch Scheduler Collections
     import app.scheduler
 
-    monkeypatch.setattr(app.scheduler, "users_collection", users)
     monkeypatch.setattr(app.scheduler, "leads_collection", leads)
     monkeypatch.setattr(app.scheduler, "settings_collection", settings_col)
 
@@ -155,6 +186,16 @@ def patch_dependencies(request, monkeypatch, mock_db):
     monkeypatch.setattr(
         app.services.lead_manager_service, "messages_collection", messages
     )
+    monkeypatch.setattr(
+        app.services.lead_manager_service,
+        "chat_sessions_collection",
+        mock_db.chat_sessions,
+    )
+    import app.services.message_log_service
+
+    monkeypatch.setattr(
+        app.services.message_log_service, "messages_collection", messages
+    )
 
     # Patch Workflow Collections
     import app.services.workflow_service
@@ -220,6 +261,11 @@ def patch_dependencies(request, monkeypatch, mock_db):
         app.services.data_management_service, "reviews_collection", reviews
     )
     monkeypatch.setattr(app.services.data_management_service, "slots_collection", slots)
+    monkeypatch.setattr(
+        app.services.data_management_service,
+        "chat_sessions_collection",
+        mock_db.chat_sessions,
+    )
 
     # Patch Analytics Service Collections
     import app.services.analytics_service
@@ -229,6 +275,11 @@ def patch_dependencies(request, monkeypatch, mock_db):
     monkeypatch.setattr(app.services.analytics_service, "users_collection", users)
     monkeypatch.setattr(app.services.analytics_service, "reviews_collection", reviews)
 
+    # Patch Lane Router Collections
+    import app.core.lanes
+
+    monkeypatch.setattr(app.core.lanes, "users_collection", users)
+
     # Patch Audit Service Collections
     import app.services.audit_service
 
@@ -312,6 +363,7 @@ async def integration_db(monkeypatch):
     await settings_col.delete_many({})
     await reviews.delete_many({})
     await consent.delete_many({})
+    await db.chat_sessions.delete_many({})
 
     # Patch app.core.database
     import app.core.database
@@ -331,6 +383,14 @@ async def integration_db(monkeypatch):
     monkeypatch.setattr(
         app.services.lead_manager_service, "messages_collection", messages
     )
+    monkeypatch.setattr(
+        app.services.lead_manager_service, "chat_sessions_collection", db.chat_sessions
+    )
+    import app.services.message_log_service
+
+    monkeypatch.setattr(
+        app.services.message_log_service, "messages_collection", messages
+    )
 
     # --- Patch Workflow Service ---
     import app.services.workflow_service
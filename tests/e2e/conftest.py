@@ -28,6 +28,7 @@ sweep is what keeps it from mattering in practice.
 
 from __future__ import annotations
 
+import os
 import sys
 
 import httpx
@@ -36,6 +37,7 @@ import pytest_asyncio
 from mongomock_motor import AsyncMongoMockClient
 
 from app.core.config import settings
+from scripts.index_coverage import RecordingCollection, ShapeRecorder
 
 from tests.e2e import reserved_numbers as R
 from tests.e2e.ai_replay import ReplayAIEngine
@@ -86,6 +88,21 @@ def forbid_real_network():
     assert not escapes, f"real HTTP requests escaped the harness: {escapes}"
 
 
+@pytest.fixture(scope="package")
+def query_shapes():
+    """With ``PROLI_QUERY_SHAPES=<path>``, every collection the app holds is
+    wrapped in a ``RecordingCollection`` and the distinct query shapes the
+    harness issued are written to <path> at the end — the input of
+    ``scripts/index_coverage.py verify``. None (no wrapping) otherwise."""
+    path = os.environ.get("PROLI_QUERY_SHAPES")
+    if not path:
+        yield None
+        return
+    recorder = ShapeRecorder()
+    yield recorder
+    recorder.dump(path)
+
+
 @pytest.fixture
 def mock_db():
     """Function-scoped override of the module-scoped ``mock_db`` in tests/conftest.py.
@@ -112,7 +129,7 @@ def recorder() -> OutboundRecorder:
 
 @pytest_asyncio.fixture
 async def world(
-    request, monkeypatch, mock_db, patch_dependencies, fake_redis, recorder
+    request, monkeypatch, mock_db, patch_dependencies, fake_redis, recorder, query_shapes
 ):
     """A wiped, fully-wired universe for one test.
 
@@ -203,7 +220,13 @@ async def world(
         "audit_log_collection": mock_db.audit_log,
         "admins_collection": mock_db.admins,
         "wa_delivery_collection": mock_db.wa_delivery,
+        "chat_sessions_collection": mock_db.chat_sessions,
     }
+    if query_shapes is not None:
+        collections = {
+            attr: RecordingCollection(target, query_shapes)
+            for attr, target in collections.items()
+        }
     for module in [
         m for name, m in list(sys.modules.items()) if name.startswith("app.")
     ]:
@@ -212,9 +235,10 @@ async def world(
                 monkeypatch.setattr(module, attr, target, raising=False)
 
     # --- 6. Real $geoNear routing over mongomock -----------------------------
-    monkeypatch.setattr(
-        matching_service, "users_collection", GeoAwareCollection(mock_db.users)
-    )
+    geo_users = GeoAwareCollection(mock_db.users)
+    if query_shapes is not None:
+        geo_users = RecordingCollection(geo_users, query_shapes, "users")
+    monkeypatch.setattr(matching_service, "users_collection", geo_users)
     monkeypatch.setattr(
         matching_service, "resolve_city_to_coords", fake_resolve_city_to_coords
     )
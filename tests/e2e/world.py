@@ -29,6 +29,7 @@ from bson import ObjectId
 from app.core.constants import ISRAEL_CITIES_COORDS, LeadStatus, UserStates
 from app.core.phone import to_chat_id
 from app.services.state_manager_service import StateManager
+from app.services.runtime_config_service import RuntimeConfig
 
 from tests.e2e import reserved_numbers as R
 
@@ -226,6 +227,8 @@ class World:
         await self.db.settings.update_one(
             {"_id": "scheduler_config"}, {"$set": toggles}, upsert=True
         )
+        # What the admin panel's change notification does in production.
+        RuntimeConfig.invalidate("scheduler_config")
 
     async def grant_consent(self, chat_id: str | None = None) -> None:
         await self.db.consent.insert_one(
@@ -0,0 +1,129 @@
+"""
+Tests for adaptive worker concurrency (app/core/concurrency.py): the AIMD
+limit rising by one per saturated healthy window up to its ceiling, backing
+off multiplicatively when an upstream throttles or the p95 latency or error
+rate is too high, lane workers sized for the ceiling with the controller in
+their job ctx, and the limits published for GET /health/concurrency.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+from arq.worker import Retry
+
+from app.core import arq_worker, concurrency
+from app.core.concurrency import AdaptiveConcurrency, note_throttled
+from app.core.config import settings
+from app.core.constants import WorkerConstants
+from app.core.redis_client import ChatLockBusyError
+from app.worker import build_lane_workers
+
+
+class _Worker:
+    """The two attributes the controller reads and writes on an ARQ Worker."""
+
+    def __init__(self):
+        self.max_jobs = 0
+        self.job_counter = 0
+
+
+@pytest.fixture(autouse=True)
+def _small_windows(monkeypatch):
+    monkeypatch.setattr(WorkerConstants, "ADAPTIVE_WINDOW_JOBS", 4)
+    concurrency.reset_controllers()
+    yield
+    concurrency.reset_controllers()
+
+
+async def _window(controller, throttled=None, fail=False, saturated=True):
+    for _ in range(WorkerConstants.ADAPTIVE_WINDOW_JOBS):
+        controller.worker.job_counter = controller.limit if saturated else 0
+        try:
+            async with controller.track():
+                if throttled:
+                    note_throttled(throttled)
+                if fail:
+                    raise RuntimeError("boom")
+        except RuntimeError:
+            pass
+
+
+@pytest.mark.asyncio
+async def test_limit_rises_while_healthy_and_saturated_up_to_the_ceiling(monkeypatch):
+    worker = _Worker()
+    controller = AdaptiveConcurrency(worker, "standard", 2)
+    assert (worker.max_jobs, controller.floor, controller.ceiling) == (2, 1, 6)
+
+    await _window(controller, saturated=False)
+    assert worker.max_jobs == 2 and controller.last_decision == "hold"
+
+    for _ in range(10):
+        await _window(controller)
+    assert worker.max_jobs == controller.ceiling == 6
+    assert controller.increases == 4
+
+    # A busy chat lock is requeued, not a finished (let alone failed) job.
+    monkeypatch.setattr(
+        arq_worker,
+        "process_incoming_message",
+        AsyncMock(side_effect=ChatLockBusyError("972500000000@c.us")),
+    )
+    for _ in range(WorkerConstants.ADAPTIVE_WINDOW_JOBS * 2):
+        with pytest.raises(Retry):
+            await arq_worker.process_message_task(
+                {"concurrency": controller}, "972500000000@c.us", "שלום"
+            )
+    assert controller._durations == [] and controller._failed == 0
+    assert worker.max_jobs == controller.ceiling
+
+
+@pytest.mark.asyncio
+async def test_limit_backs_off_on_throttling_latency_and_errors():
+    worker = _Worker()
+    controller = AdaptiveConcurrency(worker, "standard", 10)
+
+    await _window(controller, throttled="gemini")
+    assert worker.max_jobs == 7
+    assert controller.last_decision == "decrease: throttled by gemini"
+
+    await _window(controller, fail=True)
+    assert worker.max_jobs == 4
+
+    controller.record(WorkerConstants.ADAPTIVE_P95_TARGET_SECONDS + 1, False, None)
+    await _window(controller)
+    assert worker.max_jobs == 2 and controller.last_decision.startswith("decrease: p95")
+
+    for _ in range(3):
+        await _window(controller, throttled="graph")
+    assert worker.max_jobs == controller.floor == 1
+    assert controller.decreases == 4
+
+    # Outside a tracked job (API process, scheduler) noting is a no-op.
+    note_throttled("gemini")
+
+
+@pytest.mark.asyncio
+async def test_lane_workers_adapt_and_publish_limits(fake_redis, monkeypatch):
+    from app.core.sharding import heartbeat
+    from app.main import app
+
+    monkeypatch.setattr(settings, "ADAPTIVE_CONCURRENCY_ENABLED", True)
+    pro, media = build_lane_workers("pro=3,media=2")
+    # Sized for the ceiling, started at the budget.
+    assert (pro.max_jobs, pro.sem._value) == (3, 3 * WorkerConstants.ADAPTIVE_MAX_JOBS_FACTOR + 1)
+    assert pro.ctx["concurrency"].lane == "pro"
+    assert media.ctx["concurrency"].ceiling == 2 * WorkerConstants.ADAPTIVE_MAX_JOBS_FACTOR
+
+    await heartbeat(fake_redis, "w-1")
+    await concurrency.publish_concurrency_stats(fake_redis, "w-1")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+        resp = await client.get("/health/concurrency")
+
+    assert resp.status_code == 200
+    lanes = resp.json()["workers"]["w-1"]
+    assert lanes["pro"]["limit"] == 3 and lanes["media"]["floor"] == 1
+    await asyncio.gather(pro.close(), media.close())
@@ -0,0 +1,114 @@
+"""
+Tests for webhook admission control (app/services/admission_service.py): the
+customer lanes' ARQ queue depth and lag read from their sorted sets (deferred
+jobs excluded, the pro and emergency lanes ignored), customers deferred with
+one busy reply while pros, the admin and emergencies go straight through, and
+the flag gating it all. (The deferral reaching the
+enqueue is covered in tests/test_meta_webhook_route.py.)
+"""
+
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from arq.constants import default_queue_name
+
+from app.core import lanes
+from app.core.config import settings
+from app.core.constants import WorkerConstants
+from app.core.messages import Messages
+from app.services import admission_service
+from app.services.admission_service import AdmissionService
+
+CUSTOMER = "972500000001@c.us"
+
+
+async def _seed_queue(
+    redis,
+    due: int,
+    waited_seconds: float = 0,
+    deferred: int = 0,
+    queue: str = default_queue_name,
+):
+    now_ms = int(time.time() * 1000) - 1  # due strictly before the check reads
+    batch = await redis.zcard(queue)
+    jobs = {f"job{batch}.{i}": now_ms - waited_seconds * 1000 for i in range(due)}
+    jobs.update({f"later{batch}.{i}": now_ms + 60_000 for i in range(deferred)})
+    await redis.zadd(queue, jobs)
+
+
+@pytest.fixture
+def shedding(monkeypatch):
+    monkeypatch.setattr(settings, "WEBHOOK_LOAD_SHEDDING_ENABLED", True)
+    whatsapp = MagicMock()
+    whatsapp.send_message = AsyncMock()
+    monkeypatch.setattr(admission_service, "get_whatsapp", lambda: whatsapp)
+    return whatsapp
+
+
+@pytest.mark.asyncio
+async def test_queue_pressure_reads_depth_and_lag(fake_redis, monkeypatch):
+    monkeypatch.setattr(WorkerConstants, "QUEUE_SOFT_DEPTH", 3)
+    await _seed_queue(fake_redis, due=2, waited_seconds=10, deferred=5)
+
+    pressure = await AdmissionService.queue_pressure()
+    assert (pressure.depth, pressure.level) == (2, "ok")  # deferred jobs not due
+    assert 9 <= pressure.lag_seconds <= 11
+
+    await _seed_queue(fake_redis, due=1)
+    assert (await AdmissionService.queue_pressure()).depth == 2  # cached
+    admission_service.reset_pressure_cache()
+    assert (await AdmissionService.queue_pressure()).level == "soft"
+
+    await _seed_queue(fake_redis, due=1, waited_seconds=WorkerConstants.QUEUE_HARD_LAG_SECONDS)
+    admission_service.reset_pressure_cache()
+    assert (await AdmissionService.queue_pressure()).level == "hard"
+
+
+@pytest.mark.asyncio
+async def test_queue_pressure_sums_the_customer_lanes(fake_redis, monkeypatch):
+    monkeypatch.setattr(WorkerConstants, "QUEUE_SOFT_DEPTH", 3)
+    await _seed_queue(fake_redis, due=2, waited_seconds=5)
+    await _seed_queue(fake_redis, due=2, waited_seconds=30, queue=lanes.queue_name(lanes.MEDIA))
+    # Pros and emergencies are never deferred, so their backlog is not pressure.
+    await _seed_queue(fake_redis, due=50, waited_seconds=600, queue=lanes.queue_name(lanes.PRO))
+
+    pressure = await AdmissionService.queue_pressure()
+
+    assert (pressure.depth, pressure.level) == (4, "soft")
+    assert 29 <= pressure.lag_seconds <= 31  # the oldest due job, in the media lane
+    assert pressure.by_lane.keys() == {lanes.STANDARD, lanes.MEDIA}
+    assert pressure.by_lane[lanes.STANDARD].depth == 2
+    assert 4 <= pressure.by_lane[lanes.STANDARD].lag_seconds <= 6
+    assert pressure.by_lane[lanes.MEDIA].depth == 2
+
+
+@pytest.mark.asyncio
+async def test_soft_pressure_defers_customers_only(fake_redis, mock_db, shedding, monkeypatch):
+    monkeypatch.setattr(WorkerConstants, "QUEUE_SOFT_LAG_SECONDS", 5)
+    await _seed_queue(fake_redis, due=1, waited_seconds=10)
+    await mock_db.users.insert_one({"phone_number": "972522222222", "role": "professional"})
+
+    for _ in range(2):
+        assert (
+            await AdmissionService.admit(CUSTOMER, "צריך אינסטלטור")
+            == WorkerConstants.QUEUE_SOFT_DEFER_SECONDS
+        )
+    # One busy reply per cooldown, however many messages are deferred.
+    shedding.send_message.assert_awaited_once_with(CUSTOMER, Messages.Errors.BUSY_DEFERRED)
+
+    assert await AdmissionService.admit(CUSTOMER, "דחוף! יש הצפה בבית") is None
+    assert await AdmissionService.admit("972522222222@c.us", "אשר") is None
+    assert await AdmissionService.admit(f"{settings.ADMIN_PHONE}@c.us", "ניהול") is None
+
+
+@pytest.mark.asyncio
+async def test_hard_pressure_defers_longer_and_the_flag_gates_it(
+    fake_redis, shedding, monkeypatch
+):
+    await _seed_queue(fake_redis, due=WorkerConstants.QUEUE_HARD_DEPTH)
+
+    assert await AdmissionService.admit(CUSTOMER, "שלום") == WorkerConstants.QUEUE_HARD_DEFER_SECONDS
+
+    monkeypatch.setattr(settings, "WEBHOOK_LOAD_SHEDDING_ENABLED", False)
+    assert await AdmissionService.admit(CUSTOMER, "שלום") is None
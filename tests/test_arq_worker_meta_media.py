@@ -4,8 +4,10 @@ Meta webhooks carry a `meta-media://<id>` marker (the real CDN URL is
 auth-gated and expires within minutes); the worker must resolve it to a
 permanent Cloudinary URL before the message reaches the dispatcher, and must
 never raise — a media fetch/upload failure degrades to text-only processing.
+The upload itself (`upload_media_file`) is chunked and closes the spooled file.
 """
 
+import io
 from unittest.mock import AsyncMock
 
 import pytest
@@ -28,33 +30,33 @@ async def test_none_passes_through_unchanged():
 async def test_meta_media_marker_resolves_to_hosted_url(monkeypatch):
     monkeypatch.setattr(
         arq_worker,
-        "fetch_meta_media",
-        AsyncMock(return_value=(b"binarydata", "image/jpeg")),
+        "spool_meta_media",
+        AsyncMock(return_value=(io.BytesIO(b"binarydata"), "image/jpeg")),
     )
     monkeypatch.setattr(
         arq_worker,
-        "upload_media_bytes",
-        lambda data: "https://res.cloudinary.com/proli/x.jpg",
+        "upload_media_file",
+        lambda file: "https://res.cloudinary.com/proli/x.jpg",
     )
 
     result = await arq_worker._resolve_inbound_media("meta-media://MEDIA123")
 
     assert result == "https://res.cloudinary.com/proli/x.jpg"
-    arq_worker.fetch_meta_media.assert_awaited_once_with("MEDIA123")
+    arq_worker.spool_meta_media.assert_awaited_once_with("MEDIA123")
 
 
 @pytest.mark.asyncio
 async def test_fetch_failure_returns_none_no_raise(monkeypatch):
     monkeypatch.setattr(
-        arq_worker, "fetch_meta_media", AsyncMock(return_value=(None, None))
+        arq_worker, "spool_meta_media", AsyncMock(return_value=(None, None))
     )
     called = {"upload": False}
 
-    def _upload(data):
+    def _upload(file):
         called["upload"] = True
         return "should-not-be-reached"
 
-    monkeypatch.setattr(arq_worker, "upload_media_bytes", _upload)
+    monkeypatch.setattr(arq_worker, "upload_media_file", _upload)
 
     result = await arq_worker._resolve_inbound_media("meta-media://MEDIA123")
 
@@ -66,10 +68,10 @@ async def test_fetch_failure_returns_none_no_raise(monkeypatch):
 async def test_upload_failure_returns_none_no_raise(monkeypatch):
     monkeypatch.setattr(
         arq_worker,
-        "fetch_meta_media",
-        AsyncMock(return_value=(b"binarydata", "image/jpeg")),
+        "spool_meta_media",
+        AsyncMock(return_value=(io.BytesIO(b"binarydata"), "image/jpeg")),
     )
-    monkeypatch.setattr(arq_worker, "upload_media_bytes", lambda data: None)
+    monkeypatch.setattr(arq_worker, "upload_media_file", lambda file: None)
 
     result = await arq_worker._resolve_inbound_media("meta-media://MEDIA123")
 
@@ -89,17 +91,17 @@ async def test_process_message_task_resolves_meta_media_before_dispatch(monkeypa
     above cannot see on their own."""
     monkeypatch.setattr(
         arq_worker,
-        "fetch_meta_media",
-        AsyncMock(return_value=(b"binarydata", "image/jpeg")),
+        "spool_meta_media",
+        AsyncMock(return_value=(io.BytesIO(b"binarydata"), "image/jpeg")),
     )
     monkeypatch.setattr(
         arq_worker,
-        "upload_media_bytes",
-        lambda data: "https://res.cloudinary.com/proli/routed.jpg",
+        "upload_media_file",
+        lambda file: "https://res.cloudinary.com/proli/routed.jpg",
     )
     captured = {}
 
-    async def _fake_process_incoming_message(chat_id, user_text, media_url):
+    async def _fake_process_incoming_message(chat_id, user_text, media_url, gate=None):
         captured["chat_id"] = chat_id
         captured["user_text"] = user_text
         captured["media_url"] = media_url
@@ -125,10 +127,10 @@ async def test_process_message_task_passes_plain_url_through_unchanged(monkeypat
         called["fetch"] = True
         return None, None
 
-    monkeypatch.setattr(arq_worker, "fetch_meta_media", _fetch_should_not_be_called)
+    monkeypatch.setattr(arq_worker, "spool_meta_media", _fetch_should_not_be_called)
     captured = {}
 
-    async def _fake_process_incoming_message(chat_id, user_text, media_url):
+    async def _fake_process_incoming_message(chat_id, user_text, media_url, gate=None):
         captured["media_url"] = media_url
 
     monkeypatch.setattr(
@@ -141,3 +143,35 @@ async def test_process_message_task_passes_plain_url_through_unchanged(monkeypat
 
     assert captured["media_url"] == "https://cdn.example.com/already-hosted.jpg"
     assert called["fetch"] is False
+
+
+def test_upload_media_file_uploads_in_chunks_and_always_closes(monkeypatch):
+    import cloudinary.uploader
+
+    from app.core.constants import WorkerConstants
+    from app.services.cloudinary_client_service import upload_media_file
+
+    calls = []
+
+    def _upload_large(file, **options):
+        calls.append((file.read(), options))
+        return {"secure_url": "https://res.cloudinary.com/proli/v.mp4"}
+
+    monkeypatch.setattr(cloudinary.uploader, "upload_large", _upload_large)
+    spool = io.BytesIO(b"video")
+    assert upload_media_file(spool) == "https://res.cloudinary.com/proli/v.mp4"
+    assert calls == [
+        (
+            b"video",
+            {"resource_type": "auto", "chunk_size": WorkerConstants.MEDIA_UPLOAD_CHUNK_BYTES},
+        )
+    ]
+    assert spool.closed
+
+    def _fail(file, **options):
+        raise RuntimeError("cloudinary down")
+
+    monkeypatch.setattr(cloudinary.uploader, "upload_large", _fail)
+    spool = io.BytesIO(b"video")
+    assert upload_media_file(spool) is None
+    assert spool.closed
@@ -0,0 +1,199 @@
+"""
+Tests for the write-through availability cache (availability_cache_service.py)
+and the scheduling_service paths that read and keep it in sync.
+
+The cache is fakeredis-backed (conftest `fake_redis`), Mongo is mongomock; every
+test uses a fresh pro id because mock_db is module-scoped.
+"""
+
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+from bson import ObjectId
+
+from app.core.constants import AVAILABILITY_CACHE_KEY
+from app.services.availability_cache_service import AvailabilityCache
+from app.services import scheduling_service
+from app.services.scheduling_service import (
+    check_pro_availability,
+    claim_slot,
+    get_available_slots,
+    get_earliest_free_slots,
+    release_slot,
+)
+
+
+async def _seed_slots(db, pro_id, hours_out, taken=False):
+    now = datetime.now(timezone.utc)
+    ids = []
+    for h in hours_out:
+        result = await db.slots.insert_one(
+            {
+                "pro_id": pro_id,
+                "start_time": now + timedelta(hours=h),
+                "end_time": now + timedelta(hours=h + 1),
+                "is_taken": taken,
+            }
+        )
+        ids.append(result.inserted_id)
+    return ids
+
+
+@pytest.mark.asyncio
+async def test_cold_read_warms_from_mongo_in_start_order(mock_db, fake_redis):
+    pro_id = ObjectId()
+    late, early = await _seed_slots(mock_db, pro_id, [30, 5])
+    await _seed_slots(mock_db, pro_id, [10], taken=True)
+
+    slots = await AvailabilityCache.next_free_slots(pro_id)
+
+    assert [slot_id for slot_id, _ in slots] == [early, late]
+    key = AVAILABILITY_CACHE_KEY.format(pro_id=pro_id)
+    assert await fake_redis.ttl(key) > 0
+
+
+@pytest.mark.asyncio
+async def test_warm_empty_set_is_not_rebuilt_on_every_read(mock_db, fake_redis):
+    """A pro with no free slots is a known answer, not a cache miss."""
+    pro_id = ObjectId()
+    assert await AvailabilityCache.next_free_slots(pro_id) == []
+
+    # A slot written behind the cache's back stays invisible until TTL/invalidate
+    await _seed_slots(mock_db, pro_id, [3])
+    assert await AvailabilityCache.next_free_slots(pro_id) == []
+
+    await AvailabilityCache.invalidate(pro_id)
+    assert len(await AvailabilityCache.next_free_slots(pro_id)) == 1
+
+
+@pytest.mark.asyncio
+async def test_claim_and_release_write_through(mock_db):
+    pro_id = ObjectId()
+    (slot_id,) = await _seed_slots(mock_db, pro_id, [4])
+    assert await check_pro_availability(pro_id) is True  # warms the set
+
+    claimed = await claim_slot(slot_id)
+    assert claimed["_id"] == slot_id
+    assert await check_pro_availability(pro_id) is False
+    assert await claim_slot(slot_id) is None  # already taken
+
+    await release_slot(slot_id)
+    assert await check_pro_availability(pro_id) is True
+    assert (await mock_db.slots.find_one({"_id": slot_id}))["is_taken"] is False
+
+
+@pytest.mark.asyncio
+async def test_releasing_a_free_slot_does_not_write_through(mock_db):
+    pro_id = ObjectId()
+    (slot_id,) = await _seed_slots(mock_db, pro_id, [4])
+
+    with patch.object(AvailabilityCache, "add_free_slot", AsyncMock()) as add:
+        await release_slot(slot_id)  # never claimed — e.g. a repeated cancel
+        add.assert_not_awaited()
+
+        await claim_slot(slot_id)
+        await release_slot(slot_id)
+        add.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_get_available_slots_served_from_cache(mock_db):
+    pro_id = ObjectId()
+    ids = await _seed_slots(mock_db, pro_id, [2, 3, 4])
+
+    slots = await get_available_slots(str(pro_id), limit=2)
+
+    assert [s["_id"] for s in slots] == ids[:2]
+    assert all(s["start_time"].tzinfo is not None for s in slots)
+
+
+@pytest.mark.asyncio
+async def test_earliest_free_slots_across_pros(mock_db):
+    soon, later, booked_out = ObjectId(), ObjectId(), ObjectId()
+    await _seed_slots(mock_db, soon, [1, 20])
+    await _seed_slots(mock_db, later, [48])
+    await _seed_slots(mock_db, booked_out, [2], taken=True)
+
+    earliest = await get_earliest_free_slots([soon, later, booked_out])
+
+    assert earliest[str(booked_out)] is None
+    assert earliest[str(soon)] < earliest[str(later)]
+
+
+@pytest.mark.asyncio
+async def test_earliest_free_slots_falls_back_to_mongo_on_redis_error(mock_db):
+    pro_id = ObjectId()
+    await _seed_slots(mock_db, pro_id, [6])
+
+    with patch(
+        "app.services.availability_cache_service.get_redis_client",
+        AsyncMock(side_effect=ConnectionError("redis down")),
+    ):
+        earliest = await get_earliest_free_slots([pro_id, ObjectId()])
+
+    assert earliest[str(pro_id)] is not None
+    assert list(earliest.values()).count(None) == 1
+
+
+@pytest.mark.asyncio
+async def test_template_generation_invalidates_cache(mock_db, fake_redis, monkeypatch):
+    pro_id = ObjectId()
+    await mock_db.users.insert_one({"_id": pro_id, "role": "professional"})
+    assert await check_pro_availability(pro_id) is False  # warm + empty
+
+    template = {
+        day: {"start": "08:00", "end": "18:00", "enabled": True}
+        for day in ["monday", "tuesday", "wednesday", "thursday", "friday",
+                    "saturday", "sunday"]
+    }
+    monkeypatch.setattr(
+        scheduling_service, "get_schedule_template", AsyncMock(return_value=template)
+    )
+    created = await scheduling_service.generate_slots_from_template(str(pro_id), 3)
+
+    assert created > 0
+    assert not await fake_redis.exists(AVAILABILITY_CACHE_KEY.format(pro_id=pro_id))
+    assert await check_pro_availability(pro_id) is True
+
+
+@pytest.mark.asyncio
+async def test_add_free_slot_never_recreates_a_dropped_set(mock_db, fake_redis):
+    """The warm check and the write are one script: a set dropped between
+    them is not re-created as a one-member "complete" availability."""
+    pro_id = ObjectId()
+    key = AVAILABILITY_CACHE_KEY.format(pro_id=pro_id)
+    (slot_id,) = await _seed_slots(mock_db, pro_id, [5])
+    start = datetime.now(timezone.utc) + timedelta(hours=5)
+
+    await AvailabilityCache.add_free_slot(pro_id, slot_id, start)
+    assert not await fake_redis.exists(key)
+
+    assert [s for s, _ in await AvailabilityCache.next_free_slots(pro_id)] == [slot_id]
+    await fake_redis.zrem(key, str(slot_id))
+    await AvailabilityCache.add_free_slot(pro_id, slot_id, start)
+    assert [s for s, _ in await AvailabilityCache.next_free_slots(pro_id)] == [slot_id]
+
+
+@pytest.mark.asyncio
+async def test_truncated_set_falls_back_to_mongo_past_its_horizon(
+    mock_db, fake_redis, monkeypatch
+):
+    monkeypatch.setattr(
+        "app.core.constants.WorkerConstants.AVAILABILITY_CACHE_MAX_SLOTS", 2
+    )
+    pro_id = ObjectId()
+    ids = await _seed_slots(mock_db, pro_id, [1, 2, 3, 50])
+    now = datetime.now(timezone.utc)
+
+    # Within the horizon (the 2nd slot) the set answers on its own.
+    assert [s for s, _ in await AvailabilityCache.next_free_slots(pro_id, limit=2)] == ids[:2]
+    # Past it, a set that cannot fill the request is a miss, not "nothing free".
+    late_window = (now + timedelta(hours=40), now + timedelta(hours=60))
+    assert await AvailabilityCache.next_free_slots(pro_id, *late_window) is None
+    assert await check_pro_availability(pro_id, now + timedelta(hours=50)) is True
+    assert await AvailabilityCache.earliest_free_slots([pro_id], *late_window) is None
+
+    # A slot freed beyond the horizon stays out of the set.
+    await AvailabilityCache.add_free_slot(pro_id, ids[3], now + timedelta(hours=50))
+    key = AVAILABILITY_CACHE_KEY.format(pro_id=pro_id)
+    assert await fake_redis.zscore(key, str(ids[3])) is None
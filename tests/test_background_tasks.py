@@ -0,0 +1,94 @@
+"""
+Tests for the background-task supervisor (app/core/background.py): bounded
+concurrency, failures counted per task name, keyed tasks coalesced, low-
+priority work dropped under pressure, and drain waiting for outstanding work
+while cancelling what outlives its timeout.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.background import BackgroundTasks
+from app.core.constants import WorkerConstants
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded_and_failures_are_counted(monkeypatch):
+    monkeypatch.setattr(WorkerConstants, "BACKGROUND_MAX_CONCURRENT", 2)
+    running, peak = 0, 0
+
+    async def work():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    async def boom():
+        raise RuntimeError("mongo down")
+
+    tasks = [BackgroundTasks.spawn(work(), "work") for _ in range(6)]
+    tasks.append(BackgroundTasks.spawn(boom(), "track_token_usage"))
+    await asyncio.wait(tasks)
+
+    assert peak == 2
+    stats = BackgroundTasks.stats()
+    assert stats["outstanding"] == 0
+    assert stats["failed"] == {"track_token_usage": 1}
+
+
+@pytest.mark.asyncio
+async def test_keyed_tasks_coalesce_and_low_priority_is_dropped_under_pressure(
+    monkeypatch,
+):
+    monkeypatch.setattr(WorkerConstants, "BACKGROUND_LOW_PRIORITY_LIMIT", 3)
+    release = asyncio.Event()
+    calls = []
+
+    async def typing(chat_id):
+        calls.append(chat_id)
+        await release.wait()
+
+    first = BackgroundTasks.spawn(
+        typing("a"), "typing_indicator", key="typing:a", low_priority=True
+    )
+    assert BackgroundTasks.spawn(
+        typing("a"), "typing_indicator", key="typing:a", low_priority=True
+    ) is None
+    BackgroundTasks.spawn(typing("b"), "typing_indicator", key="typing:b", low_priority=True)
+    BackgroundTasks.spawn(release.wait(), "flush")
+
+    # Three outstanding: low-priority work is shed, the rest still runs.
+    assert BackgroundTasks.spawn(typing("c"), "typing_indicator", low_priority=True) is None
+    assert BackgroundTasks.spawn(release.wait(), "flush") is not None
+
+    release.set()
+    await BackgroundTasks.drain()
+    assert sorted(calls) == ["a", "b"]
+    assert first.done()
+    stats = BackgroundTasks.stats()
+    assert stats["coalesced"] == {"typing_indicator": 1}
+    assert stats["dropped"] == {"typing_indicator": 1}
+    # The key is free again once its task finished.
+    assert BackgroundTasks.spawn(typing("a"), "typing_indicator", key="typing:a") is not None
+    await BackgroundTasks.drain()
+
+
+@pytest.mark.asyncio
+async def test_drain_cancels_what_outlives_the_timeout(monkeypatch):
+    monkeypatch.setattr(WorkerConstants, "BACKGROUND_DRAIN_TIMEOUT_SECONDS", 0.05)
+    finished = []
+
+    async def quick():
+        await asyncio.sleep(0)
+        finished.append("quick")
+
+    stuck = BackgroundTasks.spawn(asyncio.sleep(60), "stuck")
+    BackgroundTasks.spawn(quick(), "quick")
+
+    await BackgroundTasks.drain()
+
+    assert finished == ["quick"]
+    assert stuck.cancelled()
+    assert BackgroundTasks.stats()["outstanding"] == 0
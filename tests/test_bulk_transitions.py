@@ -0,0 +1,183 @@
+"""
+Tests for bulk lead status transitions (set_lead_statuses_bulk): guarded
+transitions applied in one bulk_write report only the winners (read back by the
+call's own `last_transition_batch` id), write the status_history entry
+set_lead_status writes, and back the Janitor and Healer sweeps.
+
+Mongo is mongomock (module-scoped), so each test uses fresh ObjectIds.
+"""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from bson import ObjectId
+
+from app.core.constants import Actor, LeadStatus, WorkerConstants
+from app.services import lead_manager_service
+from app.services.lead_manager_service import (
+    StatusTransition,
+    set_lead_status,
+    set_lead_statuses_bulk,
+)
+from app.services.monitor_service import (
+    auto_reject_unassigned_leads,
+    reassign_stale_leads,
+)
+
+
+@pytest.fixture
+def mock_whatsapp():
+    with patch("app.services.monitor_service.whatsapp") as mock:
+        mock.send_message = AsyncMock()
+        yield mock
+
+
+@pytest.mark.asyncio
+async def test_bulk_returns_winners_and_matches_single_history(mock_db, fake_redis):
+    ids = [ObjectId() for _ in range(3)]
+    await mock_db.leads.insert_many(
+        [
+            {"_id": ids[0], "status": LeadStatus.CONTACTED, "status_history": []},
+            {"_id": ids[1], "status": LeadStatus.BOOKED, "status_history": []},
+            {"_id": ids[2], "status": LeadStatus.CONTACTED, "status_history": []},
+        ]
+    )
+
+    won = await set_lead_statuses_bulk(
+        [
+            StatusTransition(
+                i,
+                LeadStatus.CLOSED,
+                extra_set={"closed_reason": "no_pro_available"},
+                expected_status=LeadStatus.CONTACTED,
+            )
+            for i in ids
+        ],
+        Actor.SYSTEM,
+    )
+
+    assert [lead["_id"] for lead in won] == [ids[0], ids[2]]  # ids[1] lost its guard
+    assert all(lead["closed_reason"] == "no_pro_available" for lead in won)
+    assert (await mock_db.leads.find_one({"_id": ids[1]}))["status"] == LeadStatus.BOOKED
+
+    single_id = ObjectId()
+    await mock_db.leads.insert_one(
+        {"_id": single_id, "status": LeadStatus.CONTACTED, "status_history": []}
+    )
+    single = await set_lead_status(
+        single_id,
+        LeadStatus.CLOSED,
+        Actor.SYSTEM,
+        expected_status=LeadStatus.CONTACTED,
+    )
+    bulk_entry = won[0]["status_history"][-1]
+    single_entry = single["status_history"][-1]
+    assert bulk_entry.keys() == single_entry.keys()
+    assert (bulk_entry["status"], bulk_entry["by"]) == (
+        single_entry["status"],
+        single_entry["by"],
+    )
+    assert bulk_entry["at"] == won[0]["updated_at"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_calls_in_the_same_millisecond_keep_their_own_winners(
+    mock_db, fake_redis
+):
+    """Same actor, same stamp: the loser of a shared lead must not read back
+    the other call's win as its own."""
+    lead_id = ObjectId()
+    await mock_db.leads.insert_one(
+        {"_id": lead_id, "status": LeadStatus.CONTACTED, "status_history": []}
+    )
+    frozen = datetime(2026, 10, 19, 12, 0, 0, 123000, tzinfo=timezone.utc)
+    transition = StatusTransition(
+        lead_id, LeadStatus.CLOSED, expected_status=LeadStatus.CONTACTED
+    )
+
+    with patch.object(lead_manager_service, "datetime") as clock:
+        clock.now.return_value = frozen
+        first = await set_lead_statuses_bulk([transition], Actor.SYSTEM)
+        # A second transition on an untouched lead makes the loser's bulk
+        # write modify something, so it does read back.
+        other_id = ObjectId()
+        await mock_db.leads.insert_one(
+            {"_id": other_id, "status": LeadStatus.CONTACTED, "status_history": []}
+        )
+        second = await set_lead_statuses_bulk(
+            [transition, StatusTransition(other_id, LeadStatus.CLOSED)], Actor.SYSTEM
+        )
+
+    assert [lead["_id"] for lead in first] == [lead_id]
+    assert [lead["_id"] for lead in second] == [other_id]
+
+
+@pytest.mark.asyncio
+async def test_janitor_closes_a_page_in_one_bulk_write(
+    mock_db, fake_redis, monkeypatch, mock_whatsapp
+):
+    monkeypatch.setattr("app.services.monitor_service.leads_collection", mock_db.leads)
+    await mock_db.leads.delete_many({})
+    old = datetime.now(timezone.utc) - timedelta(
+        hours=WorkerConstants.UNASSIGNED_LEAD_TIMEOUT_HOURS + 1
+    )
+    await mock_db.leads.insert_many(
+        [
+            {"chat_id": f"janitor-{i}@c.us", "status": LeadStatus.CONTACTED, "created_at": old}
+            for i in range(3)
+        ]
+    )
+
+    leads = lead_manager_service.leads_collection
+    bulk_write = AsyncMock(wraps=leads.bulk_write)
+    monkeypatch.setattr(leads, "bulk_write", bulk_write)
+    result = await auto_reject_unassigned_leads()
+
+    assert bulk_write.await_count == 1
+    assert result["processed"] == 3 and result["failed"] == 0
+    assert await mock_db.leads.count_documents({"status": LeadStatus.CLOSED}) == 3
+    assert mock_whatsapp.send_message.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_healer_batches_escalations_and_skips_repeats(
+    mock_db, fake_redis, monkeypatch, mock_whatsapp
+):
+    monkeypatch.setattr("app.services.monitor_service.leads_collection", mock_db.leads)
+    alert = AsyncMock()
+    monkeypatch.setattr("app.services.monitor_service._alert_admin_lead_escalated", alert)
+    stale = datetime.now(timezone.utc) - timedelta(
+        minutes=WorkerConstants.SOS_TIMEOUT_MINUTES + 1
+    )
+    exhausted = {
+        "_id": ObjectId(),
+        "chat_id": "exhausted@c.us",
+        "status": LeadStatus.NEW,
+        "created_at": stale,
+        "full_address": "Tel Aviv",
+        "reassignment_count": WorkerConstants.MAX_REASSIGNMENTS,
+    }
+    no_location = {
+        "_id": ObjectId(),
+        "chat_id": "nowhere@c.us",
+        "status": LeadStatus.CONTACTED,
+        "created_at": stale,
+    }
+    already = {**exhausted, "_id": ObjectId(), "escalation_reason": "max_reassignments_exhausted"}
+    await mock_db.leads.insert_many([exhausted, no_location, already])
+
+    failed = await reassign_stale_leads([exhausted, no_location, already])
+
+    assert failed == 0
+    reasons = {
+        lead["_id"]: lead.get("escalation_reason")
+        async for lead in mock_db.leads.find(
+            {"_id": {"$in": [exhausted["_id"], no_location["_id"], already["_id"]]}}
+        )
+    }
+    assert reasons[exhausted["_id"]] == "max_reassignments_exhausted"
+    assert reasons[no_location["_id"]] == "no_usable_location"
+    # Only the newly exhausted lead pages the admin; the repeat is untouched.
+    alert.assert_awaited_once()
+    assert (await mock_db.leads.find_one({"_id": already["_id"]}))["status"] == LeadStatus.NEW
@@ -25,12 +25,12 @@ from app.providers.whatsapp.cloud_api import (
     ServiceWindowClosedError,
     TemplateNotRegisteredError,
     _split_text,
-    fetch_meta_media,
     normalize_meta_message,
     parse_meta_webhook,
     parse_status_events,
+    spool_meta_media,
 )
-from app.providers.whatsapp.window import _window_key
+from app.providers.whatsapp.window import window_key
 
 CHAT_ID = "972501234567@c.us"
 
@@ -97,7 +97,7 @@ class _Recorder:
         self.requests.append(request)
         return self._handler(request)
 
-    async def get_http_client(self):
+    async def get_http_client(self, pool=None):
         return self.client
 
     async def aclose(self):
@@ -108,6 +108,15 @@ def _json_response(status_code: int, payload: dict) -> httpx.Response:
     return httpx.Response(status_code, json=payload)
 
 
+async def _fetch_meta_media(media_id: str):
+    """``spool_meta_media`` with the spooled file read back and closed."""
+    spool, mime = await spool_meta_media(media_id)
+    if spool is None:
+        return None, mime
+    with spool:
+        return spool.read(), mime
+
+
 def _accepted(wamid="wamid.TEST1"):
     def handler(request: httpx.Request) -> httpx.Response:
         return _json_response(200, {"messages": [{"id": wamid}]})
@@ -124,7 +133,7 @@ def _cloud_provider_env(monkeypatch):
 
 
 async def _open_window(fake_redis, chat_id=CHAT_ID):
-    await fake_redis.set(_window_key(chat_id), "2026-01-01T00:00:00+00:00", ex=100)
+    await fake_redis.set(window_key(chat_id), "2026-01-01T00:00:00+00:00", ex=100)
 
 
 def _patch_http_client(monkeypatch, handler) -> _Recorder:
@@ -1046,7 +1055,7 @@ async def test_window_closed_page_dedupe_is_per_chat_id(fake_redis):
 
 
 # ---------------------------------------------------------------------------
-# 14. fetch_meta_media size cap
+# 14. spool_meta_media size cap
 # ---------------------------------------------------------------------------
 
 
@@ -1064,7 +1073,7 @@ async def test_fetch_meta_media_over_size_cap_is_not_downloaded(install_recorder
 
     recorder = install_recorder(handler)
 
-    data, mime = await fetch_meta_media("MEDIA_TOO_BIG")
+    data, mime = await _fetch_meta_media("MEDIA_TOO_BIG")
 
     assert data is None
     assert mime is None
@@ -1089,7 +1098,7 @@ async def test_fetch_meta_media_under_size_cap_still_downloads(install_recorder)
 
     recorder = install_recorder(handler)
 
-    data, mime = await fetch_meta_media("MEDIA_OK")
+    data, mime = await _fetch_meta_media("MEDIA_OK")
 
     assert data == b"small-file-bytes"
     assert mime == "image/jpeg"
@@ -1117,7 +1126,7 @@ async def test_fetch_meta_media_string_file_size_over_cap_is_not_downloaded(
 
     recorder = install_recorder(handler)
 
-    data, mime = await fetch_meta_media("MEDIA_STR_TOO_BIG")
+    data, mime = await _fetch_meta_media("MEDIA_STR_TOO_BIG")
 
     assert data is None
     assert mime is None
@@ -1142,7 +1151,7 @@ async def test_fetch_meta_media_small_string_file_size_still_downloads(
 
     recorder = install_recorder(handler)
 
-    data, mime = await fetch_meta_media("MEDIA_STR_OK")
+    data, mime = await _fetch_meta_media("MEDIA_STR_OK")
 
     assert data == b"small-file-bytes"
     assert mime == "image/jpeg"
@@ -1169,7 +1178,7 @@ async def test_fetch_meta_media_non_https_lookup_url_is_rejected_no_download(
 
     recorder = install_recorder(handler)
 
-    data, mime = await fetch_meta_media("MEDIA_INSECURE")
+    data, mime = await _fetch_meta_media("MEDIA_INSECURE")
 
     assert data is None
     assert mime is None
@@ -1198,16 +1207,52 @@ async def test_fetch_meta_media_downloaded_body_over_cap_is_discarded(
 
     recorder = install_recorder(handler)
 
-    data, mime = await fetch_meta_media("MEDIA_LIED_ABOUT_SIZE")
+    data, mime = await _fetch_meta_media("MEDIA_LIED_ABOUT_SIZE")
 
     assert data is None
     assert mime is None
-    # Both hops happened — the cap only bites after the body is in hand.
+    # Both hops happened — the cap bites on the streamed body.
     assert len(recorder.requests) == 2
 
 
+@pytest.mark.asyncio
+async def test_spool_meta_media_aborts_the_stream_at_the_cap_and_spills_to_disk(
+    install_recorder, monkeypatch
+):
+    """The body is streamed, never buffered whole: past the cap the rest is
+    not read at all, and under it everything beyond the in-memory budget
+    lives on disk."""
+    monkeypatch.setattr(WorkerConstants, "MAX_INBOUND_MEDIA_BYTES", 3500)
+    monkeypatch.setattr(WorkerConstants, "MEDIA_SPOOL_MEMORY_BYTES", 1500)
+    streamed = []
+    chunks = {"count": 10}
+
+    async def body():
+        for _ in range(chunks["count"]):
+            streamed.append(1)
+            yield b"x" * 1000
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if str(request.url).startswith("https://graph.facebook.com"):
+            return _json_response(
+                200, {"url": "https://lookaside.example.com/m", "mime_type": "video/mp4"}
+            )
+        return httpx.Response(200, content=body())
+
+    install_recorder(handler)
+
+    assert await spool_meta_media("MEDIA_HUGE") == (None, None)
+    assert len(streamed) == 4  # aborted on the chunk that passed the cap
+
+    chunks["count"] = 3
+    spool, mime = await spool_meta_media("MEDIA_FITS")
+    with spool:
+        assert spool._rolled  # past MEDIA_SPOOL_MEMORY_BYTES: on disk
+        assert (len(spool.read()), mime) == (3000, "video/mp4")
+
+
 # ---------------------------------------------------------------------------
-# fetch_meta_media
+# spool_meta_media
 # ---------------------------------------------------------------------------
 
 
@@ -1226,7 +1271,7 @@ async def test_fetch_meta_media_two_hop_lookup_returns_bytes_and_mime(install_re
 
     install_recorder(handler)
 
-    data, mime = await fetch_meta_media("MEDIA123")
+    data, mime = await _fetch_meta_media("MEDIA123")
 
     assert data == b"\xff\xd8\xff\xe0binarydata"
     assert mime == "image/jpeg"
@@ -1236,7 +1281,7 @@ async def test_fetch_meta_media_two_hop_lookup_returns_bytes_and_mime(install_re
 async def test_fetch_meta_media_unconfigured_returns_none_none(monkeypatch):
     monkeypatch.setattr(settings, "META_ACCESS_TOKEN", None)
 
-    data, mime = await fetch_meta_media("MEDIA123")
+    data, mime = await _fetch_meta_media("MEDIA123")
 
     assert data is None
     assert mime is None
@@ -1249,7 +1294,7 @@ async def test_fetch_meta_media_lookup_failure_returns_none_none(install_recorde
 
     install_recorder(handler)
 
-    data, mime = await fetch_meta_media("MEDIA123")
+    data, mime = await _fetch_meta_media("MEDIA123")
 
     assert data is None
     assert mime is None
@@ -0,0 +1,52 @@
+"""
+Tests for the Redis conversation context as a ring buffer
+(context_manager_service.ContextManager): appends trimmed to the last
+MAX_CHAT_HISTORY messages in the same transaction, reads fetching only the
+tail asked for, and cache warming keeping only the window.
+"""
+
+import json
+
+import pytest
+
+from app.core.config import settings
+from app.services.context_manager_service import ContextManager
+
+CHAT_ID = "972501234567@c.us"
+KEY = f"context:{CHAT_ID}"
+
+
+@pytest.fixture
+def small_window(monkeypatch):
+    monkeypatch.setattr(settings, "MAX_CHAT_HISTORY", 4)
+
+
+@pytest.mark.asyncio
+async def test_appends_keep_only_the_window_and_reads_fetch_the_tail(
+    fake_redis, small_window
+):
+    for n in range(10):
+        await ContextManager.update_history(CHAT_ID, "user", f"הודעה {n}")
+
+    assert await fake_redis.llen(KEY) == 4
+    assert await fake_redis.ttl(KEY) > 0
+    history = await ContextManager.get_history(CHAT_ID)
+    assert [m["parts"][0] for m in history] == [f"הודעה {n}" for n in range(6, 10)]
+
+    tail = await ContextManager.get_history(CHAT_ID, limit=2)
+    assert [m["parts"][0] for m in tail] == ["הודעה 8", "הודעה 9"]
+    # Never more than the window, however much is asked for.
+    assert len(await ContextManager.get_history(CHAT_ID, limit=50)) == 4
+    assert await ContextManager.get_history("972500000000@c.us") is None
+
+
+@pytest.mark.asyncio
+async def test_set_history_keeps_the_last_window(fake_redis, small_window):
+    await fake_redis.rpush(KEY, json.dumps({"role": "user", "parts": ["ישן"]}))
+    messages = [{"role": "model", "parts": [str(n)]} for n in range(7)]
+
+    await ContextManager.set_history(CHAT_ID, messages)
+
+    stored = [json.loads(m) for m in await fake_redis.lrange(KEY, 0, -1)]
+    assert stored == messages[-4:]
+    assert await fake_redis.ttl(KEY) > 0
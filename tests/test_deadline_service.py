@@ -0,0 +1,201 @@
+"""
+Tests for the deadline wheel (deadline_service.py) and the scheduler's
+deadline dispatcher that drives the monitor_service per-lead handlers.
+
+Redis is the per-test fakeredis (conftest `fake_redis`); Mongo is mongomock,
+module-scoped, so every test works on fresh lead ids.
+"""
+
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+from bson import ObjectId
+
+from app import scheduler
+from app.core.constants import (
+    DEADLINES_KEY,
+    Actor,
+    DeadlineAction,
+    LeadStatus,
+    UserStates,
+    WorkerConstants,
+)
+from app.providers.whatsapp import outbox
+from app.services import monitor_service
+from app.services.deadline_service import Deadlines, deadlines_for_lead
+from app.services.lead_manager_service import set_lead_status
+
+
+@pytest.fixture
+def monitor_db(mock_db, monkeypatch):
+    monkeypatch.setattr(monitor_service, "leads_collection", mock_db.leads)
+    monkeypatch.setattr(monitor_service, "users_collection", mock_db.users)
+    with patch.object(monitor_service, "whatsapp") as wa:
+        wa.send_message = AsyncMock()
+        yield wa
+
+
+def test_deadlines_follow_the_lead_document():
+    notified = datetime(2026, 5, 1, 10, 0, tzinfo=timezone.utc)
+    lead = {
+        "_id": ObjectId(),
+        "status": LeadStatus.NEW,
+        "pro_id": ObjectId(),
+        "pro_notified_at": notified.replace(tzinfo=None),  # Mongo hands back naive
+        "created_at": notified,
+        "approval_nudged": True,
+        "is_emergency": True,
+    }
+
+    due = deadlines_for_lead(lead)
+
+    # Nudge already sent → only the (halved) offer and the Healer remain.
+    assert set(due) == {DeadlineAction.APPROVAL_OFFER, DeadlineAction.SOS_REASSIGN}
+    assert due[DeadlineAction.APPROVAL_OFFER] == notified + timedelta(
+        minutes=WorkerConstants.APPROVAL_REASSIGN_OFFER_MINUTES // 2
+    )
+    assert deadlines_for_lead({**lead, "status": LeadStatus.COMPLETED}) == {}
+
+
+@pytest.mark.asyncio
+async def test_status_transition_arms_and_clears_the_wheel(mock_db, fake_redis):
+    now = datetime.now(timezone.utc)
+    lead_id = (
+        await mock_db.leads.insert_one({"chat_id": "c1@c.us", "status": "contacted"})
+    ).inserted_id
+
+    await set_lead_status(
+        lead_id,
+        LeadStatus.NEW,
+        Actor.SYSTEM,
+        extra_set={"pro_id": ObjectId(), "pro_notified_at": now, "created_at": now},
+    )
+    members = await fake_redis.zrange(DEADLINES_KEY, 0, -1)
+    assert f"approval_nudge:{lead_id}" in members
+    assert f"sos_reassign:{lead_id}" in members
+
+    await set_lead_status(lead_id, LeadStatus.BOOKED, Actor.PRO)
+    members = await fake_redis.zrange(DEADLINES_KEY, 0, -1)
+    assert f"approval_nudge:{lead_id}" not in members
+    assert f"stale_booked:{lead_id}" in members
+
+
+@pytest.mark.asyncio
+async def test_pop_due_claims_each_entry_once(fake_redis):
+    now = datetime.now(timezone.utc)
+    due_id, later_id = ObjectId(), ObjectId()
+    await Deadlines.schedule(due_id, DeadlineAction.SOS_REASSIGN, now - timedelta(seconds=1))
+    await Deadlines.schedule(later_id, DeadlineAction.SOS_REASSIGN, now + timedelta(hours=1))
+
+    assert await Deadlines.pop_due(now) == [(due_id, DeadlineAction.SOS_REASSIGN)]
+    assert await Deadlines.pop_due(now) == []
+
+    # Leased, not removed: a dispatcher that dies before completing it only
+    # delays the action by the lease.
+    lease_end = now + timedelta(seconds=WorkerConstants.DEADLINE_LEASE_SECONDS + 1)
+    assert await Deadlines.pop_due(lease_end) == [(due_id, DeadlineAction.SOS_REASSIGN)]
+    await Deadlines.complete([(due_id, DeadlineAction.SOS_REASSIGN)], lease_end)
+    assert await fake_redis.zrange(DEADLINES_KEY, 0, -1) == [f"sos_reassign:{later_id}"]
+
+
+@pytest.mark.asyncio
+async def test_complete_keeps_an_entry_rearmed_during_its_handler(fake_redis):
+    now = datetime.now(timezone.utc)
+    lead_id = ObjectId()
+    await Deadlines.schedule(lead_id, DeadlineAction.STALE_BOOKED, now)
+    await Deadlines.pop_due(now)
+    rearmed = now + timedelta(hours=4)
+    await Deadlines.schedule(lead_id, DeadlineAction.STALE_BOOKED, rearmed)
+
+    await Deadlines.complete([(lead_id, DeadlineAction.STALE_BOOKED)], now)
+
+    score = await fake_redis.zscore(DEADLINES_KEY, f"stale_booked:{lead_id}")
+    assert score == rearmed.timestamp()
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_nudges_pro_at_deadline(mock_db, fake_redis, monitor_db, monkeypatch):
+    pro_id = ObjectId()
+    await mock_db.users.insert_one({"_id": pro_id, "phone_number": "972500000123"})
+    notified = datetime.now(timezone.utc) - timedelta(
+        minutes=WorkerConstants.APPROVAL_NUDGE_MINUTES, seconds=5
+    )
+    lead = {
+        "chat_id": "deadline_nudge@c.us",
+        "status": LeadStatus.NEW,
+        "pro_id": pro_id,
+        "pro_notified_at": notified,
+        "created_at": notified,
+    }
+    lead["_id"] = (await mock_db.leads.insert_one(lead)).inserted_id
+    await Deadlines.arm_for_lead(lead)
+    monkeypatch.setattr(
+        monitor_service.StateManager,
+        "get_state",
+        AsyncMock(return_value=UserStates.AWAITING_PRO_APPROVAL),
+    )
+    queued = []
+    monitor_db.send_message.side_effect = lambda *a: queued.append(outbox._queueing.get())
+
+    claimed = await scheduler.run_deadline_dispatcher()
+
+    assert claimed == 1  # only the nudge is due; offer and Healer are still ahead
+    monitor_db.send_message.assert_awaited_once()
+    assert queued == [True]  # sent inside queued_sends(), paced by the outbox
+    assert monitor_db.send_message.await_args.args[0].startswith("972500000123")
+    assert (await mock_db.leads.find_one({"_id": lead["_id"]}))["approval_nudged"] is True
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_rearms_gated_cold_action(fake_redis, monitor_db, monkeypatch):
+    lead_id = ObjectId()
+    await Deadlines.schedule(
+        lead_id, DeadlineAction.SOS_REASSIGN, datetime.now(timezone.utc)
+    )
+    monkeypatch.setattr(
+        scheduler, "_customer_cold_job_allowed", AsyncMock(return_value=False)
+    )
+
+    await scheduler.run_deadline_dispatcher()
+
+    score = await fake_redis.zscore(DEADLINES_KEY, f"sos_reassign:{lead_id}")
+    assert score > datetime.now(timezone.utc).timestamp()
+    monitor_db.send_message.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_deflection_rearms_when_handoff_saw_new_activity(monitor_db):
+    recent = datetime.now(timezone.utc) - timedelta(minutes=2)
+    lead = {
+        "_id": ObjectId(),
+        "chat_id": "paused@c.us",
+        "status": LeadStatus.BOOKED,
+        "is_paused": True,
+        "paused_at": recent,
+    }
+
+    rearm_at = await monitor_service.deflect_silent_handoff(lead)
+
+    assert rearm_at == recent + timedelta(seconds=WorkerConstants.PAUSE_TTL_SECONDS)
+    monitor_db.send_message.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_stale_reminder_waits_out_the_interval_since_the_last_one(monitor_db):
+    now = datetime.now(timezone.utc)
+    last = now - timedelta(minutes=10)
+    lead = {
+        "_id": ObjectId(),
+        "status": LeadStatus.BOOKED,
+        "pro_id": ObjectId(),
+        "updated_at": now - timedelta(hours=WorkerConstants.STALE_BOOKED_LEAD_HOURS + 5),
+        "reminders_sent": 1,
+        "last_reminder_at": last,
+    }
+
+    rearm_at = await monitor_service.remind_stale_booked_lead(lead)
+
+    assert rearm_at == last + timedelta(
+        hours=WorkerConstants.STALE_BOOKED_REMINDER_INTERVAL_HOURS
+    )
+    monitor_db.send_message.assert_not_awaited()
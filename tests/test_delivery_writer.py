@@ -0,0 +1,81 @@
+"""
+Tests for write-behind delivery bookkeeping (delivery.DeliveryWriter, on with
+DELIVERY_WRITE_BEHIND_ENABLED): an outbound record and its status callbacks
+coalesced into one upsert per wamid and flushed as one bulk_write, the flush
+interval writing a quiet buffer, and a `failed` status flushing at once so the
+131047 path still reads its record — with a failed flush keeping its writes.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.core.constants import WorkerConstants
+from app.providers.whatsapp import delivery
+from app.providers.whatsapp.delivery import DeliveryWriter
+
+CHAT_ID = "972501234567@c.us"
+
+
+@pytest.fixture
+def write_behind(mock_db, monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.DELIVERY_WRITE_BEHIND_ENABLED", True)
+    collection = mock_db.wa_delivery
+    monkeypatch.setattr(delivery, "wa_delivery_collection", collection)
+    bulk_write = AsyncMock(wraps=collection.bulk_write)
+    monkeypatch.setattr(collection, "bulk_write", bulk_write)
+    return collection
+
+
+@pytest.mark.asyncio
+async def test_writes_coalesce_per_wamid_into_one_bulk_write(write_behind):
+    await delivery.record_outbound("wamid.W1", CHAT_ID, "text")
+    for status in ("sent", "delivered"):
+        await delivery.apply_status_event({"wa_message_id": "wamid.W1", "status": status})
+    await delivery.record_outbound("wamid.W2", CHAT_ID, "template")
+
+    assert await write_behind.count_documents({}) == 0  # nothing on the send path
+
+    assert await DeliveryWriter.flush() == 2
+    write_behind.bulk_write.assert_awaited_once()
+    first = await write_behind.find_one({"wa_message_id": "wamid.W1"})
+    second = await write_behind.find_one({"wa_message_id": "wamid.W2"})
+    assert (first["status"], first["kind"]) == ("delivered", "text")
+    assert first["created_at"] is not None
+    assert (second["status"], second["kind"]) == ("accepted", "template")
+
+
+@pytest.mark.asyncio
+async def test_buffer_flushes_after_the_interval(write_behind, monkeypatch):
+    monkeypatch.setattr(WorkerConstants, "DELIVERY_FLUSH_INTERVAL_SECONDS", 0.01)
+
+    await delivery.record_outbound("wamid.T1", CHAT_ID, "text")
+    for _ in range(50):
+        if await write_behind.count_documents({"wa_message_id": "wamid.T1"}):
+            break
+        await asyncio.sleep(0.01)
+
+    assert (await write_behind.find_one({"wa_message_id": "wamid.T1"}))["kind"] == "text"
+
+
+@pytest.mark.asyncio
+async def test_failed_status_flushes_at_once_and_a_failed_flush_keeps_writes(
+    write_behind, monkeypatch
+):
+    await delivery.record_outbound("wamid.F1", CHAT_ID, "text")
+    write_behind.bulk_write.side_effect = RuntimeError("mongo down")
+    with pytest.raises(RuntimeError):
+        await DeliveryWriter.flush()
+    write_behind.bulk_write.side_effect = None
+
+    retry = AsyncMock()
+    monkeypatch.setattr(delivery, "_retry_as_template", retry)
+    await delivery.apply_status_event(
+        {"wa_message_id": "wamid.F1", "status": "failed", "error_code": 131047}
+    )
+
+    # The retry path saw the record the outbound write buffered.
+    retry.assert_awaited_once()
+    _, chat_id, record = retry.await_args.args
+    assert (chat_id, record["kind"], record["status"]) == (CHAT_ID, "text", "failed")
@@ -185,7 +185,7 @@ async def test_call_google_no_key_raises_unavailable(monkeypatch):
     failure — it must raise GeocodingUnavailable and short-circuit before
     any network client is constructed (PRO-19)."""
     monkeypatch.setattr(geo.settings, "GOOGLE_MAPS_API_KEY", None)
-    with patch("httpx.AsyncClient") as mock_client_cls:
+    with patch("app.services.geocoding_service.get_http_client") as mock_client_cls:
         with pytest.raises(geo.GeocodingUnavailable):
             await geo._call_google("whatever")
         mock_client_cls.assert_not_called()
@@ -204,10 +204,8 @@ async def test_call_google_ok_response(mock_google_maps_key):
 
     mock_client = MagicMock()
     mock_client.get = AsyncMock(return_value=mock_resp)
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=None)
 
-    with patch("httpx.AsyncClient", return_value=mock_client):
+    with patch("app.services.geocoding_service.get_http_client", AsyncMock(return_value=mock_client)):
         result = await geo._call_google("Tel Aviv")
     # Note: geojson ordering — (lon, lat)
     assert result == (34.7818, 32.0853)
@@ -228,10 +226,8 @@ async def test_call_google_rejects_outside_israel(mock_google_maps_key):
 
     mock_client = MagicMock()
     mock_client.get = AsyncMock(return_value=mock_resp)
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=None)
 
-    with patch("httpx.AsyncClient", return_value=mock_client):
+    with patch("app.services.geocoding_service.get_http_client", AsyncMock(return_value=mock_client)):
         result = await geo._call_google("Some ambiguous name")
     assert result is None
 
@@ -245,10 +241,8 @@ async def test_call_google_zero_results(mock_google_maps_key):
 
     mock_client = MagicMock()
     mock_client.get = AsyncMock(return_value=mock_resp)
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=None)
 
-    with patch("httpx.AsyncClient", return_value=mock_client):
+    with patch("app.services.geocoding_service.get_http_client", AsyncMock(return_value=mock_client)):
         result = await geo._call_google("כלום")
     assert result is None
 
@@ -266,10 +260,8 @@ async def test_call_google_raises_for_transient_statuses(mock_google_maps_key, s
 
     mock_client = MagicMock()
     mock_client.get = AsyncMock(return_value=mock_resp)
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=None)
 
-    with patch("httpx.AsyncClient", return_value=mock_client):
+    with patch("app.services.geocoding_service.get_http_client", AsyncMock(return_value=mock_client)):
         with pytest.raises(geo.GeocodingUnavailable):
             await geo._call_google("whatever")
 
@@ -285,10 +277,8 @@ async def test_call_google_raises_for_unrecognized_status(mock_google_maps_key):
 
     mock_client = MagicMock()
     mock_client.get = AsyncMock(return_value=mock_resp)
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=None)
 
-    with patch("httpx.AsyncClient", return_value=mock_client):
+    with patch("app.services.geocoding_service.get_http_client", AsyncMock(return_value=mock_client)):
         with pytest.raises(geo.GeocodingUnavailable):
             await geo._call_google("whatever")
 
@@ -304,10 +294,8 @@ async def test_call_google_raises_for_ok_with_empty_results(mock_google_maps_key
 
     mock_client = MagicMock()
     mock_client.get = AsyncMock(return_value=mock_resp)
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=None)
 
-    with patch("httpx.AsyncClient", return_value=mock_client):
+    with patch("app.services.geocoding_service.get_http_client", AsyncMock(return_value=mock_client)):
         with pytest.raises(geo.GeocodingUnavailable):
             await geo._call_google("whatever")
 
@@ -323,10 +311,8 @@ async def test_call_google_raises_for_malformed_payload(mock_google_maps_key):
 
     mock_client = MagicMock()
     mock_client.get = AsyncMock(return_value=mock_resp)
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=None)
 
-    with patch("httpx.AsyncClient", return_value=mock_client):
+    with patch("app.services.geocoding_service.get_http_client", AsyncMock(return_value=mock_client)):
         with pytest.raises(geo.GeocodingUnavailable):
             await geo._call_google("whatever")
 
@@ -337,10 +323,8 @@ async def test_call_google_raises_on_http_layer_exception(mock_google_maps_key):
     into GeocodingUnavailable, not propagate as-is or return None."""
     mock_client = MagicMock()
     mock_client.get = AsyncMock(side_effect=httpx.TimeoutException("boom"))
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=None)
 
-    with patch("httpx.AsyncClient", return_value=mock_client):
+    with patch("app.services.geocoding_service.get_http_client", AsyncMock(return_value=mock_client)):
         with pytest.raises(geo.GeocodingUnavailable) as excinfo:
             await geo._call_google("whatever")
         assert excinfo.value.__cause__ is not None
@@ -364,10 +348,8 @@ async def test_resolve_caches_definitive_miss_with_negative_ttl(
 
     mock_client = MagicMock()
     mock_client.get = AsyncMock(return_value=mock_resp)
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=None)
 
-    with patch("httpx.AsyncClient", return_value=mock_client):
+    with patch("app.services.geocoding_service.get_http_client", AsyncMock(return_value=mock_client)):
         result = await geo.resolve_city_to_coords("גיבריש")
 
     assert result is None
@@ -403,10 +385,8 @@ async def test_resolve_caches_invalid_request_with_transient_ttl_and_opens_circu
 
     mock_client = MagicMock()
     mock_client.get = AsyncMock(return_value=mock_resp)
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=None)
 
-    with patch("httpx.AsyncClient", return_value=mock_client):
+    with patch("app.services.geocoding_service.get_http_client", AsyncMock(return_value=mock_client)):
         result = await geo.resolve_city_to_coords("גיבריש")
 
     assert result is None
@@ -525,10 +505,8 @@ async def test_resolve_caches_out_of_israel_with_definitive_ttl(
 
     mock_client = MagicMock()
     mock_client.get = AsyncMock(return_value=mock_resp)
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=None)
 
-    with patch("httpx.AsyncClient", return_value=mock_client):
+    with patch("app.services.geocoding_service.get_http_client", AsyncMock(return_value=mock_client)):
         result = await geo.resolve_city_to_coords("Some ambiguous name")
 
     assert result is None
@@ -1,17 +1,26 @@
 from unittest.mock import MagicMock
 
+import httpx
 import pytest
 
 import app.core.http_client as http_client_module
-from app.core.http_client import get_http_client, close_http_client
+from app.core.http_client import (
+    GEOCODING,
+    GRAPH,
+    MEDIA,
+    META_MEDIA,
+    POOLS,
+    close_http_client,
+    get_http_client,
+)
 
 
 @pytest.fixture(autouse=True)
 def _reset_http_client_singleton():
     """Each test starts with a clean slate — no leaked client from a prior test."""
-    http_client_module._http_client = None
+    http_client_module._clients.clear()
     yield
-    http_client_module._http_client = None
+    http_client_module._clients.clear()
 
 
 @pytest.mark.asyncio
@@ -22,7 +31,7 @@ async def test_close_after_get_closes_client_and_resets_singleton():
     await close_http_client()
 
     assert client.is_closed is True
-    assert http_client_module._http_client is None
+    assert http_client_module._clients == {}
 
 
 @pytest.mark.asyncio
@@ -30,21 +39,21 @@ async def test_double_close_is_silent_noop():
     client = await get_http_client()
     await close_http_client()
     assert client.is_closed is True
-    assert http_client_module._http_client is None
+    assert http_client_module._clients == {}
 
     # Second close: nothing to close, must not raise.
     await close_http_client()
 
-    assert http_client_module._http_client is None
+    assert http_client_module._clients == {}
 
 
 @pytest.mark.asyncio
 async def test_close_without_ever_opening_is_noop():
-    assert http_client_module._http_client is None
+    assert http_client_module._clients == {}
 
     await close_http_client()
 
-    assert http_client_module._http_client is None
+    assert http_client_module._clients == {}
 
 
 @pytest.mark.asyncio
@@ -68,7 +77,7 @@ async def test_close_swallows_aclose_error_and_logs_warning_and_resets_singleton
     warning_msg = warning_mock.call_args[0][0]
     assert "boom during shutdown" in warning_msg
     # Singleton is reset to None even though the underlying close failed.
-    assert http_client_module._http_client is None
+    assert http_client_module._clients == {}
 
 
 @pytest.mark.asyncio
@@ -80,4 +89,61 @@ async def test_get_http_client_after_close_returns_fresh_open_client():
 
     assert second_client is not first_client
     assert second_client.is_closed is False
-    assert http_client_module._http_client is second_client
+    assert http_client_module._clients[MEDIA] is second_client
+
+
+@pytest.mark.asyncio
+async def test_each_upstream_gets_its_own_tuned_pool():
+    graph = await get_http_client(GRAPH)
+    media = await get_http_client(META_MEDIA)
+
+    assert graph is not media
+    assert graph is await get_http_client(GRAPH)
+    assert graph.timeout.read == POOLS[GRAPH].read
+    assert media.timeout.read == POOLS[META_MEDIA].read
+    with pytest.raises(ValueError):
+        await get_http_client("nope")
+
+    await close_http_client()
+    assert graph.is_closed and media.is_closed
+
+
+@pytest.mark.asyncio
+async def test_pool_stats_count_requests_in_flight_until_the_body_is_closed(monkeypatch):
+    monkeypatch.setattr(
+        http_client_module.httpx,
+        "AsyncHTTPTransport",
+        lambda **_: httpx.MockTransport(lambda request: httpx.Response(200, content=b"x" * 10)),
+    )
+    monkeypatch.setattr(http_client_module, "_counters", {})
+    client = await get_http_client(GRAPH)
+
+    async with client.stream("GET", "https://graph.facebook.com/v23.0/1") as response:
+        stats = http_client_module.pool_stats()[GRAPH]
+        assert (stats["in_flight"], stats["requests"]) == (1, 1)
+        assert stats["utilization"] == round(1 / POOLS[GRAPH].max_connections, 3)
+        await response.aread()
+    await client.get("https://graph.facebook.com/v23.0/2")
+
+    stats = http_client_module.pool_stats()[GRAPH]
+    assert (stats["in_flight"], stats["peak_in_flight"], stats["requests"]) == (0, 1, 2)
+    assert http_client_module.pool_stats()[GEOCODING]["requests"] == 0
+
+
+@pytest.mark.asyncio
+async def test_health_http_reports_live_workers_pools(fake_redis):
+    from app.core.sharding import heartbeat
+    from app.main import app
+
+    await heartbeat(fake_redis, "w-1")
+    await http_client_module.publish_pool_stats(fake_redis, "w-1")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+        resp = await client.get("/health/http")
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert set(body["workers"]) == {"w-1"}
+    assert body["workers"]["w-1"][GRAPH]["max_connections"] == POOLS[GRAPH].max_connections
+    assert set(body["api"]) == set(POOLS)
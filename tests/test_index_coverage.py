@@ -0,0 +1,122 @@
+"""
+Tests for the query-shape index coverage check (scripts/index_coverage.py):
+RecordingCollection reducing each query to its shape — values to type names,
+a chained .sort() included once the cursor is read — and the explain() plan
+checks flagging collection scans, in-memory sorts and unbounded index scans
+while skipping the small and accepted shapes.
+"""
+
+import json
+from datetime import datetime, timezone
+
+import pytest
+from bson import ObjectId
+
+from app.core.constants import LeadStatus
+from scripts.index_coverage import (
+    ACCEPTED_SCANS,
+    RecordingCollection,
+    ShapeRecorder,
+    plan_stages,
+    problems,
+    skip_reason,
+)
+
+
+@pytest.mark.asyncio
+async def test_recording_collection_keeps_one_shape_per_query(mock_db, tmp_path):
+    recorder = ShapeRecorder()
+    leads = RecordingCollection(mock_db.leads, recorder)
+    now = datetime.now(timezone.utc)
+
+    for pro_id in (ObjectId(), ObjectId()):
+        await leads.find(
+            {"pro_id": pro_id, "status": {"$in": [LeadStatus.BOOKED, "new"]}}
+        ).sort("created_at", -1).limit(5).to_list(None)
+    await leads.count_documents({"pro_id": ObjectId(), "status": LeadStatus.NEW})
+    await leads.update_one({"_id": ObjectId()}, {"$set": {"updated_at": now}})
+    # A cursor nobody reads issued no query.
+    leads.find({"chat_id": "972500000000@c.us"})
+
+    path = tmp_path / "shapes.json"
+    recorder.dump(str(path))
+    shapes = {
+        (s["collection"], json.dumps(s["filter"]), json.dumps(s["sort"])): s
+        for s in json.loads(path.read_text())
+    }
+
+    assert set(shapes) == {
+        (
+            "leads",
+            '{"pro_id": "ObjectId", "status": {"$in": ["str"]}}',
+            '[["created_at", -1]]',
+        ),
+        ("leads", '{"pro_id": "ObjectId", "status": "str"}', "null"),
+        ("leads", '{"_id": "ObjectId"}', "null"),
+    }
+    find_shape = shapes[
+        (
+            "leads",
+            '{"pro_id": "ObjectId", "status": {"$in": ["str"]}}',
+            '[["created_at", -1]]',
+        )
+    ]
+    assert find_shape["ops"] == ["find"]
+    assert "$oid" in find_shape["example"]  # real values, for explain()
+
+
+def _ixscan(bounds):
+    return {"stage": "IXSCAN", "indexName": "idx", "indexBounds": bounds}
+
+
+def test_plan_checks_flag_scans_and_sorts_but_skip_accepted_shapes():
+    def explain(plan):
+        return {"queryPlanner": {"winningPlan": {"queryPlan": plan}}}
+
+    indexed = explain(
+        {
+            "stage": "FETCH",
+            "inputStage": _ixscan(
+                {"chat_id": ['["a", "a"]'], "timestamp": ["[MaxKey, MinKey]"]}
+            ),
+        }
+    )
+    assert problems(plan_stages(indexed)) == []
+
+    sorted_in_memory = explain(
+        {
+            "stage": "SORT",
+            "inputStage": {
+                "stage": "FETCH",
+                "inputStage": _ixscan({"status": ['["new", "new"]']}),
+            },
+        }
+    )
+    assert problems(plan_stages(sorted_in_memory)) == ["in-memory sort"]
+
+    # Picked for its order alone: walks the whole _id index.
+    walked = explain(
+        {"stage": "FETCH", "inputStage": _ixscan({"_id": ["[MinKey, MaxKey]"]})}
+    )
+    assert problems(plan_stages(walked)) == ["unbounded index scan"]
+
+    scanned = explain(
+        {
+            "stage": "OR",
+            "inputStages": [{"stage": "COLLSCAN"}, _ixscan({"a": ["[1, 1]"]})],
+        }
+    )
+    assert problems(plan_stages(scanned)) == ["collection scan"]
+
+    assert skip_reason(
+        {"collection": "settings", "filter": {"_id": "str"}, "sort": None}
+    )
+    assert (
+        skip_reason({"collection": "leads", "filter": {}, "sort": None}) == "no filter"
+    )
+    assert (
+        skip_reason({"collection": "leads", "filter": {"status": "str"}, "sort": None})
+        is None
+    )
+    accepted = json.loads(next(iter(ACCEPTED_SCANS)))
+    assert skip_reason(accepted) == next(iter(ACCEPTED_SCANS.values()))
@@ -57,6 +57,7 @@ def test_webhook_valid_text_message(mock_background_tasks):
         "Hello Proli",
         None,
         message_id="F1234567890",
+        _queue_name="arq:queue",
     )
 
 
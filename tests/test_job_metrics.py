@@ -0,0 +1,127 @@
+"""
+Tests for scheduler job instrumentation (app/core/job_metrics.py) and the
+GET /health/scheduler route that reads it back: per-run outcome, items, lock
+and PRO-73 gate decisions recorded in Redis, and the rolling-duration
+histogram flagging a job whose runtime approaches its interval.
+"""
+
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+import httpx
+from unittest.mock import AsyncMock
+from bson import ObjectId
+
+import app.scheduler as sched
+from app.core.constants import DeadlineAction, SCHEDULER_JOB_DURATIONS_KEY
+from app.core.job_metrics import instrument_job, job_stats
+from app.core.redis_client import with_scheduler_lock
+from app.main import app
+
+
+@pytest.mark.asyncio
+async def test_records_items_and_lock_skips(fake_redis):
+    release = asyncio.Event()
+
+    @instrument_job("sweep_job", interval_seconds=60)
+    @with_scheduler_lock("sweep_job", ttl=50)
+    async def job():
+        await release.wait()
+        return {"processed": 7, "failed": 0}
+
+    first = asyncio.create_task(job())
+    await asyncio.sleep(0)
+    await job()  # lock held by the first run
+    release.set()
+    await first
+
+    stats = (await job_stats())["sweep_job"]
+    assert (stats["runs"], stats["ok"], stats["lock_skipped"]) == (2, 1, 1)
+    assert stats["items_total"] == 7
+    assert stats["last_lock"] == "acquired" and stats["last_success_at"]
+    # Lock-skipped runs stay out of the duration samples.
+    assert stats["samples"] == 1
+
+
+@pytest.mark.asyncio
+async def test_records_gate_decisions_and_errors(fake_redis, monkeypatch):
+    monkeypatch.setattr(sched, "within_business_hours", lambda: False)
+    monkeypatch.setattr(sched, "check_and_reassign_stale_leads", AsyncMock())
+
+    await instrument_job("sos_auto_healer")(sched.run_sos_healer)()
+
+    @instrument_job("broken")
+    async def broken():
+        raise RuntimeError("mongo down")
+
+    with pytest.raises(RuntimeError):
+        await broken()
+
+    stats = await job_stats()
+    assert stats["sos_auto_healer"]["last_outcome"] == "gated"
+    assert stats["sos_auto_healer"]["last_gates"] == {"sos_healer_active": False}
+    assert stats["sos_auto_healer"]["gates"] == {
+        "sos_healer_active": {"allowed": 0, "blocked": 1}
+    }
+    sched.check_and_reassign_stale_leads.assert_not_awaited()
+    assert stats["broken"]["errors"] == 1
+    assert stats["broken"]["last_error"] == "mongo down"
+    assert stats["broken"]["last_success_at"] is None
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_closed_toggle_is_a_gate_decision_not_a_gated_run(
+    fake_redis, monkeypatch
+):
+    """The dispatcher re-arms the gated entries and runs the rest, so a closed
+    toggle must not stop its last_success_at from advancing."""
+    monkeypatch.setattr(sched, "within_business_hours", lambda: False)
+    await sched.Deadlines.schedule(
+        ObjectId(), DeadlineAction.SOS_REASSIGN, datetime.now(timezone.utc)
+    )
+
+    await instrument_job("deadline_dispatcher")(sched.run_deadline_dispatcher)()
+
+    stats = (await job_stats())["deadline_dispatcher"]
+    assert stats["last_outcome"] == "ok" and stats["last_success_at"]
+    assert stats["gated"] == 0
+    assert stats["gates"] == {"sos_healer_active": {"allowed": 0, "blocked": 1}}
+
+
+@pytest.mark.asyncio
+async def test_health_scheduler_flags_job_nearing_its_interval(fake_redis):
+    @instrument_job("slow_sweep", interval_seconds=10)
+    async def slow_sweep():
+        return 1
+
+    await slow_sweep()
+    # Rewrite the sample so the p95 sits at 90% of the 10 s interval.
+    key = SCHEDULER_JOB_DURATIONS_KEY.format(job_id="slow_sweep")
+    await fake_redis.delete(key)
+    await fake_redis.lpush(key, 0.2, 9.0)
+
+    # In-loop ASGI client: fakeredis is bound to the test's event loop.
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+        resp = await client.get("/health/scheduler")
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["status"] == "degraded"
+    assert body["near_overlap"] == ["slow_sweep"]
+    job = body["jobs"]["slow_sweep"]
+    assert job["p95_interval_ratio"] == 0.9
+    assert job["histogram"]["le_0.5s"] == 1 and job["histogram"]["le_15s"] == 1
+
+
+@pytest.mark.asyncio
+async def test_start_scheduler_instruments_every_job():
+    scheduler = sched.start_scheduler()
+    try:
+        jobs = scheduler.get_jobs()
+        assert jobs
+        for job in jobs:
+            assert job.func.__wrapped__ is getattr(sched, job.func.__name__)
+    finally:
+        scheduler.shutdown(wait=False)
@@ -0,0 +1,67 @@
+"""
+Tests for the priority job lanes (app/core/lanes.py, app/worker.py): routing
+of inbound messages to the pro/emergency/media/standard lanes, the cached pro
+set, the WORKER_LANES spec, and one ARQ worker per subscribed lane with only
+the first running the process hooks. (The lane reaching the enqueue is covered
+in tests/test_meta_webhook_route.py.)
+"""
+
+import pytest
+from arq.constants import default_queue_name
+
+from app.core import lanes
+from app.core.arq_worker import WorkerSettings
+from app.core.config import settings
+from app.worker import build_lane_workers
+
+CUSTOMER = "972500000001@c.us"
+PRO_CHAT = "972533333333@c.us"
+
+
+@pytest.fixture
+def lanes_on(monkeypatch):
+    monkeypatch.setattr(settings, "JOB_LANES_ENABLED", True)
+
+
+@pytest.mark.asyncio
+async def test_route_picks_the_lane_and_caches_pros(mock_db, lanes_on):
+    await mock_db.users.insert_one({"phone_number": "0533333333", "role": "professional"})
+
+    assert await lanes.route(CUSTOMER, "דחוף! יש הצפה בבית", None) == lanes.EMERGENCY
+    assert await lanes.route(PRO_CHAT, "אשר", None) == lanes.PRO
+    assert await lanes.route(f"{settings.ADMIN_PHONE}@c.us", "ניהול", None) == lanes.PRO
+    assert await lanes.route(CUSTOMER, "", "https://media/x.jpg") == lanes.MEDIA
+    assert await lanes.route(CUSTOMER, "צריך אינסטלטור", None) == lanes.STANDARD
+
+    # The pro set is cached: a pro added now is routed as one after a reload.
+    await mock_db.users.insert_one({"phone_number": "972544444444", "role": "professional"})
+    assert await lanes.route("972544444444@c.us", "אשר", None) == lanes.STANDARD
+    lanes.reset_pro_cache()
+    assert await lanes.route("972544444444@c.us", "אשר", None) == lanes.PRO
+
+
+@pytest.mark.asyncio
+async def test_route_is_standard_while_the_flag_is_off(mock_db):
+    assert settings.JOB_LANES_ENABLED is False
+    assert await lanes.route(CUSTOMER, "דחוף! יש הצפה", "https://media/x.jpg") == lanes.STANDARD
+    assert lanes.queue_name(lanes.STANDARD) == default_queue_name
+
+
+def test_parse_lanes_and_lane_workers():
+    assert lanes.parse_lanes(" media=4 ") == {"media": 4}
+    for bad in ("", "vip=3", "pro=0", "pro", "pro=x"):
+        with pytest.raises(ValueError):
+            lanes.parse_lanes(bad)
+
+    workers = build_lane_workers("pro=3,standard=10,media=2")
+    assert [(w.queue_name, w.max_jobs) for w in workers] == [
+        (f"{default_queue_name}:pro", 3),
+        (default_queue_name, 10),
+        (f"{default_queue_name}:media", 2),
+    ]
+    # One scheduler/heartbeat/outbox per process: only the primary has hooks.
+    assert workers[0].on_startup is WorkerSettings.on_startup
+    assert all(w.on_startup is None and w.on_shutdown is None for w in workers[1:])
+    assert {w.health_check_key for w in workers} == {
+        f"{w.queue_name}:health-check" for w in workers
+    }
@@ -0,0 +1,180 @@
+"""
+Tests for the reactive lead monitor (lead_events_service.py): entry-once
+dispatch, the change-stream path with its Redis resume token, the polling
+fallback for deployments without a replica set (paging by `(updated_at, _id)`
+through leads sharing one timestamp), and the escalation page
+registered in notification_service.
+"""
+
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+from bson import ObjectId
+from pymongo.errors import OperationFailure
+
+from app.core import database
+from app.core.constants import (
+    LEAD_EVENTS_RESUME_KEY,
+    Actor,
+    LeadStatus,
+    WorkerConstants,
+)
+from app.core.lead_history import status_history_entry
+from app.services import lead_events_service
+from app.services.lead_events_service import LeadEventConsumer, dispatch
+from app.services.lead_manager_service import set_lead_status
+from app.services.notification_service import page_lead_needs_review
+
+
+@pytest.fixture
+def handlers(monkeypatch):
+    any_status, on_review = AsyncMock(), AsyncMock()
+    any_status.__name__ = "any_status"
+    on_review.__name__ = "on_review"
+    monkeypatch.setattr(
+        lead_events_service,
+        "_HANDLERS",
+        {"*": [any_status], LeadStatus.PENDING_ADMIN_REVIEW: [on_review]},
+    )
+    return any_status, on_review
+
+
+class _FakeStream:
+    def __init__(self, changes, error=None):
+        self._changes = list(changes)
+        self._error = error
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._changes:
+            return self._changes.pop(0)
+        if self._error:
+            raise self._error
+        raise StopAsyncIteration
+
+
+@pytest.mark.asyncio
+async def test_entry_handlers_fire_once_per_status(handlers):
+    any_status, on_review = handlers
+    lead = {"_id": ObjectId(), "status": LeadStatus.PENDING_ADMIN_REVIEW}
+
+    await dispatch(lead)
+    await dispatch(lead)  # replayed / re-polled event
+
+    assert any_status.await_count == 2
+    on_review.assert_awaited_once_with(lead)
+
+
+@pytest.mark.asyncio
+async def test_change_stream_dispatches_and_persists_resume_token(
+    handlers, fake_redis, monkeypatch
+):
+    any_status, on_review = handlers
+    lead = {"_id": ObjectId(), "status": LeadStatus.PENDING_ADMIN_REVIEW}
+    token = {"_data": "8264A1B2C3"}
+    watch = lambda *a, **k: _FakeStream([{"_id": token, "fullDocument": lead}])
+    monkeypatch.setattr(database.leads_collection, "watch", watch, raising=False)
+
+    await LeadEventConsumer()._consume_stream()
+
+    on_review.assert_awaited_once_with(lead)
+    assert await LeadEventConsumer()._load_resume_token() == token
+    assert await fake_redis.exists(LEAD_EVENTS_RESUME_KEY)
+
+
+@pytest.mark.asyncio
+async def test_no_replica_set_falls_back_to_polling(handlers, monkeypatch):
+    unsupported = OperationFailure("not a replica set", code=40573)
+    monkeypatch.setattr(
+        database.leads_collection,
+        "watch",
+        lambda *a, **k: _FakeStream([], error=unsupported),
+        raising=False,
+    )
+    consumer = LeadEventConsumer()
+
+    async def poll_and_stop():
+        consumer.stop()
+
+    with patch.object(consumer, "_poll_forever", AsyncMock(side_effect=poll_and_stop)) as poll:
+        await consumer.run()
+
+    poll.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_poller_dispatches_status_changes_past_high_water_mark(
+    mock_db, handlers
+):
+    any_status, on_review = handlers
+    consumer = LeadEventConsumer()
+    assert await consumer.poll_once() == 0  # first run only records "now"
+
+    lead_id = (
+        await mock_db.leads.insert_one(
+            {
+                "chat_id": "poll@c.us",
+                "status": LeadStatus.NEW,
+                "updated_at": datetime.now(timezone.utc) - timedelta(hours=1),
+            }
+        )
+    ).inserted_id
+    await set_lead_status(lead_id, LeadStatus.PENDING_ADMIN_REVIEW, Actor.SYSTEM)
+
+    assert await consumer.poll_once() == 1
+    assert on_review.await_args.args[0]["_id"] == lead_id
+    assert await consumer.poll_once() == 0
+
+
+@pytest.mark.asyncio
+async def test_poller_pages_through_leads_sharing_one_updated_at(
+    mock_db, handlers, monkeypatch
+):
+    any_status, _ = handlers
+    consumer = LeadEventConsumer()
+    await consumer.poll_once()
+    # One bulk transition: a single `updated_at` for the whole batch.
+    stamp = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(seconds=1)
+    inserted = await mock_db.leads.insert_many(
+        [
+            {"chat_id": f"bulk{n}@c.us", "status": LeadStatus.CLOSED, "updated_at": stamp}
+            for n in range(5)
+        ]
+    )
+    monkeypatch.setattr(WorkerConstants, "LEAD_EVENTS_BATCH_SIZE", 2)
+
+    assert [await consumer.poll_once() for _ in range(4)] == [2, 2, 1, 0]
+    dispatched = [call.args[0]["_id"] for call in any_status.await_args_list]
+    assert sorted(dispatched) == sorted(inserted.inserted_ids)
+
+
+@pytest.mark.asyncio
+async def test_escalation_page_skips_admin_moves_and_already_paged_leads():
+    base = {"_id": ObjectId(), "chat_id": "972501234567@c.us"}
+    system = [status_history_entry(LeadStatus.PENDING_ADMIN_REVIEW, Actor.SYSTEM)]
+    admin = [status_history_entry(LeadStatus.PENDING_ADMIN_REVIEW, Actor.ADMIN)]
+
+    with patch("app.services.notification_service.page_operator") as page:
+        await page_lead_needs_review({**base, "status_history": admin})
+        await page_lead_needs_review(
+            {
+                **base,
+                "status_history": system,
+                "escalation_reason": "max_reassignments_exhausted",
+            }
+        )
+        page.assert_not_called()
+
+        await page_lead_needs_review(
+            {**base, "status_history": system, "escalation_reason": "no_usable_location"}
+        )
+    page.assert_called_once()
+    assert "***4567" in page.call_args.args[0]
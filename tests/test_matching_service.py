@@ -290,3 +290,28 @@ async def test_geo_sorts_by_rating(mock_matching_dependencies):
     result = await determine_best_pro(location="Tel Aviv")
 
     assert result == pro_high
+
+
+@pytest.mark.asyncio
+async def test_equal_score_prefers_earliest_availability(mock_matching_dependencies, mock_db):
+    """
+    Scenario: Two equally rated pros, both with free slots this week.
+    Expected: The pro whose first free slot is sooner wins the tie (read from
+    the availability cache in one batch, not a slots query per pro).
+    """
+    from datetime import datetime, timedelta, timezone
+
+    mock_users, mock_leads = mock_matching_dependencies
+    later = {"_id": ObjectId(), "business_name": "Later", "social_proof": {"rating": 4.8}}
+    sooner = {"_id": ObjectId(), "business_name": "Sooner", "social_proof": {"rating": 4.8}}
+    now = datetime.now(timezone.utc)
+    await mock_db.slots.insert_many([
+        {"pro_id": later["_id"], "start_time": now + timedelta(days=3), "is_taken": False},
+        {"pro_id": sooner["_id"], "start_time": now + timedelta(hours=2), "is_taken": False},
+    ])
+
+    mock_users.aggregate = _mock_users_aggregate([later, sooner])
+
+    result = await determine_best_pro(location="Tel Aviv", issue_type="Leak")
+
+    assert result == sooner
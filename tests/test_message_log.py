@@ -0,0 +1,152 @@
+"""
+Tests for the write-behind message log (message_log_service.MessageLogWriter,
+on with MESSAGE_LOG_WRITE_BEHIND_ENABLED): LeadManager.log_message updating
+the Redis context and the spill stream with no Mongo write, a flush inserting
+the buffer with one insert_many and deleting its stream entries, a failed
+flush keeping its messages, spilled entries a dead process left behind being
+recovered (duplicates skipped), and a write-through when Redis is down.
+"""
+
+import json
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+import pytest_asyncio
+
+from app.core.background import BackgroundTasks
+from app.core.constants import MESSAGE_LOG_SPILL_KEY, WorkerConstants
+from app.services import message_log_service
+from app.services.lead_manager_service import LeadManager
+from app.services.message_log_service import MessageLogWriter
+
+CHAT_ID = "972501234567@c.us"
+
+
+@pytest_asyncio.fixture
+async def write_behind(mock_db, monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.MESSAGE_LOG_WRITE_BEHIND_ENABLED", True)
+    messages = mock_db.messages
+    await messages.delete_many({"chat_id": CHAT_ID})
+    monkeypatch.setattr(message_log_service, "messages_collection", messages)
+    monkeypatch.setattr(messages, "insert_many", AsyncMock(wraps=messages.insert_many))
+    return messages
+
+
+@pytest.mark.asyncio
+async def test_log_writes_context_and_spill_then_flushes_in_one_batch(
+    write_behind, fake_redis
+):
+    lead_manager = LeadManager()
+    await lead_manager.log_message(CHAT_ID, "user", "יש נזילה במטבח")
+    await lead_manager.log_message(CHAT_ID, "model", "באיזו עיר?")
+
+    # The context is current and the spill holds both; Mongo has neither yet.
+    context = await fake_redis.lrange(f"context:{CHAT_ID}", 0, -1)
+    assert [json.loads(m)["parts"] for m in context] == [["יש נזילה במטבח"], ["באיזו עיר?"]]
+    assert await fake_redis.ttl(f"context:{CHAT_ID}") > 0
+    assert await fake_redis.xlen(MESSAGE_LOG_SPILL_KEY) == 2
+    assert await write_behind.count_documents({"chat_id": CHAT_ID}) == 0
+
+    # A failed flush keeps the messages (and their spill entries).
+    write_behind.insert_many.side_effect = RuntimeError("mongo down")
+    with pytest.raises(RuntimeError):
+        await MessageLogWriter.flush()
+    write_behind.insert_many.side_effect = None
+    assert await fake_redis.xlen(MESSAGE_LOG_SPILL_KEY) == 2
+
+    assert await MessageLogWriter.flush() == 2
+    docs = await write_behind.find({"chat_id": CHAT_ID}).sort("timestamp", 1).to_list(None)
+    assert [(d["role"], d["text"]) for d in docs] == [
+        ("user", "יש נזילה במטבח"),
+        ("model", "באיזו עיר?"),
+    ]
+    assert write_behind.insert_many.await_count == 2
+    assert await fake_redis.xlen(MESSAGE_LOG_SPILL_KEY) == 0
+
+
+@pytest.mark.asyncio
+async def test_recover_inserts_stale_spill_entries_once(write_behind, fake_redis, monkeypatch):
+    await MessageLogWriter.log(CHAT_ID, "user", "שלום")
+    await MessageLogWriter.log(CHAT_ID, "model", "היי")
+    # The process "dies" with both buffered — but the first one was flushed.
+    first_entry, first_doc = MessageLogWriter._pending[0]
+    await write_behind.insert_one(dict(first_doc))
+    MessageLogWriter.reset()
+
+    # Too young: its process may still be retrying the flush.
+    assert await MessageLogWriter.recover() == 0
+
+    monkeypatch.setattr(time, "time", lambda: 10**10)
+    assert await MessageLogWriter.recover() == 2
+    docs = await write_behind.find({"chat_id": CHAT_ID}).to_list(None)
+    assert sorted(d["text"] for d in docs) == ["היי", "שלום"]
+    assert await fake_redis.xlen(MESSAGE_LOG_SPILL_KEY) == 0
+
+
+@pytest.mark.asyncio
+async def test_redis_down_writes_through_and_a_full_batch_flushes_early(
+    write_behind, monkeypatch
+):
+    with patch(
+        "app.services.message_log_service.get_redis_client",
+        AsyncMock(side_effect=ConnectionError("redis down")),
+    ):
+        await MessageLogWriter.log(CHAT_ID, "user", "ישיר")
+    assert (await write_behind.find_one({"chat_id": CHAT_ID}))["text"] == "ישיר"
+
+    monkeypatch.setattr(WorkerConstants, "MESSAGE_LOG_FLUSH_MAX_ITEMS", 2)
+    monkeypatch.setattr(WorkerConstants, "MESSAGE_LOG_FLUSH_INTERVAL_SECONDS", 60)
+    await MessageLogWriter.log(CHAT_ID, "user", "א")
+    await MessageLogWriter.log(CHAT_ID, "model", "ב")
+    MessageLogWriter._timer.cancel()  # the early flush, not the timer, writes them
+    await BackgroundTasks.drain()
+    assert await write_behind.count_documents({"chat_id": CHAT_ID}) == 3
+
+
+@pytest.mark.asyncio
+async def test_erase_purges_the_chats_spill_entries_before_recovery(
+    write_behind, fake_redis, monkeypatch
+):
+    from app.services.data_management_service import delete_user_data
+
+    monkeypatch.setattr(WorkerConstants, "MESSAGE_LOG_RECOVER_BATCH", 2)
+    other = "972509876543@c.us"
+    for text in ("א", "ב", "ג"):
+        await MessageLogWriter.log(CHAT_ID, "user", text)
+    await MessageLogWriter.log(other, "user", "ד")
+    # The process "dies" with all of it buffered.
+    MessageLogWriter.reset()
+
+    result = await delete_user_data(CHAT_ID)
+
+    assert result["spilled_messages"] == 3
+    monkeypatch.setattr(time, "time", lambda: 10**10)
+    assert await MessageLogWriter.recover() == 1
+    assert await write_behind.count_documents({"chat_id": CHAT_ID}) == 0
+    assert await write_behind.count_documents({"chat_id": other}) == 1
+
+
+@pytest.mark.asyncio
+async def test_erase_tombstone_drops_another_processs_buffered_messages(
+    write_behind, fake_redis
+):
+    from app.services.data_management_service import delete_user_data
+
+    await MessageLogWriter.log(CHAT_ID, "user", "לפני המחיקה")
+    # Another replica holds it in its buffer: this process's flush is empty.
+    elsewhere, MessageLogWriter._pending = MessageLogWriter._pending, []
+
+    await delete_user_data(CHAT_ID)
+    assert await fake_redis.ttl(f"messages:erased:{CHAT_ID}") > 0
+
+    # That replica's flush lands after the erase; the tombstone drops it.
+    MessageLogWriter._pending = elsewhere
+    await MessageLogWriter.flush()
+    assert await write_behind.count_documents({"chat_id": CHAT_ID}) == 0
+
+    # A message logged after the erase is kept, flushed by the supervised timer.
+    await MessageLogWriter.log(CHAT_ID, "user", "שיחה חדשה")
+    assert BackgroundTasks.stats()["outstanding"] == 1
+    await BackgroundTasks.drain()
+    assert (await write_behind.find_one({"chat_id": CHAT_ID}))["text"] == "שיחה חדשה"
@@ -1,5 +1,5 @@
 """PRO-89 — GET/POST /webhook/meta: subscription handshake, HMAC auth,
-idempotency, delivery-status routing, and enqueue.
+idempotency, delivery-status routing, enqueue, and envelope batching.
 
 GET tests use `fastapi.testclient.TestClient` (sync, no Redis touch — the
 same pattern as tests/test_integration_webhook.py). POST tests touch fakeredis
@@ -15,12 +15,13 @@ route call and the fakeredis fixture on the same loop.
 import hashlib
 import hmac
 import json
+import time
 
 import httpx
 import pytest
 from fastapi.testclient import TestClient
 from pydantic import SecretStr
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from app.core.config import settings
 from app.main import app
@@ -209,7 +210,13 @@ async def test_post_with_valid_signature_enqueues_and_opens_window(
     assert resp.status_code == 200
     assert resp.json() == {"status": "processing_message"}
     _capturing_pool.enqueue_job.assert_awaited_once_with(
-        "process_message_task", CHAT_ID, "hi", None, message_id="wamid.ROUTE1"
+        "process_message_task",
+        CHAT_ID,
+        "hi",
+        None,
+        message_id="wamid.ROUTE1",
+        gate={"outcome": "accepted", "count": 1, "trips": 0},
+        _queue_name="arq:queue",
     )
 
     assert await fake_redis.exists(f"wa:window:{CHAT_ID}")
@@ -450,3 +457,173 @@ async def test_post_malformed_json_body_still_returns_200_ignored(
     assert resp.status_code == 200
     assert resp.json() == {"status": "ignored_type"}
     _capturing_pool.enqueue_job.assert_not_awaited()
+
+
+# ---------------------------------------------------------------------------
+# Envelope batching — one pipeline, one status write, per-chat enqueue order
+# ---------------------------------------------------------------------------
+
+OTHER_CHAT_ID = "972509999999@c.us"
+
+
+def _batch_payload(messages, statuses=()):
+    return {
+        "object": "whatsapp_business_account",
+        "entry": [
+            {
+                "id": "WABA_ID",
+                "changes": [
+                    {
+                        "field": "messages",
+                        "value": {
+                            "messaging_product": "whatsapp",
+                            "messages": [
+                                {"from": phone, "id": wamid, "type": "text", "text": {"body": text}}
+                                for phone, wamid, text in messages
+                            ],
+                            "statuses": [
+                                {"id": wamid, "status": status, "recipient_id": "972501234567"}
+                                for wamid, status in statuses
+                            ],
+                        },
+                    }
+                ],
+            }
+        ],
+    }
+
+
+async def _post_signed(payload) -> httpx.Response:
+    raw = json.dumps(payload).encode()
+    with patch.object(settings, "META_APP_SECRET", SecretStr("shh-secret")):
+        return await _post(
+            raw,
+            {"X-Hub-Signature-256": _sign(raw, "shh-secret"), "Content-Type": "application/json"},
+        )
+
+
+@pytest.mark.asyncio
+async def test_post_envelope_is_processed_as_one_batch(
+    fake_redis, _capturing_pool, mock_db, monkeypatch
+):
+    collection = mock_db.wa_delivery
+    monkeypatch.setattr(delivery, "wa_delivery_collection", collection)
+    bulk_write = AsyncMock(wraps=collection.bulk_write)
+    monkeypatch.setattr(collection, "bulk_write", bulk_write)
+    pipeline = MagicMock(wraps=fake_redis.pipeline)
+    monkeypatch.setattr(fake_redis, "pipeline", pipeline)
+    await fake_redis.set("webhook:wamid.B2", "processed")  # already handled
+
+    payload = _batch_payload(
+        [
+            ("972501234567", "wamid.A1", "first"),
+            ("972509999999", "wamid.B2", "dup"),
+            ("972501234567", "wamid.A3", "second"),
+            ("972509999999", "wamid.B4", "other"),
+        ],
+        statuses=[("wamid.OUT1", "sent"), ("wamid.OUT1", "delivered")],
+    )
+    resp = await _post_signed(payload)
+
+    assert resp.status_code == 200
+    assert resp.json() == {"status": "processing_message"}
+    pipeline.assert_called_once()
+    bulk_write.assert_awaited_once()
+    doc = await collection.find_one({"wa_message_id": "wamid.OUT1"})
+    assert doc["status"] == "delivered"
+
+    enqueued = [
+        (c.args[1], c.kwargs["message_id"]) for c in _capturing_pool.enqueue_job.await_args_list
+    ]
+    assert [m for chat, m in enqueued if chat == CHAT_ID] == ["wamid.A1", "wamid.A3"]
+    assert [m for chat, m in enqueued if chat == OTHER_CHAT_ID] == ["wamid.B4"]
+    assert await fake_redis.exists(f"wa:window:{CHAT_ID}", f"wa:window:{OTHER_CHAT_ID}") == 2
+
+
+@pytest.mark.asyncio
+async def test_post_envelope_partial_enqueue_failure_releases_only_unqueued_claims(
+    fake_redis, _capturing_pool
+):
+    async def enqueue_job(name, chat_id, *args, **kwargs):
+        if chat_id == CHAT_ID:
+            raise Exception("redis pool exploded")
+
+    _capturing_pool.enqueue_job.side_effect = enqueue_job
+
+    resp = await _post_signed(
+        _batch_payload(
+            [
+                ("972501234567", "wamid.FAIL1", "lost"),
+                ("972509999999", "wamid.OK2", "kept"),
+            ]
+        )
+    )
+
+    assert resp.status_code == 503
+    assert await fake_redis.exists("webhook:wamid.FAIL1") == 0  # redelivery can land
+    assert await fake_redis.exists("webhook:wamid.OK2") == 1  # already enqueued
+
+
+@pytest.mark.asyncio
+async def test_post_envelope_rate_limit_applies_per_chat(fake_redis, _capturing_pool):
+    # The shield's GCRA is a minute ahead: the chat's allowance is used up.
+    await fake_redis.set(f"rate_limit:{CHAT_ID}", time.time() + 60, ex=60)
+
+    resp = await _post_signed(
+        _batch_payload(
+            [
+                ("972501234567", "wamid.FLOOD", "again"),
+                ("972509999999", "wamid.CALM", "hello"),
+            ]
+        )
+    )
+
+    assert resp.status_code == 200
+    _capturing_pool.enqueue_job.assert_awaited_once()
+    assert _capturing_pool.enqueue_job.await_args.args[1] == OTHER_CHAT_ID
+    assert 0 < await fake_redis.pttl(f"rate_limit:{OTHER_CHAT_ID}") <= 60_000
+
+
+@pytest.mark.asyncio
+async def test_post_under_queue_pressure_defers_the_job(
+    fake_redis, _capturing_pool, monkeypatch
+):
+    from app.services.admission_service import AdmissionService
+
+    admit = AsyncMock(return_value=120)
+    monkeypatch.setattr(AdmissionService, "admit", admit)
+
+    resp = await _post_signed(_batch_payload([("972501234567", "wamid.BUSY", "hello")]))
+
+    assert resp.status_code == 200
+    admit.assert_awaited_once_with(CHAT_ID, "hello")
+    assert _capturing_pool.enqueue_job.await_args.kwargs["_defer_by"] == 120
+
+
+@pytest.mark.asyncio
+async def test_post_routes_each_job_to_its_lane(
+    fake_redis, mock_db, _capturing_pool, monkeypatch
+):
+    monkeypatch.setattr(settings, "JOB_LANES_ENABLED", True)
+    await mock_db.users.insert_one({"phone_number": "972533333333", "role": "professional"})
+
+    resp = await _post_signed(
+        _batch_payload(
+            [
+                ("972533333333", "wamid.LANE1", "אשר"),
+                ("972501234567", "wamid.LANE2", "דחוף! יש הצפה"),
+                ("972509999999", "wamid.LANE3", "צריך אינסטלטור"),
+            ]
+        )
+    )
+
+    assert resp.status_code == 200
+    queues = {
+        c.args[1]: c.kwargs["_queue_name"]
+        for c in _capturing_pool.enqueue_job.await_args_list
+    }
+    assert queues == {
+        "972533333333@c.us": "arq:queue:pro",
+        CHAT_ID: "arq:queue:emergency",
+        OTHER_CHAT_ID: "arq:queue",
+    }
@@ -0,0 +1,157 @@
+"""
+Tests for the outbound send queue (app/providers/whatsapp/outbox.py): sends
+inside ``queued_sends()`` are queued rather than transmitted and drain in
+order per recipient with long texts pre-split into chunks (queued whole when
+the service window is closed, so it falls back to one template), a throttled send
+backs off without letting the recipient's later messages overtake it, and the
+global token bucket paces sends to WHATSAPP_MESSAGES_PER_SECOND.
+"""
+
+import json
+import time
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from app.core.constants import WA_OUTBOX_DEAD_KEY, WA_OUTBOX_KEY, WA_OUTBOX_READY_KEY
+from app.providers.whatsapp import outbox
+from app.providers.whatsapp.base import WhatsAppProvider
+from app.providers.whatsapp.facade import WhatsAppFacade
+from app.providers.whatsapp.outbox import OutboxWorker, queued_sends, take_send_token
+from app.providers.whatsapp.window import window_key
+
+
+class _TransmittingProvider(WhatsAppProvider):
+    name = "fake-transmitting"
+    transmits = True
+
+    def __init__(self, failures=None):
+        self.sent: list[tuple] = []
+        # text → exceptions to raise on its next sends, in order
+        self.failures = failures or {}
+
+    async def send_text(self, chat_id, text):
+        if self.failures.get(text):
+            raise self.failures[text].pop(0)
+        self.sent.append((chat_id, text))
+        return {"id": "1"}
+
+    async def send_file(self, chat_id, url, caption="", file_name="media.jpg"):
+        self.sent.append((chat_id, url))
+        return {"id": "2"}
+
+    async def send_template(self, chat_id, template_name, params=None):
+        self.sent.append((chat_id, template_name))
+        return {"id": "3"}
+
+    async def send_interactive(self, chat_id, body, options):
+        self.sent.append((chat_id, body))
+        return {"id": "4"}
+
+    async def get_state(self):
+        return "authorized"
+
+    def parse_webhook(self, payload):
+        return None
+
+
+def _graph_error(status: int, code: int | None = None) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://graph.facebook.com/v21.0/1/messages")
+    body = {"error": {"code": code}} if code else {}
+    response = httpx.Response(status, json=body, request=request)
+    return httpx.HTTPStatusError("graph error", request=request, response=response)
+
+
+@pytest_asyncio.fixture
+async def queue_on(fake_redis, monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.OUTBOUND_QUEUE_ENABLED", True)
+    await fake_redis.set("wa:instance:state", "authorized")
+    return fake_redis
+
+
+async def _drain(worker: OutboxWorker) -> None:
+    while await worker.drain_once():
+        pass
+
+
+@pytest.mark.asyncio
+async def test_queued_sends_drain_in_order_per_recipient(queue_on):
+    provider = _TransmittingProvider()
+    facade = WhatsAppFacade(provider)
+    agenda = "\n".join(f"job line {i:04d} " + "x" * 80 for i in range(60))  # > 4096
+    await queue_on.set(window_key("a@c.us"), "open")
+
+    with queued_sends():
+        assert await facade.send_message("a@c.us", agenda) == {"queued": 2}
+        await facade.send_template("a@c.us", "pro_reminder")
+        await facade.send_message("b@c.us", "hello b")
+    assert provider.sent == []  # nothing transmitted by the caller
+
+    # Outside queued_sends() a send is direct, as for a conversational reply.
+    await facade.send_message("c@c.us", "reply")
+    assert provider.sent == [("c@c.us", "reply")]
+
+    await _drain(OutboxWorker(facade))
+
+    to_a = [item for chat, item in provider.sent if chat == "a@c.us"]
+    assert len(to_a) == 3 and to_a[-1] == "pro_reminder"
+    assert "".join(to_a[:2]).replace("\n", "") == agenda.replace("\n", "")
+    assert ("b@c.us", "hello b") in provider.sent
+    assert await queue_on.zcard(WA_OUTBOX_READY_KEY) == 0
+
+
+@pytest.mark.asyncio
+async def test_long_text_to_a_closed_window_is_queued_whole(queue_on):
+    provider = _TransmittingProvider()
+    facade = WhatsAppFacade(provider)
+    agenda = "\n".join(f"job line {i:04d} " + "x" * 80 for i in range(60))  # > 4096
+
+    with queued_sends():
+        assert await facade.send_message("a@c.us", agenda) == {"queued": 1}
+    await _drain(OutboxWorker(facade))
+
+    # One provider send: the provider's own window check picks the single
+    # fallback template for the whole message.
+    assert provider.sent == [("a@c.us", agenda)]
+
+
+@pytest.mark.asyncio
+async def test_throttled_send_backs_off_and_keeps_order(queue_on):
+    provider = _TransmittingProvider(
+        failures={"first": [_graph_error(429)], "doomed": [_graph_error(400, code=131026)]}
+    )
+    facade = WhatsAppFacade(provider)
+    with queued_sends():
+        for text in ("first", "second"):
+            await facade.send_message("a@c.us", text)
+        await facade.send_message("d@c.us", "doomed")
+        await facade.send_message("d@c.us", "after")
+    worker = OutboxWorker(facade)
+
+    await _drain(worker)
+
+    # a@c.us is backing off: nothing sent to it, "first" still at the head.
+    assert [text for chat, text in provider.sent if chat == "a@c.us"] == []
+    head = json.loads(await queue_on.lindex(WA_OUTBOX_KEY.format(chat_id="a@c.us"), 0))
+    assert (head["args"][0], head["attempts"]) == ("first", 1)
+    assert await queue_on.zscore(WA_OUTBOX_READY_KEY, "a@c.us") > time.time()
+    # A non-retryable error drops the message and frees the recipient.
+    assert [text for chat, text in provider.sent if chat == "d@c.us"] == ["after"]
+    assert json.loads(await queue_on.lindex(WA_OUTBOX_DEAD_KEY, 0))["args"] == ["doomed"]
+
+    await queue_on.zadd(WA_OUTBOX_READY_KEY, {"a@c.us": time.time()})  # backoff elapsed
+    await _drain(worker)
+    assert [text for chat, text in provider.sent if chat == "a@c.us"] == ["first", "second"]
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_paces_sends(fake_redis):
+    assert await take_send_token(fake_redis, rate=2) == 0
+    assert await take_send_token(fake_redis, rate=2) == 0
+
+    wait = await take_send_token(fake_redis, rate=2)
+    assert 0 < wait <= 0.5
+
+    assert outbox._is_retryable(_graph_error(400, code=130429))
+    assert not outbox._is_retryable(_graph_error(400, code=131026))
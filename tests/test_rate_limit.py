@@ -6,6 +6,7 @@ drive process_incoming_message and assert pros/admins are exempt and the AI engi
 never invoked once a cap trips.
 """
 
+import asyncio
 from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock, patch
 from zoneinfo import ZoneInfo
@@ -17,59 +18,14 @@ import app.services.workflow_service as workflow_service
 from app.core.config import settings
 from app.core.constants import LeadStatus, UserStates, WorkerConstants
 from app.core.messages import Messages
-from app.services.security_service import SecurityService
+from app.services.security_service import _RATE_LIMIT_LUA, SecurityService
 
 
 # --------------------------------------------------------------------------- #
-# Fake Redis with sorted-set + pipeline support (no fakeredis dependency)
+# Fake Redis counters (daily cap / trip counter INCR + EXPIRE)
 # --------------------------------------------------------------------------- #
-class _FakePipeline:
-    def __init__(self, redis):
-        self._redis = redis
-        self._ops = []
-
-    def zremrangebyscore(self, key, min_score, max_score):
-        self._ops.append(("zrem", key, min_score, max_score))
-        return self
-
-    def zadd(self, key, mapping):
-        self._ops.append(("zadd", key, mapping))
-        return self
-
-    def zcard(self, key):
-        self._ops.append(("zcard", key))
-        return self
-
-    def expire(self, key, ttl):
-        self._ops.append(("expire", key, ttl))
-        return self
-
-    async def execute(self):
-        results = []
-        for op in self._ops:
-            kind = op[0]
-            if kind == "zrem":
-                _, key, lo, hi = op
-                zset = self._redis.zsets.setdefault(key, {})
-                stale = [m for m, s in zset.items() if lo <= s <= hi]
-                for m in stale:
-                    del zset[m]
-                results.append(len(stale))
-            elif kind == "zadd":
-                _, key, mapping = op
-                self._redis.zsets.setdefault(key, {}).update(mapping)
-                results.append(len(mapping))
-            elif kind == "zcard":
-                _, key = op
-                results.append(len(self._redis.zsets.get(key, {})))
-            elif kind == "expire":
-                results.append(True)
-        return results
-
-
 class _FakeRedis:
     def __init__(self):
-        self.zsets = {}
         self.counters = {}
         self.expire_calls = []
 
@@ -81,9 +37,6 @@ class _FakeRedis:
         self.expire_calls.append((key, ttl))
         return True
 
-    def pipeline(self):
-        return _FakePipeline(self)
-
 
 def _patch_redis(redis):
     return patch(
@@ -98,52 +51,84 @@ def _patch_redis(redis):
 # --------------------------------------------------------------------------- #
 @pytest.mark.asyncio
 async def test_sliding_window_allows_under_limit():
-    redis = _FakeRedis()
-    with _patch_redis(redis):
-        for _ in range(WorkerConstants.INBOUND_RATE_LIMIT_MAX):
-            assert (
-                await SecurityService.check_sliding_window(
-                    "c1@c.us", limit=20, window_seconds=60
-                )
-                is True
+    # The burst is half the limit; the rest is spread over the window.
+    for _ in range(WorkerConstants.INBOUND_RATE_LIMIT_MAX // 2):
+        assert (
+            await SecurityService.check_sliding_window(
+                "c1@c.us", limit=20, window_seconds=60
             )
+            is True
+        )
 
 
 @pytest.mark.asyncio
 async def test_sliding_window_blocks_over_limit():
-    redis = _FakeRedis()
-    with _patch_redis(redis):
-        results = [
-            await SecurityService.check_sliding_window(
-                "c1@c.us", limit=3, window_seconds=60
-            )
-            for _ in range(5)
-        ]
-    assert results[:3] == [True, True, True]
-    assert results[3] is False and results[4] is False
+    results = [
+        await SecurityService.check_sliding_window(
+            "c1@c.us", limit=3, window_seconds=60
+        )
+        for _ in range(4)
+    ]
+    assert results[:2] == [True, True]  # a burst of ceil(3 / 2)
+    assert results[2] is False and results[3] is False
 
 
 @pytest.mark.asyncio
 async def test_sliding_window_is_per_chat():
-    redis = _FakeRedis()
-    with _patch_redis(redis):
-        for _ in range(3):
-            await SecurityService.check_sliding_window(
-                "c1@c.us", limit=3, window_seconds=60
-            )
-        # c1 is now full, but c2 is independent
-        assert (
-            await SecurityService.check_sliding_window(
-                "c1@c.us", limit=3, window_seconds=60
-            )
-            is False
+    for _ in range(3):
+        await SecurityService.check_sliding_window(
+            "c1@c.us", limit=3, window_seconds=60
         )
-        assert (
-            await SecurityService.check_sliding_window(
-                "c2@c.us", limit=3, window_seconds=60
-            )
-            is True
+    # c1 is now full, but c2 is independent
+    assert (
+        await SecurityService.check_sliding_window(
+            "c1@c.us", limit=3, window_seconds=60
         )
+        is False
+    )
+    assert (
+        await SecurityService.check_sliding_window(
+            "c2@c.us", limit=3, window_seconds=60
+        )
+        is True
+    )
+
+
+@pytest.mark.asyncio
+async def test_sliding_window_keeps_one_timestamp_and_refills_per_interval(fake_redis):
+    """GCRA: a single string per chat, expiring when the burst is full
+    again; one cell frees up every interval, not all at once at the end of a
+    fixed window. 4 per second is a burst of 2, then one per 1/3 s."""
+    for _ in range(2):
+        assert await SecurityService.check_sliding_window("c1@c.us", 4, 1)
+    assert not await SecurityService.check_sliding_window("c1@c.us", 4, 1)
+    assert await fake_redis.type("rl:gcra:c1@c.us") == "string"
+    assert 0 < await fake_redis.pttl("rl:gcra:c1@c.us") <= 667
+
+    await asyncio.sleep(0.35)  # one interval later: exactly one more
+    assert await SecurityService.check_sliding_window("c1@c.us", 4, 1)
+    assert not await SecurityService.check_sliding_window("c1@c.us", 4, 1)
+
+
+@pytest.mark.asyncio
+async def test_sliding_window_worst_case_never_exceeds_the_limit(fake_redis):
+    """A chat flooding every 100 ms for three minutes gets at most ``limit``
+    messages through in any 60 s window — the sorted set's guarantee. An
+    uncapped GCRA burst let 19 of 10 through in the first window."""
+    limit = WorkerConstants.INBOUND_RATE_LIMIT_MAX
+    script = fake_redis.register_script(_RATE_LIMIT_LUA)
+    start = 1_800_000_000.0
+    allowed = [
+        now
+        for now in (start + i / 10 for i in range(1800))
+        if await script(keys=["rl:gcra:flood@c.us"], args=[limit, 60, now]) == 1
+    ]
+
+    in_window = [
+        sum(1 for t in allowed if end - 60 < t <= end) for end in allowed
+    ]
+    assert max(in_window) == limit
+    assert sum(1 for t in allowed if t < start + 60) == limit
 
 
 @pytest.mark.asyncio
@@ -224,6 +209,34 @@ async def test_record_trip_fails_open_to_zero():
         assert await SecurityService.record_trip("c1@c.us") == 0
 
 
+# --------------------------------------------------------------------------- #
+# stage_ingestion_gate — one atomic script per inbound message (fakeredis)
+# --------------------------------------------------------------------------- #
+@pytest.mark.asyncio
+async def test_ingestion_gate_verdicts(fake_redis, monkeypatch):
+    # Bursts of 2 (customer) and 4 (shield): ceil(limit / 2).
+    monkeypatch.setattr(WorkerConstants, "INBOUND_RATE_LIMIT_MAX", 3)
+    chat = "c1@c.us"
+    pipe = fake_redis.pipeline(transaction=False)
+    for message_id in ("m1", "m1", "m2", "m3", "m4", "m5"):
+        await SecurityService.stage_ingestion_gate(
+            pipe, chat, message_id, "wa:window:c1@c.us", shield_limit=7
+        )
+    verdicts = [SecurityService.ingestion_verdict(r) for r in await pipe.execute()]
+
+    assert [(v.outcome, v.count, v.trips) for v in verdicts] == [
+        ("accepted", 1, 0),
+        ("duplicate", 0, 0),  # counted nowhere
+        ("accepted", 2, 0),
+        ("throttled", 3, 1),
+        ("throttled", 3, 2),  # a rejected request does not use a cell
+        ("shielded", 5, 0),
+    ]
+    assert await fake_redis.exists("wa:window:c1@c.us", "webhook:m5") == 2
+    for key in ("rate_limit:c1@c.us", "rl:gcra:c1@c.us", "rl:trips:c1@c.us"):
+        assert await fake_redis.ttl(key) > 0
+
+
 # --------------------------------------------------------------------------- #
 # End-to-end wiring through process_incoming_message
 # --------------------------------------------------------------------------- #
@@ -355,3 +368,24 @@ async def test_daily_cap_blocks_assigned_pro_fast_path(wired_mocks):
     )
     build_pro.assert_not_awaited()
     workflow_service.ai.analyze_conversation.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_gate_verdict_replaces_the_worker_limiter_calls(wired_mocks):
+    """A message that came through the ingestion gate is not counted again:
+    the worker applies the verdict the gate returned."""
+    check = AsyncMock(return_value=True)
+    trip = AsyncMock(return_value=0)
+    with patch.object(
+        workflow_service.SecurityService, "check_sliding_window", new=check
+    ), patch.object(workflow_service.SecurityService, "record_trip", new=trip):
+        await workflow_service.process_incoming_message(
+            "972500000001@c.us",
+            "שלום, יש לי נזילה",
+            gate={"outcome": "throttled", "count": 11, "trips": 1},
+        )
+
+    check.assert_not_awaited()
+    trip.assert_not_awaited()
+    assert Messages.Errors.RATE_LIMITED in _sent_texts(workflow_service.whatsapp)
+    workflow_service.ai.analyze_conversation.assert_not_awaited()
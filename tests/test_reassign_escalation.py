@@ -365,3 +365,35 @@ async def test_below_max_reassignments_attempts_normal_reassignment(
 
     # Text-only menu rule (CLAUDE.md) — no interactive buttons anywhere in this flow.
     mock_whatsapp.send_interactive_buttons.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_reassignment_backs_off_when_the_lead_moved_concurrently(
+    mock_db, monkeypatch, mock_whatsapp, mock_state_and_context
+):
+    """The NEW transition is guarded on the status read, like the escalation:
+    a pro who accepted while the replacement was being matched keeps the lead,
+    and no second pro is offered it."""
+    monkeypatch.setattr(monitor_service, "leads_collection", mock_db.leads)
+    monkeypatch.setattr(monitor_service, "users_collection", mock_db.users)
+    monkeypatch.setattr(
+        "app.services.matching_service.determine_best_pro",
+        AsyncMock(return_value={"_id": "new_pro", "phone_number": "972500000002"}),
+    )
+    notify = AsyncMock(return_value=True)
+    monkeypatch.setattr(monitor_service, "notify_pro_new_lead", notify)
+    await mock_db.leads.delete_many({})
+    lead = await _insert_exhausted_lead(
+        mock_db, status=LeadStatus.BOOKED, reassignment_count=0
+    )
+    stale_lead = dict(lead)
+    stale_lead["status"] = LeadStatus.NEW
+
+    result = await reassign_lead(stale_lead)
+
+    assert result is False
+    notify.assert_not_called()
+    updated = await mock_db.leads.find_one({"_id": lead["_id"]})
+    assert updated["status"] == LeadStatus.BOOKED
+    assert updated["pro_id"] == "old_pro"
+    assert updated["reassignment_count"] == 0
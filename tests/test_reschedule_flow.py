@@ -6,8 +6,8 @@ AWAITING_RESCHEDULE_TIME) atomically claims the new slot, frees the old one,
 updates the lead, and notifies the pro. Edge cases: cancel keyword, invalid
 choice, slot already taken (race), and missing booked lead.
 
-customer_flow imports slots_collection at module level but conftest only patches
-its users/leads/reviews, so each test monkeypatches slots_collection too.
+Slot claims/releases go through scheduling_service.claim_slot/release_slot,
+whose slots_collection conftest already binds to mock_db.slots.
 StateManager is Redis-backed → replaced with a mock (test_pro_flow.py pattern).
 """
 
@@ -24,8 +24,6 @@ from app.core.messages import Messages
 
 @pytest.fixture
 def reschedule_env(monkeypatch, mock_db):
-    monkeypatch.setattr(customer_flow, "slots_collection", mock_db.slots)
-
     mock_state = MagicMock()
     mock_state.clear_state = AsyncMock()
     mock_state.get_metadata = AsyncMock(return_value={})
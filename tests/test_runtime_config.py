@@ -0,0 +1,84 @@
+"""
+Tests for the runtime settings cache (app/services/runtime_config_service.py):
+repeated reads served from memory without a Mongo round trip, a change
+notification on the pub/sub channel dropping the cached document within a
+second, and the TTL bounding a writer that never publishes.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core import database
+from app.core.constants import RUNTIME_CONFIG_CHANNEL
+from app.core.redis_client import listen_for_invalidations
+from app.services import runtime_config_service
+from app.services.runtime_config_service import RuntimeConfig
+
+
+class _CountingSettings:
+    def __init__(self, doc):
+        self.doc = doc
+        self.reads = 0
+
+    async def find_one(self, query):
+        self.reads += 1
+        return dict(self.doc)
+
+
+@pytest.mark.asyncio
+async def test_reads_are_cached_between_changes(monkeypatch):
+    settings = _CountingSettings({"_id": "scheduler_config", "sos_healer_active": True})
+    monkeypatch.setattr(database, "settings_collection", settings)
+
+    for _ in range(5):
+        config = await RuntimeConfig.get("scheduler_config")
+
+    assert config["sos_healer_active"] is True
+    assert settings.reads == 1
+
+
+@pytest.mark.asyncio
+async def test_published_change_invalidates_within_a_second(fake_redis, monkeypatch):
+    settings = _CountingSettings({"_id": "scheduler_config", "sos_healer_active": False})
+    monkeypatch.setattr(database, "settings_collection", settings)
+    listener = asyncio.create_task(
+        listen_for_invalidations({RUNTIME_CONFIG_CHANNEL: RuntimeConfig.invalidate})
+    )
+    try:
+        for _ in range(50):
+            if (await fake_redis.pubsub_numsub(RUNTIME_CONFIG_CHANNEL))[0][1]:
+                break
+            await asyncio.sleep(0.01)
+        assert (await RuntimeConfig.get("scheduler_config"))["sos_healer_active"] is False
+
+        # The operator flips the toggle; the admin panel publishes the doc id.
+        settings.doc["sos_healer_active"] = True
+        await fake_redis.publish(RUNTIME_CONFIG_CHANNEL, "scheduler_config")
+
+        for _ in range(100):
+            if "scheduler_config" not in RuntimeConfig._cache:
+                break
+            await asyncio.sleep(0.01)
+        assert (await RuntimeConfig.get("scheduler_config"))["sos_healer_active"] is True
+        assert settings.reads == 2
+    finally:
+        listener.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await listener
+
+
+@pytest.mark.asyncio
+async def test_ttl_bounds_an_unannounced_change(monkeypatch):
+    settings = _CountingSettings({"_id": "scheduler_config", "stale_monitor_active": True})
+    monkeypatch.setattr(database, "settings_collection", settings)
+    clock = [1000.0]
+    monkeypatch.setattr(runtime_config_service.time, "monotonic", lambda: clock[0])
+
+    await RuntimeConfig.get("scheduler_config")
+    settings.doc["stale_monitor_active"] = False  # manual Mongo edit, no publish
+
+    clock[0] += RuntimeConfig.TTL - 1
+    assert (await RuntimeConfig.get("scheduler_config"))["stale_monitor_active"] is True
+    clock[0] += 2
+    assert (await RuntimeConfig.get("scheduler_config"))["stale_monitor_active"] is False
@@ -18,12 +18,11 @@ IL_TZ = pytz.timezone("Asia/Jerusalem")
 @pytest.fixture
 def mock_collections():
     with patch("app.scheduler.leads_collection") as mock_leads, patch(
-        "app.scheduler.users_collection"
-    ) as mock_users, patch("app.scheduler.settings_collection") as mock_settings:
+        "app.scheduler.settings_collection"
+    ) as mock_settings:
 
         # Setup Async cursors
         mock_leads.find = MagicMock()
-        mock_users.find = MagicMock()
         mock_leads.update_many = AsyncMock()
         mock_leads.update_many.return_value.modified_count = 0
 
@@ -35,7 +34,7 @@ def mock_collections():
             "sos_reporter_active": True,
         }
 
-        yield mock_leads, mock_users, mock_settings
+        yield mock_leads, mock_settings
 
 
 @pytest.fixture
@@ -55,7 +54,7 @@ def mock_actions():
 
 @pytest.mark.asyncio
 async def test_monitor_unfinished_jobs_tier1(mock_collections, mock_actions):
-    mock_leads, _, _ = mock_collections
+    mock_leads, _ = mock_collections
     mock_remind, mock_check, _ = mock_actions
 
     # Mock datetime to be 12:00 PM IL time (Business hours)
@@ -79,7 +78,7 @@ async def test_monitor_unfinished_jobs_tier1(mock_collections, mock_actions):
 
 @pytest.mark.asyncio
 async def test_monitor_unfinished_jobs_tier3(mock_collections, mock_actions):
-    mock_leads, _, _ = mock_collections
+    mock_leads, _ = mock_collections
 
     # Mock datetime 12:00 PM
     fixed_now = datetime(2023, 1, 1, 12, 0, 0, tzinfo=IL_TZ)
@@ -104,51 +103,44 @@ async def test_monitor_unfinished_jobs_tier3(mock_collections, mock_actions):
 
 @pytest.mark.asyncio
 async def test_send_daily_reminders(mock_collections, mock_actions):
-    mock_leads, mock_users, _ = mock_collections
+    mock_leads, _ = mock_collections
     _, _, mock_whatsapp = mock_actions
 
-    # Mock Users: explicit cursor setup
-    pro = {
+    # The agenda is one aggregation over leads, grouped per pro and joined to
+    # the pro's user doc — no per-pro leads.find (PRO-9: renders from
+    # appointment_datetime).
+    agenda = {
         "_id": ObjectId(),
         "business_name": "Mario Plumbing",
         "phone_number": "972500000000",
-        "is_active": True,
-    }
-    users_cursor = MagicMock()
-    users_cursor.to_list = AsyncMock(return_value=[pro])
-    mock_users.find.return_value = users_cursor
-
-    # Mock Leads (Booked Today) — PRO-9: agenda now renders from appointment_datetime
-    job = {
-        "created_at": datetime.now(pytz.utc),
-        "appointment_datetime": datetime.now(pytz.utc),
-        "chat_id": "12345@c.us",
-        "details": "Leaky Faucet",
+        "jobs": [
+            {
+                "appointment_datetime": datetime.now(pytz.utc),
+                "chat_id": "12345@c.us",
+                "details": "Leaky Faucet",
+            }
+        ],
     }
 
-    # Setup chained cursor mock for Leads
-    # The code does: leads_collection.find(...).sort(...).to_list(...)
-    leads_cursor = MagicMock()
-    sort_cursor = MagicMock()
-    sort_cursor.to_list = AsyncMock(return_value=[job])
-    leads_cursor.sort.return_value = sort_cursor
-    mock_leads.find.return_value = leads_cursor
+    async def _agg(*args, **kwargs):
+        yield agenda
+
+    mock_leads.aggregate = MagicMock(side_effect=_agg)
 
     with patch("app.scheduler.datetime") as mock_dt:
         mock_dt.now.return_value = datetime(2023, 1, 1, 8, 0, 0, tzinfo=IL_TZ)
 
-        await send_daily_reminders()
+        metrics = await send_daily_reminders()
 
-        # Verify intermediate calls
-        mock_users.find.assert_called()
-        mock_leads.find.assert_called()
-        leads_cursor.sort.assert_called()
-        sort_cursor.to_list.assert_called()
+        mock_leads.aggregate.assert_called_once()
+        mock_leads.find.assert_not_called()
 
         mock_whatsapp.send_message.assert_called_once()
         msg_sent = mock_whatsapp.send_message.call_args[0][1]
         assert "Mario Plumbing" in msg_sent
         assert "Leaky Faucet" in msg_sent
+        assert metrics["pros_messaged"] == 1
+        assert metrics["failures"] == 0
 
 
 # --- PRO-9: appointment_datetime is the source of truth for the daily agenda ---
@@ -277,6 +269,83 @@ async def test_send_daily_reminders_excludes_booked_lead_without_appointment_dat
     scheduler_module.whatsapp.send_message.assert_not_called()
 
 
+@pytest.mark.asyncio
+async def test_send_daily_reminders_groups_per_pro_and_counts_failures(
+    mock_db, fake_redis
+):
+    """One agenda per active pro with jobs today; an inactive pro is skipped,
+    and one failed send is counted without stopping the others."""
+    import json
+
+    await mock_db.users.delete_many({})
+    await mock_db.leads.delete_many({})
+
+    today = datetime.now(IL_TZ).date()
+    pros = []
+    for name, active in [("Alpha", True), ("Beta", True), ("Gamma", False)]:
+        pro_id = ObjectId()
+        pros.append(pro_id)
+        await mock_db.users.insert_one(
+            {
+                "_id": pro_id,
+                "business_name": name,
+                "phone_number": f"97250000{len(pros):04d}",
+                "is_active": active,
+            }
+        )
+        for hour in (9, 14):
+            appt = IL_TZ.localize(datetime(today.year, today.month, today.day, hour))
+            await mock_db.leads.insert_one(
+                {
+                    "pro_id": pro_id,
+                    "status": LeadStatus.BOOKED,
+                    "appointment_datetime": appt.astimezone(pytz.utc),
+                    "chat_id": f"9725011{hour:02d}{len(pros)}@c.us",
+                    "details": f"{name} job {hour}",
+                }
+            )
+
+    sent = []
+
+    async def _send(chat_id, text):
+        if "Beta" in text:
+            raise RuntimeError("provider 503")
+        sent.append(text)
+
+    scheduler_module.whatsapp.send_message = AsyncMock(side_effect=_send)
+
+    metrics = await scheduler_module.send_daily_reminders()
+
+    assert len(sent) == 1
+    assert sent[0].index("09:00") < sent[0].index("14:00")
+    assert metrics["pros_messaged"] == 1
+    assert metrics["failures"] == 1
+    stored = json.loads(
+        await fake_redis.get(scheduler_module.DAILY_REMINDERS_METRICS_KEY)
+    )
+    assert stored["failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_bounded_fanout_caps_in_flight_sends():
+    import asyncio
+    from app.core.fanout import bounded_fanout
+
+    in_flight = peak = 0
+
+    async def work(_):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+
+    result = await bounded_fanout(range(12), work, concurrency=3)
+
+    assert peak == 3
+    assert (result.attempted, result.succeeded, result.failed) == (12, 12, 0)
+
+
 # --- Tier 2: the customer must not be re-nudged on every 30-min tick -------
 #
 # Reproduces the reported bug directly: a lead that stays BOOKED sits inside the
@@ -13,7 +13,9 @@ import pytest
 import pytz
 
 import app.scheduler as sched
+from app.core import database
 from app.core.datetime_utils import within_business_hours
+from app.services.runtime_config_service import RuntimeConfig
 
 _IL = pytz.timezone("Asia/Jerusalem")
 
@@ -37,10 +39,13 @@ def test_within_business_hours_boundaries():
     assert within_business_hours(_il_utc(21, 0)) is False  # 21:00 — out
 
 
-def _mock_settings(config):
+def _use_settings(monkeypatch, config):
+    """Serve ``config`` as the scheduler_config document. Drops the runtime
+    config cache, as the admin panel's change notification would."""
     m = MagicMock()
     m.find_one = AsyncMock(return_value=config)
-    return m
+    monkeypatch.setattr(database, "settings_collection", m)
+    RuntimeConfig.invalidate()
 
 
 @pytest.mark.asyncio
@@ -48,30 +53,24 @@ async def test_cold_job_allowed_only_in_hours_and_toggled_on(monkeypatch):
     monkeypatch.setattr(sched, "within_business_hours", lambda *a, **k: True)
 
     # in hours + toggle explicitly on → allowed
-    monkeypatch.setattr(
-        sched, "settings_collection", _mock_settings({"sos_healer_active": True})
-    )
+    _use_settings(monkeypatch, {"sos_healer_active": True})
     assert await sched._customer_cold_job_allowed("sos_healer_active") is True
 
     # toggle explicitly off → blocked
-    monkeypatch.setattr(
-        sched, "settings_collection", _mock_settings({"sos_healer_active": False})
-    )
+    _use_settings(monkeypatch, {"sos_healer_active": False})
     assert await sched._customer_cold_job_allowed("sos_healer_active") is False
 
     # toggle absent → default OFF (pilot safety)
-    monkeypatch.setattr(sched, "settings_collection", _mock_settings({}))
+    _use_settings(monkeypatch, {})
     assert await sched._customer_cold_job_allowed("lead_janitor_active") is False
 
     # no config doc at all → blocked
-    monkeypatch.setattr(sched, "settings_collection", _mock_settings(None))
+    _use_settings(monkeypatch, None)
     assert await sched._customer_cold_job_allowed("sla_monitor_active") is False
 
 
 @pytest.mark.asyncio
 async def test_cold_job_blocked_outside_hours_even_when_toggled_on(monkeypatch):
     monkeypatch.setattr(sched, "within_business_hours", lambda *a, **k: False)
-    monkeypatch.setattr(
-        sched, "settings_collection", _mock_settings({"sos_healer_active": True})
-    )
+    _use_settings(monkeypatch, {"sos_healer_active": True})
     assert await sched._customer_cold_job_allowed("sos_healer_active") is False
@@ -0,0 +1,147 @@
+"""
+Tests for the conversation session boundary behind the Mongo history fallback
+(lead_manager_service): a lead reaching a terminal status stamps the chat's
+`chat_sessions` document, a cold-cache get_chat_history reads it instead of
+searching leads and returns the newest messages after it, chats from before
+the stamp derive it from their leads once, an admin-panel close moves the
+boundary too — and, against a real mongod, the rehydration query is an index
+range read with no in-memory sort.
+"""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock
+
+import pytest
+import mongomock
+from bson import ObjectId
+
+from app.core.constants import Actor, LeadStatus
+from app.services import lead_manager_service
+from app.services.lead_manager_service import LeadManager, set_lead_status
+
+CHAT_ID = "972507777777@c.us"
+
+
+async def _messages(collection, start: datetime, count: int, chat_id: str = CHAT_ID):
+    await collection.insert_many(
+        [
+            {
+                "chat_id": chat_id,
+                "role": "user" if n % 2 == 0 else "model",
+                "text": f"הודעה {n}",
+                "timestamp": start + timedelta(minutes=n),
+            }
+            for n in range(count)
+        ]
+    )
+
+
+@pytest.mark.asyncio
+async def test_terminal_status_stamps_the_session_and_rehydration_skips_leads(
+    mock_db, monkeypatch
+):
+    await mock_db.chat_sessions.delete_many({})
+    await mock_db.messages.delete_many({"chat_id": CHAT_ID})
+    start = datetime(2026, 1, 1, 9, 0, tzinfo=timezone.utc)
+    lead_id = ObjectId()
+    await mock_db.leads.insert_one(
+        {"_id": lead_id, "chat_id": CHAT_ID, "status": LeadStatus.BOOKED}
+    )
+    await _messages(mock_db.messages, start, 3)  # the old session
+
+    completed_at = start + timedelta(minutes=5)
+    await set_lead_status(
+        lead_id, LeadStatus.COMPLETED, Actor.PRO, extra_set={"completed_at": completed_at}
+    )
+    session = await mock_db.chat_sessions.find_one({"_id": CHAT_ID})
+    assert session["started_at"].replace(tzinfo=timezone.utc) == completed_at
+
+    await _messages(mock_db.messages, start + timedelta(minutes=10), 6)  # this one
+    leads_find_one = AsyncMock()
+    monkeypatch.setattr(lead_manager_service.leads_collection, "find_one", leads_find_one)
+
+    history = await LeadManager().get_chat_history(CHAT_ID, limit=4)
+
+    leads_find_one.assert_not_awaited()
+    assert [m["parts"][0] for m in history] == [f"הודעה {n}" for n in range(2, 6)]
+
+
+@pytest.mark.asyncio
+async def test_chats_without_a_stamp_derive_it_from_their_leads_once(mock_db):
+    await mock_db.chat_sessions.delete_many({})
+    legacy, fresh = "972507777778@c.us", "972507777779@c.us"
+    closed_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    await mock_db.leads.insert_one(
+        {"chat_id": legacy, "status": LeadStatus.CLOSED, "closed_at": closed_at}
+    )
+    lead_manager = LeadManager()
+
+    assert (await lead_manager.get_session_cutoff(legacy)).replace(
+        tzinfo=timezone.utc
+    ) == closed_at
+    assert await lead_manager.get_session_cutoff(fresh) is None
+    # Both stamped: the next rehydration of either is a point read.
+    assert await mock_db.chat_sessions.count_documents({"_id": {"$in": [legacy, fresh]}}) == 2
+    assert "started_at" not in await mock_db.chat_sessions.find_one({"_id": fresh})
+
+
+def test_admin_panel_close_moves_the_session_boundary(monkeypatch):
+    from admin_panel.core import utils
+
+    database = mongomock.MongoClient().db
+    monkeypatch.setattr(utils, "leads_collection", database.leads)
+    monkeypatch.setattr(utils, "chat_sessions_collection", database.chat_sessions)
+    earlier = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    database.chat_sessions.insert_one({"_id": CHAT_ID, "started_at": earlier})
+    closed, booked = ObjectId(), ObjectId()
+    database.leads.insert_many(
+        [
+            {
+                "_id": closed,
+                "chat_id": CHAT_ID,
+                "status": LeadStatus.CLOSED,
+                "updated_at": earlier + timedelta(days=1),
+            },
+            {
+                "_id": booked,
+                "chat_id": "972507777778@c.us",
+                "status": LeadStatus.BOOKED,
+                "updated_at": earlier,
+            },
+        ]
+    )
+
+    utils.stamp_chat_sessions([str(closed), str(booked)])
+
+    session = database.chat_sessions.find_one({"_id": CHAT_ID})
+    assert session["started_at"].replace(tzinfo=timezone.utc) == earlier + timedelta(
+        days=1
+    )
+    # Not session-ending: no boundary recorded.
+    assert database.chat_sessions.count_documents({}) == 1
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_rehydration_query_uses_the_chat_timestamp_index(integration_db):
+    from scripts.create_indexes import create_all_indexes
+
+    # The indexes scripts/create_indexes.py declares, on the test database.
+    await create_all_indexes(silent=True, database=integration_db)
+
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for chat_id in (CHAT_ID, "972507777778@c.us"):
+        await _messages(integration_db.messages, start, 30, chat_id)
+
+    cursor = LeadManager.session_history_cursor(CHAT_ID, start + timedelta(minutes=5), 20)
+    plan = (await cursor.explain())["queryPlanner"]["winningPlan"]
+    plan = plan.get("queryPlan", plan)  # slot-based engine (MongoDB 7+)
+
+    stages, node = [], plan
+    while node:
+        stages.append(node["stage"])
+        if node["stage"] == "IXSCAN":
+            assert node["indexName"] == "chat_id_1_timestamp_1"
+        node = node.get("inputStage")
+    assert "IXSCAN" in stages
+    assert "COLLSCAN" not in stages and "SORT" not in stages
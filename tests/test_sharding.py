@@ -0,0 +1,110 @@
+"""
+Tests for sharded scheduler sweeps (app/core/sharding.py): shard layout from
+worker heartbeats with rebalancing when a replica dies, disjoint and complete
+coverage of a sweep across shards with the shard predicate in the query (and
+the Python fallback for leads without a `shard_key`), and per-shard scheduler
+locks.
+"""
+
+import time
+from unittest.mock import AsyncMock
+
+import pytest
+from bson import ObjectId
+
+from app.core import sharding
+from app.core.constants import WORKERS_LIVE_KEY, WorkerConstants
+from app.core.redis_client import with_scheduler_lock
+from app.core.sharding import Shard, heartbeat, resolve_shard
+from app.core.sweep import run_sweep
+
+
+@pytest.mark.asyncio
+async def test_layout_follows_heartbeats_and_rebalances(fake_redis):
+    for worker in ("w-a", "w-b", "w-c"):
+        await heartbeat(fake_redis, worker)
+
+    assert await resolve_shard(fake_redis, "w-b") == Shard(1, 3)
+
+    # w-a stops heartbeating; once past the liveness window it drops out.
+    stale = time.time() - WorkerConstants.WORKER_LIVENESS_SECONDS - 1
+    await fake_redis.zadd(WORKERS_LIVE_KEY, {"w-a": stale})
+
+    assert await resolve_shard(fake_redis, "w-b") == Shard(0, 2)
+    assert await resolve_shard(fake_redis, "w-a") is None
+
+
+@pytest.mark.asyncio
+async def test_shards_split_a_sweep_without_overlap(mock_db, fake_redis):
+    # Two thirds keyed at creation; the rest predate `shard_key`.
+    keyed = [sharding.with_shard_key({"tag": "sharded"}) for _ in range(20)]
+    legacy = [{"_id": ObjectId(), "tag": "sharded"} for _ in range(10)]
+    await mock_db.leads.insert_many(keyed + legacy)
+    ids = [doc["_id"] for doc in keyed + legacy]
+
+    seen = []
+
+    async def handler(lead):
+        seen.append(lead["_id"])
+
+    processed = []
+    for index in range(3):
+        token = sharding.use_shard(Shard(index, 3))
+        try:
+            result = await run_sweep("sharded", mock_db.leads, {"tag": "sharded"}, handler)
+        finally:
+            sharding.reset_shard(token)
+        processed.append(result.processed)
+
+    assert sorted(seen) == sorted(ids)  # every lead once, in exactly one shard
+    assert sum(processed) == 30 and all(processed)
+
+    # Mongo, not the sweep, drops the keyed leads of other shards.
+    for index in range(3):
+        read = await mock_db.leads.count_documents(
+            {"$and": [{"tag": "sharded"}, sharding.shard_filter(Shard(index, 3))]}
+        )
+        own = sum(sharding.owns(doc["_id"], Shard(index, 3)) for doc in keyed)
+        assert read == own + len(legacy)
+
+
+@pytest.mark.asyncio
+async def test_sharded_lock_is_taken_per_shard(fake_redis, monkeypatch):
+    monkeypatch.setattr(sharding, "WORKER_ID", "w-1")
+    monkeypatch.setattr("app.core.redis_client.settings.SCHEDULER_SHARDING_ENABLED", True)
+    await heartbeat(fake_redis, "w-1")
+    await heartbeat(fake_redis, "w-2")
+    shards = []
+
+    @with_scheduler_lock("sharded_job", ttl=30, sharded=True)
+    async def job():
+        shards.append(sharding.current_shard())
+
+    # The peer holds the *other* shard's lock; ours is free.
+    await fake_redis.set("lock:scheduler:sharded_job:shard:1of2", "1")
+    await job()
+    assert shards == [Shard(0, 2)]
+
+    await fake_redis.set("lock:scheduler:sharded_job:shard:0of2", "1")
+    await job()
+    assert shards == [Shard(0, 2)]  # our shard is already running — skipped
+
+
+@pytest.mark.asyncio
+async def test_sharded_job_skips_when_its_shard_is_unresolved(fake_redis, monkeypatch):
+    monkeypatch.setattr(sharding, "WORKER_ID", "w-new")
+    monkeypatch.setattr("app.core.redis_client.settings.SCHEDULER_SHARDING_ENABLED", True)
+    await heartbeat(fake_redis, "w-1")  # a peer is live; our heartbeat is not
+    runs = []
+
+    @with_scheduler_lock("sharded_job", ttl=30, sharded=True)
+    async def job():
+        runs.append(sharding.current_shard())
+
+    await job()
+    assert runs == []  # no unsharded sweep over the peer's leads
+    assert await fake_redis.get("lock:scheduler:sharded_job") is None
+
+    monkeypatch.setattr(sharding, "live_workers", AsyncMock(side_effect=RuntimeError("boom")))
+    await job()
+    assert runs == []
@@ -106,3 +106,37 @@ async def test_nudger_ignores_fresh_leads(mock_db, monkeypatch, mock_whatsapp):
     await remind_stale_booked_leads()
 
     mock_whatsapp.send_message.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_wheel_and_sweep_snapshots_remind_once(mock_db, monkeypatch, mock_whatsapp):
+    """Two paths holding the same due snapshot: only the one whose claim
+    matches sends; the other gets the lead's next due time back."""
+    from app.services.monitor_service import remind_stale_booked_lead
+
+    monkeypatch.setattr("app.services.monitor_service.leads_collection", mock_db.leads)
+    monkeypatch.setattr("app.services.monitor_service.users_collection", mock_db.users)
+    await mock_db.users.delete_many({})
+    await mock_db.users.insert_one({"_id": "pro_once", "phone_number": "972500000001"})
+    now = datetime.now(timezone.utc)
+    result = await mock_db.leads.insert_one(
+        {
+            "status": LeadStatus.BOOKED,
+            "appointment_datetime": now
+            - timedelta(hours=WorkerConstants.STALE_BOOKED_LEAD_HOURS + 1),
+            "pro_id": "pro_once",
+            "reminders_sent": 1,
+            "last_reminder_at": now
+            - timedelta(hours=WorkerConstants.STALE_BOOKED_REMINDER_INTERVAL_HOURS + 1),
+        }
+    )
+    snapshot = await mock_db.leads.find_one({"_id": result.inserted_id})
+
+    first = await remind_stale_booked_lead(dict(snapshot))
+    second = await remind_stale_booked_lead(dict(snapshot))
+
+    mock_whatsapp.send_message.assert_awaited_once()
+    lead = await mock_db.leads.find_one({"_id": result.inserted_id})
+    assert lead["reminders_sent"] == 2
+    # Mongo keeps milliseconds, so the read-back due time is truncated.
+    assert abs(second - first) < timedelta(seconds=1)
@@ -0,0 +1,99 @@
+"""
+Tests for the paginated monitor sweeps (app/core/sweep.py): every matching
+lead is visited past the old 100-document cap, a sweep that runs out of its
+time budget resumes from its Redis checkpoint, and handler failures are
+counted instead of aborting the run.
+
+Mongo is mongomock (module-scoped), so each test sweeps its own chat_id tag.
+"""
+
+import json
+
+import pytest
+from bson import ObjectId
+
+from app.core import sweep
+from app.core.constants import SWEEP_CHECKPOINT_KEY, SWEEP_METRICS_KEY
+from app.core.sweep import run_sweep
+
+
+async def _seed(mock_db, tag: str, count: int):
+    docs = [
+        {"_id": ObjectId(), "chat_id": f"{tag}-{i}@c.us", "tag": tag, "note": "x"}
+        for i in range(count)
+    ]
+    await mock_db.leads.insert_many(docs)
+    return [d["_id"] for d in docs]
+
+
+@pytest.mark.asyncio
+async def test_sweep_visits_every_match_in_pages(mock_db, fake_redis):
+    ids = await _seed(mock_db, "paged", 25)
+    seen = []
+
+    async def handler(lead):
+        seen.append(lead)
+
+    result = await run_sweep(
+        "paged",
+        mock_db.leads,
+        {"tag": "paged"},
+        handler,
+        projection={"chat_id": 1},
+        page_size=10,
+    )
+
+    assert sorted(lead["_id"] for lead in seen) == sorted(ids)
+    assert "note" not in seen[0]  # projection applied
+    assert (result.processed, result.pages, result.completed) == (25, 3, True)
+    assert not await fake_redis.exists(SWEEP_CHECKPOINT_KEY.format(name="paged"))
+    metrics = json.loads(await fake_redis.get(SWEEP_METRICS_KEY.format(name="paged")))
+    assert metrics["processed"] == 25
+
+
+@pytest.mark.asyncio
+async def test_sweep_resumes_from_checkpoint_after_budget(
+    mock_db, fake_redis, monkeypatch
+):
+    ids = await _seed(mock_db, "budget", 12)
+    seen = []
+
+    async def handler(lead):
+        seen.append(lead["_id"])
+
+    # Each monotonic() read advances the clock 1s, so a 0.5s budget is spent
+    # after the first page.
+    ticks = iter(range(1000))
+    monkeypatch.setattr(sweep.time, "monotonic", lambda: float(next(ticks)))
+
+    first = await run_sweep(
+        "budget", mock_db.leads, {"tag": "budget"}, handler,
+        page_size=5, time_budget_seconds=0.5,
+    )
+    assert (first.processed, first.completed) == (5, False)
+    assert await fake_redis.get(SWEEP_CHECKPOINT_KEY.format(name="budget")) == str(ids[4])
+
+    monkeypatch.setattr(sweep.time, "monotonic", lambda: 0.0)
+    second = await run_sweep(
+        "budget", mock_db.leads, {"tag": "budget"}, handler, page_size=5
+    )
+
+    assert second.resumed and second.completed
+    assert second.processed == 7
+    assert sorted(seen) == sorted(ids)  # nothing visited twice, nothing skipped
+
+
+@pytest.mark.asyncio
+async def test_sweep_counts_handler_failures_and_keeps_going(mock_db, fake_redis):
+    ids = await _seed(mock_db, "failing", 4)
+    done = []
+
+    async def handler(lead):
+        if lead["_id"] == ids[1]:
+            raise RuntimeError("boom")
+        done.append(lead["_id"])
+
+    result = await run_sweep("failing", mock_db.leads, {"tag": "failing"}, handler)
+
+    assert (result.processed, result.failed) == (4, 1)
+    assert len(done) == 3
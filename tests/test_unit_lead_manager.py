@@ -142,17 +142,17 @@ async def test_get_chat_history_cache_miss(mock_lead_manager_db):
     _, mock_messages, mock_context_manager = mock_lead_manager_db
     lead_manager = LeadManager()
 
-    # Mock data returned from DB
+    # Mock data returned from DB (newest first, as the query sorts)
     mock_history = [
-        {"role": "user", "text": "Hi", "timestamp": datetime.now()},
         {"role": "model", "text": "Hello", "timestamp": datetime.now()},
+        {"role": "user", "text": "Hi", "timestamp": datetime.now()},
     ]
     mock_messages.find.return_value.to_list.return_value = mock_history
 
     history = await lead_manager.get_chat_history("123", limit=10)
 
     # Verify Cache Miss behavior
-    mock_context_manager.get_history.assert_called_once_with("123")
+    mock_context_manager.get_history.assert_called_once_with("123", limit=10)
     mock_messages.find.assert_called_once()
     mock_context_manager.set_history.assert_called_once()
 
@@ -178,7 +178,7 @@ async def test_get_chat_history_cache_hit(mock_lead_manager_db):
     history = await lead_manager.get_chat_history("123", limit=10)
 
     # Verify Cache Hit behavior
-    mock_context_manager.get_history.assert_called_once_with("123")
+    mock_context_manager.get_history.assert_called_once_with("123", limit=10)
     mock_messages.find.assert_not_called()
     mock_context_manager.set_history.assert_not_called()
 
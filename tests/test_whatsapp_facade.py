@@ -21,6 +21,7 @@ import app.providers.whatsapp as provider_pkg
 import app.providers.whatsapp.facade as facade_module
 from app.core.config import settings
 from app.core.constants import WorkerConstants
+from app.core.redis_client import listen_for_invalidations
 from app.providers.whatsapp.base import NormalizedMessage, WhatsAppProvider
 from app.providers.whatsapp.cloud_api import CloudAPIProvider
 from app.providers.whatsapp.dry_run import DryRunProvider
@@ -197,6 +198,85 @@ async def test_every_outbound_method_is_gated(transmitting, fake_redis):
     assert transmitting.sent == []
 
 
+# ===========================================================================
+# Breaker snapshot — cached in-process, invalidated over pub/sub
+# ===========================================================================
+
+
+@pytest.mark.asyncio
+async def test_a_fan_out_reads_the_breaker_once(transmitting, fake_redis, monkeypatch):
+    await fake_redis.set(_STATE_KEY, "authorized", ex=360)
+    reads = []
+    pipeline = fake_redis.pipeline
+    monkeypatch.setattr(
+        fake_redis, "pipeline", lambda **kw: reads.append(1) or pipeline(**kw)
+    )
+    facade = WhatsAppFacade(transmitting)
+
+    for i in range(50):
+        await facade.send_message(f"97250000{i:04d}@c.us", "hi")
+
+    assert len(transmitting.sent) == 50
+    assert len(reads) == 1
+
+
+@pytest.mark.asyncio
+async def test_an_announced_kill_switch_halts_the_next_send(transmitting, fake_redis):
+    """Another process flips the switch; the listener drops the snapshot the
+    moment the announcement arrives, not when the freshness window ends."""
+    await fake_redis.set(_STATE_KEY, "authorized", ex=360)
+    facade = WhatsAppFacade(transmitting)
+    listener = asyncio.create_task(
+        listen_for_invalidations(
+            {provider_pkg.BREAKER_CHANNEL: provider_pkg.invalidate_breaker_cache}
+        )
+    )
+    try:
+        for _ in range(50):
+            if (await fake_redis.pubsub_numsub(provider_pkg.BREAKER_CHANNEL))[0][1]:
+                break
+            await asyncio.sleep(0.01)
+        await facade.send_message("972500000001@c.us", "before")
+
+        await fake_redis.set(_PAUSE_MANUAL_KEY, "1")
+        await fake_redis.publish(provider_pkg.BREAKER_CHANNEL, "1")
+        for _ in range(100):
+            if facade_module._breaker_snapshot is None:
+                break
+            await asyncio.sleep(0.01)
+
+        assert await facade.send_message("972500000001@c.us", "after") is None
+        assert transmitting.sent == [("text", "972500000001@c.us", "before")]
+    finally:
+        listener.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await listener
+
+    await provider_pkg.set_kill_switch(False)
+    assert await facade.send_message("972500000001@c.us", "resumed")
+    assert not await fake_redis.exists(_PAUSE_MANUAL_KEY)
+
+
+@pytest.mark.asyncio
+async def test_a_cached_confirmation_never_outlives_its_key(
+    transmitting, fake_redis, monkeypatch
+):
+    """PRO-82 still holds with the snapshot: a confirmation about to expire is
+    cached only until it does, then the send fails closed."""
+    await fake_redis.set(_STATE_KEY, "authorized", px=1000)
+    clock = [100.0]
+    monkeypatch.setattr(facade_module.time, "monotonic", lambda: clock[0])
+    facade = WhatsAppFacade(transmitting)
+
+    await facade.send_message("972500000001@c.us", "hi")
+    await fake_redis.delete(_STATE_KEY)  # what the TTL does in production
+    clock[0] += 1.5  # past the key's 1 s, inside WA_BREAKER_CACHE_SECONDS
+
+    assert WorkerConstants.WA_BREAKER_CACHE_SECONDS > 1.5
+    assert await facade.send_message("972500000001@c.us", "stale") is None
+    assert len(transmitting.sent) == 1
+
+
 # ===========================================================================
 # State probe — deliberately outside the breaker
 # ===========================================================================
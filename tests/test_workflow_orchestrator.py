@@ -15,6 +15,7 @@ from app.services.workflow_service import (
 )
 from app.services.ai_engine_service import AIResponse, ExtractedData
 import app.services.workflow_service
+import app.services.scheduling_service
 
 
 @pytest.fixture
@@ -332,15 +333,10 @@ async def test_customer_cancel_booked_lead_releases_slot(
     freed (is_taken -> False) so the pro regains that hour. Previously the
     slot release was missing, orphaning the slot as permanently taken.
 
-    workflow_service imports slots_collection at module level but conftest
-    only patches its users/leads/reviews (see test_reschedule_flow.py docstring
-    for the equivalent gap in customer_flow), so slots_collection is
-    monkeypatched here too.
+    The release goes through scheduling_service.release_slot, whose
+    slots_collection conftest binds to mock_db.slots.
     """
     mock_wa, mock_state, mock_ctx, mock_ai, _ = wf_mocks
-    monkeypatch.setattr(
-        app.services.workflow_service, "slots_collection", mock_db.slots
-    )
     mock_state.get_state.return_value = UserStates.IDLE
 
     chat_id = "972509977001@c.us"
@@ -402,8 +398,8 @@ async def test_customer_cancel_booked_lead_without_slot_id_is_noop_safe(
     """
     mock_wa, mock_state, mock_ctx, mock_ai, _ = wf_mocks
     mock_slots = MagicMock()
-    mock_slots.update_one = AsyncMock()
-    monkeypatch.setattr(app.services.workflow_service, "slots_collection", mock_slots)
+    mock_slots.find_one_and_update = AsyncMock()
+    monkeypatch.setattr(app.services.scheduling_service, "slots_collection", mock_slots)
     mock_state.get_state.return_value = UserStates.IDLE
 
     chat_id = "972509977002@c.us"
@@ -432,7 +428,7 @@ async def test_customer_cancel_booked_lead_without_slot_id_is_noop_safe(
     assert updated_lead["status"] == LeadStatus.CANCELLED
 
     # Guarded: no slot update was attempted since there's no booked_slot_id
-    mock_slots.update_one.assert_not_called()
+    mock_slots.find_one_and_update.assert_not_called()
 
     mock_wa.send_message.assert_any_call(
         chat_id, Messages.Customer.CANCELLED_ACTIVE_LEAD